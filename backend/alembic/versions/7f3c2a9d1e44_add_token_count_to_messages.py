@@ -0,0 +1,34 @@
+"""add_token_count_to_messages
+
+Revision ID: 7f3c2a9d1e44
+Revises: 55e1dfa98f3a
+Create Date: 2026-10-17 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3c2a9d1e44'
+down_revision: Union[str, Sequence[str], None] = '55e1dfa98f3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add nullable token_count column to messages.
+
+    Existing rows stay NULL; context assembly falls back to the
+    character estimate for them.
+    """
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_count', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove token_count column from messages."""
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_column('token_count')
@@ -0,0 +1,52 @@
+"""add_postgres_document_search
+
+Revision ID: a1c6e8f30d92
+Revises: f4c8a2e61b57
+Create Date: 2026-10-17 18:05:12.640318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c6e8f30d92'
+down_revision: Union[str, Sequence[str], None] = 'f4c8a2e61b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the tsvector/GIN document search index on PostgreSQL (SQLite uses FTS5)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # Same objects as PostgresSearchBackend.ensure_schema
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS document_search (
+            document_id VARCHAR(36) PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,
+            filename TEXT NOT NULL,
+            content TEXT NOT NULL,
+            search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(filename, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(content, '')), 'D')
+            ) STORED
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_document_search_vector ON document_search USING GIN (search_vector)"
+    )
+    # Index documents that already have extracted text
+    op.execute("""
+        INSERT INTO document_search (document_id, filename, content)
+        SELECT id, filename, content_text FROM documents
+        WHERE content_text IS NOT NULL
+        ON CONFLICT (document_id) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    """Drop the PostgreSQL document search index."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP TABLE IF EXISTS document_search")
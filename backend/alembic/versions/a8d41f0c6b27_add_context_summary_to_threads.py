@@ -0,0 +1,32 @@
+"""add_context_summary_to_threads
+
+Revision ID: a8d41f0c6b27
+Revises: 7f3c2a9d1e44
+Create Date: 2026-10-17 11:03:18.552901
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d41f0c6b27'
+down_revision: Union[str, Sequence[str], None] = '7f3c2a9d1e44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add rolling context summary columns to threads."""
+    with op.batch_alter_table('threads', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('context_summary', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('context_summary_until', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove rolling context summary columns from threads."""
+    with op.batch_alter_table('threads', schema=None) as batch_op:
+        batch_op.drop_column('context_summary_until')
+        batch_op.drop_column('context_summary')
@@ -0,0 +1,32 @@
+"""add_cache_tokens_to_token_usage
+
+Revision ID: c3e9b7d25a10
+Revises: a8d41f0c6b27
+Create Date: 2026-10-17 11:48:02.317764
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e9b7d25a10'
+down_revision: Union[str, Sequence[str], None] = 'a8d41f0c6b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add prompt cache write/read token counts to token_usage."""
+    with op.batch_alter_table('token_usage', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cache_creation_tokens', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('cache_read_tokens', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Remove prompt cache token counts from token_usage."""
+    with op.batch_alter_table('token_usage', schema=None) as batch_op:
+        batch_op.drop_column('cache_read_tokens')
+        batch_op.drop_column('cache_creation_tokens')
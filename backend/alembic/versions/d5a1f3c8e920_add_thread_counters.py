@@ -0,0 +1,50 @@
+"""add_thread_counters
+
+Revision ID: d5a1f3c8e920
+Revises: c3e9b7d25a10
+Create Date: 2026-10-17 14:05:41.582316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a1f3c8e920'
+down_revision: Union[str, Sequence[str], None] = 'c3e9b7d25a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add denormalized message/artifact counters to threads and backfill them."""
+    with op.batch_alter_table('threads', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('artifact_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('last_message_preview', sa.String(length=200), nullable=True))
+
+    # Backfill from existing rows (artifacts may predate alembic, created by init_db)
+    artifact_count = "0"
+    if sa.inspect(op.get_bind()).has_table('artifacts'):
+        artifact_count = "(SELECT COUNT(*) FROM artifacts WHERE artifacts.thread_id = threads.id)"
+    op.execute(f"""
+        UPDATE threads SET
+            message_count = (SELECT COUNT(*) FROM messages WHERE messages.thread_id = threads.id),
+            artifact_count = {artifact_count},
+            last_message_preview = (
+                SELECT substr(messages.content, 1, 200) FROM messages
+                WHERE messages.thread_id = threads.id
+                ORDER BY messages.created_at DESC
+                LIMIT 1
+            )
+    """)
+
+
+def downgrade() -> None:
+    """Remove denormalized counters from threads."""
+    with op.batch_alter_table('threads', schema=None) as batch_op:
+        batch_op.drop_column('last_message_preview')
+        batch_op.drop_column('artifact_count')
+        batch_op.drop_column('message_count')
@@ -20,6 +20,10 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    # FTS5 is SQLite-only; PostgreSQL search is created by a1c6e8f30d92
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
     # Create FTS5 virtual table for document full-text search
     op.execute("""
         CREATE VIRTUAL TABLE document_fts USING fts5(
@@ -33,5 +37,8 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
     # Drop FTS5 virtual table
     op.execute("DROP TABLE document_fts")
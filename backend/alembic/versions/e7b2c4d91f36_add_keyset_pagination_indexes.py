@@ -0,0 +1,53 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: e7b2c4d91f36
+Revises: d5a1f3c8e920
+Create Date: 2026-10-17 15:21:09.104873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b2c4d91f36'
+down_revision: Union[str, Sequence[str], None] = 'd5a1f3c8e920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name -> (table, columns): composite (..., sort column, id) indexes for keyset pagination
+INDEXES = {
+    'ix_threads_last_activity_id': ('threads', ['last_activity_at', 'id']),
+    'ix_threads_project_created_id': ('threads', ['project_id', 'created_at', 'id']),
+    'ix_documents_project_created_id': ('documents', ['project_id', 'created_at', 'id']),
+    'ix_artifacts_thread_created_id': ('artifacts', ['thread_id', 'created_at', 'id']),
+}
+
+
+def _existing_columns(inspector, table: str) -> set:
+    if not inspector.has_table(table):
+        return set()
+    return {column['name'] for column in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    """Add composite indexes for keyset pagination.
+
+    artifacts and threads.last_activity_at may predate alembic (created by
+    init_db / _run_migrations), so indexes on missing columns are skipped;
+    _run_migrations creates them at startup.
+    """
+    inspector = sa.inspect(op.get_bind())
+    for name, (table, columns) in INDEXES.items():
+        if set(columns) <= _existing_columns(inspector, table):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Remove keyset pagination indexes."""
+    inspector = sa.inspect(op.get_bind())
+    for name, (table, _) in INDEXES.items():
+        if inspector.has_table(table) and name in {ix['name'] for ix in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
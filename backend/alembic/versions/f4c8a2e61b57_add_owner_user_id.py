@@ -0,0 +1,85 @@
+"""add_owner_user_id
+
+Revision ID: f4c8a2e61b57
+Revises: e7b2c4d91f36
+Create Date: 2026-10-17 16:42:27.318590
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c8a2e61b57'
+down_revision: Union[str, Sequence[str], None] = 'e7b2c4d91f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables carrying the denormalized effective owner (threads first: the others inherit)
+OWNED_TABLES = ('threads', 'documents', 'artifacts')
+
+
+def _existing_columns(inspector, table: str) -> set:
+    if not inspector.has_table(table):
+        return set()
+    return {column['name'] for column in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    """Add owner_user_id to threads, documents and artifacts, backfill it and index it.
+
+    artifacts, documents.thread_id and threads.user_id/last_activity_at may predate
+    alembic (created by init_db / _run_migrations), so missing pieces are
+    skipped; _run_migrations completes them at startup.
+    """
+    inspector = sa.inspect(op.get_bind())
+    columns = {table: _existing_columns(inspector, table) for table in OWNED_TABLES}
+
+    for table in OWNED_TABLES:
+        if columns[table]:
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.add_column(sa.Column('owner_user_id', sa.String(length=36), nullable=True))
+
+    project_owner = "(SELECT projects.user_id FROM projects WHERE projects.id = threads.project_id)"
+    if 'user_id' in columns['threads']:
+        op.execute(f"UPDATE threads SET owner_user_id = COALESCE(user_id, {project_owner})")
+    else:
+        op.execute(f"UPDATE threads SET owner_user_id = {project_owner}")
+    if 'thread_id' in columns['documents']:
+        op.execute("""
+            UPDATE documents SET owner_user_id = COALESCE(
+                (SELECT projects.user_id FROM projects WHERE projects.id = documents.project_id),
+                (SELECT threads.owner_user_id FROM threads WHERE threads.id = documents.thread_id)
+            )
+        """)
+    elif columns['documents']:
+        op.execute("""
+            UPDATE documents SET owner_user_id = (
+                SELECT projects.user_id FROM projects WHERE projects.id = documents.project_id
+            )
+        """)
+    if columns['artifacts']:
+        op.execute("""
+            UPDATE artifacts SET owner_user_id = (
+                SELECT threads.owner_user_id FROM threads WHERE threads.id = artifacts.thread_id
+            )
+        """)
+
+    if 'last_activity_at' in columns['threads']:
+        op.create_index('ix_threads_owner_activity_id', 'threads', ['owner_user_id', 'last_activity_at', 'id'])
+    op.create_index('ix_messages_thread_created', 'messages', ['thread_id', 'created_at'])
+
+
+def downgrade() -> None:
+    """Remove owner_user_id and its indexes."""
+    inspector = sa.inspect(op.get_bind())
+    for name, table in (('ix_messages_thread_created', 'messages'), ('ix_threads_owner_activity_id', 'threads')):
+        if name in {ix['name'] for ix in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
+
+    for table in reversed(OWNED_TABLES):
+        if 'owner_user_id' in _existing_columns(inspector, table):
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.drop_column('owner_user_id')
@@ -24,6 +24,25 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite+aiosqlite:///./ba_assistant.db"
 
+    # Connection pool (file databases; in-memory SQLite uses a static pool)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle_seconds: int = 3600
+    db_pool_pre_ping: bool = False
+
+    # SQLite performance profile, applied as PRAGMAs on every new connection
+    # to a file database (WAL lets readers run alongside the single writer)
+    sqlite_performance_profile: bool = True
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 65536
+    sqlite_mmap_size_bytes: int = 268435456
+    sqlite_temp_store: str = "MEMORY"
+    # How long a starting worker waits for another worker's schema migration
+    sqlite_migration_lock_timeout_ms: int = 120000
+
     # Security
     secret_key: str = "dev-secret-key-change-in-production"
 
@@ -40,6 +59,38 @@ class Settings(BaseSettings):
     deepseek_api_key: str = ""
     deepseek_model: str = "deepseek-reasoner"
 
+    # Shared LLM client connection pools (per provider, reused across requests)
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 30.0
+
+    # Worker processes serving the app on this host. gunicorn reads the same
+    # WEB_CONCURRENCY variable, and host-wide limits below are split across them.
+    web_concurrency: int = 1
+
+    # Claude CLI warm process pool (adaptive sizing bounds)
+    claude_pool_min_size: int = 1
+    claude_pool_max_size: int = 8
+    claude_pool_max_idle_seconds: float = 600.0
+    # Per-model pools (non-default models) and the host-wide cap on all pools'
+    # targets (each worker's registry gets its per_worker share)
+    claude_pool_model_max_size: int = 2
+    claude_pool_global_max_size: int = 12
+    # Max concurrent Claude CLI requests on the host; each worker admits its
+    # share (see per_worker) and queues the excess fairly per user
+    claude_cli_max_concurrency: int = 4
+    # Thread types whose CLI responses stream text deltas as they are generated
+    # (comma-separated; others emit text once per completed content block)
+    claude_cli_partial_thread_types: str = "assistant"
+
+    # MCP callback session registry: "memory" (single worker) or "sqlite"
+    # (file shared by all workers on the host); leaked tokens expire after the TTL.
+    # Empty db path = mcp_sessions.db next to the SQLite database (or in the
+    # backend dir); relative paths resolve against the backend dir, not the CWD
+    mcp_session_backend: str = "memory"
+    mcp_session_db_path: str = ""
+    mcp_session_ttl_seconds: int = 900
+
     # CORS
     cors_origins: str = "http://localhost:3000,http://localhost:8080"
 
@@ -49,14 +100,51 @@ class Settings(BaseSettings):
     # Encryption (for document storage)
     fernet_key: str = ""
 
+    # tiktoken BPE cache (relative to backend dir; populated at build time by
+    # `python -m app.services.token_counting`)
+    tiktoken_cache_dir: str = ".tiktoken_cache"
+
+    # Conversation context cache (max threads kept in the in-process LRU)
+    context_cache_max_threads: int = 256
+
+    # Rolling context compaction: once a thread's unsummarized context exceeds
+    # the trigger, older turns are folded into a persisted summary, keeping
+    # roughly keep_tokens of recent turns verbatim
+    context_compaction_trigger_tokens: int = 100000
+    context_compaction_keep_tokens: int = 30000
+    context_summary_max_tokens: int = 2000
+
+    # SSE text_delta coalescing defaults (clients may override per request)
+    sse_delta_flush_ms: int = 50
+    sse_delta_flush_bytes: int = 1024
+
+    # Resumable chat streams (per-stream replay buffer for Last-Event-ID reconnects).
+    # Buffers live in the worker that started the stream, so resuming needs sticky
+    # routing; a reconnect reaching another worker gets a "stream_unavailable" error
+    stream_buffer_max_events: int = 5000
+    stream_buffer_ttl_seconds: int = 300
+
+    # Post-stream work queue (token tracking, summarization)
+    post_stream_workers: int = 4
+    post_stream_max_attempts: int = 3
+    post_stream_retry_delay_seconds: float = 1.0
+    post_stream_shutdown_timeout_seconds: float = 30.0
+
     # Skill configuration
     skill_path: str = ".claude/business-analyst"
 
+    # List pagination: seconds a list total is reused for pages after the first
+    pagination_total_cache_ttl_seconds: float = 30.0
+
     # Logging configuration
     log_dir: str = "logs"
     log_level: str = "INFO"
     log_rotation_days: int = 7
 
+    # Database query metrics (aggregated per table/operation, flushed periodically)
+    db_query_metrics_enabled: bool = True
+    db_query_metrics_flush_seconds: float = 60.0
+
     @property
     def log_dir_path(self) -> Path:
         """Return Path object for log directory relative to backend directory."""
@@ -64,11 +152,25 @@ class Settings(BaseSettings):
         backend_dir = Path(__file__).parent.parent
         return backend_dir / self.log_dir
 
+    def per_worker(self, host_limit: int) -> int:
+        """Share of a host-wide limit for one of web_concurrency workers (at least 1)."""
+        return max(1, host_limit // max(1, self.web_concurrency))
+
+    @property
+    def tiktoken_cache_dir_path(self) -> Path:
+        """Return Path object for the tiktoken cache relative to backend directory."""
+        return Path(__file__).parent.parent / self.tiktoken_cache_dir
+
     @property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins from comma-separated string."""
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
+    @property
+    def claude_cli_partial_thread_types_list(self) -> List[str]:
+        """Parse partial-message thread types from comma-separated string."""
+        return [t.strip() for t in self.claude_cli_partial_thread_types.split(",") if t.strip()]
+
     @property
     def oauth_redirect_base_url(self) -> str:
         """OAuth redirect base URL varies by environment."""
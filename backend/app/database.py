@@ -6,18 +6,22 @@ Uses async SQLAlchemy for non-blocking database operations with FastAPI.
 """
 
 import os
-import re
 import time
+from contextlib import asynccontextmanager
 from contextvars import ContextVar
-from typing import AsyncGenerator
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List
 
 from sqlalchemy import event, text
-from sqlalchemy.engine import Engine
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config import settings
 from app.models import Base
 from app.services.logging_service import get_logging_service
+from app.services.query_metrics import get_query_metrics, parse_statement
+from app.services import ownership  # noqa: F401  (registers owner_user_id flush listeners)
+from app.services.document_search import FTS5SearchBackend, get_search_backend
 from app.middleware.logging_middleware import get_correlation_id
 
 
@@ -33,8 +37,11 @@ def set_sqlite_pragma(dbapi_conn, connection_record):
     CRITICAL: SQLite disables foreign keys by default for backwards compatibility.
     Without this, cascade deletes won't work and orphaned records will accumulate.
 
-    This listener executes on every new database connection.
+    This listener executes on every new database connection (other
+    databases, e.g. PostgreSQL, enforce foreign keys and are skipped).
     """
+    if "sqlite" not in type(dbapi_conn).__module__:
+        return
     cursor = dbapi_conn.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
     cursor.close()
@@ -47,13 +54,98 @@ DATABASE_URL = os.getenv(
     "sqlite+aiosqlite:///./ba_assistant.db"
 )
 
+SQLITE_JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SQLITE_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+SQLITE_TEMP_STORES = ("DEFAULT", "FILE", "MEMORY")
+
+
+def _pragma_choice(name: str, value: str, allowed: tuple) -> str:
+    value = value.upper()
+    if value not in allowed:
+        raise ValueError(f"Invalid {name}: {value}. Supported: {', '.join(allowed)}")
+    return value
+
+
+def sqlite_profile_pragmas() -> List[str]:
+    """
+    Build the PRAGMA statements of the configured SQLite performance profile.
+
+    busy_timeout comes first so that switching the journal mode waits for
+    other connections' locks instead of failing.
+
+    Raises:
+        ValueError: If a mode setting is not a valid SQLite value
+    """
+    journal_mode = _pragma_choice("sqlite_journal_mode", settings.sqlite_journal_mode, SQLITE_JOURNAL_MODES)
+    synchronous = _pragma_choice("sqlite_synchronous", settings.sqlite_synchronous, SQLITE_SYNCHRONOUS_MODES)
+    temp_store = _pragma_choice("sqlite_temp_store", settings.sqlite_temp_store, SQLITE_TEMP_STORES)
+    return [
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kib)}",  # Negative = KiB
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_bytes)}",
+        f"PRAGMA temp_store={temp_store}",
+    ]
+
+
+def is_sqlite_file_url(url: str) -> bool:
+    """Whether url points at an on-disk SQLite database (not :memory:)."""
+    parsed = make_url(url)
+    return (
+        parsed.get_backend_name() == "sqlite"
+        and parsed.database not in (None, "", ":memory:")
+        and parsed.query.get("mode") != "memory"
+    )
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Connection pool options for create_async_engine.
+
+    In-memory SQLite uses SQLAlchemy's default static pool, which takes no
+    sizing options.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and not is_sqlite_file_url(url):
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def apply_sqlite_profile(target_engine) -> None:
+    """
+    Apply the SQLite performance profile to every new connection of an engine.
+
+    Args:
+        target_engine: AsyncEngine (or sync Engine) on a file database
+    """
+    pragmas = sqlite_profile_pragmas()
+
+    def set_profile_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    event.listen(getattr(target_engine, "sync_engine", target_engine), "connect", set_profile_pragmas)
+
+
 # Create async engine
 # echo=True enables SQL logging for development (disable in production)
 engine = create_async_engine(
     DATABASE_URL,
     echo=(settings.environment != "production"),
     future=True,
+    **engine_options(DATABASE_URL),
 )
+if settings.sqlite_performance_profile and is_sqlite_file_url(DATABASE_URL):
+    apply_sqlite_profile(engine)
 
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -75,57 +167,50 @@ def before_cursor_execute(conn, cursor, statement, parameters, context, executem
 @event.listens_for(Engine, "after_cursor_execute")
 def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
     """
-    Log database operation after execution with timing.
+    Record query timing in the aggregated query metrics.
 
-    Logs at DEBUG level to avoid excessive volume in production.
-    Skips PRAGMA statements (SQLite metadata queries) to reduce noise.
+    Per-query DEBUG lines are only built when the logging service would
+    actually write them (log_level=DEBUG). Statement parsing is cached per
+    statement string and PRAGMA statements (SQLite metadata) are skipped.
     """
-    # Calculate query duration
+    metrics = get_query_metrics()
+    logging_service = get_logging_service()
+    log_queries = logging_service.is_enabled_for('DEBUG')
+    if not (metrics.enabled or log_queries):
+        return
+
     start_time = _query_start_time.get()
     duration_ms = (time.perf_counter() - start_time) * 1000 if start_time else 0
+    metrics.record(statement, duration_ms)
+
+    if log_queries:
+        parsed = parse_statement(statement)
+        if parsed is None:
+            return
+        operation, table = parsed
+        logging_service.log(
+            'DEBUG',
+            f'DB {operation} {table}',
+            'db',
+            correlation_id=get_correlation_id(),
+            operation=operation,
+            table=table,
+            duration_ms=round(duration_ms, 2),
+            db_event='query'
+        )
 
-    # Skip PRAGMA statements (SQLite metadata)
-    if statement.strip().upper().startswith('PRAGMA'):
-        return
 
-    # Extract table name and operation type from SQL
-    statement_upper = statement.strip().upper()
-    operation = 'UNKNOWN'
-    table = 'unknown'
-
-    # Parse operation type
-    if statement_upper.startswith('SELECT'):
-        operation = 'SELECT'
-    elif statement_upper.startswith('INSERT'):
-        operation = 'INSERT'
-    elif statement_upper.startswith('UPDATE'):
-        operation = 'UPDATE'
-    elif statement_upper.startswith('DELETE'):
-        operation = 'DELETE'
-
-    # Extract table name using regex (basic pattern)
-    # Matches: FROM/INTO/UPDATE <table_name>
-    table_match = re.search(
-        r'(?:FROM|INTO|UPDATE)\s+([a-zA-Z_][a-zA-Z0-9_]*)',
-        statement_upper
-    )
-    if table_match:
-        table = table_match.group(1).lower()
+def get_session_factory() -> async_sessionmaker:
+    """
+    Dependency for work that outlives the request (e.g., chat generation
+    that continues after a client disconnect) and must open its own session.
 
-    # Log database operation
-    logging_service = get_logging_service()
-    correlation_id = get_correlation_id()
-
-    logging_service.log(
-        'DEBUG',
-        f'DB {operation} {table}',
-        'db',
-        correlation_id=correlation_id,
-        operation=operation,
-        table=table,
-        duration_ms=round(duration_ms, 2),
-        db_event='query'
-    )
+    Usage:
+        async def endpoint(session_factory=Depends(get_session_factory)):
+            async with session_factory() as session:
+                ...
+    """
+    return AsyncSessionLocal
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -156,160 +241,398 @@ async def init_db():
     This should be called on application startup.
     In production, use Alembic migrations instead.
     """
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    if engine.dialect.name == "sqlite":
+        # Workers start together: create tables under the migration write lock
+        async with _migration_lock() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        # Run SQLite migrations for existing databases (includes the FTS5 index)
+        await _run_migrations()
+    else:
+        # Other databases are migrated by Alembic; only ensure the search index
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await get_search_backend().ensure_schema(conn)
+
+
+# Recomputes Thread.message_count, artifact_count and last_message_preview
+THREAD_COUNTERS_BACKFILL_SQL = """
+    UPDATE threads SET
+        message_count = (SELECT COUNT(*) FROM messages WHERE messages.thread_id = threads.id),
+        artifact_count = (SELECT COUNT(*) FROM artifacts WHERE artifacts.thread_id = threads.id),
+        last_message_preview = (
+            SELECT substr(messages.content, 1, 200) FROM messages
+            WHERE messages.thread_id = threads.id
+            ORDER BY messages.created_at DESC
+            LIMIT 1
+        )
+"""
 
-    # Run SQLite migrations for existing databases
-    await _run_migrations()
+
+# Composite (..., sort column, id) indexes serving keyset-paginated lists
+KEYSET_INDEXES_SQL = (
+    "CREATE INDEX IF NOT EXISTS ix_threads_last_activity_id ON threads (last_activity_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_threads_project_created_id ON threads (project_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_documents_project_created_id ON documents (project_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_artifacts_thread_created_id ON artifacts (thread_id, created_at, id)",
+)
 
 
-async def _run_migrations():
+# Effective owner of existing rows (threads first: documents/artifacts inherit)
+OWNER_BACKFILL_SQL = (
     """
-    Run SQLite migrations for existing databases.
+    UPDATE threads SET owner_user_id = COALESCE(
+        user_id,
+        (SELECT projects.user_id FROM projects WHERE projects.id = threads.project_id)
+    )
+    """,
+    """
+    UPDATE documents SET owner_user_id = COALESCE(
+        (SELECT projects.user_id FROM projects WHERE projects.id = documents.project_id),
+        (SELECT threads.owner_user_id FROM threads WHERE threads.id = documents.thread_id)
+    )
+    """,
+    """
+    UPDATE artifacts SET owner_user_id = (
+        SELECT threads.owner_user_id FROM threads WHERE threads.id = artifacts.thread_id
+    )
+    """,
+)
 
-    SQLAlchemy's create_all() is idempotent for new tables but doesn't
-    modify existing tables. This function handles schema migrations
-    for SQLite databases.
+# Ownership probes / per-user thread list, and per-thread chronological messages
+OWNER_INDEXES_SQL = (
+    "CREATE INDEX IF NOT EXISTS ix_threads_owner_activity_id ON threads (owner_user_id, last_activity_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_messages_thread_created ON messages (thread_id, created_at)",
+)
 
-    For production PostgreSQL, use Alembic migrations instead.
+
+# Records which migration steps have run (one row per MigrationStep.version)
+SCHEMA_MIGRATIONS_TABLE = "schema_migrations"
+
+
+@dataclass(frozen=True)
+class MigrationStep:
     """
-    async with engine.begin() as conn:
-        # Check if display_name column exists in users table
-        result = await conn.execute(text("PRAGMA table_info(users)"))
-        columns = [row[1] for row in result]
+    One recorded, idempotent schema migration for SQLite databases.
 
-        if "display_name" not in columns:
-            await conn.execute(
-                text("ALTER TABLE users ADD COLUMN display_name VARCHAR(255)")
-            )
+    version is the matching Alembic revision ID where one exists (so both
+    paths name the same change), else a "sqlite:" prefixed name for
+    changes only made here. apply() must be safe to re-run on a database
+    that already has the change (e.g., created by create_all()).
+    """
+    version: str
+    description: str
+    apply: Callable[[AsyncConnection], Awaitable[None]]
 
-        # Check and add user_id and last_activity_at columns to threads
-        result = await conn.execute(text("PRAGMA table_info(threads)"))
-        thread_columns = [row[1] for row in result]
 
-        if "user_id" not in thread_columns:
-            await conn.execute(
-                text("ALTER TABLE threads ADD COLUMN user_id VARCHAR(36) REFERENCES users(id)")
-            )
+async def _table_columns(conn: AsyncConnection, table: str) -> Dict[str, int]:
+    """Column name -> notnull flag, from PRAGMA table_info."""
+    result = await conn.execute(text(f"PRAGMA table_info({table})"))
+    return {row[1]: row[3] for row in result}
 
-        if "last_activity_at" not in thread_columns:
-            # SQLite doesn't allow non-constant defaults in ALTER TABLE
-            # Add column without default, then backfill from updated_at
-            await conn.execute(
-                text("ALTER TABLE threads ADD COLUMN last_activity_at DATETIME")
-            )
 
-        # Always backfill last_activity_at for any threads missing it
-        # (handles case where column existed but backfill didn't run)
+async def _add_users_display_name(conn: AsyncConnection) -> None:
+    if "display_name" not in await _table_columns(conn, "users"):
         await conn.execute(
-            text("UPDATE threads SET last_activity_at = updated_at WHERE last_activity_at IS NULL")
+            text("ALTER TABLE users ADD COLUMN display_name VARCHAR(255)")
         )
 
-        # Check if project_id column is NOT NULL (needs to be nullable for project-less threads)
-        # PRAGMA table_info returns: cid, name, type, notnull, dflt_value, pk
-        result = await conn.execute(text("PRAGMA table_info(threads)"))
-        columns_info = {row[1]: row[3] for row in result}  # name -> notnull
-
-        if columns_info.get("project_id") == 1:  # 1 = NOT NULL, 0 = nullable
-            # SQLite doesn't support ALTER COLUMN, must recreate table
-            # Disable foreign keys temporarily for table recreation
-            await conn.execute(text("PRAGMA foreign_keys=OFF"))
-
-            # Create new table with nullable project_id
-            await conn.execute(text("""
-                CREATE TABLE threads_new (
-                    id VARCHAR(36) PRIMARY KEY,
-                    project_id VARCHAR(36) REFERENCES projects(id) ON DELETE SET NULL,
-                    user_id VARCHAR(36) REFERENCES users(id) ON DELETE CASCADE,
-                    title VARCHAR(255),
-                    model_provider VARCHAR(20) DEFAULT 'anthropic',
-                    created_at DATETIME NOT NULL,
-                    updated_at DATETIME NOT NULL,
-                    last_activity_at DATETIME
-                )
-            """))
-
-            # Copy data
-            await conn.execute(text("""
-                INSERT INTO threads_new (id, project_id, user_id, title, model_provider, created_at, updated_at, last_activity_at)
-                SELECT id, project_id, user_id, title, model_provider, created_at, updated_at, last_activity_at
-                FROM threads
-            """))
-
-            # Drop old table and rename new one
-            await conn.execute(text("DROP TABLE threads"))
-            await conn.execute(text("ALTER TABLE threads_new RENAME TO threads"))
-
-            # Recreate indexes
-            await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_threads_project_id ON threads(project_id)"))
-            await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_threads_user_id ON threads(user_id)"))
-            await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_threads_created_at ON threads(created_at)"))
-
-            # Re-enable foreign keys
-            await conn.execute(text("PRAGMA foreign_keys=ON"))
-
-        # --- Document schema migration for rich document support ---
-        result = await conn.execute(text("PRAGMA table_info(documents)"))
-        doc_columns = [row[1] for row in result]
-
-        if "content_type" not in doc_columns:
-            await conn.execute(text(
-                "ALTER TABLE documents ADD COLUMN content_type VARCHAR(100) DEFAULT 'text/plain'"
-            ))
 
-        if "content_text" not in doc_columns:
-            await conn.execute(text(
-                "ALTER TABLE documents ADD COLUMN content_text TEXT"
-            ))
+async def _add_thread_direct_ownership(conn: AsyncConnection) -> None:
+    # Check and add user_id and last_activity_at columns to threads
+    thread_columns = await _table_columns(conn, "threads")
+
+    if "user_id" not in thread_columns:
+        await conn.execute(
+            text("ALTER TABLE threads ADD COLUMN user_id VARCHAR(36) REFERENCES users(id)")
+        )
+
+    if "last_activity_at" not in thread_columns:
+        # SQLite doesn't allow non-constant defaults in ALTER TABLE
+        # Add column without default, then backfill from updated_at
+        await conn.execute(
+            text("ALTER TABLE threads ADD COLUMN last_activity_at DATETIME")
+        )
+
+    # Backfill last_activity_at for any threads missing it
+    # (handles case where column existed but backfill didn't run)
+    await conn.execute(
+        text("UPDATE threads SET last_activity_at = updated_at WHERE last_activity_at IS NULL")
+    )
+
+    # Check if project_id column is NOT NULL (needs to be nullable for project-less threads)
+    columns_info = await _table_columns(conn, "threads")
+
+    if columns_info.get("project_id") == 1:  # 1 = NOT NULL, 0 = nullable
+        # SQLite doesn't support ALTER COLUMN, must recreate table
+        # Disable foreign keys temporarily for table recreation
+        await conn.execute(text("PRAGMA foreign_keys=OFF"))
+
+        # Create new table with nullable project_id
+        await conn.execute(text("""
+            CREATE TABLE threads_new (
+                id VARCHAR(36) PRIMARY KEY,
+                project_id VARCHAR(36) REFERENCES projects(id) ON DELETE SET NULL,
+                user_id VARCHAR(36) REFERENCES users(id) ON DELETE CASCADE,
+                title VARCHAR(255),
+                model_provider VARCHAR(20) DEFAULT 'anthropic',
+                created_at DATETIME NOT NULL,
+                updated_at DATETIME NOT NULL,
+                last_activity_at DATETIME
+            )
+        """))
+
+        # Copy data
+        await conn.execute(text("""
+            INSERT INTO threads_new (id, project_id, user_id, title, model_provider, created_at, updated_at, last_activity_at)
+            SELECT id, project_id, user_id, title, model_provider, created_at, updated_at, last_activity_at
+            FROM threads
+        """))
+
+        # Drop old table and rename new one
+        await conn.execute(text("DROP TABLE threads"))
+        await conn.execute(text("ALTER TABLE threads_new RENAME TO threads"))
+
+        # Recreate indexes
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_threads_project_id ON threads(project_id)"))
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_threads_user_id ON threads(user_id)"))
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_threads_created_at ON threads(created_at)"))
+
+        # Re-enable foreign keys
+        await conn.execute(text("PRAGMA foreign_keys=ON"))
+
+
+async def _add_document_rich_content(conn: AsyncConnection) -> None:
+    doc_columns = await _table_columns(conn, "documents")
+
+    if "content_type" not in doc_columns:
+        await conn.execute(text(
+            "ALTER TABLE documents ADD COLUMN content_type VARCHAR(100) DEFAULT 'text/plain'"
+        ))
+
+    if "content_text" not in doc_columns:
+        await conn.execute(text(
+            "ALTER TABLE documents ADD COLUMN content_text TEXT"
+        ))
+
+    if "metadata_json" not in doc_columns:
+        await conn.execute(text(
+            "ALTER TABLE documents ADD COLUMN metadata_json TEXT"
+        ))
+
+
+async def _add_message_token_count(conn: AsyncConnection) -> None:
+    if "token_count" not in await _table_columns(conn, "messages"):
+        await conn.execute(text(
+            "ALTER TABLE messages ADD COLUMN token_count INTEGER"
+        ))
+
 
-        if "metadata_json" not in doc_columns:
+async def _add_thread_context_summary(conn: AsyncConnection) -> None:
+    thread_columns = await _table_columns(conn, "threads")
+
+    if "context_summary" not in thread_columns:
+        await conn.execute(text(
+            "ALTER TABLE threads ADD COLUMN context_summary TEXT"
+        ))
+
+    if "context_summary_until" not in thread_columns:
+        await conn.execute(text(
+            "ALTER TABLE threads ADD COLUMN context_summary_until DATETIME"
+        ))
+
+
+async def _add_usage_cache_tokens(conn: AsyncConnection) -> None:
+    usage_columns = await _table_columns(conn, "token_usage")
+
+    for column in ("cache_creation_tokens", "cache_read_tokens"):
+        if column not in usage_columns:
             await conn.execute(text(
-                "ALTER TABLE documents ADD COLUMN metadata_json TEXT"
+                f"ALTER TABLE token_usage ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
             ))
 
-        # Ensure FTS5 virtual table exists with unicode61 tokenizer for international text
-        result = await conn.execute(
-            text("SELECT sql FROM sqlite_master WHERE type='table' AND name='document_fts'")
+
+async def _add_thread_counters(conn: AsyncConnection) -> None:
+    # Backfill only when the columns are added (create_all() starts them at 0)
+    if "message_count" not in await _table_columns(conn, "threads"):
+        await conn.execute(text(
+            "ALTER TABLE threads ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0"
+        ))
+        await conn.execute(text(
+            "ALTER TABLE threads ADD COLUMN artifact_count INTEGER NOT NULL DEFAULT 0"
+        ))
+        await conn.execute(text(
+            "ALTER TABLE threads ADD COLUMN last_message_preview VARCHAR(200)"
+        ))
+        await conn.execute(text(THREAD_COUNTERS_BACKFILL_SQL))
+
+
+async def _add_keyset_indexes(conn: AsyncConnection) -> None:
+    for index_sql in KEYSET_INDEXES_SQL:
+        await conn.execute(text(index_sql))
+
+
+async def _add_owner_user_id(conn: AsyncConnection) -> None:
+    added = False
+    for table in ("threads", "documents", "artifacts"):
+        if "owner_user_id" not in await _table_columns(conn, table):
+            await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN owner_user_id VARCHAR(36)"))
+            added = True
+    if added:
+        for backfill_sql in OWNER_BACKFILL_SQL:
+            await conn.execute(text(backfill_sql))
+
+    for index_sql in OWNER_INDEXES_SQL:
+        await conn.execute(text(index_sql))
+
+
+async def _ensure_document_fts_unicode61(conn: AsyncConnection) -> None:
+    # Ensure FTS5 virtual table exists with unicode61 tokenizer for international text
+    result = await conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type='table' AND name='document_fts'")
+    )
+    fts_sql = result.scalar()
+
+    if fts_sql is None:
+        # FTS5 doesn't exist — create with unicode61 tokenizer
+        await conn.execute(text(FTS5SearchBackend.CREATE_SQL))
+    elif 'unicode61' not in (fts_sql or ''):
+        # FTS5 exists but uses old ascii tokenizer — upgrade to unicode61
+        # Must drop and recreate (SQLite FTS5 doesn't support ALTER)
+        await conn.execute(text("DROP TABLE document_fts"))
+        await conn.execute(text(FTS5SearchBackend.CREATE_SQL))
+        # Re-index existing documents
+        # For existing text documents, content_text may be NULL (not yet backfilled)
+        # Re-index from content_text where available, otherwise we can't re-index
+        # (legacy encrypted content can't be decrypted in migration context)
+        # This means old documents lose FTS until accessed and backfilled
+        await conn.execute(text("""
+            INSERT INTO document_fts(document_id, filename, content)
+            SELECT d.id, d.filename, d.content_text
+            FROM documents d
+            WHERE d.content_text IS NOT NULL
+        """))
+
+
+# Applied in order; append new steps at the end (never reorder or rename)
+MIGRATION_STEPS: List[MigrationStep] = [
+    MigrationStep("sqlite:users_display_name", "Add users.display_name", _add_users_display_name),
+    MigrationStep(
+        "sqlite:threads_direct_ownership",
+        "Add threads.user_id/last_activity_at, make project_id nullable",
+        _add_thread_direct_ownership,
+    ),
+    MigrationStep(
+        "sqlite:documents_rich_content",
+        "Add documents.content_type/content_text/metadata_json",
+        _add_document_rich_content,
+    ),
+    MigrationStep("7f3c2a9d1e44", "Add messages.token_count", _add_message_token_count),
+    MigrationStep("a8d41f0c6b27", "Add threads.context_summary", _add_thread_context_summary),
+    MigrationStep("c3e9b7d25a10", "Add token_usage cache token columns", _add_usage_cache_tokens),
+    MigrationStep("d5a1f3c8e920", "Add denormalized thread counters", _add_thread_counters),
+    MigrationStep("e7b2c4d91f36", "Add keyset pagination indexes", _add_keyset_indexes),
+    MigrationStep("f4c8a2e61b57", "Add owner_user_id and its indexes", _add_owner_user_id),
+    MigrationStep(
+        "sqlite:document_fts_unicode61",
+        "Create document_fts with the unicode61 tokenizer",
+        _ensure_document_fts_unicode61,
+    ),
+]
+
+
+@asynccontextmanager
+async def _migration_lock() -> AsyncGenerator[AsyncConnection, None]:
+    """
+    Connection holding SQLite's write lock for one migration transaction.
+
+    Every gunicorn worker runs init_db() at startup; BEGIN IMMEDIATE makes
+    them take turns (waiting up to sqlite_migration_lock_timeout_ms) so a
+    step is applied by exactly one of them. Explicit BEGIN also keeps
+    pysqlite from autocommitting DDL, so a failed step rolls back whole.
+    Commits on success, rolls back on error.
+    """
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql(f"PRAGMA busy_timeout={int(settings.sqlite_migration_lock_timeout_ms)}")
+        try:
+            await conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                await conn.rollback()
+                raise
+            await conn.commit()
+        finally:
+            await conn.exec_driver_sql(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+            await conn.commit()
+
+
+async def _applied_migrations(conn: AsyncConnection) -> set:
+    """Versions recorded in the schema_migrations table (created if missing)."""
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {SCHEMA_MIGRATIONS_TABLE} ("
+        "version VARCHAR(64) PRIMARY KEY, "
+        "description VARCHAR(255) NOT NULL, "
+        "applied_at DATETIME NOT NULL)"
+    ))
+    result = await conn.execute(text(f"SELECT version FROM {SCHEMA_MIGRATIONS_TABLE}"))
+    return set(result.scalars())
+
+
+async def _run_migrations() -> List[str]:
+    """
+    Run SQLite migrations for existing databases.
+
+    SQLAlchemy's create_all() is idempotent for new tables but doesn't
+    modify existing tables. This function applies MIGRATION_STEPS that are
+    not yet recorded in the schema_migrations table. Each step runs in its
+    own write-locked transaction together with its version row, and is
+    skipped if another worker recorded it while this one waited for the
+    lock, so concurrent starts apply every step once. A warm start
+    (everything recorded) reads the version table without locking.
+
+    For production PostgreSQL, use Alembic migrations instead.
+
+    Returns:
+        Versions applied by this call
+    """
+    async with engine.connect() as conn:
+        applied = await _applied_migrations(conn)
+        await conn.commit()
+
+    applied_now = []
+    for step in MIGRATION_STEPS:
+        if step.version in applied:
+            continue
+        started = time.perf_counter()
+        async with _migration_lock() as conn:
+            # Re-read under the lock: another worker may have just applied it
+            if step.version in await _applied_migrations(conn):
+                continue
+            await step.apply(conn)
+            await conn.execute(
+                text(
+                    f"INSERT OR IGNORE INTO {SCHEMA_MIGRATIONS_TABLE} (version, description, applied_at) "
+                    "VALUES (:version, :description, CURRENT_TIMESTAMP)"
+                ),
+                {"version": step.version, "description": step.description},
+            )
+        applied_now.append(step.version)
+        get_logging_service().log(
+            'INFO',
+            f'Applied schema migration {step.version}',
+            'db',
+            db_event='schema_migration',
+            version=step.version,
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
         )
-        fts_sql = result.scalar()
-
-        if fts_sql is None:
-            # FTS5 doesn't exist — create with unicode61 tokenizer
-            await conn.execute(text("""
-                CREATE VIRTUAL TABLE document_fts USING fts5(
-                    document_id UNINDEXED,
-                    filename,
-                    content,
-                    tokenize = 'porter unicode61'
-                )
-            """))
-        elif 'unicode61' not in (fts_sql or ''):
-            # FTS5 exists but uses old ascii tokenizer — upgrade to unicode61
-            # Must drop and recreate (SQLite FTS5 doesn't support ALTER)
-            await conn.execute(text("DROP TABLE document_fts"))
-            await conn.execute(text("""
-                CREATE VIRTUAL TABLE document_fts USING fts5(
-                    document_id UNINDEXED,
-                    filename,
-                    content,
-                    tokenize = 'porter unicode61'
-                )
-            """))
-            # Re-index existing documents
-            # For existing text documents, content_text may be NULL (not yet backfilled)
-            # Re-index from content_text where available, otherwise we can't re-index
-            # (legacy encrypted content can't be decrypted in migration context)
-            # This means old documents lose FTS until accessed and backfilled
-            await conn.execute(text("""
-                INSERT INTO document_fts(document_id, filename, content)
-                SELECT d.id, d.filename, d.content_text
-                FROM documents d
-                WHERE d.content_text IS NOT NULL
-            """))
+    return applied_now
 
 
 async def close_db():
     """
     Dispose database engine on application shutdown.
+
+    Flushes pending query metrics first so the last interval is logged.
     """
+    get_query_metrics().flush()
     await engine.dispose()
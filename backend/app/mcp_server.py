@@ -5,7 +5,8 @@ Provides a real MCP server mounted in FastAPI at /mcp. The Claude CLI subprocess
 connects to this server via --mcp-config when artifact_generation=True.
 
 Per-request context (db session + thread_id) is propagated via a session token
-embedded in the system prompt. The MCP tool resolves it from the session registry.
+embedded in the system prompt. The MCP tool resolves it from the session registry
+(in-process by default, or shared across workers; see app.services.session_registry).
 
 Phase 72: Backend File Generation
 """
@@ -15,16 +16,19 @@ import logging
 from mcp.server.fastmcp import FastMCP
 
 from app.models import Artifact, ArtifactType
+from app.services.session_registry import get_session_registry, open_context_db
 
 logger = logging.getLogger(__name__)
 
 # FastMCP server instance — exported for mounting in main.py
 mcp_app = FastMCP("assistant-tools")
 
-# Session registry: maps session_token -> {"db": AsyncSession, "thread_id": str}
+# Session registry: maps session_token -> {"thread_id": str[, "db": AsyncSession]}
 # Populated by register_mcp_session() before CLI subprocess receives the system prompt.
-# Cleaned up by unregister_mcp_session() after the CLI subprocess completes.
-_session_registry: dict[str, dict] = {}
+# Cleaned up by unregister_mcp_session() after the CLI subprocess completes (or by TTL).
+# Backend is configurable (settings.mcp_session_backend) so the /mcp callback
+# may land on any worker on the host.
+SESSION_NAMESPACE = "mcp_server"
 
 
 def register_mcp_session(token: str, db, thread_id: str) -> None:
@@ -32,10 +36,15 @@ def register_mcp_session(token: str, db, thread_id: str) -> None:
 
     Args:
         token: Unique session token embedded in the system prompt.
-        db: SQLAlchemy AsyncSession for persisting the artifact.
+        db: SQLAlchemy AsyncSession for persisting the artifact (kept only by
+            the in-process backend; shared backends open a session per callback).
         thread_id: ID of the Assistant thread owning the artifact.
     """
-    _session_registry[token] = {"db": db, "thread_id": thread_id}
+    registry = get_session_registry(SESSION_NAMESPACE)
+    context = {"thread_id": thread_id}
+    if not registry.shared:
+        context["db"] = db
+    registry.register(token, context)
     logger.debug(f"Registered MCP session: {token[:8]}... thread_id={thread_id}")
 
 
@@ -45,7 +54,7 @@ def unregister_mcp_session(token: str) -> None:
     Args:
         token: Session token to remove (no-op if already removed).
     """
-    _session_registry.pop(token, None)
+    get_session_registry(SESSION_NAMESPACE).unregister(token)
     logger.debug(f"Unregistered MCP session: {token[:8]}...")
 
 
@@ -64,7 +73,7 @@ async def save_artifact(session_token: str, title: str, content_markdown: str) -
     Returns:
         ARTIFACT_CREATED marker string on success, or error string on failure.
     """
-    ctx = _session_registry.get(session_token)
+    ctx = get_session_registry(SESSION_NAMESPACE).lookup(session_token)
     if not ctx:
         logger.warning(f"MCP save_artifact: session not found for token {session_token[:8]}...")
         return "Error: session context not found"
@@ -75,9 +84,10 @@ async def save_artifact(session_token: str, title: str, content_markdown: str) -
         title=title,
         content_markdown=content_markdown,
     )
-    ctx["db"].add(artifact)
-    await ctx["db"].commit()
-    await ctx["db"].refresh(artifact)
+    async with open_context_db(ctx) as db:
+        db.add(artifact)
+        await db.commit()
+        await db.refresh(artifact)
 
     event_data = {
         "id": artifact.id,
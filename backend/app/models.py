@@ -11,7 +11,7 @@ from decimal import Decimal
 from enum import Enum as PyEnum
 from typing import List, Optional
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, LargeBinary, Numeric, String, Text
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, LargeBinary, Numeric, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -116,6 +116,20 @@ class TokenUsage(Base):
     request_tokens: Mapped[int] = mapped_column(Integer, nullable=False)
     response_tokens: Mapped[int] = mapped_column(Integer, nullable=False)
 
+    # Prompt cache token counts (Anthropic; request_tokens excludes these)
+    cache_creation_tokens: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        nullable=False,
+        server_default="0"
+    )
+    cache_read_tokens: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        nullable=False,
+        server_default="0"
+    )
+
     # Cost tracking (using Decimal for precision)
     total_cost: Mapped[Decimal] = mapped_column(
         Numeric(10, 6),  # PostgreSQL-compatible DECIMAL
@@ -212,6 +226,10 @@ class Document(Base):
     """
 
     __tablename__ = "documents"
+    __table_args__ = (
+        # Keyset pagination of project document lists (created_at DESC, id DESC)
+        Index("ix_documents_project_created_id", "project_id", "created_at", "id"),
+    )
 
     # Primary key using UUID
     id: Mapped[str] = mapped_column(
@@ -236,6 +254,10 @@ class Document(Base):
         index=True
     )
 
+    # Effective owner (project owner, or the thread's owner for thread
+    # documents); denormalized and maintained on flush by services.ownership
+    owner_user_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+
     # Document metadata
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
 
@@ -286,6 +308,14 @@ class Thread(Base):
     """
 
     __tablename__ = "threads"
+    __table_args__ = (
+        # Keyset pagination: global list (last_activity_at DESC, id DESC)
+        # and project thread list (created_at DESC, id DESC)
+        Index("ix_threads_last_activity_id", "last_activity_at", "id"),
+        Index("ix_threads_project_created_id", "project_id", "created_at", "id"),
+        # Ownership checks and the per-user global list (owner_user_id, last_activity_at DESC, id DESC)
+        Index("ix_threads_owner_activity_id", "owner_user_id", "last_activity_at", "id"),
+    )
 
     # Primary key using UUID
     id: Mapped[str] = mapped_column(
@@ -310,6 +340,10 @@ class Thread(Base):
         index=True
     )
 
+    # Effective owner: user_id for project-less threads, else the project's
+    # user_id (denormalized and maintained on flush by services.ownership)
+    owner_user_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+
     # Thread metadata
     title: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
 
@@ -335,6 +369,33 @@ class Thread(Base):
         server_default="ba_assistant"
     )
 
+    # Rolling context summary: older turns folded into a persisted summary
+    # (messages created at or before context_summary_until are not re-sent)
+    context_summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    context_summary_until: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
+
+    # Denormalized counters for list views (maintained on flush by
+    # conversation_service, so listing never loads message bodies)
+    message_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0"
+    )
+    artifact_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0"
+    )
+    last_message_preview: Mapped[Optional[str]] = mapped_column(
+        String(200),
+        nullable=True
+    )
+
     # Audit timestamps
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -395,6 +456,10 @@ class Message(Base):
     """
 
     __tablename__ = "messages"
+    __table_args__ = (
+        # Chronological message reads per thread
+        Index("ix_messages_thread_created", "thread_id", "created_at"),
+    )
 
     # Primary key using UUID
     id: Mapped[str] = mapped_column(
@@ -418,6 +483,9 @@ class Message(Base):
     )  # 'user' or 'assistant'
     content: Mapped[str] = mapped_column(Text, nullable=False)
 
+    # Token count computed once at save time (NULL for legacy rows -> estimated)
+    token_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
     # Timestamp
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -451,6 +519,10 @@ class Artifact(Base):
     """
 
     __tablename__ = "artifacts"
+    __table_args__ = (
+        # Keyset pagination of thread artifact lists (created_at DESC, id DESC)
+        Index("ix_artifacts_thread_created_id", "thread_id", "created_at", "id"),
+    )
 
     # Primary key using UUID
     id: Mapped[str] = mapped_column(
@@ -467,6 +539,10 @@ class Artifact(Base):
         index=True
     )
 
+    # Effective owner inherited from the thread (denormalized and maintained
+    # on flush by services.ownership)
+    owner_user_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+
     # Artifact metadata
     artifact_type: Mapped[ArtifactType] = mapped_column(
         Enum(ArtifactType, native_enum=False, length=30),
@@ -10,16 +10,17 @@ from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
-from app.models import Artifact, Thread, Project, ArtifactType
+from app.models import Artifact, ArtifactType
 from app.utils.jwt import get_current_user
+from app.utils.pagination import NEXT_CURSOR_HEADER, paginate_keyset, split_page
+from app.services.ownership import get_owned_thread
 from app.services.export_service import (
     export_markdown,
     export_pdf,
@@ -60,6 +61,9 @@ class ArtifactListItem(BaseModel):
 @router.get("/threads/{thread_id}/artifacts", response_model=List[ArtifactListItem])
 async def list_thread_artifacts(
     thread_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Page size; omit for all artifacts"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -67,10 +71,14 @@ async def list_thread_artifacts(
     List all artifacts for a thread.
 
     Returns lightweight artifact list without full content.
-    Validates user owns the thread's project.
+    Validates user owns the thread's project. With limit, returns one keyset
+    page and sets X-Next-Cursor when more follow.
 
     Args:
         thread_id: ID of the thread
+        response: Response (for the next-cursor header)
+        limit: Optional page size
+        cursor: Keyset cursor from the previous page
         current_user: Authenticated user
         db: Database session
 
@@ -81,36 +89,18 @@ async def list_thread_artifacts(
         HTTPException 404: Thread not found or not owned by user
     """
     # Validate thread access
-    stmt = (
-        select(Thread)
-        .where(Thread.id == thread_id)
-        .options(selectinload(Thread.project))
-    )
-    result = await db.execute(stmt)
-    thread = result.scalar_one_or_none()
-
-    if not thread:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Thread not found"
-        )
-
-    # Check ownership: project-less threads use user_id, project threads use project.user_id
-    owner_id = thread.user_id if thread.project is None else thread.project.user_id
-    if owner_id != current_user["user_id"]:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Thread not found"
-        )
+    await get_owned_thread(db, thread_id, current_user["user_id"])
 
     # Get artifacts
-    stmt = (
-        select(Artifact)
-        .where(Artifact.thread_id == thread_id)
-        .order_by(Artifact.created_at.desc())
+    stmt = paginate_keyset(
+        select(Artifact).where(Artifact.thread_id == thread_id),
+        Artifact.created_at, Artifact.id, cursor, limit
     )
     result = await db.execute(stmt)
-    return result.scalars().all()
+    artifacts, next_cursor = split_page(result.scalars().all(), limit, "created_at")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return artifacts
 
 
 @router.get("/artifacts/{artifact_id}", response_model=ArtifactResponse)
@@ -122,7 +112,7 @@ async def get_artifact(
     """
     Get a single artifact with full content.
 
-    Validates user owns the artifact's thread's project.
+    Validates user owns the artifact's thread (directly or via its project).
 
     Args:
         artifact_id: ID of the artifact
@@ -135,10 +125,10 @@ async def get_artifact(
     Raises:
         HTTPException 404: Artifact not found or not owned by user
     """
-    stmt = (
-        select(Artifact)
-        .where(Artifact.id == artifact_id)
-        .options(selectinload(Artifact.thread).selectinload(Thread.project))
+    # Ownership via the denormalized owner (thread's user or project owner)
+    stmt = select(Artifact).where(
+        Artifact.id == artifact_id,
+        Artifact.owner_user_id == current_user["user_id"]
     )
     result = await db.execute(stmt)
     artifact = result.scalar_one_or_none()
@@ -149,15 +139,6 @@ async def get_artifact(
             detail="Artifact not found"
         )
 
-    # Check ownership: project-less threads use user_id, project threads use project.user_id
-    thread = artifact.thread
-    owner_id = thread.user_id if thread.project is None else thread.project.user_id
-    if owner_id != current_user["user_id"]:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Artifact not found"
-        )
-
     return artifact
 
 
@@ -193,11 +174,10 @@ async def export_artifact(
         HTTPException 400: Unsupported format
         HTTPException 500: PDF export failed (GTK not available)
     """
-    # Load artifact with thread and project for auth check
-    stmt = (
-        select(Artifact)
-        .where(Artifact.id == artifact_id)
-        .options(selectinload(Artifact.thread).selectinload(Thread.project))
+    # Load artifact owned by the user (denormalized owner_user_id)
+    stmt = select(Artifact).where(
+        Artifact.id == artifact_id,
+        Artifact.owner_user_id == current_user["user_id"]
     )
     result = await db.execute(stmt)
     artifact = result.scalar_one_or_none()
@@ -205,12 +185,6 @@ async def export_artifact(
     if not artifact:
         raise HTTPException(status_code=404, detail="Artifact not found")
 
-    # Check ownership: project-less threads use user_id, project threads use project.user_id
-    thread = artifact.thread
-    owner_id = thread.user_id if thread.project is None else thread.project.user_id
-    if owner_id != current_user["user_id"]:
-        raise HTTPException(status_code=404, detail="Artifact not found")
-
     # Generate export based on format
     try:
         if format == "md":
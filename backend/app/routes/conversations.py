@@ -5,25 +5,35 @@ Provides SSE streaming endpoint for real-time AI responses with tool use.
 Uses direct Anthropic API for Claude conversations with document search
 and artifact generation tools.
 """
+import asyncio
 import json
+import logging
+from functools import partial
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, Field
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 from sse_starlette.sse import EventSourceResponse
 
-from app.database import get_db
-from app.models import Message, Thread, Project
+from app.database import get_db, get_session_factory
+from app.models import Message, Thread
 from app.utils.jwt import get_current_user
-from app.services.ai_service import AIService, stream_with_heartbeat
+from app.config import settings
+from app.services.ai_service import AIService, coalesce_text_deltas, stream_with_heartbeat
 from app.services.conversation_service import (
     save_message,
     build_conversation_context,
     get_message_count
 )
 from app.services.token_tracking import track_token_usage, check_user_budget
-from app.services.summarization_service import maybe_update_summary
+from app.services.summarization_service import maybe_update_summary, maybe_compact_context
+from app.services.stream_buffer import StreamBuffer, get_stream_buffers, parse_event_id
+from app.services.work_queue import get_work_queue
+from app.services.ownership import get_owned_thread
+
+logger = logging.getLogger(__name__)
 
 # Model name for token tracking
 AGENT_MODEL = "claude-sonnet-4-5-20250514"
@@ -35,6 +45,9 @@ class ChatRequest(BaseModel):
     """Request model for chat message."""
     content: str = Field(..., min_length=1, max_length=32000)
     artifact_generation: bool = Field(default=False)
+    # text_delta coalescing window (None = server default, 0 ms = one event per fragment)
+    delta_flush_ms: Optional[int] = Field(default=None, ge=0, le=1000)
+    delta_flush_bytes: Optional[int] = Field(default=None, ge=1, le=65536)
 
 
 async def validate_thread_access(
@@ -45,42 +58,12 @@ async def validate_thread_access(
     """
     Validate thread exists and belongs to user (directly or via project).
 
-    Supports two ownership models:
-    - Project-less threads: thread.user_id matches current user
-    - Project threads: thread.project.user_id matches current user
+    Ownership is resolved through the denormalized Thread.owner_user_id
+    (user_id for project-less threads, project.user_id for project threads).
 
-    Returns Thread with project loaded, or raises 404.
+    Returns Thread, or raises 404.
     """
-    stmt = (
-        select(Thread)
-        .where(Thread.id == thread_id)
-        .options(selectinload(Thread.project))
-    )
-    result = await db.execute(stmt)
-    thread = result.scalar_one_or_none()
-
-    if not thread:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Thread not found"
-        )
-
-    # Project-less thread: check direct ownership
-    if thread.project_id is None:
-        if thread.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Thread not found"
-            )
-    # Project thread: check project ownership
-    else:
-        if thread.project.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Thread not found"
-            )
-
-    return thread
+    return await get_owned_thread(db, thread_id, user_id)
 
 
 @router.post("/threads/{thread_id}/chat")
@@ -89,7 +72,8 @@ async def stream_chat(
     request: Request,
     body: ChatRequest,
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    session_factory=Depends(get_session_factory)
 ):
     """
     Stream AI response for a chat message.
@@ -102,13 +86,23 @@ async def stream_chat(
     - tool_executing: AI is executing a tool
     - artifact_created: An artifact was generated and saved
     - message_complete: Response complete with usage stats
+    - queued: Waiting for CLI capacity ({"position", "queue_depth"})
     - error: Error occurred
 
+    Every event carries an SSE id ("<stream_id>:<seq>"). Generation runs in
+    the background and is buffered; a retry of this request carrying a
+    Last-Event-ID header resumes from the buffer instead of generating again.
+    Buffers live in the worker process that started the stream, so resuming
+    needs sticky routing; a retry whose buffer is unknown here (other worker,
+    expired, restarted) gets a terminal "stream_unavailable" error event and
+    is never saved or generated again.
+
     Args:
         thread_id: ID of the thread
         body: Chat message content
         current_user: Authenticated user
         db: Database session
+        session_factory: Session factory for the background generation task
 
     Returns:
         EventSourceResponse streaming AI response
@@ -116,16 +110,35 @@ async def stream_chat(
     # Validate thread access
     thread = await validate_thread_access(db, thread_id, current_user["user_id"])
 
-    # Check user budget before allowing chat
+    # Reconnect: resume the existing stream from the replay buffer instead of
+    # saving the message again and starting a duplicate LLM call
+    resume = parse_event_id(request.headers.get("last-event-id"))
+    if resume is not None:
+        stream_id, last_seq = resume
+        buffer = get_stream_buffers().get(stream_id)
+        if (
+            buffer is not None
+            and buffer.thread_id == thread_id
+            and buffer.user_id == current_user["user_id"]
+        ):
+            return _buffered_event_response(request, buffer, after_seq=last_seq)
+        # The original turn may already be saved and billed: fail closed
+        return _stream_unavailable_response(stream_id)
+
+    # Check user budget before starting a new generation
     if not await check_user_budget(db, current_user["user_id"]):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Monthly token budget exceeded. Please try again next month."
         )
 
+    # Use thread's bound provider (set at creation time)
+    # This ensures consistency - conversations stay with their original provider
+    provider = thread.model_provider or "anthropic"
+
     # Save user message to database (skip for silent artifact generation)
     if not body.artifact_generation:
-        await save_message(db, thread_id, "user", body.content)
+        await save_message(db, thread_id, "user", body.content, provider=provider)
 
     # Update thread activity timestamp
     from datetime import datetime, timezone
@@ -145,18 +158,58 @@ async def stream_chat(
                        "Only call the save_artifact tool and stop."
         })
 
-    # Use thread's bound provider (set at creation time)
-    # This ensures consistency - conversations stay with their original provider
-    provider = thread.model_provider or "anthropic"
-    ai_service = AIService(provider=provider, thread_type=thread.thread_type or "ba_assistant")
-
-    async def event_generator():
-        """Generate SSE events from AI response with heartbeat during silence."""
-        accumulated_text = ""
-        usage_data = None
-        actual_model = None
+    ai_service = AIService(
+        provider=provider,
+        thread_type=thread.thread_type or "ba_assistant",
+        session_factory=session_factory,
+        user_id=current_user["user_id"]
+    )
 
-        try:
+    # Generate in a background task that writes to a replay buffer, so a client
+    # disconnect neither aborts generation nor loses the (already paid) answer
+    buffer = get_stream_buffers().create(thread_id, current_user["user_id"])
+    buffer.task = asyncio.create_task(_produce_chat_stream(
+        buffer,
+        ai_service,
+        conversation,
+        thread,
+        current_user["user_id"],
+        body,
+        provider,
+        session_factory,
+    ))
+
+    return _buffered_event_response(request, buffer)
+
+
+async def _produce_chat_stream(
+    buffer: StreamBuffer,
+    ai_service: AIService,
+    conversation: list,
+    thread: Thread,
+    user_id: str,
+    body: ChatRequest,
+    provider: str,
+    session_factory,
+) -> None:
+    """
+    Run the AI response to completion, writing SSE events into the buffer.
+
+    Uses its own database session because it may outlive the request.
+    The assistant message is committed before message_complete is buffered,
+    so a client that has seen the answer (and its next turn, on any worker)
+    always finds it saved. Token usage is recorded inline too (one INSERT,
+    and it must survive a worker restart); summarization is queued on the
+    post-stream work queue, so the buffer closes without waiting on it.
+    """
+    thread_id = thread.id
+    accumulated_text = ""
+    usage_data = None
+    actual_model = None
+    saved = body.artifact_generation  # Silent generation saves no assistant message
+
+    try:
+        async with session_factory() as db:
             # Create raw stream generator
             raw_stream = ai_service.stream_chat(
                 conversation,
@@ -166,27 +219,29 @@ async def stream_chat(
                 artifact_generation=body.artifact_generation
             )
 
-            # Wrap with heartbeat for long thinking periods
-            heartbeat_stream = stream_with_heartbeat(raw_stream)
-
-            async for event in heartbeat_stream:
-                # Check for client disconnect
-                if await request.is_disconnected():
-                    break
-
-                # Heartbeat events pass through directly (no accumulation)
-                if "comment" in event:
-                    yield event
-                    continue
+            # Merge text fragments into frames flushed every N ms or M bytes
+            coalesced_stream = coalesce_text_deltas(
+                raw_stream,
+                flush_interval_ms=(
+                    settings.sse_delta_flush_ms if body.delta_flush_ms is None
+                    else body.delta_flush_ms
+                ),
+                max_bytes=body.delta_flush_bytes or settings.sse_delta_flush_bytes
+            )
 
+            async for event in coalesced_stream:
                 # Suppress text_delta for silent artifact generation
                 if body.artifact_generation and event.get("event") == "text_delta":
-                    continue  # Skip yielding - frontend doesn't need text for silent mode
+                    continue  # Skip buffering - frontend doesn't need text for silent mode
 
                 # Track accumulated text for saving (skip for silent mode)
-                if not body.artifact_generation and event.get("event") == "text_delta":
-                    data = json.loads(event["data"])
+                if event.get("event") == "text_delta":
+                    data = event["data"]
+                    if isinstance(data, str):
+                        data = json.loads(data)
                     accumulated_text += data.get("text", "")
+                    # Serialize once per coalesced frame at the SSE edge
+                    event = {"event": "text_delta", "data": json.dumps(data)}
 
                 # Track usage for token tracking
                 if event.get("event") == "message_complete":
@@ -195,39 +250,144 @@ async def stream_chat(
                     actual_model = data.get("model", None)
                     accumulated_text = data.get("content", accumulated_text)
 
-                yield event
+                    # Persist the answer before the client is told it is complete
+                    if not saved:
+                        await _save_assistant_message(db, thread_id, accumulated_text, provider)
+                        saved = True
+
+                buffer.append(event)
 
-            # Save assistant message after streaming completes (skip for silent generation)
-            if accumulated_text and not body.artifact_generation:
-                await save_message(db, thread_id, "assistant", accumulated_text)
+            # Stream ended without message_complete: keep what was shown
+            if not saved:
+                await _save_assistant_message(db, thread_id, accumulated_text, provider)
 
-            # Track token usage
             if usage_data:
-                # Use actual model from AI response, fall back to thread provider, then constant
-                model_name = actual_model or thread.model_provider or AGENT_MODEL
-                await track_token_usage(
-                    db,
-                    current_user["user_id"],
-                    model_name,
-                    usage_data.get("input_tokens", 0),
-                    usage_data.get("output_tokens", 0),
-                    f"/threads/{thread_id}/chat",
-                    thread_type=thread.thread_type or "ba_assistant"
-                )
-
-            # Update thread summary (skip for silent generation - no new messages to summarize)
-            if not body.artifact_generation:
-                await maybe_update_summary(db, thread_id, current_user["user_id"])
-
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            if body.artifact_generation:
-                logger.error(f"Silent artifact generation failed for thread {thread_id}: {e}")
-            yield {
-                "event": "error",
-                "data": json.dumps({"message": str(e)})
-            }
+                await _track_chat_usage(db, thread, user_id, usage_data, actual_model)
+
+        # Summarize in the background so the response closes now
+        for name, steps in _post_stream_work(thread, user_id, body):
+            get_work_queue().submit(f"{name}:{thread_id}", session_factory, steps)
+
+    except Exception as e:
+        if body.artifact_generation:
+            logger.error(f"Silent artifact generation failed for thread {thread_id}: {e}")
+        else:
+            logger.error(f"Chat stream failed for thread {thread_id}: {e}")
+        buffer.append({
+            "event": "error",
+            "data": json.dumps({"message": str(e)})
+        })
+    finally:
+        buffer.close()
+
+
+async def _save_assistant_message(
+    db: AsyncSession,
+    thread_id: str,
+    content: str,
+    provider: str,
+) -> None:
+    """Save the streamed assistant response (committed; no-op if empty)."""
+    if content:
+        await save_message(db, thread_id, "assistant", content, provider=provider)
+
+
+async def _track_chat_usage(
+    db: AsyncSession,
+    thread: Thread,
+    user_id: str,
+    usage_data: dict,
+    actual_model: Optional[str],
+) -> None:
+    """Record token usage for a finished chat response (committed)."""
+    # Use actual model from AI response, fall back to thread provider, then constant
+    model_name = actual_model or thread.model_provider or AGENT_MODEL
+    await track_token_usage(
+        db,
+        user_id=user_id,
+        model=model_name,
+        input_tokens=usage_data.get("input_tokens", 0),
+        output_tokens=usage_data.get("output_tokens", 0),
+        endpoint=f"/threads/{thread.id}/chat",
+        thread_type=thread.thread_type or "ba_assistant",
+        cache_creation_tokens=usage_data.get("cache_creation_input_tokens", 0),
+        cache_read_tokens=usage_data.get("cache_read_input_tokens", 0),
+    )
+
+
+def _post_stream_work(
+    thread: Thread,
+    user_id: str,
+    body: ChatRequest,
+) -> list:
+    """
+    Build the post-stream work items for a finished chat response.
+
+    Each item is (name, steps) and is queued separately: nothing on the next
+    turn's path waits for them, and losing one on a restart only delays a
+    summary. Each step takes the worker's database session.
+    """
+    thread_id = thread.id
+    work = []
+
+    # Update thread title/summary (skip for silent generation - no new messages to summarize)
+    if not body.artifact_generation:
+        work.append(("update_summary", [("update_summary", partial(
+            maybe_update_summary, thread_id=thread_id, user_id=user_id
+        ))]))
+        # Fold older turns into the rolling summary once context grows large
+        work.append(("compact_context", [("compact_context", partial(
+            maybe_compact_context, thread_id=thread_id, user_id=user_id
+        ))]))
+
+    return work
+
+
+def _buffered_event_response(
+    request: Request,
+    buffer: StreamBuffer,
+    after_seq: int = 0
+) -> EventSourceResponse:
+    """Stream buffered events (from after_seq) to the client with heartbeats."""
+
+    async def event_generator():
+        """Generate SSE events from the replay buffer with heartbeat during silence."""
+        # Wrap with heartbeat for long thinking periods
+        heartbeat_stream = stream_with_heartbeat(buffer.subscribe(after_seq))
+
+        async for event in heartbeat_stream:
+            # Client gone: stop reading; generation continues in the background
+            if await request.is_disconnected():
+                break
+            yield event
+
+    return EventSourceResponse(
+        event_generator(),
+        headers={
+            "X-Accel-Buffering": "no",  # Disable Nginx buffering
+            "Cache-Control": "no-cache",
+        }
+    )
+
+
+def _stream_unavailable_response(stream_id: str) -> EventSourceResponse:
+    """
+    Terminal response for a reconnect whose stream buffer is not available.
+
+    The buffer expired, its worker restarted, or the reconnect was routed to
+    another worker. The client should reload the thread's messages instead
+    of resending the turn.
+    """
+    logger.warning(f"Chat stream {stream_id} not resumable in this worker")
+
+    async def event_generator():
+        yield {
+            "event": "error",
+            "data": json.dumps({
+                "message": "This response can no longer be resumed. Reload the conversation to see it.",
+                "code": "stream_unavailable",
+            })
+        }
 
     return EventSourceResponse(
         event_generator(),
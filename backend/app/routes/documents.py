@@ -8,19 +8,20 @@ import csv
 import json
 from io import BytesIO, StringIO
 from typing import List, Optional
-from fastapi import APIRouter, Depends, File, HTTPException, Response, status, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, status, UploadFile
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 import openpyxl
 
 from app.database import get_db
-from app.models import Document, Project, Thread, User
+from app.models import Document, Project, User
 from app.routes.auth import get_current_user
 from app.services.encryption import get_encryption_service
 from app.services.document_search import index_document, search_documents
 from app.services.document_parser import ParserFactory
 from app.services.file_validator import validate_file_security
+from app.services.ownership import get_owned_thread
+from app.utils.pagination import NEXT_CURSOR_HEADER, paginate_keyset, split_page
 
 
 router = APIRouter()
@@ -35,6 +36,20 @@ TABULAR_CONTENT_TYPES = [
 ]
 
 
+async def _get_owned_project_document(
+    db: AsyncSession,
+    document_id: str,
+    user_id: str
+) -> Optional[Document]:
+    """Load a project document owned by user_id (None if missing or not owned)."""
+    stmt = select(Document).where(
+        Document.id == document_id,
+        Document.owner_user_id == user_id,
+        Document.project_id.is_not(None)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
 async def _process_and_store_document(
     db: AsyncSession,
     file: UploadFile,
@@ -155,13 +170,17 @@ async def upload_document(
 @router.get("/projects/{project_id}/documents")
 async def list_documents(
     project_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Page size; omit for all documents"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     List all documents in a project.
 
-    Returns metadata only (no content) ordered by creation date.
+    Returns metadata only (no content) ordered by creation date. With limit,
+    returns one keyset page and sets X-Next-Cursor when more follow.
     """
     # Verify project ownership
     stmt = select(Project).where(
@@ -173,12 +192,15 @@ async def list_documents(
         raise HTTPException(status_code=404, detail="Project not found")
 
     # Get documents
-    stmt = select(Document).where(
-        Document.project_id == project_id
-    ).order_by(Document.created_at.desc())
+    stmt = paginate_keyset(
+        select(Document).where(Document.project_id == project_id),
+        Document.created_at, Document.id, cursor, limit
+    )
 
     result = await db.execute(stmt)
-    documents = result.scalars().all()
+    documents, next_cursor = split_page(result.scalars().all(), limit, "created_at")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
     return [
         {
@@ -204,12 +226,7 @@ async def get_document(
     Verifies user owns the project containing the document.
     Returns extracted text content for all document types.
     """
-    # Get document with project join to verify ownership
-    stmt = select(Document).join(Project).where(
-        Document.id == document_id,
-        Project.user_id == current_user["user_id"]
-    )
-    doc = (await db.execute(stmt)).scalar_one_or_none()
+    doc = await _get_owned_project_document(db, document_id, current_user["user_id"])
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
@@ -242,12 +259,7 @@ async def download_document(
     For rich documents (XLSX, CSV, PDF, DOCX): returns original binary.
     For text documents: returns plain text content.
     """
-    # Get document with project join to verify ownership
-    stmt = select(Document).join(Project).where(
-        Document.id == document_id,
-        Project.user_id == current_user["user_id"]
-    )
-    doc = (await db.execute(stmt)).scalar_one_or_none()
+    doc = await _get_owned_project_document(db, document_id, current_user["user_id"])
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
@@ -295,12 +307,7 @@ async def _get_tabular_document(
         404: Document not found or not owned by user
         400: Document is not tabular format or has no data
     """
-    # Get document with project join to verify ownership
-    stmt = select(Document).join(Project).where(
-        Document.id == document_id,
-        Project.user_id == current_user["user_id"]
-    )
-    doc = (await db.execute(stmt)).scalar_one_or_none()
+    doc = await _get_owned_project_document(db, document_id, current_user["user_id"])
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
@@ -472,25 +479,8 @@ async def upload_thread_document(
     """
     user_id = current_user["user_id"]
 
-    # Get thread with project loaded for ownership check
-    stmt = (
-        select(Thread)
-        .where(Thread.id == thread_id)
-        .options(selectinload(Thread.project))
-    )
-    result = await db.execute(stmt)
-    thread = result.scalar_one_or_none()
-
-    if not thread:
-        raise HTTPException(status_code=404, detail="Thread not found")
-
-    # Validate ownership: project-less threads check user_id, project threads check project.user_id
-    if thread.project_id is None:
-        if thread.user_id != user_id:
-            raise HTTPException(status_code=404, detail="Thread not found")
-    else:
-        if thread.project.user_id != user_id:
-            raise HTTPException(status_code=404, detail="Thread not found")
+    # Validate thread ownership
+    await get_owned_thread(db, thread_id, user_id)
 
     # Process and store document (no project_id for thread documents)
     doc = await _process_and_store_document(db, file, project_id=None, thread_id=thread_id)
@@ -533,25 +523,8 @@ async def list_thread_documents(
     """
     user_id = current_user["user_id"]
 
-    # Get thread with project loaded for ownership check
-    stmt = (
-        select(Thread)
-        .where(Thread.id == thread_id)
-        .options(selectinload(Thread.project))
-    )
-    result = await db.execute(stmt)
-    thread = result.scalar_one_or_none()
-
-    if not thread:
-        raise HTTPException(status_code=404, detail="Thread not found")
-
-    # Validate ownership: project-less threads check user_id, project threads check project.user_id
-    if thread.project_id is None:
-        if thread.user_id != user_id:
-            raise HTTPException(status_code=404, detail="Thread not found")
-    else:
-        if thread.project.user_id != user_id:
-            raise HTTPException(status_code=404, detail="Thread not found")
+    # Validate thread ownership
+    await get_owned_thread(db, thread_id, user_id)
 
     # Get documents for this thread
     stmt = select(Document).where(
@@ -595,12 +568,7 @@ async def delete_document(
     Raises:
         404: Document not found or not owned by user
     """
-    # Get document with project join to verify ownership
-    stmt = select(Document).join(Project).where(
-        Document.id == document_id,
-        Project.user_id == current_user["user_id"]
-    )
-    doc = (await db.execute(stmt)).scalar_one_or_none()
+    doc = await _get_owned_project_document(db, document_id, current_user["user_id"])
     if not doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,39 @@
+"""
+Runtime metrics API endpoint.
+
+Admin endpoint exposing Claude CLI process pool, admission and database
+query counters (kept off the unauthenticated /health liveness check).
+"""
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.models import User
+from app.services.llm.admission import get_cli_admission
+from app.services.llm.claude_cli_adapter import get_process_pools
+from app.services.query_metrics import get_query_metrics
+from app.utils.jwt import get_admin_user
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def get_metrics(
+    admin: User = Depends(get_admin_user),
+) -> Dict[str, Any]:
+    """
+    Return this worker's runtime metrics.
+
+    Security:
+        - Requires admin authentication
+
+    Returns:
+        Claude CLI process pools (when running), admission counters and
+        database query metrics since the last flush
+    """
+    pools = get_process_pools()
+    return {
+        "process_pools": pools.stats() if pools else None,
+        "cli_admission": get_cli_admission().stats(),
+        "db_queries": get_query_metrics().stats(),
+    }
@@ -18,11 +18,13 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel, Field
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager, selectinload
 
 from app.database import get_db
 from app.models import Message, Project, Thread
+from app.services.ownership import get_owned_thread
 from app.utils.jwt import get_current_user
+from app.utils.pagination import NEXT_CURSOR_HEADER, get_count_cache, paginate_keyset, split_page
 
 router = APIRouter()
 
@@ -91,6 +93,8 @@ class ThreadResponse(BaseModel):
 class ThreadListResponse(ThreadResponse):
     """Response model for thread in list view with message count."""
     message_count: int
+    artifact_count: int = 0
+    last_message_preview: Optional[str] = None
 
 
 class ThreadDetailResponse(ThreadResponse):
@@ -108,6 +112,8 @@ class GlobalThreadListResponse(BaseModel):
     project_id: Optional[str]
     project_name: Optional[str]
     message_count: int
+    artifact_count: int = 0
+    last_message_preview: Optional[str] = None
     model_provider: str
     conversation_mode: Optional[str] = None
     thread_type: str = "ba_assistant"
@@ -119,10 +125,11 @@ class GlobalThreadListResponse(BaseModel):
 class PaginatedThreadsResponse(BaseModel):
     """Paginated threads response."""
     threads: List[GlobalThreadListResponse]
-    total: int
+    total: Optional[int]  # None when include_total=false
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Pass as cursor to fetch the next page
 
 
 # ============================================================================
@@ -133,6 +140,8 @@ class PaginatedThreadsResponse(BaseModel):
 async def list_all_threads(
     page: int = Query(1, ge=1),
     page_size: int = Query(25, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (takes precedence over page)"),
+    include_total: bool = Query(True, description="Include total (cached between pages)"),
     thread_type: Optional[str] = Query(None, description="Filter by thread_type"),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
@@ -140,11 +149,16 @@ async def list_all_threads(
     """
     List all threads for current user across all projects.
 
-    Includes project-less threads. Sorted by last_activity_at DESC.
+    Includes project-less threads. Sorted by last_activity_at DESC (id DESC
+    for ties). Pass next_cursor back as cursor for keyset pagination; page
+    (OFFSET) is still accepted for existing clients.
 
     Args:
-        page: Page number (1-indexed)
+        page: Page number (1-indexed), used when no cursor is given
         page_size: Number of threads per page (max 50)
+        cursor: Keyset cursor from the previous page's next_cursor
+        include_total: Count matching threads; recomputed on the first page
+            and cached for later pages
         thread_type: Optional filter by thread type
         current_user: Authenticated user from JWT
         db: Database session
@@ -161,41 +175,43 @@ async def list_all_threads(
             detail=f"Invalid thread_type filter. Must be one of: {', '.join(VALID_THREAD_TYPES)}"
         )
 
-    # Query: threads owned directly (user_id) OR via project (project.user_id)
-    base_query = (
-        select(Thread)
-        .outerjoin(Project, Thread.project_id == Project.id)
-        .where(
-            (Thread.user_id == user_id) |
-            (Project.user_id == user_id)
-        )
-        .options(selectinload(Thread.project), selectinload(Thread.messages))
-        .order_by(Thread.last_activity_at.desc())
-    )
+    # Query: threads by effective owner (owner_user_id/last_activity_at index).
+    # Project is filled from an outer join for project_name and counts come
+    # from the denormalized Thread columns, so one query serves the page
+    filters = [Thread.owner_user_id == user_id]
 
     # Apply thread_type filter if provided
     if thread_type:
-        base_query = base_query.where(Thread.thread_type == thread_type)
+        filters.append(Thread.thread_type == thread_type)
 
-    # Count total matching threads
-    count_subquery = (
-        select(Thread.id)
+    base_query = (
+        select(Thread)
         .outerjoin(Project, Thread.project_id == Project.id)
-        .where((Thread.user_id == user_id) | (Project.user_id == user_id))
+        .where(*filters)
+        .options(contains_eager(Thread.project))
     )
-    # Apply thread_type filter to count as well
-    if thread_type:
-        count_subquery = count_subquery.where(Thread.thread_type == thread_type)
-    count_subquery = count_subquery.subquery()
-    count_stmt = select(func.count()).select_from(count_subquery)
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar()
-
-    # Paginate
-    offset = (page - 1) * page_size
-    paginated = base_query.offset(offset).limit(page_size)
-    result = await db.execute(paginated)
-    threads = result.scalars().unique().all()
+
+    # Fetch the page (one extra row tells whether more follow)
+    stmt = paginate_keyset(base_query, Thread.last_activity_at, Thread.id, cursor, page_size)
+    offset = 0
+    if not cursor:
+        offset = (page - 1) * page_size
+        stmt = stmt.offset(offset)
+    result = await db.execute(stmt)
+    threads, next_cursor = split_page(result.scalars().unique().all(), page_size, "last_activity_at")
+
+    # Count total matching threads (cached for pages after the first)
+    total = None
+    if include_total:
+        count_cache = get_count_cache()
+        cache_key = ("threads", user_id, thread_type)
+        if cursor or page > 1:
+            total = count_cache.get(cache_key)
+        if total is None:
+            count_stmt = select(func.count(Thread.id)).where(*filters)
+            total_result = await db.execute(count_stmt)
+            total = total_result.scalar()
+            count_cache.set(cache_key, total)
 
     return PaginatedThreadsResponse(
         threads=[
@@ -207,7 +223,9 @@ async def list_all_threads(
                 last_activity_at=t.last_activity_at.isoformat() if t.last_activity_at else t.updated_at.isoformat(),
                 project_id=t.project_id,
                 project_name=t.project.name if t.project else None,
-                message_count=len(t.messages),
+                message_count=t.message_count,
+                artifact_count=t.artifact_count,
+                last_message_preview=t.last_message_preview,
                 model_provider=t.model_provider or "anthropic",
                 conversation_mode=t.conversation_mode,
                 thread_type=t.thread_type or "ba_assistant",
@@ -217,7 +235,8 @@ async def list_all_threads(
         total=total,
         page=page,
         page_size=page_size,
-        has_more=(offset + len(threads)) < total,
+        has_more=next_cursor is not None,
+        next_cursor=next_cursor,
     )
 
 
@@ -408,14 +427,23 @@ async def create_thread(
 )
 async def list_threads(
     project_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Page size; omit for all threads"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
     List all threads in a project ordered by creation date (newest first).
 
+    With limit, returns one keyset page and sets the X-Next-Cursor header
+    when more threads follow.
+
     Args:
         project_id: ID of the project
+        response: Response (for the next-cursor header)
+        limit: Optional page size
+        cursor: Keyset cursor from the previous page
         current_user: Authenticated user from JWT
         db: Database session
 
@@ -439,15 +467,15 @@ async def list_threads(
             detail="Project not found"
         )
 
-    # Get threads with messages loaded for counting
-    stmt = (
-        select(Thread)
-        .where(Thread.project_id == project_id)
-        .options(selectinload(Thread.messages))
-        .order_by(Thread.created_at.desc())
+    # Counts come from the denormalized Thread columns (no message loading)
+    stmt = paginate_keyset(
+        select(Thread).where(Thread.project_id == project_id),
+        Thread.created_at, Thread.id, cursor, limit
     )
     result = await db.execute(stmt)
-    threads = result.scalars().all()
+    threads, next_cursor = split_page(result.scalars().all(), limit, "created_at")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
     return [
         ThreadListResponse(
@@ -459,7 +487,9 @@ async def list_threads(
             thread_type=thread.thread_type or "ba_assistant",
             created_at=thread.created_at.isoformat(),
             updated_at=thread.updated_at.isoformat(),
-            message_count=len(thread.messages),
+            message_count=thread.message_count,
+            artifact_count=thread.artifact_count,
+            last_message_preview=thread.last_message_preview,
         )
         for thread in threads
     ]
@@ -490,37 +520,8 @@ async def get_thread(
     """
     user_id = current_user["user_id"]
 
-    # Get thread with project and messages loaded
-    stmt = (
-        select(Thread)
-        .where(Thread.id == thread_id)
-        .options(
-            selectinload(Thread.project),
-            selectinload(Thread.messages)
-        )
-    )
-    result = await db.execute(stmt)
-    thread = result.scalar_one_or_none()
-
-    if not thread:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Thread not found"
-        )
-
-    # Validate ownership: project-less threads check user_id, project threads check project.user_id
-    if thread.project_id is None:
-        if thread.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Thread not found"
-            )
-    else:
-        if thread.project.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Thread not found"
-            )
+    # Get owned thread with messages loaded
+    thread = await get_owned_thread(db, thread_id, user_id, selectinload(Thread.messages))
 
     # Sort messages chronologically (oldest first)
     sorted_messages = sorted(thread.messages, key=lambda m: m.created_at)
@@ -575,34 +576,7 @@ async def update_thread(
     """
     user_id = current_user["user_id"]
 
-    # Get thread with project loaded for ownership check
-    stmt = (
-        select(Thread)
-        .where(Thread.id == thread_id)
-        .options(selectinload(Thread.project))
-    )
-    result = await db.execute(stmt)
-    thread = result.scalar_one_or_none()
-
-    if not thread:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Thread not found"
-        )
-
-    # Validate ownership: project-less threads check user_id, project threads check project.user_id
-    if thread.project_id is None:
-        if thread.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Thread not found"
-            )
-    else:
-        if thread.project.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Thread not found"
-            )
+    thread = await get_owned_thread(db, thread_id, user_id)
 
     # Handle project association
     if update_data.project_id is not None:
@@ -627,7 +601,7 @@ async def update_thread(
                 detail="Project not found"
             )
 
-        # Transition ownership model
+        # Transition ownership model (owner_user_id is kept by services.ownership)
         thread.project_id = update_data.project_id
         thread.user_id = None  # Clear direct ownership
 
@@ -687,34 +661,7 @@ async def delete_thread(
     """
     user_id = current_user["user_id"]
 
-    # Get thread with project loaded for ownership check
-    stmt = (
-        select(Thread)
-        .where(Thread.id == thread_id)
-        .options(selectinload(Thread.project))
-    )
-    result = await db.execute(stmt)
-    thread = result.scalar_one_or_none()
-
-    if not thread:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Thread not found"
-        )
-
-    # Validate ownership: project-less threads check user_id, project threads check project.user_id
-    if thread.project_id is None:
-        if thread.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Thread not found"
-            )
-    else:
-        if thread.project.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Thread not found"
-            )
+    thread = await get_owned_thread(db, thread_id, user_id)
 
     # Delete thread (cascades to messages, artifacts)
     await db.delete(thread)
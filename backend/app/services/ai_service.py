@@ -5,10 +5,12 @@ Uses the LLM adapter pattern for provider-agnostic interactions.
 Currently supports Anthropic Claude, with Gemini and DeepSeek planned for Phase 21.
 """
 import asyncio
+import heapq
 import json
 import time
 import uuid as _uuid
-from typing import AsyncGenerator, List, Dict, Any, Optional
+from typing import AsyncGenerator, List, Dict, Any, Optional, Tuple
+from app.config import settings
 from app.services.document_search import search_documents
 from app.services.llm import LLMFactory, StreamChunk
 from app.services.logging_service import get_logging_service
@@ -29,6 +31,164 @@ ASSISTANT_FILE_GEN_PROMPT = (
 )
 
 
+class _HeartbeatStream:
+    """Per-stream heartbeat state driven by the shared HeartbeatScheduler."""
+
+    __slots__ = (
+        "queue", "initial_delay", "heartbeat_interval", "max_silence",
+        "last_data_time", "last_beat_time", "first_heartbeat_sent", "closed",
+        "registered",
+    )
+
+    def __init__(
+        self,
+        queue: asyncio.Queue,
+        initial_delay: float,
+        heartbeat_interval: float,
+        max_silence: float
+    ):
+        now = time.monotonic()
+        self.queue = queue
+        self.initial_delay = initial_delay
+        self.heartbeat_interval = heartbeat_interval
+        self.max_silence = max_silence
+        self.last_data_time = now
+        self.last_beat_time = now
+        self.first_heartbeat_sent = False
+        self.closed = False
+        self.registered = False
+
+    def mark_data(self) -> None:
+        """Record real data (O(1); the scheduler picks up the new deadline lazily)."""
+        now = time.monotonic()
+        self.last_data_time = now
+        self.last_beat_time = now
+        self.first_heartbeat_sent = False  # Reset heartbeat delay for next silence
+
+    def next_deadline(self) -> float:
+        """Monotonic time of the next heartbeat or silence timeout."""
+        threshold = self.initial_delay if not self.first_heartbeat_sent else self.heartbeat_interval
+        return min(
+            self.last_beat_time + threshold,
+            self.last_data_time + self.max_silence,
+        )
+
+
+class HeartbeatScheduler:
+    """
+    Single timer task that drives heartbeats for all open SSE streams.
+
+    Streams are kept in a min-heap ordered by their next deadline. The task
+    sleeps until the earliest deadline (or until an earlier one is added), so
+    idle streams cost no wakeups between heartbeats. Data events only update
+    the stream's timestamps; stale heap entries are re-pushed when popped.
+    The task exits when no streams remain and restarts on the next schedule.
+
+    Attributes:
+        wakeups: Number of times the scheduler task woke up (for diagnostics)
+    """
+
+    def __init__(self):
+        self._heap: List[tuple] = []
+        self._counter = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._open = 0
+        self.wakeups = 0
+
+    def __len__(self) -> int:
+        """Number of open streams."""
+        return self._open
+
+    def add(self, stream: _HeartbeatStream) -> None:
+        """Start driving heartbeats for a stream."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # New event loop (e.g. per-test loops): drop state bound to the old one
+            self._heap = []
+            self._open = 0
+            self._task = None
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+
+        stream.registered = True
+        self._open += 1
+        deadline = stream.next_deadline()
+        earliest = self._heap[0][0] if self._heap else None
+        self._push(deadline, stream)
+
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        elif earliest is None or deadline < earliest:
+            self._wakeup.set()
+
+    def discard(self, stream: _HeartbeatStream) -> None:
+        """Stop driving a stream (its heap entry is dropped lazily)."""
+        stream.closed = True
+        if not stream.registered:
+            return
+        stream.registered = False
+        self._open -= 1
+        if self._open == 0 and self._wakeup is not None:
+            # Nothing left to drive: let the task exit now, not at a stale deadline
+            self._heap = []
+            self._wakeup.set()
+
+    def _push(self, deadline: float, stream: _HeartbeatStream) -> None:
+        self._counter += 1
+        heapq.heappush(self._heap, (deadline, self._counter, stream))
+
+    async def _run(self) -> None:
+        """Fire due heartbeats/timeouts, sleeping until the earliest deadline."""
+        while self._heap:
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                deadline, _, stream = heapq.heappop(self._heap)
+                if stream.closed:
+                    continue
+
+                # Data arrived since this entry was pushed: reschedule lazily
+                current = stream.next_deadline()
+                if current > now:
+                    self._push(current, stream)
+                    continue
+
+                if now - stream.last_data_time >= stream.max_silence:
+                    stream.closed = True
+                    stream.queue.put_nowait(("timeout", None))
+                    continue
+
+                stream.queue.put_nowait(("heartbeat", None))
+                stream.first_heartbeat_sent = True
+                stream.last_beat_time = now  # Reset timer after heartbeat
+                self._push(stream.next_deadline(), stream)
+
+            if not self._heap:
+                break
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), self._heap[0][0] - time.monotonic()
+                )
+            except asyncio.TimeoutError:
+                pass
+            self.wakeups += 1
+
+
+# Module-level singleton (like get_logging_service)
+_heartbeat_scheduler: Optional[HeartbeatScheduler] = None
+
+
+def get_heartbeat_scheduler() -> HeartbeatScheduler:
+    """Get the singleton HeartbeatScheduler instance."""
+    global _heartbeat_scheduler
+    if _heartbeat_scheduler is None:
+        _heartbeat_scheduler = HeartbeatScheduler()
+    return _heartbeat_scheduler
+
+
 async def stream_with_heartbeat(
     data_gen: AsyncGenerator[Dict[str, Any], None],
     initial_delay: float = 5.0,
@@ -41,6 +201,10 @@ async def stream_with_heartbeat(
     SSE comments (format: ': heartbeat\\n\\n') are invisible to JavaScript
     EventSource clients but keep the connection alive through proxies.
 
+    Heartbeats are event-driven: one shared HeartbeatScheduler task wakes
+    only when some stream's heartbeat is due, instead of a polling task per
+    stream.
+
     Args:
         data_gen: The source async generator yielding SSE event dicts
         initial_delay: Seconds before first heartbeat (default: 5s)
@@ -51,52 +215,28 @@ async def stream_with_heartbeat(
         SSE event dicts from source generator, plus heartbeat comments during silence
     """
     queue: asyncio.Queue = asyncio.Queue()
-    last_data_time = time.monotonic()
-    done = False
-    first_heartbeat_sent = False
+    stream = _HeartbeatStream(queue, initial_delay, heartbeat_interval, max_silence)
 
     async def data_producer():
         """Forward data from source generator to queue."""
-        nonlocal done
         try:
             async for item in data_gen:
                 await queue.put(("data", item))
         except Exception as e:
             await queue.put(("error", e))
         finally:
-            done = True
+            stream.closed = True
             await queue.put(("done", None))
 
-    async def heartbeat_producer():
-        """Send heartbeat comments during silence periods."""
-        nonlocal last_data_time, first_heartbeat_sent
-        while not done:
-            await asyncio.sleep(1)  # Check every second
-            silence_duration = time.monotonic() - last_data_time
-
-            # Check for max timeout
-            if silence_duration >= max_silence:
-                await queue.put(("timeout", None))
-                return
-
-            # Determine threshold based on whether first heartbeat sent
-            threshold = initial_delay if not first_heartbeat_sent else heartbeat_interval
-            if silence_duration >= threshold:
-                await queue.put(("heartbeat", None))
-                first_heartbeat_sent = True
-                last_data_time = time.monotonic()  # Reset timer after heartbeat
-
-    # Start both producers as background tasks
     data_task = asyncio.create_task(data_producer())
-    heartbeat_task = asyncio.create_task(heartbeat_producer())
+    get_heartbeat_scheduler().add(stream)
 
     try:
         while True:
             msg_type, payload = await queue.get()
 
             if msg_type == "data":
-                last_data_time = time.monotonic()  # Reset on real data
-                first_heartbeat_sent = False  # Reset heartbeat delay for next silence
+                stream.mark_data()  # Reset on real data
                 yield payload
             elif msg_type == "heartbeat":
                 # SSE comment format - sse_starlette handles the ': ' prefix
@@ -113,21 +253,111 @@ async def stream_with_heartbeat(
             elif msg_type == "done":
                 return
     finally:
-        # Clean up tasks
+        # Stop heartbeats and clean up task
+        get_heartbeat_scheduler().discard(stream)
         data_task.cancel()
-        heartbeat_task.cancel()
         try:
             await data_task
         except asyncio.CancelledError:
             pass
-        try:
-            await heartbeat_task
-        except asyncio.CancelledError:
-            pass
 
 
 
 
+async def coalesce_text_deltas(
+    data_gen: AsyncGenerator[Dict[str, Any], None],
+    flush_interval_ms: int = 50,
+    max_bytes: int = 1024
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Merge consecutive text_delta events into larger frames.
+
+    Text fragments are buffered and flushed as one text_delta when
+    flush_interval_ms has elapsed since the first buffered fragment, when the
+    buffer reaches max_bytes (UTF-8), or before any other event (ordering is
+    preserved). text_delta data stays a structured {"text": str} dict; JSON
+    encoding happens once per frame at the SSE edge.
+
+    Args:
+        data_gen: Source generator (AIService.stream_chat events)
+        flush_interval_ms: Max milliseconds a fragment waits in the buffer
+            (0 disables coalescing)
+        max_bytes: Flush as soon as the buffered text reaches this size
+
+    Yields:
+        SSE event dicts with consecutive text_delta events merged
+    """
+    if flush_interval_ms <= 0:
+        async for event in data_gen:
+            yield event
+        return
+
+    flush_interval = flush_interval_ms / 1000
+    source = data_gen.__aiter__()
+    parts: List[str] = []
+    buffered_bytes = 0
+    deadline = 0.0
+    pending: Optional[asyncio.Future] = None
+
+    def flush() -> Dict[str, Any]:
+        nonlocal buffered_bytes
+        text = "".join(parts)
+        parts.clear()
+        buffered_bytes = 0
+        return {"event": "text_delta", "data": {"text": text}}
+
+    try:
+        while True:
+            try:
+                if not parts:
+                    # Nothing buffered: no timer needed
+                    event = await (pending if pending is not None else source.__anext__())
+                    pending = None
+                else:
+                    if pending is None:
+                        pending = asyncio.ensure_future(source.__anext__())
+                    done, _ = await asyncio.wait(
+                        {pending}, timeout=max(deadline - time.monotonic(), 0)
+                    )
+                    if not done:
+                        # Window elapsed while the provider is still producing
+                        yield flush()
+                        continue
+                    event = pending.result()
+                    pending = None
+            except StopAsyncIteration:
+                break
+            except Exception:
+                pending = None
+                if parts:
+                    yield flush()
+                raise
+
+            if event.get("event") == "text_delta" and isinstance(event.get("data"), dict):
+                text = event["data"].get("text", "")
+                if not parts:
+                    deadline = time.monotonic() + flush_interval
+                parts.append(text)
+                buffered_bytes += len(text.encode("utf-8"))
+                if buffered_bytes >= max_bytes:
+                    yield flush()
+                continue
+
+            if parts:
+                yield flush()
+            yield event
+
+        if parts:
+            yield flush()
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+            try:
+                await pending
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
 async def _fetch_project_documents(db, project_id: str, max_docs: int = 5) -> str:
     """
     Fetch project document content for providers that do not support tool calling.
@@ -808,17 +1038,46 @@ If the user sends a NEW message explicitly asking to regenerate, revise, or crea
     }
 }
 
+# Read-only tools that may run concurrently within one turn, with the max
+# number of concurrent calls per tool. Other tools (save_artifact writes and
+# ends the turn) run serially on the request session in model order.
+PARALLEL_TOOL_LIMITS = {"search_documents": 4}
+
+# Per-tool semaphores enforcing PARALLEL_TOOL_LIMITS across all requests in
+# this process, bound to the event loop they were created on
+_tool_semaphores: Optional[Tuple[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]] = None
+
+
+def _get_tool_semaphores() -> Dict[str, asyncio.Semaphore]:
+    """Get the process-wide tool semaphores (recreated if the event loop changed)."""
+    global _tool_semaphores
+    loop = asyncio.get_running_loop()
+    if _tool_semaphores is None or _tool_semaphores[0] is not loop:
+        _tool_semaphores = (loop, {
+            name: asyncio.Semaphore(limit) for name, limit in PARALLEL_TOOL_LIMITS.items()
+        })
+    return _tool_semaphores[1]
+
 
 class AIService:
     """LLM service for streaming chat with tool use via adapter pattern."""
 
-    def __init__(self, provider: str = "anthropic", thread_type: str = "ba_assistant"):
+    def __init__(
+        self,
+        provider: str = "anthropic",
+        thread_type: str = "ba_assistant",
+        session_factory=None,
+        user_id: Optional[str] = None
+    ):
         """
         Initialize AI service with specified LLM provider.
 
         Args:
             provider: LLM provider name (default: "anthropic")
             thread_type: Type of thread ("ba_assistant" or "assistant")
+            session_factory: Opens isolated DB sessions so independent tool
+                calls can run concurrently (None runs tools serially)
+            user_id: Requesting user (fair queueing key for CLI admission)
         """
         # LOGIC-03: Override provider for Assistant threads (per locked decision: hardcoded to claude-code-cli)
         if thread_type == "assistant":
@@ -826,6 +1085,8 @@ class AIService:
 
         self.adapter = LLMFactory.create(provider)
         self.thread_type = thread_type
+        self.session_factory = session_factory
+        self.user_id = user_id
 
         # LOGIC-02: Conditional tool loading (per locked decision: no BA tools for Assistant)
         if thread_type == "ba_assistant":
@@ -902,6 +1163,74 @@ class AIService:
 
         return (f"Unknown tool: {tool_name}", None)
 
+    async def _execute_tool_calls(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        project_id: str,
+        thread_id: str,
+        db
+    ) -> List[Optional[tuple]]:
+        """
+        Execute one turn's tool calls, running independent ones concurrently.
+
+        Calls to PARALLEL_TOOL_LIMITS tools that come before the first
+        save_artifact run concurrently (each in its own session) when a
+        session factory is available; the rest run serially on the request
+        session, stopping after the first saved artifact.
+
+        Returns:
+            (result_string, optional_event_dict) per call, in tool_calls order;
+            None for calls skipped after an artifact was saved
+        """
+        results: List[Optional[tuple]] = [None] * len(tool_calls)
+        # Calls after a save_artifact may never run (the save can end the turn)
+        first_save = next(
+            (i for i, tool_call in enumerate(tool_calls) if tool_call["name"] == "save_artifact"),
+            len(tool_calls)
+        )
+        parallel = [
+            i for i, tool_call in enumerate(tool_calls[:first_save])
+            if tool_call["name"] in PARALLEL_TOOL_LIMITS
+        ]
+
+        if self.session_factory is not None and len(parallel) > 1:
+            limits = _get_tool_semaphores()
+
+            async def run_isolated(i: int) -> None:
+                tool_call = tool_calls[i]
+                async with limits[tool_call["name"]]:
+                    async with self.session_factory() as tool_db:
+                        results[i] = await self.execute_tool(
+                            tool_call["name"],
+                            tool_call["input"],
+                            project_id,
+                            thread_id,
+                            tool_db
+                        )
+
+            outcomes = await asyncio.gather(
+                *(run_isolated(i) for i in parallel), return_exceptions=True
+            )
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+
+        for i, tool_call in enumerate(tool_calls):
+            if results[i] is not None:
+                continue
+            results[i] = await self.execute_tool(
+                tool_call["name"],
+                tool_call["input"],
+                project_id,
+                thread_id,
+                db
+            )
+            # BUG-016: the turn ends at the first saved artifact
+            if tool_call["name"] == "save_artifact" and results[i][1]:
+                break
+
+        return results
+
     def _tool_status_message(self, tool_name: str) -> str:
         """
         Get user-friendly status message for a tool.
@@ -967,11 +1296,24 @@ class AIService:
             if hasattr(self.adapter, 'set_context'):
                 self.adapter.set_context(db, project_id, thread_id)
 
+            # Per-user fair admission for CLI subprocesses
+            if self.user_id and hasattr(self.adapter, 'set_user'):
+                self.adapter.set_user(self.user_id)
+
+            # Incremental CLI text streaming for configured thread types
+            if hasattr(self.adapter, 'set_partial_messages'):
+                self.adapter.set_partial_messages(
+                    self.thread_type in settings.claude_cli_partial_thread_types_list
+                )
+
             # TOKEN-03: Emergency token limit for agent providers
             # The 150K soft limit in build_conversation_context() should have already truncated,
             # but this catches edge cases (single huge message, estimation arithmetic drift).
             # Formatting overhead (~75 tokens for 20-turn conversation) is negligible at this scale.
-            estimated_tokens = estimate_messages_tokens(messages)
+            # Prefer the stored per-message total carried by build_conversation_context().
+            estimated_tokens = getattr(messages, "token_count", None)
+            if estimated_tokens is None:
+                estimated_tokens = estimate_messages_tokens(messages)
             if estimated_tokens > EMERGENCY_TOKEN_LIMIT:
                 yield {
                     "event": "error",
@@ -1014,7 +1356,14 @@ class AIService:
                     sse_event_count += 1
                     yield {
                         "event": "text_delta",
-                        "data": json.dumps({"text": chunk.content})
+                        "data": {"text": chunk.content}
+                    }
+
+                elif chunk.chunk_type == "queued":
+                    # Waiting for a CLI slot: tell the client its queue position
+                    yield {
+                        "event": "queued",
+                        "data": json.dumps(chunk.metadata or {})
                     }
 
                 elif chunk.chunk_type == "tool_use":
@@ -1189,7 +1538,7 @@ class AIService:
                         sse_event_count += 1
                         yield {
                             "event": "text_delta",
-                            "data": json.dumps({"text": chunk.content})
+                            "data": {"text": chunk.content}
                         }
 
                     elif chunk.chunk_type == "tool_use":
@@ -1244,13 +1593,9 @@ class AIService:
                     }
                     return
 
-                # Execute tools and continue conversation
-                tool_results = []
+                # Show tool-specific status for every call before running them
                 for tool_call in tool_calls:
-                    tool_name = tool_call["name"]
-
-                    # Show tool-specific status
-                    if tool_name == "save_artifact":
+                    if tool_call["name"] == "save_artifact":
                         yield {
                             "event": "tool_executing",
                             "data": json.dumps({"status": "Generating artifact..."})
@@ -1261,13 +1606,16 @@ class AIService:
                             "data": json.dumps({"status": "Searching project documents..."})
                         }
 
-                    result, event_data = await self.execute_tool(
-                        tool_name,
-                        tool_call["input"],
-                        project_id,
-                        thread_id,
-                        db
-                    )
+                # Execute tools (independent ones concurrently) and continue conversation
+                outcomes = await self._execute_tool_calls(
+                    tool_calls, project_id, thread_id, db
+                )
+                tool_results = []
+                for tool_call, outcome in zip(tool_calls, outcomes):
+                    if outcome is None:
+                        break
+                    tool_name = tool_call["name"]
+                    result, event_data = outcome
                     tool_results.append({
                         "type": "tool_result",
                         "tool_use_id": tool_call["id"],
@@ -1333,7 +1681,7 @@ class AIService:
                 if accumulated_text:
                     yield {
                         "event": "text_delta",
-                        "data": json.dumps({"text": "\n\n"})
+                        "data": {"text": "\n\n"}
                     }
 
         except Exception as e:
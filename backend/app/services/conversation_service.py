@@ -3,19 +3,52 @@ Conversation service for message persistence and context building.
 
 Handles saving messages to database and building conversation context
 for Claude API calls with token-aware truncation.
+
+Built contexts are kept in a per-thread, in-process LRU cache so that each
+chat turn only loads messages added since the previous build instead of
+reloading the whole thread history. Every hit is checked against the
+thread row (message/artifact counters, summary boundary), so writes made
+by other worker processes are never served from a stale entry.
 """
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
-from sqlalchemy import select
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, func, inspect, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from app.config import settings
 from app.models import Message, Thread, Artifact
+from app.services.token_counting import CHARS_PER_TOKEN, count_tokens
 
 # Context window limits
 MAX_CONTEXT_TOKENS = 150000  # Leave room for response and system prompt
-# Rough estimate: 1 token ~= 4 characters
-CHARS_PER_TOKEN = 4
 # Artifact correlation window for fulfilled pair detection
 ARTIFACT_CORRELATION_WINDOW = timedelta(seconds=5)
+# Session.info key for thread IDs whose cached context must be dropped on commit
+_PENDING_INVALIDATIONS_KEY = "context_cache_invalidations"
+# Characters of the newest message kept in Thread.last_message_preview
+MESSAGE_PREVIEW_CHARS = 200
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Return an aware UTC datetime (SQLite hands back naive UTC values)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _as_utc_or_none(value: Optional[datetime]) -> Optional[datetime]:
+    """_as_utc for nullable columns."""
+    return _as_utc(value) if value is not None else None
+
+
+def message_preview(content: str) -> str:
+    """Leading characters of a message for Thread.last_message_preview."""
+    return content[:MESSAGE_PREVIEW_CHARS]
 
 
 def estimate_tokens(text: str) -> int:
@@ -49,6 +82,10 @@ def _identify_fulfilled_pairs(
     after an assistant message, that message pair is considered "fulfilled"
     and should be excluded from conversation context.
 
+    Artifact timestamps are sorted once and each assistant message is matched
+    with a binary search, so cost is O((messages + artifacts) log artifacts)
+    instead of O(messages x artifacts).
+
     Args:
         messages: List of Message objects with id, role, created_at attributes
         artifacts: List of Artifact objects with created_at attribute
@@ -57,6 +94,7 @@ def _identify_fulfilled_pairs(
         Set of message IDs to exclude from conversation context
     """
     fulfilled_ids = set()
+    artifact_times = sorted(artifact.created_at for artifact in artifacts)
 
     for i, msg in enumerate(messages):
         if msg.role != "assistant":
@@ -70,38 +108,380 @@ def _identify_fulfilled_pairs(
                 fulfilled_ids.add(messages[i - 1].id)
             continue  # Skip timestamp check - marker found
 
-        # Fallback: Check if any artifact was created within correlation window
-        for artifact in artifacts:
-            time_diff = (artifact.created_at - msg.created_at).total_seconds()
+        # Fallback: earliest artifact at or after the message must fall in the window
+        idx = bisect_left(artifact_times, msg.created_at)
+        if (
+            idx < len(artifact_times)
+            and artifact_times[idx] - msg.created_at <= ARTIFACT_CORRELATION_WINDOW
+        ):
+            # Mark assistant message as fulfilled
+            fulfilled_ids.add(msg.id)
 
-            if 0 <= time_diff <= ARTIFACT_CORRELATION_WINDOW.total_seconds():
-                # Mark assistant message as fulfilled
-                fulfilled_ids.add(msg.id)
+            # Mark preceding user message if it exists
+            if i > 0 and messages[i - 1].role == "user":
+                fulfilled_ids.add(messages[i - 1].id)
 
-                # Mark preceding user message if it exists
-                if i > 0 and messages[i - 1].role == "user":
-                    fulfilled_ids.add(messages[i - 1].id)
+    return fulfilled_ids
 
-                # Break after first match (one artifact per message)
-                break
 
-    return fulfilled_ids
+def _summary_message(summary: str) -> Dict[str, Any]:
+    """Build the context prefix carrying the rolling thread summary."""
+    return {
+        "role": "user",
+        "content": f"[System note: Earlier messages in this conversation were summarized to keep the context compact. Summary of the conversation so far:\n\n{summary}]"
+    }
+
+
+class ConversationContext(list):
+    """
+    Claude-format message list that also carries its token total.
+
+    Behaves exactly like a list (it is sent to providers as-is); the
+    ``token_count`` attribute is the sum of stored per-message counts so
+    callers can check limits without re-estimating message text.
+    """
+
+    def __init__(self, messages=(), token_count: int = 0):
+        super().__init__(messages)
+        self.token_count = token_count
+
+
+@dataclass
+class _CachedMessage:
+    """Detached snapshot of a Message row (safe to keep across sessions)."""
+    id: str
+    role: str
+    content: str
+    created_at: datetime
+    tokens: int
+
+
+@dataclass
+class _CachedArtifact:
+    """Detached snapshot of the Artifact fields used for pair detection."""
+    created_at: datetime
+
+
+@dataclass
+class _ThreadContext:
+    """
+    Cached conversation state for a single thread.
+
+    Attributes:
+        messages: All thread messages in chronological order
+        artifacts: Thread artifacts (only timestamps are needed)
+        fulfilled_ids: Message IDs excluded as fulfilled artifact requests
+        conversation: Claude-format messages (fulfilled pairs excluded)
+        conversation_tokens: Token estimate per ``conversation`` entry
+        total_tokens: Running token estimate for ``conversation``
+        seen_ids: IDs of all cached messages (dedupes incremental loads)
+        watermark: created_at of the newest cached message
+        summary: Persisted rolling summary of folded (older) turns
+        summary_until: created_at of the newest folded message
+        message_count: Thread message count this entry accounts for
+    """
+    messages: List[_CachedMessage] = field(default_factory=list)
+    artifacts: List[_CachedArtifact] = field(default_factory=list)
+    fulfilled_ids: set = field(default_factory=set)
+    conversation: List[Dict[str, Any]] = field(default_factory=list)
+    conversation_tokens: List[int] = field(default_factory=list)
+    total_tokens: int = 0
+    seen_ids: set = field(default_factory=set)
+    watermark: Optional[datetime] = None
+    summary: Optional[str] = None
+    summary_until: Optional[datetime] = None
+    message_count: int = 0
+
+    def matches(self, state: Any) -> bool:
+        """
+        Whether artifacts and the summary boundary still match the thread row.
+
+        Args:
+            state: Row from _load_thread_state
+        """
+        latest_artifact = self.artifacts[-1].created_at if self.artifacts else None
+        return (
+            state.artifact_count == len(self.artifacts)
+            and _as_utc_or_none(state.latest_artifact_at) == latest_artifact
+            and _as_utc_or_none(state.context_summary_until) == self.summary_until
+        )
+
+    def append_messages(self, rows: list) -> int:
+        """
+        Append newly loaded messages, updating fulfilled pairs and token total.
+
+        Only the new tail (plus the message preceding it, which may be the user
+        half of a newly fulfilled pair) is re-checked for artifact correlation.
+
+        Returns:
+            Number of messages appended (already cached rows are skipped)
+        """
+        new_messages = []
+        for row in rows:
+            if row.id in self.seen_ids:
+                continue
+            self.seen_ids.add(row.id)
+            new_messages.append(_CachedMessage(
+                id=row.id,
+                role=row.role,
+                content=row.content,
+                created_at=_as_utc(row.created_at),
+                tokens=(
+                    row.token_count if row.token_count is not None
+                    else estimate_tokens(row.content or "")
+                ),
+            ))
+
+        if not new_messages:
+            return 0
+
+        start = len(self.messages)
+        self.messages.extend(new_messages)
+        if self.watermark is None or new_messages[-1].created_at > self.watermark:
+            self.watermark = new_messages[-1].created_at
+
+        tail_start = max(start - 1, 0)
+        newly_fulfilled = _identify_fulfilled_pairs(
+            self.messages[tail_start:], self.artifacts
+        ) - self.fulfilled_ids
+        self.fulfilled_ids |= newly_fulfilled
+
+        # A previously included message became part of a fulfilled pair: rebuild
+        if any(msg.id in newly_fulfilled for msg in self.messages[tail_start:start]):
+            self._rebuild_conversation()
+            return len(new_messages)
+
+        for msg in new_messages:
+            if msg.id not in self.fulfilled_ids:
+                self.conversation.append({"role": msg.role, "content": msg.content})
+                self.conversation_tokens.append(msg.tokens)
+                self.total_tokens += msg.tokens
+        return len(new_messages)
+
+    def compaction_split(self, keep_tokens: int) -> List[_CachedMessage]:
+        """
+        Select the oldest included messages to fold into the rolling summary.
+
+        Keeps the most recent messages that fit in keep_tokens (always at
+        least one) and never splits messages sharing a timestamp, so the fold
+        boundary can be stored as a single created_at.
+
+        Args:
+            keep_tokens: Token budget for turns kept verbatim
+
+        Returns:
+            Messages to fold, oldest first (empty if nothing to fold)
+        """
+        included = [msg for msg in self.messages if msg.id not in self.fulfilled_ids]
+        cut = len(included) - 1 if included else 0
+        kept_tokens = included[cut].tokens if included else 0
+        while cut > 0 and kept_tokens + included[cut - 1].tokens <= keep_tokens:
+            cut -= 1
+            kept_tokens += included[cut].tokens
+
+        while 0 < cut < len(included) and (
+            included[cut - 1].created_at == included[cut].created_at
+        ):
+            cut -= 1
+        return included[:cut]
+
+    def _rebuild_conversation(self) -> None:
+        """Recompute conversation and token total from cached messages."""
+        self.conversation = []
+        self.conversation_tokens = []
+        self.total_tokens = 0
+        for msg in self.messages:
+            if msg.id not in self.fulfilled_ids:
+                self.conversation.append({"role": msg.role, "content": msg.content})
+                self.conversation_tokens.append(msg.tokens)
+                self.total_tokens += msg.tokens
+
+
+class ConversationContextCache:
+    """
+    In-process LRU cache of per-thread conversation contexts.
+
+    Entries are refreshed incrementally (only messages newer than the cached
+    watermark are loaded) and dropped when artifacts are created or deleted,
+    messages are deleted, or the thread is deleted. Those invalidations only
+    reach this process, so build_conversation_context also validates each
+    hit against the thread row. The least recently used thread is evicted
+    once ``max_threads`` entries are held.
+    """
+
+    def __init__(self, max_threads: int = 256):
+        self.max_threads = max_threads
+        self._entries: "OrderedDict[str, _ThreadContext]" = OrderedDict()
+
+    def get(self, thread_id: str) -> Optional[_ThreadContext]:
+        """Return the cached entry for a thread (marking it recently used)."""
+        entry = self._entries.get(thread_id)
+        if entry is not None:
+            self._entries.move_to_end(thread_id)
+        return entry
+
+    def put(self, thread_id: str, entry: _ThreadContext) -> None:
+        """Store an entry, evicting the least recently used thread if full."""
+        self._entries[thread_id] = entry
+        self._entries.move_to_end(thread_id)
+        while len(self._entries) > self.max_threads:
+            self._entries.popitem(last=False)
+
+    def record_message(self, message: Message) -> None:
+        """Append a just-saved message to its thread's entry, if cached."""
+        entry = self._entries.get(message.thread_id)
+        if entry is not None:
+            entry.message_count += entry.append_messages([message])
+
+    def invalidate(self, thread_id: str) -> None:
+        """Drop the cached entry for a thread (no-op if not cached)."""
+        self._entries.pop(thread_id, None)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Module-level singleton (like get_logging_service)
+_context_cache: Optional[ConversationContextCache] = None
+
+
+def get_context_cache() -> ConversationContextCache:
+    """Get the singleton ConversationContextCache instance."""
+    global _context_cache
+    if _context_cache is None:
+        _context_cache = ConversationContextCache(
+            max_threads=settings.context_cache_max_threads
+        )
+    return _context_cache
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_context_invalidations(session, flush_context):
+    """
+    Record threads whose cached context is affected by this flush.
+
+    Covers every artifact creation path (AIService, MCP tools, BRD generator)
+    as well as message, artifact and thread deletion. Invalidation is deferred
+    to commit so a concurrent rebuild cannot cache pre-commit state.
+    """
+    thread_ids = set()
+    for obj in session.new:
+        if isinstance(obj, Artifact):
+            thread_ids.add(obj.thread_id)
+    for obj in session.deleted:
+        if isinstance(obj, (Artifact, Message)):
+            thread_ids.add(obj.thread_id)
+        elif isinstance(obj, Thread):
+            thread_ids.add(obj.id)
+    if thread_ids:
+        session.info.setdefault(_PENDING_INVALIDATIONS_KEY, set()).update(thread_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_thread_counters(session, flush_context):
+    """
+    Keep Thread.message_count, artifact_count and last_message_preview in
+    step with message/artifact inserts and deletes in the same transaction.
+
+    Runs for every write path (save_message, message deletion, AIService,
+    MCP tools, BRD generator) as one UPDATE per affected thread. Counter
+    values of Thread objects loaded in this session are adjusted in place.
+    """
+    deltas: Dict[str, List[int]] = {}  # thread_id -> [messages, artifacts]
+    latest: Dict[str, Message] = {}  # thread_id -> newest inserted message
+    recompute_preview = set()
+    for obj in session.new:
+        if isinstance(obj, Message):
+            deltas.setdefault(obj.thread_id, [0, 0])[0] += 1
+            newest = latest.get(obj.thread_id)
+            if newest is None or obj.created_at >= newest.created_at:
+                latest[obj.thread_id] = obj
+        elif isinstance(obj, Artifact):
+            deltas.setdefault(obj.thread_id, [0, 0])[1] += 1
+    deleted_threads = set()
+    for obj in session.deleted:
+        if isinstance(obj, Message):
+            deltas.setdefault(obj.thread_id, [0, 0])[0] -= 1
+            recompute_preview.add(obj.thread_id)
+        elif isinstance(obj, Artifact):
+            deltas.setdefault(obj.thread_id, [0, 0])[1] -= 1
+        elif isinstance(obj, Thread):
+            deleted_threads.add(obj.id)
+
+    threads = Thread.__table__
+    messages = Message.__table__
+    connection = session.connection()
+    for thread_id, (message_delta, artifact_delta) in deltas.items():
+        if thread_id in deleted_threads:
+            continue
+        values = {
+            "message_count": threads.c.message_count + message_delta,
+            "artifact_count": threads.c.artifact_count + artifact_delta,
+            "updated_at": threads.c.updated_at,  # Counters are not user edits (skip onupdate)
+        }
+        preview = None
+        if thread_id in latest:
+            preview = message_preview(latest[thread_id].content)
+            values["last_message_preview"] = preview
+        elif thread_id in recompute_preview:
+            values["last_message_preview"] = (
+                select(func.substr(messages.c.content, 1, MESSAGE_PREVIEW_CHARS))
+                .where(messages.c.thread_id == thread_id)
+                .order_by(messages.c.created_at.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+        connection.execute(update(threads).where(threads.c.id == thread_id).values(**values))
+
+        thread = session.identity_map.get(identity_key(Thread, thread_id))
+        if thread is not None:
+            state = inspect(thread)
+            for attr, delta in (("message_count", message_delta), ("artifact_count", artifact_delta)):
+                if attr not in state.unloaded:
+                    set_committed_value(thread, attr, (getattr(thread, attr) or 0) + delta)
+            if preview is not None:
+                set_committed_value(thread, "last_message_preview", preview)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_context_invalidations(session):
+    """Drop cached contexts for threads changed in the committed transaction."""
+    thread_ids = session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+    if thread_ids:
+        cache = get_context_cache()
+        for thread_id in thread_ids:
+            cache.invalidate(thread_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_context_invalidations(session):
+    """Forget pending invalidations from a rolled-back transaction."""
+    session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
 
 
 async def save_message(
     db: AsyncSession,
     thread_id: str,
     role: str,
-    content: str
+    content: str,
+    provider: Optional[str] = None
 ) -> Message:
     """
     Save a message to the database.
 
+    The message's token count is computed once here (with the provider's
+    offline counter, heuristic fallback) and stored on the row.
+
     Args:
         db: Database session
         thread_id: ID of the thread
         role: 'user' or 'assistant'
         content: Message content
+        provider: LLM provider bound to the thread (selects the token counter)
 
     Returns:
         Created Message object
@@ -109,7 +489,8 @@ async def save_message(
     message = Message(
         thread_id=thread_id,
         role=role,
-        content=content
+        content=content,
+        token_count=count_tokens(content, provider)
     )
     db.add(message)
     await db.commit()
@@ -123,9 +504,87 @@ async def save_message(
         thread.updated_at = datetime.now(timezone.utc)
         await db.commit()
 
+    # Append the new turn to the cached context (if this thread is cached)
+    get_context_cache().record_message(message)
+
     return message
 
 
+async def _load_thread_state(db: AsyncSession, thread_id: str) -> Optional[Any]:
+    """
+    Read the thread state a cached context depends on (one query).
+
+    Message and artifact counts are aggregated from their own tables (both
+    indexed by thread_id), so validation does not rely on any counter
+    maintained elsewhere.
+
+    Returns:
+        Row (message_count, artifact_count, latest_artifact_at, context_summary,
+        context_summary_until), or None if the thread does not exist
+    """
+    message_count = (
+        select(func.count(Message.id))
+        .where(Message.thread_id == thread_id)
+        .scalar_subquery()
+        .label("message_count")
+    )
+    artifact_count = (
+        select(func.count(Artifact.id))
+        .where(Artifact.thread_id == thread_id)
+        .scalar_subquery()
+        .label("artifact_count")
+    )
+    latest_artifact_at = (
+        select(func.max(Artifact.created_at))
+        .where(Artifact.thread_id == thread_id)
+        .scalar_subquery()
+        .label("latest_artifact_at")
+    )
+    result = await db.execute(
+        select(
+            message_count,
+            artifact_count,
+            latest_artifact_at,
+            Thread.context_summary,
+            Thread.context_summary_until,
+        ).where(Thread.id == thread_id)
+    )
+    return result.first()
+
+
+async def _load_thread_context(
+    db: AsyncSession,
+    thread_id: str,
+    state: Optional[Any]
+) -> _ThreadContext:
+    """Build a thread's context entry from scratch (rolling summary, artifacts, messages)."""
+    entry = _ThreadContext()
+    if state is not None:
+        entry.message_count = state.message_count
+        if state.context_summary:
+            entry.summary = state.context_summary
+            entry.summary_until = _as_utc(state.context_summary_until)
+
+    artifact_stmt = (
+        select(Artifact.created_at)
+        .where(Artifact.thread_id == thread_id)
+        .order_by(Artifact.created_at)
+    )
+    artifact_result = await db.execute(artifact_stmt)
+    entry.artifacts = [
+        _CachedArtifact(created_at=_as_utc(created_at))
+        for created_at in artifact_result.scalars().all()
+    ]
+
+    stmt = select(Message).where(Message.thread_id == thread_id)
+    if entry.summary_until is not None:
+        stmt = stmt.where(Message.created_at > entry.summary_until)
+    stmt = stmt.order_by(Message.created_at)
+    result = await db.execute(stmt)
+    entry.append_messages(result.scalars().all())
+    return entry
+
+
 async def build_conversation_context(
     db: AsyncSession,
     thread_id: str
@@ -137,55 +596,78 @@ async def build_conversation_context(
     Filters out fulfilled artifact request pairs before truncation.
     Implements token-aware truncation if conversation is too long.
 
+    The result is cached per thread: later calls only query messages newer
+    than the cached watermark and keep a running token total, so per-turn
+    cost no longer grows with thread length. Each hit is validated against
+    the thread row first and rebuilt if another worker changed the thread.
+
+    Turns already folded into the thread's rolling summary (see
+    summarization_service.maybe_compact_context) are replaced by a single
+    summary prefix message.
+
     Args:
         db: Database session
         thread_id: ID of the thread
 
     Returns:
-        List of messages in Claude API format
+        ConversationContext (list of messages in Claude API format) whose
+        token_count is the sum of stored per-message token counts
     """
-    # Fetch all messages in chronological order
-    stmt = (
-        select(Message)
-        .where(Message.thread_id == thread_id)
-        .order_by(Message.created_at)
+    cache = get_context_cache()
+    entry = cache.get(thread_id)
+    state = await _load_thread_state(db, thread_id)
+
+    if entry is not None and state is not None and entry.matches(state):
+        # Cache hit: load only messages saved since the last build
+        # (>= plus seen_ids dedupe handles identical timestamps)
+        stmt = select(Message).where(Message.thread_id == thread_id)
+        if entry.watermark is not None:
+            stmt = stmt.where(Message.created_at >= entry.watermark)
+        elif entry.summary_until is not None:
+            stmt = stmt.where(Message.created_at > entry.summary_until)
+        stmt = stmt.order_by(Message.created_at)
+        result = await db.execute(stmt)
+        entry.message_count += entry.append_messages(result.scalars().all())
+        if entry.message_count != state.message_count:
+            # Messages deleted (or saved behind the watermark) by another worker
+            entry = None
+    else:
+        # Miss, or artifacts/summary changed by another worker
+        entry = None
+
+    if entry is None:
+        entry = await _load_thread_context(db, thread_id, state)
+    cache.put(thread_id, entry)
+
+    # Rolling summary of folded turns goes first as a small, stable prefix
+    prefix = [_summary_message(entry.summary)] if entry.summary else []
+    prefix_tokens = estimate_messages_tokens(prefix)
+    budget = MAX_CONTEXT_TOKENS - prefix_tokens
+
+    # Copy so callers (tool loop, silent generation) can append freely
+    if entry.total_tokens <= budget:
+        return ConversationContext(
+            prefix + entry.conversation,
+            token_count=prefix_tokens + entry.total_tokens
+        )
+
+    # Over budget (compaction not caught up yet): truncate using stored counts
+    truncated = truncate_conversation(
+        entry.conversation, budget, entry.conversation_tokens
     )
-    result = await db.execute(stmt)
-    messages = result.scalars().all()
-
-    # Fetch all artifacts for this thread
-    artifact_stmt = (
-        select(Artifact)
-        .where(Artifact.thread_id == thread_id)
-        .order_by(Artifact.created_at)
+    kept = len(truncated) - 1  # First entry is the truncation note
+    token_count = (
+        prefix_tokens
+        + sum(entry.conversation_tokens[len(entry.conversation_tokens) - kept:])
+        + estimate_messages_tokens(truncated[:1])
     )
-    artifact_result = await db.execute(artifact_stmt)
-    artifacts = artifact_result.scalars().all()
-
-    # Identify fulfilled pairs to exclude
-    fulfilled_ids = _identify_fulfilled_pairs(messages, artifacts)
-
-    # Convert to Claude message format, excluding fulfilled pairs
-    conversation = []
-    for msg in messages:
-        if msg.id not in fulfilled_ids:
-            conversation.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-
-    # Check token count and truncate if needed
-    total_tokens = estimate_messages_tokens(conversation)
-
-    if total_tokens > MAX_CONTEXT_TOKENS:
-        conversation = truncate_conversation(conversation, MAX_CONTEXT_TOKENS)
-
-    return conversation
+    return ConversationContext(prefix + truncated, token_count=token_count)
 
 
 def truncate_conversation(
     messages: List[Dict[str, Any]],
-    max_tokens: int
+    max_tokens: int,
+    message_tokens: Optional[List[int]] = None
 ) -> List[Dict[str, Any]]:
     """
     Truncate conversation to fit within token budget.
@@ -193,31 +675,40 @@ def truncate_conversation(
     Strategy: Keep recent messages that fit in 80% of budget.
     Prepend summary note about truncated messages.
 
+    Single pass from the end over per-message token counts (a running suffix
+    sum) finds the cut point; the kept tail is then sliced once, so cost is
+    linear in the number of messages.
+
     Args:
         messages: Full conversation history
         max_tokens: Maximum tokens allowed
+        message_tokens: Optional precomputed token count per message
+            (avoids re-estimating cached messages)
 
     Returns:
         Truncated message list
     """
     budget = int(max_tokens * 0.8)  # 80% for messages, 20% buffer
-    recent_messages = []
-    token_count = 0
-
-    # Work backwards from most recent
-    for msg in reversed(messages):
-        msg_tokens = estimate_messages_tokens([msg])
-        if token_count + msg_tokens > budget:
+    if message_tokens is None:
+        message_tokens = [estimate_messages_tokens([msg]) for msg in messages]
+
+    # Work backwards from most recent until the suffix sum exceeds the budget
+    cut = len(messages)
+    suffix_tokens = 0
+    while cut > 0:
+        msg_tokens = message_tokens[cut - 1]
+        if suffix_tokens + msg_tokens > budget:
             break
-        recent_messages.insert(0, msg)
-        token_count += msg_tokens
+        suffix_tokens += msg_tokens
+        cut -= 1
+
+    recent_messages = messages[cut:]
 
     # If we truncated, add summary
-    truncated_count = len(messages) - len(recent_messages)
-    if truncated_count > 0:
+    if cut > 0:
         summary = {
             "role": "user",
-            "content": f"[System note: {truncated_count} earlier messages in this conversation have been summarized to fit context limits. The conversation began earlier and covered additional topics not shown here.]"
+            "content": f"[System note: {cut} earlier messages in this conversation have been summarized to fit context limits. The conversation began earlier and covered additional topics not shown here.]"
         }
         recent_messages.insert(0, summary)
 
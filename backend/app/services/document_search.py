@@ -1,12 +1,227 @@
 """
-Document search service using SQLite FTS5.
+Document search service.
 
-Provides full-text search capabilities for project documents.
+Provides full-text search capabilities for project documents. The search
+index depends on the database (selected from DATABASE_URL):
+- SQLite: FTS5 virtual table document_fts, ranked with bm25()
+- PostgreSQL: document_search table with a generated tsvector column and a
+  GIN index, ranked with ts_rank_cd() and highlighted with ts_headline()
+
+Both backends return the same result tuples, with the FTS5 score
+convention (lower is more relevant).
 """
 
-from typing import List, Tuple
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple, Type
+
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+# (document_id, filename, snippet, score, content_type, metadata_json)
+SearchResult = Tuple[str, str, str, float, str, str]
+
+
+class SearchBackend(ABC):
+    """Full-text index of document content for one database dialect."""
+
+    # Dialect name as returned by make_url(url).get_backend_name()
+    dialect: str
+
+    @abstractmethod
+    async def ensure_schema(self, conn: AsyncConnection) -> None:
+        """Create the search index objects if missing (idempotent)."""
+
+    @abstractmethod
+    async def index_document(
+        self,
+        db: AsyncSession,
+        doc_id: str,
+        filename: str,
+        content: str
+    ) -> None:
+        """Add a document's plaintext to the index."""
+
+    @abstractmethod
+    async def search(
+        self,
+        db: AsyncSession,
+        project_id: str,
+        query: str,
+        max_chunks: int
+    ) -> List[SearchResult]:
+        """Return up to max_chunks matches in project_id, most relevant first."""
+
+
+class FTS5SearchBackend(SearchBackend):
+    """SQLite FTS5 index (porter stemming, unicode61 tokenizer)."""
+
+    dialect = "sqlite"
+
+    CREATE_SQL = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS document_fts USING fts5(
+            document_id UNINDEXED,
+            filename,
+            content,
+            tokenize = 'porter unicode61'
+        )
+    """
+
+    async def ensure_schema(self, conn: AsyncConnection) -> None:
+        await conn.execute(text(self.CREATE_SQL))
+
+    async def index_document(self, db, doc_id, filename, content):
+        await db.execute(
+            text("""
+                INSERT INTO document_fts(document_id, filename, content)
+                VALUES (:doc_id, :filename, :content)
+            """),
+            {"doc_id": doc_id, "filename": filename, "content": content}
+        )
+
+    async def search(self, db, project_id, query, max_chunks):
+        try:
+            result = await db.execute(
+                text("""
+                    SELECT d.id, d.filename,
+                           snippet(document_fts, 2, '<mark>', '</mark>', '...', 20) as snippet,
+                           bm25(document_fts, 10.0, 1.0) as score,
+                           d.content_type,
+                           d.metadata_json
+                    FROM documents d
+                    JOIN document_fts fts ON d.id = fts.document_id
+                    WHERE d.project_id = :project_id
+                      AND document_fts MATCH :query
+                    ORDER BY score
+                    LIMIT :max_chunks
+                """),
+                {"project_id": project_id, "query": query, "max_chunks": max_chunks}
+            )
+            return [(row[0], row[1], row[2], row[3], row[4], row[5]) for row in result.fetchall()]
+        except Exception:
+            # Invalid FTS5 query syntax — return empty rather than crash
+            return []
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    PostgreSQL tsvector index.
+
+    Filename is weighted A and content D, so with ts_rank_cd's default
+    weights a filename hit counts 10x a content hit (as bm25(10.0, 1.0)).
+    Queries are parsed with websearch_to_tsquery, which accepts the same
+    plain terms, quoted phrases and OR as the FTS5 queries the AI tools
+    send (a trailing * prefix marker is ignored) and never raises on
+    malformed input.
+    """
+
+    dialect = "postgresql"
+
+    # Text search configuration (english stemming, as FTS5's porter tokenizer)
+    config = "english"
+
+    CREATE_SQL = (
+        """
+        CREATE TABLE IF NOT EXISTS document_search (
+            document_id VARCHAR(36) PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,
+            filename TEXT NOT NULL,
+            content TEXT NOT NULL,
+            search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(filename, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(content, '')), 'D')
+            ) STORED
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_document_search_vector ON document_search USING GIN (search_vector)",
+    )
+
+    # ts_headline options matching the FTS5 snippet (<mark> tags, ~20 tokens)
+    HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=20, MinWords=5, MaxFragments=1, FragmentDelimiter=..."
+
+    async def ensure_schema(self, conn: AsyncConnection) -> None:
+        for statement in self.CREATE_SQL:
+            await conn.execute(text(statement))
+
+    async def index_document(self, db, doc_id, filename, content):
+        await db.execute(
+            text("""
+                INSERT INTO document_search (document_id, filename, content)
+                VALUES (:doc_id, :filename, :content)
+                ON CONFLICT (document_id)
+                DO UPDATE SET filename = EXCLUDED.filename, content = EXCLUDED.content
+            """),
+            {"doc_id": doc_id, "filename": filename, "content": content}
+        )
+
+    async def search(self, db, project_id, query, max_chunks):
+        # Rank via the GIN index first; ts_headline (expensive) runs on the top rows only
+        async with db.begin_nested():  # A failed statement must not abort the caller's transaction
+            result = await db.execute(
+                text(f"""
+                    SELECT ranked.id, ranked.filename,
+                           ts_headline('{self.config}', ranked.content, ranked.query,
+                                       :headline_options) AS snippet,
+                           ranked.score,
+                           ranked.content_type,
+                           ranked.metadata_json
+                    FROM (
+                        SELECT d.id, d.filename, s.content, q.query,
+                               -ts_rank_cd(s.search_vector, q.query) AS score,
+                               d.content_type, d.metadata_json
+                        FROM documents d
+                        JOIN document_search s ON s.document_id = d.id
+                        CROSS JOIN websearch_to_tsquery('{self.config}', :query) AS q(query)
+                        WHERE d.project_id = :project_id
+                          AND s.search_vector @@ q.query
+                        ORDER BY score
+                        LIMIT :max_chunks
+                    ) ranked
+                    ORDER BY ranked.score
+                """),
+                {
+                    "project_id": project_id,
+                    "query": query,
+                    "max_chunks": max_chunks,
+                    "headline_options": self.HEADLINE_OPTIONS,
+                }
+            )
+            return [(row[0], row[1], row[2], float(row[3]), row[4], row[5]) for row in result.fetchall()]
+
+
+_BACKENDS: Dict[str, Type[SearchBackend]] = {
+    FTS5SearchBackend.dialect: FTS5SearchBackend,
+    PostgresSearchBackend.dialect: PostgresSearchBackend,
+}
+
+
+def backend_for_url(url: str) -> SearchBackend:
+    """
+    Search backend for a database URL (e.g., "postgresql+asyncpg://...").
+
+    Raises:
+        ValueError: If the database has no search backend
+    """
+    dialect = make_url(url).get_backend_name()
+    backend_cls = _BACKENDS.get(dialect)
+    if backend_cls is None:
+        raise ValueError(
+            f"No document search backend for database '{dialect}'. "
+            f"Supported: {', '.join(sorted(_BACKENDS))}"
+        )
+    return backend_cls()
+
+
+# Module-level singleton (like get_logging_service)
+_search_backend: Optional[SearchBackend] = None
+
+
+def get_search_backend() -> SearchBackend:
+    """Get the search backend for the configured DATABASE_URL."""
+    global _search_backend
+    if _search_backend is None:
+        from app.database import DATABASE_URL
+        _search_backend = backend_for_url(DATABASE_URL)
+    return _search_backend
 
 
 async def index_document(
@@ -24,13 +239,7 @@ async def index_document(
         filename: Document filename
         content: Plaintext content to index
     """
-    await db.execute(
-        text("""
-            INSERT INTO document_fts(document_id, filename, content)
-            VALUES (:doc_id, :filename, :content)
-        """),
-        {"doc_id": doc_id, "filename": filename, "content": content}
-    )
+    await get_search_backend().index_document(db, doc_id, filename, content)
 
 
 async def search_documents(
@@ -38,7 +247,7 @@ async def search_documents(
     project_id: str,
     query: str,
     max_chunks: int = 3  # AI-02: Token budget — limit retrieval
-) -> List[Tuple[str, str, str, float, str, str]]:
+) -> List[SearchResult]:
     """
     Search documents with metadata.
 
@@ -50,7 +259,7 @@ async def search_documents(
 
     Returns:
         List of tuples: (document_id, filename, snippet, score, content_type, metadata_json)
-        Results ordered by BM25 relevance score (higher is better)
+        Results ordered by relevance score (lower is more relevant, as FTS5 bm25())
     """
     # Skip search for project-less chats or empty queries
     if not project_id or not query or not query.strip():
@@ -61,24 +270,4 @@ async def search_documents(
     if cleaned == '*' or cleaned == '**':
         return []
 
-    try:
-        result = await db.execute(
-        text("""
-            SELECT d.id, d.filename,
-                   snippet(document_fts, 2, '<mark>', '</mark>', '...', 20) as snippet,
-                   bm25(document_fts, 10.0, 1.0) as score,
-                   d.content_type,
-                   d.metadata_json
-            FROM documents d
-            JOIN document_fts fts ON d.id = fts.document_id
-            WHERE d.project_id = :project_id
-              AND document_fts MATCH :query
-            ORDER BY score
-            LIMIT :max_chunks
-        """),
-            {"project_id": project_id, "query": cleaned, "max_chunks": max_chunks}
-        )
-        return [(row[0], row[1], row[2], row[3], row[4], row[5]) for row in result.fetchall()]
-    except Exception:
-        # Invalid FTS5 query syntax — return empty rather than crash
-        return []
+    return await get_search_backend().search(db, project_id, cleaned, max_chunks)
@@ -0,0 +1,223 @@
+"""
+Admission control for Claude CLI subprocesses.
+
+Each CLI request runs its own Node.js process, so concurrency is capped
+host-wide to keep memory use predictable under load: every worker process
+admits its share of claude_cli_max_concurrency. Requests over the cap
+wait in a per-user fair queue: FIFO within a user, round-robin across users,
+so one user's burst cannot starve everyone else. Waiters can read their
+queue position (surfaced to clients as an SSE "queued" event).
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionTicket:
+    """A request's place in the admission queue (or its granted slot)."""
+
+    __slots__ = ("user_id", "enqueued_at", "granted", "released", "wait_seconds")
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.released = False
+        self.wait_seconds = 0.0
+
+
+class FairAdmissionQueue:
+    """
+    Global concurrency limiter with per-user round-robin queueing.
+
+    Usage:
+        ticket = admission.enqueue(user_id)
+        try:
+            while True:
+                changed = admission.changed  # Capture before checking state
+                if ticket.granted:
+                    break
+                position = admission.position(ticket)
+                await changed.wait()
+            ...  # run the request
+        finally:
+            admission.leave(ticket)
+
+    Attributes:
+        limit: Max concurrently admitted requests
+        active: Currently admitted requests
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        # user_id -> waiting tickets; dict order is the round-robin order
+        self._queues: "OrderedDict[str, Deque[AdmissionTicket]]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Event] = None
+
+        # Metrics
+        self.admitted = 0
+        self.queued_admissions = 0
+        self.max_depth = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Number of waiting requests."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # New event loop (e.g. per-test loops): drop state bound to the old one
+            self._loop = loop
+            self._changed = asyncio.Event()
+            self._queues.clear()
+            self.active = 0
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def enqueue(self, user_id: str) -> AdmissionTicket:
+        """
+        Request a slot; granted immediately if capacity is free and nobody waits.
+
+        Args:
+            user_id: Owner of the request (fairness key)
+
+        Returns:
+            AdmissionTicket (check ticket.granted)
+        """
+        self._bind_loop()
+        ticket = AdmissionTicket(user_id)
+        if self.active < self.limit and not self._queues:
+            self._grant(ticket)
+            return ticket
+
+        self._queues.setdefault(user_id, deque()).append(ticket)
+        depth = self.depth
+        self.max_depth = max(self.max_depth, depth)
+        logger.info(f"CLI request queued for user {user_id} (depth={depth}, active={self.active})")
+        return ticket
+
+    def position(self, ticket: AdmissionTicket) -> int:
+        """
+        1-based position in dispatch order (0 once granted).
+
+        Under round-robin, a ticket k-th in its user's queue is preceded by
+        up to k tickets from each other user, plus one more from users ahead
+        of its own in the rotation.
+        """
+        if ticket.granted:
+            return 0
+        queue = self._queues.get(ticket.user_id)
+        if not queue or ticket not in queue:
+            return 0
+
+        index = queue.index(ticket)
+        ahead = index
+        before_own_user = True
+        for user_id, other in self._queues.items():
+            if user_id == ticket.user_id:
+                before_own_user = False
+                continue
+            ahead += min(len(other), index + (1 if before_own_user else 0))
+        return ahead + 1
+
+    @property
+    def changed(self) -> asyncio.Event:
+        """
+        Event set on the next grant/release/withdrawal (positions may move).
+
+        Capture it before inspecting state so a change in between is not missed.
+        """
+        return self._changed
+
+    def leave(self, ticket: AdmissionTicket) -> None:
+        """
+        Release a granted slot, or withdraw a waiting ticket. Idempotent.
+
+        Args:
+            ticket: Ticket returned by enqueue()
+        """
+        if ticket.released:
+            return
+        ticket.released = True
+
+        if not ticket.granted:
+            queue = self._queues.get(ticket.user_id)
+            if queue and ticket in queue:
+                queue.remove(ticket)
+                if not queue:
+                    del self._queues[ticket.user_id]
+                self._notify()
+            return
+
+        self.active = max(0, self.active - 1)
+        self._dispatch()
+        self._notify()
+
+    def _grant(self, ticket: AdmissionTicket) -> None:
+        ticket.granted = True
+        ticket.wait_seconds = time.monotonic() - ticket.enqueued_at
+        self.active += 1
+        self.admitted += 1
+
+    def _dispatch(self) -> None:
+        """Grant free slots round-robin across users with waiting tickets."""
+        while self.active < self.limit and self._queues:
+            user_id, queue = next(iter(self._queues.items()))
+            ticket = queue.popleft()
+            # Rotate: this user goes to the back of the round-robin order
+            del self._queues[user_id]
+            if queue:
+                self._queues[user_id] = queue
+
+            self._grant(ticket)
+            self.queued_admissions += 1
+            self.wait_seconds_total += ticket.wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, ticket.wait_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return admission counters.
+
+        Returns:
+            dict: limit, active, queue depth, admissions, and wait times (ms)
+        """
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.depth,
+            "max_queued": self.max_depth,
+            "admitted": self.admitted,
+            "queued_admissions": self.queued_admissions,
+            "avg_wait_ms": (
+                round(self.wait_seconds_total / self.queued_admissions * 1000, 1)
+                if self.queued_admissions else None
+            ),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+        }
+
+
+# Module-level singleton (like get_logging_service)
+_cli_admission: Optional[FairAdmissionQueue] = None
+
+
+def get_cli_admission() -> FairAdmissionQueue:
+    """Get this worker's FairAdmissionQueue for Claude CLI requests."""
+    global _cli_admission
+    if _cli_admission is None:
+        _cli_admission = FairAdmissionQueue(
+            limit=settings.per_worker(settings.claude_cli_max_concurrency)
+        )
+    return _cli_admission
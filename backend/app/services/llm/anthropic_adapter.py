@@ -8,6 +8,7 @@ This adapter handles:
 - Claude API client instantiation
 - Streaming message API calls
 - Response normalization to StreamChunk format
+- Prompt caching (system prompt, tools and conversation prefix)
 - Anthropic-specific error handling
 
 The adapter does NOT handle:
@@ -24,6 +25,61 @@ from .base import LLMAdapter, LLMProvider, StreamChunk
 # Default Claude model
 DEFAULT_MODEL = "claude-sonnet-4-5-20250929"
 
+# Prompt caching breakpoint (5-minute ephemeral cache)
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _cacheable_system(system_prompt: str):
+    """Wrap the system prompt in a cacheable text block (empty prompt unchanged)."""
+    if not system_prompt:
+        return system_prompt
+    return [{"type": "text", "text": system_prompt, "cache_control": CACHE_CONTROL}]
+
+
+def _cacheable_tools(tools: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Mark the last tool definition as a cache breakpoint (copy, not in place)."""
+    if not tools:
+        return []
+    return tools[:-1] + [{**tools[-1], "cache_control": CACHE_CONTROL}]
+
+
+def _cacheable_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Mark the last content block of the last message as a cache breakpoint.
+
+    Everything before the breakpoint (the stable history prefix) is written
+    to the cache; the next turn or tool-loop iteration reads it back. The
+    caller's message list and dicts are not modified.
+    """
+    if not messages:
+        return messages
+
+    last = messages[-1]
+    content = last.get("content")
+    if isinstance(content, str):
+        if not content:
+            return messages
+        blocks = [{"type": "text", "text": content, "cache_control": CACHE_CONTROL}]
+    elif isinstance(content, list) and content and isinstance(content[-1], dict):
+        blocks = content[:-1] + [{**content[-1], "cache_control": CACHE_CONTROL}]
+    else:
+        return messages
+
+    return messages[:-1] + [{**last, "content": blocks}]
+
+
+def _usage_dict(usage) -> Dict[str, int]:
+    """Normalize Anthropic usage, including prompt cache counters when reported."""
+    result = {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+    }
+    for key in ("cache_creation_input_tokens", "cache_read_input_tokens"):
+        value = getattr(usage, key, None)
+        if isinstance(value, int):
+            result[key] = value
+    return result
+
 
 class AnthropicAdapter(LLMAdapter):
     """
@@ -37,6 +93,8 @@ class AnthropicAdapter(LLMAdapter):
         self,
         api_key: str,
         model: Optional[str] = None,
+        prompt_caching: bool = True,
+        client: Optional[anthropic.AsyncAnthropic] = None,
     ):
         """
         Initialize the Anthropic adapter.
@@ -44,10 +102,14 @@ class AnthropicAdapter(LLMAdapter):
         Args:
             api_key: Anthropic API key for authentication
             model: Claude model to use (defaults to claude-sonnet-4-5-20250929)
+            prompt_caching: Mark system prompt, tools and history prefix as
+                cacheable (cache reads are billed at a fraction of input)
+            client: Shared client (from LLMFactory); a new one is created if omitted
         """
         self._api_key = api_key
         self.model = model or DEFAULT_MODEL
-        self.client = anthropic.AsyncAnthropic(api_key=api_key)
+        self.prompt_caching = prompt_caching
+        self.client = client or anthropic.AsyncAnthropic(api_key=api_key)
 
     @property
     def provider(self) -> LLMProvider:
@@ -77,16 +139,24 @@ class AnthropicAdapter(LLMAdapter):
             StreamChunk objects:
             - "text" chunks as content streams
             - "tool_use" chunks if model requests tool calls
-            - "complete" chunk with usage statistics
+            - "complete" chunk with usage statistics (including
+              cache_creation_input_tokens / cache_read_input_tokens)
             - "error" chunk if an error occurs
         """
+        system = system_prompt
+        request_tools = tools or []
+        if self.prompt_caching:
+            system = _cacheable_system(system_prompt)
+            request_tools = _cacheable_tools(tools)
+            messages = _cacheable_messages(messages)
+
         try:
             async with self.client.messages.stream(
                 model=self.model,
                 max_tokens=max_tokens,
                 messages=messages,
-                tools=tools or [],
-                system=system_prompt,
+                tools=request_tools,
+                system=system,
             ) as stream:
                 # Stream text content as it arrives
                 async for text in stream.text_stream:
@@ -111,10 +181,7 @@ class AnthropicAdapter(LLMAdapter):
                 yield StreamChunk(
                     chunk_type="complete",
                     content="",  # Content already streamed
-                    usage={
-                        "input_tokens": final.usage.input_tokens,
-                        "output_tokens": final.usage.output_tokens,
-                    },
+                    usage=_usage_dict(final.usage),
                 )
 
         except anthropic.APIError as e:
@@ -43,11 +43,15 @@ class StreamChunk:
             - "tool_result": Result of tool execution (internal use)
             - "complete": Final message with usage statistics
             - "error": Error occurred during streaming
+            - "queued": Request is waiting for capacity (metadata: position,
+              queue_depth); agent providers with admission control only
         content: Text content for "text" chunks, empty for others
         thinking_content: Reserved for future providers (Gemini, DeepSeek) that
             expose reasoning/thinking content separately. Always None for Anthropic.
         tool_call: For "tool_use" chunks: {"id": str, "name": str, "input": dict}
-        usage: For "complete" chunks: {"input_tokens": int, "output_tokens": int}
+        usage: For "complete" chunks: {"input_tokens": int, "output_tokens": int},
+            plus "cache_creation_input_tokens" / "cache_read_input_tokens" for
+            providers that report prompt cache usage (Anthropic)
         error: For "error" chunks: Error message string
         metadata: Optional metadata for agent-specific data (artifact_created events,
             documents_used for source attribution, tool status indicators). Used by
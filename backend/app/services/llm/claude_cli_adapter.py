@@ -18,12 +18,16 @@ Known limitations (POC scope):
 import asyncio
 import json
 import logging
+import math
 import os
 import shutil
 import time
-from typing import AsyncGenerator, Dict, Any, List, Optional
+from typing import AsyncGenerator, Callable, Dict, Any, List, Optional, Tuple
 
+from .admission import get_cli_admission
 from .base import LLMAdapter, LLMProvider, StreamChunk
+from .stream_json import StreamJsonParser, iter_lines
+from app.config import settings
 from app.services.mcp_tools import (
     _db_context,
     _project_id_context,
@@ -58,19 +62,88 @@ def _build_cli_env() -> dict:
             if k not in ("CLAUDECODE", "CLAUDE_CODE_ENTRYPOINT")}
 
 
+# Credentials a CLI process reads at startup; if they change, warm processes are stale
+CLI_AUTH_ENV_VARS = ("ANTHROPIC_API_KEY", "ANTHROPIC_AUTH_TOKEN", "CLAUDE_CODE_OAUTH_TOKEN")
+CLI_CREDENTIALS_FILE = os.path.join(os.path.expanduser("~"), ".claude", ".credentials.json")
+
+# stream-json event types _translate_event discards; dropped before JSON decoding
+IGNORED_EVENT_TYPES = frozenset({"system"})
+# Partial-message delta events (--include-partial-messages)
+STREAM_EVENT_TYPE = "stream_event"
+
+
+# Arguments every CLI process starts with besides --model; part of the pool key
+CLI_FLAGS = (
+    "-p",  # Print mode (non-interactive, reads prompt from stdin)
+    DANGEROUSLY_SKIP_PERMISSIONS,
+    "--output-format", "stream-json",
+    "--verbose",
+    "--mcp-config", MCP_CONFIG_JSON,
+    "--tools", "",
+)
+# Partial-mode processes also emit per-token delta events; only adapters in
+# partial mode use them, so they get their own pool instead of every process
+# paying for the extra output
+PARTIAL_CLI_FLAGS = CLI_FLAGS + ("--include-partial-messages",)
+
+
+def _cli_command(cli_path: str, model: str, flags: Tuple[str, ...] = CLI_FLAGS) -> List[str]:
+    """Build the CLI argument list shared by pooled and cold-spawned processes."""
+    return [cli_path, *flags, "--model", model]
+
+
+def _auth_fingerprint() -> tuple:
+    """
+    Snapshot of the credentials a CLI subprocess would start with.
+
+    Combines hashes of the auth environment variables with the CLI
+    credentials file mtime (OAuth logins/refreshes rewrite it). A warm
+    process spawned under a different fingerprint has stale auth.
+
+    Returns:
+        tuple: Comparable fingerprint (no secret values are stored)
+    """
+    try:
+        credentials_mtime = os.stat(CLI_CREDENTIALS_FILE).st_mtime_ns
+    except OSError:
+        credentials_mtime = None
+    return (
+        tuple(hash(os.environ.get(name)) for name in CLI_AUTH_ENV_VARS),
+        credentials_mtime,
+    )
+
+
 class ClaudeProcessPool:
     """
     Pre-warming pool for Claude CLI subprocesses.
 
-    Maintains POOL_SIZE warm processes ready to accept prompts.
+    Maintains a target number of warm processes ready to accept prompts.
     Each process handles exactly one request (--print mode is single-shot).
     After a process exits naturally, the refill loop spawns a replacement.
 
+    Adaptive sizing:
+      Starts at POOL_SIZE and, every RESIZE_INTERVAL seconds, re-targets
+      between min_size and max_size from the last interval's traffic:
+        - grows by the number of cold spawns (pool misses)
+        - keeps at least enough processes to cover acquires arriving while
+          a replacement spawns (acquire rate x average warm spawn time)
+        - shrinks by one when warm processes sat unused all interval
+          (queue low-water mark > 0), terminating the surplus
+      Hit/miss counts and spawn latencies are exposed via stats().
+
     Latency improvement:
       Cold start (no pool): ~120-400ms (OS spawn + Node.js init + auth check)
       Warm acquire (pool):  <5ms (asyncio.Queue.get_nowait)
       Measured baseline:    See test_claude_process_pool.py
 
+    Warm process health:
+      Each warm process records its spawn time and auth fingerprint.
+      acquire() skips (and terminates) processes that exited, have a closed
+      stdin, were spawned under different credentials, or are older than
+      max_idle_age, so a request after a quiet period never gets a stale
+      process. The refill loop is woken by acquire() instead of polling,
+      and also wakes when the oldest idle process is due for recycling.
+
     Usage:
         pool = ClaudeProcessPool(cli_path='/usr/bin/claude', model='claude-sonnet-...')
         await pool.start()          # Pre-warm at app startup
@@ -84,37 +157,83 @@ class ClaudeProcessPool:
         - Do NOT share processes across requests — each claude -p is single-shot
     """
 
-    POOL_SIZE = 2       # Number of processes to keep warm (sufficient for single-user dev)
-    REFILL_DELAY = 0.1  # Seconds between refill loop checks
+    POOL_SIZE = 2       # Initial number of processes to keep warm
+    MIN_POOL_SIZE = 1   # Adaptive sizing lower bound
+    MAX_POOL_SIZE = 8   # Adaptive sizing upper bound
+    RESIZE_INTERVAL = 10.0  # Seconds between sizing decisions
+    REFILL_DELAY = 0.1  # Replacement-spawn allowance used by adaptive sizing
+    MAX_IDLE_AGE = 600.0  # Seconds a warm process may sit idle before recycling
     BACKOFF_BASE = 0.1  # Initial backoff delay (seconds)
     BACKOFF_MAX = 30.0  # Max backoff delay (seconds)
     BACKOFF_FAILURES_THRESHOLD = 10  # Log error after this many consecutive failures
 
-    def __init__(self, cli_path: str, model: str):
+    def __init__(
+        self,
+        cli_path: str,
+        model: str,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        max_idle_age: Optional[float] = None,
+        flags: Tuple[str, ...] = CLI_FLAGS,
+        headroom: Optional[Callable[["ClaudeProcessPool"], int]] = None
+    ):
         """
         Initialize pool without starting it.
 
         Args:
             cli_path: Absolute path to claude CLI binary
             model: Model identifier to pass with --model flag
+            min_size: Lower bound for adaptive sizing (default MIN_POOL_SIZE)
+            max_size: Upper bound for adaptive sizing (default MAX_POOL_SIZE)
+            max_idle_age: Seconds before an idle warm process is recycled
+                          (default MAX_IDLE_AGE)
+            flags: CLI arguments besides --model (default CLI_FLAGS)
+            headroom: Returns the largest target this pool may take given
+                      other pools' targets (set by ClaudeProcessPoolRegistry
+                      to enforce its global cap; None means unlimited)
         """
         self._cli_path = cli_path
         self._model = model
-        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.POOL_SIZE)
+        self._flags = flags
+        self._headroom = headroom
+        self.min_size = self.MIN_POOL_SIZE if min_size is None else min_size
+        self.max_size = max(self.min_size, self.MAX_POOL_SIZE if max_size is None else max_size)
+        self.target_size = min(max(self.POOL_SIZE, self.min_size), self.max_size)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_size)
+        self.max_idle_age = self.MAX_IDLE_AGE if max_idle_age is None else max_idle_age
         self._running = False
         self._refill_task: Optional[asyncio.Task] = None
+        self._refill_needed = asyncio.Event()
+        # id(proc) -> (spawned_at, auth fingerprint) for warm processes
+        self._warm_info: Dict[int, tuple] = {}
+        self._reaping: set = set()  # Termination tasks for discarded processes
+
+        # Lifetime counters (see stats())
+        self.hits = 0
+        self.misses = 0
+        self.warm_spawns = 0
+        self.warm_spawn_seconds = 0.0
+        self.cold_spawns = 0
+        self.cold_spawn_seconds = 0.0
+        self.recycled = 0
+
+        # Current sizing window
+        self._window_start = time.monotonic()
+        self._window_acquires = 0
+        self._window_misses = 0
+        self._window_low_water = 0
 
     async def start(self) -> None:
         """
-        Pre-warm POOL_SIZE processes and start background refill loop.
+        Pre-warm target_size processes and start background refill loop.
 
         Call at app startup (FastAPI lifespan). Processes are pre-started
         with stdin=PIPE, waiting to receive a prompt. If spawn fails, the
         slot is skipped (cold spawn will be used as fallback for requests).
         """
         self._running = True
-        # Pre-spawn POOL_SIZE processes
-        for _ in range(self.POOL_SIZE):
+        # Pre-spawn target_size processes
+        for _ in range(self.target_size):
             proc = await self._spawn_warm_process()
             if proc:
                 try:
@@ -123,7 +242,8 @@ class ClaudeProcessPool:
                     # Queue full (shouldn't happen during startup, but defensive)
                     proc.terminate()
                     await proc.wait()
-        # Start background refill loop
+        # Start background refill loop with a fresh sizing window
+        self._reset_window()
         self._refill_task = asyncio.create_task(self._refill_loop())
 
     async def stop(self) -> None:
@@ -140,6 +260,9 @@ class ClaudeProcessPool:
                 await self._refill_task
             except asyncio.CancelledError:
                 pass
+        if self._reaping:
+            await asyncio.gather(*self._reaping, return_exceptions=True)
+        self._warm_info.clear()
         # Drain queue and terminate remaining processes
         while not self._queue.empty():
             try:
@@ -158,25 +281,174 @@ class ClaudeProcessPool:
         """
         Acquire a warm process from the pool.
 
-        Tries queue.get_nowait() first (O(1), no spawn overhead). If the
-        dequeued process is dead (returncode is not None), falls through to
-        cold spawn. If pool is empty, falls through to cold spawn.
+        Tries queue.get_nowait() first (O(1), no spawn overhead). Dequeued
+        processes that fail the health check (exited, stdin closed, stale
+        auth, older than max_idle_age) are discarded and the next one is
+        tried. If the pool runs out, falls through to cold spawn. Every
+        acquire wakes the refill loop to replace what was taken.
 
         Returns:
             asyncio.subprocess.Process: Warm or cold-spawned process ready
                                          to receive a prompt via stdin.
         """
+        self._window_acquires += 1
+        self._refill_needed.set()
+        fingerprint = _auth_fingerprint()
+        now = time.monotonic()
+
+        while True:
+            try:
+                proc = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                # Pool exhausted — fall back to cold spawn transparently
+                self._window_low_water = 0
+                logger.warning("Process pool empty, falling back to cold spawn")
+                return await self._miss()
+
+            self._window_low_water = min(self._window_low_water, self._queue.qsize())
+            problem = self._health_problem(proc, now, fingerprint)
+            self._warm_info.pop(id(proc), None)
+            if problem is None:
+                self.hits += 1
+                return proc
+
+            # Unusable warm process — discard it and try the next one
+            logger.warning(f"Discarding pool process ({problem}), trying next")
+            self._discard(proc)
+
+    def _health_problem(
+        self,
+        proc: asyncio.subprocess.Process,
+        now: float,
+        fingerprint: tuple
+    ) -> Optional[str]:
+        """
+        Check a warm process before handing it out.
+
+        Returns:
+            Reason the process is unusable, or None if healthy
+        """
+        if proc.returncode is not None:
+            return "exited"
+        if proc.stdin is None or proc.stdin.is_closing():
+            return "stdin closed"
+        info = self._warm_info.get(id(proc))
+        if info is not None:
+            spawned_at, spawned_fingerprint = info
+            if spawned_fingerprint != fingerprint:
+                return "stale auth"
+            if now - spawned_at > self.max_idle_age:
+                return "idle too long"
+        return None
+
+    def _discard(self, proc: asyncio.subprocess.Process) -> None:
+        """Terminate an unusable warm process without blocking the caller."""
+        self._warm_info.pop(id(proc), None)
+        self.recycled += 1
+        if proc.returncode is not None:
+            return
+        task = asyncio.ensure_future(self._terminate(proc))
+        self._reaping.add(task)
+        task.add_done_callback(self._reaping.discard)
+
+    @staticmethod
+    async def _terminate(proc: asyncio.subprocess.Process) -> None:
+        proc.terminate()
         try:
-            proc = self._queue.get_nowait()
-            if proc.returncode is not None:
-                # Process died unexpectedly while queued — fall back to cold spawn
-                logger.warning("Pool process died while queued, falling back to cold spawn")
-                return await self._cold_spawn()
-            return proc
-        except asyncio.QueueEmpty:
-            # Pool exhausted — fall back to cold spawn transparently
-            logger.warning("Process pool empty, falling back to cold spawn")
-            return await self._cold_spawn()
+            await asyncio.wait_for(proc.wait(), timeout=2.0)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+
+    async def _miss(self) -> asyncio.subprocess.Process:
+        """Record a pool miss and cold-spawn a process for the caller."""
+        self.misses += 1
+        self._window_misses += 1
+        return await self._cold_spawn()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return pool sizing and latency counters.
+
+        Returns:
+            dict: target/idle sizes, hit/miss counts and rate, and average
+                  warm/cold spawn latency in milliseconds
+        """
+        acquires = self.hits + self.misses
+        return {
+            "model": self._model,
+            "target_size": self.target_size,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "idle": self._queue.qsize(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / acquires, 3) if acquires else None,
+            "warm_spawns": self.warm_spawns,
+            "cold_spawns": self.cold_spawns,
+            "recycled": self.recycled,
+            "avg_warm_spawn_ms": (
+                round(self.warm_spawn_seconds / self.warm_spawns * 1000, 1)
+                if self.warm_spawns else None
+            ),
+            "avg_cold_spawn_ms": (
+                round(self.cold_spawn_seconds / self.cold_spawns * 1000, 1)
+                if self.cold_spawns else None
+            ),
+        }
+
+    def _reset_window(self) -> None:
+        self._window_start = time.monotonic()
+        self._window_acquires = 0
+        self._window_misses = 0
+        self._window_low_water = self._queue.qsize()
+
+    def _resize(self, now: float) -> None:
+        """
+        Re-target the pool size from the sizing window that just ended.
+
+        Args:
+            now: Current time.monotonic() value
+        """
+        elapsed = max(now - self._window_start, 1e-6)
+        target = self.target_size
+
+        if self._window_misses:
+            # Cold spawns: the pool was too small for the burst
+            target += self._window_misses
+        elif self._window_low_water > 0:
+            # Processes sat idle the whole window: give one back
+            target -= 1
+
+        # Cover acquires that arrive while a replacement is spawning
+        if self._window_acquires and self.warm_spawns:
+            avg_spawn = self.warm_spawn_seconds / self.warm_spawns
+            rate = self._window_acquires / elapsed
+            target = max(target, math.ceil(rate * (avg_spawn + self.REFILL_DELAY)))
+
+        target = min(max(target, self.min_size), self.max_size)
+        if self._headroom is not None:
+            target = min(target, max(self._headroom(self), 0))
+        if target != self.target_size:
+            logger.info(
+                f"Process pool resized {self.target_size} -> {target} "
+                f"(acquires={self._window_acquires}, misses={self._window_misses}, "
+                f"idle_low_water={self._window_low_water})"
+            )
+            self.target_size = target
+        self._reset_window()
+
+    async def _trim_to_target(self) -> None:
+        """Terminate idle processes above target_size."""
+        while self._queue.qsize() > self.target_size:
+            try:
+                proc = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            self._warm_info.pop(id(proc), None)
+            if proc.returncode is None:
+                proc.terminate()
+                await proc.wait()
 
     async def _spawn_warm_process(self) -> Optional[asyncio.subprocess.Process]:
         """
@@ -185,26 +457,24 @@ class ClaudeProcessPool:
         The spawned process has stdin=PIPE and waits for a prompt.
         Returns None if spawn fails (logged as warning, not error).
         """
+        spawn_start = time.perf_counter()
         try:
             env = _build_cli_env()
-            return await asyncio.create_subprocess_exec(
-                self._cli_path,
-                '-p',
-                DANGEROUSLY_SKIP_PERMISSIONS,
-                '--output-format', 'stream-json',
-                '--verbose',
-                '--model', self._model,
-                '--mcp-config', MCP_CONFIG_JSON,
-                '--tools', '',
+            proc = await asyncio.create_subprocess_exec(
+                *_cli_command(self._cli_path, self._model, self._flags),
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 env=env,
-                limit=1024 * 1024  # 1MB line buffer (same as stream_chat)
+                limit=1024 * 1024  # 1MB read buffer (same as stream_chat)
             )
         except Exception as e:
             logger.warning(f"Failed to pre-warm process: {e}")
             return None
+        self.warm_spawns += 1
+        self.warm_spawn_seconds += time.perf_counter() - spawn_start
+        self._warm_info[id(proc)] = (time.monotonic(), _auth_fingerprint())
+        return proc
 
     async def _cold_spawn(self) -> asyncio.subprocess.Process:
         """
@@ -213,39 +483,53 @@ class ClaudeProcessPool:
         Unlike _spawn_warm_process, raises on failure since this is
         on the critical path for a user request.
         """
+        spawn_start = time.perf_counter()
         env = _build_cli_env()
-        return await asyncio.create_subprocess_exec(
-            self._cli_path,
-            '-p',
-            DANGEROUSLY_SKIP_PERMISSIONS,
-            '--output-format', 'stream-json',
-            '--verbose',
-            '--model', self._model,
-            '--mcp-config', MCP_CONFIG_JSON,
-            '--tools', '',
+        proc = await asyncio.create_subprocess_exec(
+            *_cli_command(self._cli_path, self._model, self._flags),
             stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
             env=env,
-            limit=1024 * 1024  # 1MB line buffer (same as stream_chat)
+            limit=1024 * 1024  # 1MB read buffer (same as stream_chat)
         )
+        self.cold_spawns += 1
+        self.cold_spawn_seconds += time.perf_counter() - spawn_start
+        return proc
 
     async def _refill_loop(self) -> None:
         """
-        Background task that keeps the pool at POOL_SIZE.
-
-        Checks every REFILL_DELAY seconds and spawns new processes
-        until the queue is full again. Uses exponential backoff on
-        consecutive failures to avoid log flooding.
+        Background task that keeps the pool at target_size.
+
+        Sleeps until woken by acquire(), the next sizing decision
+        (RESIZE_INTERVAL) or the oldest idle process reaching max_idle_age.
+        Then re-targets the size, recycles unhealthy idle processes and
+        spawns new ones (or trims surplus ones) until the queue matches the
+        target. Uses exponential backoff on consecutive failures to avoid
+        log flooding.
         """
         consecutive_failures = 0
         current_delay = self.BACKOFF_BASE
-        
+
         while self._running:
-            delay = current_delay if consecutive_failures > 0 else self.REFILL_DELAY
-            await asyncio.sleep(delay)
-            
-            while self._running and self._queue.qsize() < self.POOL_SIZE:
+            if consecutive_failures > 0:
+                await asyncio.sleep(current_delay)
+            else:
+                try:
+                    await asyncio.wait_for(
+                        self._refill_needed.wait(), self._next_maintenance_delay()
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            self._refill_needed.clear()
+
+            now = time.monotonic()
+            if now - self._window_start >= self.RESIZE_INTERVAL:
+                self._resize(now)
+                await self._trim_to_target()
+            await self._recycle_unhealthy(now)
+
+            while self._running and self._queue.qsize() < self.target_size:
                 proc = await self._spawn_warm_process()
                 if proc:
                     try:
@@ -271,39 +555,273 @@ class ClaudeProcessPool:
                     break  # Exit inner loop to apply backoff
 
 
-# Module-level singleton for the process pool
-_process_pool: Optional[ClaudeProcessPool] = None
+    def _next_maintenance_delay(self) -> float:
+        """Seconds until the next sizing decision or idle-age expiry."""
+        now = time.monotonic()
+        deadline = self._window_start + self.RESIZE_INTERVAL
+        if self._warm_info:
+            oldest = min(spawned_at for spawned_at, _ in self._warm_info.values())
+            deadline = min(deadline, oldest + self.max_idle_age)
+        return max(deadline - now, 0.0)
+
+    async def _recycle_unhealthy(self, now: float) -> None:
+        """Replace idle processes that are expired, dead or have stale auth."""
+        fingerprint = _auth_fingerprint()
+        keep = []
+        while True:
+            try:
+                proc = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            problem = self._health_problem(proc, now, fingerprint)
+            if problem is None:
+                keep.append(proc)
+            else:
+                logger.info(f"Recycling idle pool process ({problem})")
+                self._discard(proc)
+        for proc in keep:
+            self._queue.put_nowait(proc)
+
+
+class ClaudeProcessPoolRegistry:
+    """
+    Warm process pools keyed by (cli_path, model, CLI flags).
+
+    The default model's pool is started at app startup. A pool for any
+    other key is created on its first request (which cold-spawns as that
+    pool's first miss) and pre-warms in the background, so threads bound
+    to a non-default model also get warm processes from then on.
+
+    Budgets:
+      The default pool sizes within [min_size, max_size]; other pools
+      within [0, model_max_size], so an unused model's pool shrinks to no
+      processes. All pools share global_max: a pool can only grow into
+      capacity the others' targets leave free.
+    """
+
+    def __init__(
+        self,
+        cli_path: str,
+        default_model: str,
+        global_max: int,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        model_max_size: int = 2,
+        max_idle_age: Optional[float] = None
+    ):
+        """
+        Initialize registry without starting any pool.
+
+        Args:
+            cli_path: Absolute path to claude CLI binary (default key)
+            default_model: Model pre-warmed at startup
+            global_max: Cap on the sum of all pools' target sizes
+            min_size: Default pool's adaptive sizing lower bound
+            max_size: Default pool's adaptive sizing upper bound
+            model_max_size: Upper bound for each non-default pool
+            max_idle_age: Seconds before an idle warm process is recycled
+        """
+        self.cli_path = cli_path
+        self.default_model = default_model
+        self.global_max = max(1, global_max)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.model_max_size = model_max_size
+        self.max_idle_age = max_idle_age
+        self._pools: Dict[tuple, ClaudeProcessPool] = {}
+        self._starting: set = set()  # Background start() tasks
+
+    def _key(self, model: Optional[str], cli_path: Optional[str], flags: Tuple[str, ...]) -> tuple:
+        return (cli_path or self.cli_path, model or self.default_model, flags)
+
+    def _headroom(self, pool: ClaudeProcessPool) -> int:
+        """Targets still available to pool under the global cap."""
+        others = sum(p.target_size for p in self._pools.values() if p is not pool)
+        return self.global_max - others
+
+    def _create(self, key: tuple) -> ClaudeProcessPool:
+        cli_path, model, flags = key
+        is_default = key == self._key(None, None, CLI_FLAGS)
+        pool = ClaudeProcessPool(
+            cli_path=cli_path,
+            model=model,
+            min_size=self.min_size if is_default else 0,
+            max_size=self.max_size if is_default else self.model_max_size,
+            max_idle_age=self.max_idle_age,
+            flags=flags,
+            headroom=self._headroom,
+        )
+        if not is_default:
+            # Demand-created pool: pre-warm one process, grow on misses
+            pool.target_size = min(pool.target_size, 1)
+        # Initial pre-warm must fit the global cap too
+        pool.target_size = min(pool.target_size, max(self._headroom(pool), 0))
+        self._pools[key] = pool
+        return pool
+
+    async def start(self) -> ClaudeProcessPool:
+        """
+        Create and pre-warm the default pool.
 
+        Returns:
+            ClaudeProcessPool: The started default pool
+        """
+        pool = self._create(self._key(None, None, CLI_FLAGS))
+        await pool.start()
+        return pool
 
-def get_process_pool() -> Optional[ClaudeProcessPool]:
-    """Return the module-level process pool singleton, or None if not initialized."""
-    return _process_pool
+    def get(
+        self,
+        model: Optional[str] = None,
+        cli_path: Optional[str] = None,
+        flags: Tuple[str, ...] = CLI_FLAGS
+    ) -> ClaudeProcessPool:
+        """
+        Return the pool for a key, creating and starting it on first use.
+
+        A new pool starts pre-warming in the background; until a process is
+        ready, acquire() cold-spawns (counted as a miss for sizing).
+
+        Args:
+            model: CLI model (default_model if None)
+            cli_path: CLI binary (registry's cli_path if None)
+            flags: CLI arguments besides --model
+        """
+        key = self._key(model, cli_path, flags)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._create(key)
+            logger.info(f"Starting process pool for model {key[1]} (target={pool.target_size})")
+            task = asyncio.ensure_future(pool.start())
+            self._starting.add(task)
+            task.add_done_callback(self._starting.discard)
+        return pool
+
+    async def stop(self) -> None:
+        """Stop every pool (terminating warm processes)."""
+        if self._starting:
+            await asyncio.gather(*self._starting, return_exceptions=True)
+        for pool in self._pools.values():
+            await pool.stop()
+        self._pools.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the global budget and per-pool stats.
+
+        Returns:
+            dict: global_max, summed target size, and each pool's stats()
+                  (with a partial_messages or custom_flags marker for
+                  non-default flag sets)
+        """
+        pools = []
+        for (cli_path, _model, flags), pool in self._pools.items():
+            pool_stats = pool.stats()
+            if flags == PARTIAL_CLI_FLAGS:
+                pool_stats["partial_messages"] = True
+            elif flags != CLI_FLAGS or cli_path != self.cli_path:
+                pool_stats["custom_flags"] = True
+            pools.append(pool_stats)
+        return {
+            "global_max": self.global_max,
+            "total_target": sum(p.target_size for p in self._pools.values()),
+            "pools": pools,
+        }
+
+
+# Module-level singleton for the process pool registry
+_process_pools: Optional[ClaudeProcessPoolRegistry] = None
+
+
+def get_process_pools() -> Optional[ClaudeProcessPoolRegistry]:
+    """Return the module-level pool registry, or None if not initialized."""
+    return _process_pools
+
+
+def get_process_pool(
+    model: Optional[str] = None,
+    cli_path: Optional[str] = None,
+    flags: Tuple[str, ...] = CLI_FLAGS
+) -> Optional[ClaudeProcessPool]:
+    """
+    Return the warm pool for (cli_path, model, flags), or None if not initialized.
+
+    With no arguments, returns the default model's pool.
+    """
+    if _process_pools is None:
+        return None
+    return _process_pools.get(model, cli_path, flags)
 
 
 async def init_process_pool(cli_path: str, model: str) -> ClaudeProcessPool:
     """
-    Initialize and start the module-level process pool singleton.
+    Initialize the module-level pool registry and start the default pool.
+
+    Pool size bounds, budgets and idle age come from settings (claude_pool_*);
+    the global cap is this worker's share of claude_pool_global_max_size.
 
     Args:
         cli_path: Absolute path to claude CLI binary
-        model: Model identifier for pre-warmed processes
+        model: Default model for pre-warmed processes
 
     Returns:
-        ClaudeProcessPool: Started pool instance
+        ClaudeProcessPool: Started default pool
     """
-    global _process_pool
-    pool = ClaudeProcessPool(cli_path=cli_path, model=model)
-    await pool.start()
-    _process_pool = pool
+    global _process_pools
+    registry = ClaudeProcessPoolRegistry(
+        cli_path=cli_path,
+        default_model=model,
+        global_max=settings.per_worker(settings.claude_pool_global_max_size),
+        min_size=settings.claude_pool_min_size,
+        max_size=settings.claude_pool_max_size,
+        model_max_size=settings.claude_pool_model_max_size,
+        max_idle_age=settings.claude_pool_max_idle_seconds,
+    )
+    pool = await registry.start()
+    _process_pools = registry
     return pool
 
 
 async def shutdown_process_pool() -> None:
-    """Stop and clear the module-level process pool singleton."""
-    global _process_pool
-    if _process_pool:
-        await _process_pool.stop()
-        _process_pool = None
+    """Stop every pool and clear the module-level registry."""
+    global _process_pools
+    if _process_pools:
+        await _process_pools.stop()
+        _process_pools = None
+
+
+class _PartialTextTracker:
+    """
+    Maps partial-message stream events to incremental text chunks.
+
+    With --include-partial-messages the CLI emits the raw Messages API
+    stream events (wrapped as {"type": "stream_event", "event": {...}})
+    before each complete assistant event. Text deltas are yielded as they
+    arrive; the IDs of messages whose text was streamed are remembered so
+    the later assistant event does not repeat that text.
+    """
+
+    def __init__(self):
+        self._message_id: Optional[str] = None
+        self._streamed_ids: set = set()
+
+    def translate(self, event: Dict[str, Any]) -> Optional[StreamChunk]:
+        """Return a text chunk for a text delta, else None (tracking message IDs)."""
+        inner = event.get("event") or {}
+        inner_type = inner.get("type")
+
+        if inner_type == "message_start":
+            self._message_id = (inner.get("message") or {}).get("id")
+        elif inner_type == "content_block_delta":
+            delta = inner.get("delta") or {}
+            if delta.get("type") == "text_delta" and delta.get("text"):
+                self._streamed_ids.add(self._message_id)
+                return StreamChunk(chunk_type="text", content=delta["text"])
+        return None
+
+    def streamed(self, event: Dict[str, Any]) -> bool:
+        """Whether this assistant event's text was already streamed as deltas."""
+        return (event.get("message") or {}).get("id") in self._streamed_ids
 
 
 class ClaudeCLIAdapter(LLMAdapter):
@@ -352,12 +870,40 @@ class ClaudeCLIAdapter(LLMAdapter):
         self.db = None
         self.project_id = None
         self.thread_id = None
+        self.user_id = None
+        self.partial_messages = False
 
     @property
     def provider(self) -> LLMProvider:
         """Return the provider identifier."""
         return LLMProvider.CLAUDE_CODE_CLI
 
+    def set_user(self, user_id: Optional[str]):
+        """
+        Set the requesting user for admission control.
+
+        CLI requests over the global concurrency limit queue per user
+        (FIFO within a user, round-robin across users).
+
+        Args:
+            user_id: ID of the user making the request
+        """
+        self.user_id = user_id
+
+    def set_partial_messages(self, enabled: bool):
+        """
+        Choose how text is streamed.
+
+        When enabled, text is yielded delta-by-delta from the CLI's partial
+        message events as it is generated; otherwise it is yielded once per
+        completed content block (one chunk per assistant event). Partial mode
+        runs CLI processes started with PARTIAL_CLI_FLAGS (a separate pool).
+
+        Args:
+            enabled: Stream text incrementally
+        """
+        self.partial_messages = enabled
+
     def set_context(self, db, project_id: str, thread_id: str):
         """
         Set request context for this adapter.
@@ -497,17 +1043,24 @@ class ClaudeCLIAdapter(LLMAdapter):
 
         return str(content)
 
-    def _translate_event(self, event: Dict[str, Any]) -> Optional[StreamChunk]:
+    def _translate_event(
+        self,
+        event: Dict[str, Any],
+        include_text: bool = True
+    ) -> Optional[StreamChunk]:
         """
         Translate CLI JSON event to StreamChunk format.
 
         Actual CLI stream-json output format:
         - type: "system" (init, hooks) -> ignored
+        - type: "stream_event" (partial message deltas) -> see _PartialTextTracker
         - type: "assistant" with message.content blocks -> text/tool_use StreamChunk
         - type: "result" with usage -> StreamChunk(chunk_type="complete")
 
         Args:
             event: Parsed JSON event from CLI stdout
+            include_text: False when the message's text was already streamed
+                as deltas (tool_use blocks are still translated)
 
         Returns:
             StreamChunk or None if event type not handled
@@ -523,7 +1076,7 @@ class ClaudeCLIAdapter(LLMAdapter):
             # Collect all text blocks into a single text chunk
             text_parts = []
             for block in content_blocks:
-                if block.get("type") == "text":
+                if block.get("type") == "text" and include_text:
                     text_parts.append(block.get("text", ""))
                 elif block.get("type") == "tool_use":
                     # Emit tool use chunk (return first tool_use found)
@@ -605,11 +1158,23 @@ class ClaudeCLIAdapter(LLMAdapter):
         server configuration is needed for POC.
 
         Process acquisition:
-        - If process pool is initialized: acquires warm process from pool
-          (pool.acquire latency <5ms vs cold spawn ~120-400ms).
+        - If process pools are initialized: acquires warm process from the
+          pool for this adapter's model (pool.acquire latency <5ms vs cold
+          spawn ~120-400ms); a model's pool is created on its first request.
         - If pool is not initialized: falls back to cold spawn directly.
         Latency is logged on every acquisition via time.perf_counter().
 
+        Text streaming (see set_partial_messages):
+        - Partial mode yields text deltas as they are generated.
+        - Otherwise text is yielded once per completed assistant event (the
+          process is started without --include-partial-messages).
+
+        Admission control:
+        - At most claude_cli_max_concurrency requests per host (this
+          worker's share) run a CLI process at once; the rest wait in a per-user fair queue and yield "queued"
+          chunks (metadata: position, queue_depth) whenever their position
+          changes.
+
         Args:
             messages: Conversation history
             system_prompt: System instructions (includes MCP tool descriptions)
@@ -635,7 +1200,27 @@ class ClaudeCLIAdapter(LLMAdapter):
         process = None
         received_result = False  # Track if CLI sent result event
 
+        # Admission control: cap concurrent CLI processes, queue fairly per user
+        admission = get_cli_admission()
+        ticket = admission.enqueue(self.user_id or "anonymous")
+
         try:
+            last_position = None
+            while True:
+                changed = admission.changed  # Capture before checking state
+                if ticket.granted:
+                    break
+                position = admission.position(ticket)
+                if position != last_position:
+                    last_position = position
+                    yield StreamChunk(
+                        chunk_type="queued",
+                        metadata={"position": position, "queue_depth": admission.depth}
+                    )
+                await changed.wait()
+            if last_position is not None:
+                logger.info(f"CLI request admitted after {ticket.wait_seconds * 1000:.0f}ms in queue")
+
             # Build prompt from messages
             prompt_text = self._convert_messages_to_prompt(messages)
 
@@ -647,24 +1232,15 @@ class ClaudeCLIAdapter(LLMAdapter):
             # receives the full conversation history after the [SYSTEM]: marker.
             combined_prompt = f"[SYSTEM]: {system_prompt}\n\n[USER]: {prompt_text}"
 
-            # Build CLI command
+            # Build CLI command (same arguments as warm pool processes)
             # NOTE: Do NOT pass --system-prompt flag, use combined prompt instead
-            # NOTE: Do NOT pass --include-partial-messages (excluded from POC scope)
             # NOTE: Prompt passed via stdin to avoid Windows 8,191 char command line limit
-            cmd = [
-                self.cli_path,
-                "-p",  # Print mode (non-interactive, reads prompt from stdin)
-                DANGEROUSLY_SKIP_PERMISSIONS,
-                "--output-format", "stream-json",
-                "--verbose",
-                "--model", self.model,
-                "--mcp-config", MCP_CONFIG_JSON,
-                "--tools", "",
-            ]
+            flags = PARTIAL_CLI_FLAGS if self.partial_messages else CLI_FLAGS
+            cmd = _cli_command(self.cli_path, self.model, flags)
 
             # Acquire process: prefer warm pool over cold spawn
             # Measure acquisition latency via perf_counter (PERF-01)
-            pool = get_process_pool()
+            pool = get_process_pool(self.model, self.cli_path, flags)
             acquire_start = time.perf_counter()
 
             if pool is not None:
@@ -684,7 +1260,7 @@ class ClaudeCLIAdapter(LLMAdapter):
                     stdout=asyncio.subprocess.PIPE,
                     stderr=asyncio.subprocess.PIPE,
                     env=env,
-                    limit=1024 * 1024  # 1MB line buffer (default 64KB too small for BRDs)
+                    limit=1024 * 1024  # 1MB read buffer (BRD events arrive in large chunks)
                 )
                 acquire_ms = (time.perf_counter() - acquire_start) * 1000
                 logger.info(f"Process cold-spawned in {acquire_ms:.1f}ms")
@@ -697,29 +1273,43 @@ class ClaudeCLIAdapter(LLMAdapter):
 
             # Stream output line-by-line
             turn_count = 0
-            async for line in process.stdout:
-                decoded = line.decode('utf-8').strip()
-                if not decoded:
+            if self.partial_messages:
+                partial = _PartialTextTracker()
+                parser = StreamJsonParser(skip_types=IGNORED_EVENT_TYPES)
+            else:
+                partial = None
+                parser = StreamJsonParser(skip_types=IGNORED_EVENT_TYPES | {STREAM_EVENT_TYPE})
+            async for line in iter_lines(process.stdout):
+                event = parser.parse(line)
+                if event is None:
                     continue
 
-                try:
-                    event = json.loads(decoded)
-
-                    # Track turns for debugging
-                    if event.get("type") == "assistant_message":
-                        turn_count += 1
-
-                    # Track if we received result event
-                    if event.get("type") == "result":
-                        received_result = True
-
-                    # Translate and yield
-                    chunk = self._translate_event(event)
-                    if chunk:
-                        yield chunk
-
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse JSON: {decoded[:100]} - {e}")
+                if partial is not None:
+                    if event.get("type") == STREAM_EVENT_TYPE:
+                        chunk = partial.translate(event)
+                        if chunk:
+                            yield chunk
+                        continue
+                    if event.get("type") == "assistant" and partial.streamed(event):
+                        chunk = self._translate_event(event, include_text=False)
+                        if chunk:
+                            yield chunk
+                        continue
+
+                # Track turns for debugging
+                if event.get("type") == "assistant_message":
+                    turn_count += 1
+
+                # Track if we received result event
+                if event.get("type") == "result":
+                    received_result = True
+
+                # Translate and yield
+                chunk = self._translate_event(event)
+                if chunk:
+                    yield chunk
+
+            logger.debug(f"CLI stream parsed: {parser.stats()}")
 
             # Wait for process completion
             returncode = await process.wait()
@@ -772,3 +1362,6 @@ class ClaudeCLIAdapter(LLMAdapter):
                     process.kill()
                     await process.wait()
                     logger.info("CLI subprocess killed")
+
+            # Free the admission slot (or leave the queue) for the next request
+            admission.leave(ticket)
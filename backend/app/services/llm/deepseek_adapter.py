@@ -41,6 +41,7 @@ class DeepSeekAdapter(LLMAdapter):
         self,
         api_key: str,
         model: Optional[str] = None,
+        client: Optional[AsyncOpenAI] = None,
     ):
         """
         Initialize the DeepSeek adapter.
@@ -48,10 +49,11 @@ class DeepSeekAdapter(LLMAdapter):
         Args:
             api_key: DeepSeek API key for authentication
             model: DeepSeek model to use (defaults to deepseek-reasoner)
+            client: Shared client (from LLMFactory); a new one is created if omitted
         """
         self._api_key = api_key
         self.model = model or DEFAULT_MODEL
-        self.client = AsyncOpenAI(
+        self.client = client or AsyncOpenAI(
             api_key=api_key,
             base_url=DEEPSEEK_BASE_URL,
         )
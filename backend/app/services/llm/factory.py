@@ -6,17 +6,29 @@ Handles API key retrieval from settings and adapter instantiation.
 
 This module enables provider selection at runtime without the calling
 code needing to know about specific adapter implementations.
+
+SDK clients for direct API providers are shared across requests (created
+lazily, one per provider and API key) so HTTP keep-alive connections and
+TLS sessions are reused; LLMFactory.aclose() releases them at shutdown.
 """
-from typing import Optional
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import anthropic
+import httpx
+import openai
+from google import genai
 
 from .base import LLMAdapter, LLMProvider
 from .anthropic_adapter import AnthropicAdapter
 from .gemini_adapter import GeminiAdapter
-from .deepseek_adapter import DeepSeekAdapter
+from .deepseek_adapter import DeepSeekAdapter, DEEPSEEK_BASE_URL
 from .claude_agent_adapter import ClaudeAgentAdapter
 from .claude_cli_adapter import ClaudeCLIAdapter
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class LLMFactory:
     """
@@ -42,6 +54,16 @@ class LLMFactory:
         LLMProvider.CLAUDE_CODE_CLI: ClaudeCLIAdapter,
     }
 
+    # Providers whose adapters take a shared SDK client
+    _pooled_providers = (
+        LLMProvider.ANTHROPIC,
+        LLMProvider.GOOGLE,
+        LLMProvider.DEEPSEEK,
+    )
+
+    # Shared SDK clients keyed by (provider, api_key)
+    _clients: Dict[Tuple[LLMProvider, str], Any] = {}
+
     @classmethod
     def create(
         cls,
@@ -85,8 +107,100 @@ class LLMFactory:
             elif provider_enum == LLMProvider.DEEPSEEK:
                 model = settings.deepseek_model
 
+        if provider_enum in cls._pooled_providers:
+            return adapter_class(
+                api_key=api_key,
+                model=model,
+                client=cls._get_or_create_client(provider_enum, api_key),
+            )
+
         return adapter_class(api_key=api_key, model=model)
 
+    @classmethod
+    def get_client(cls, provider: str) -> Any:
+        """
+        Return the shared SDK client for a direct API provider.
+
+        Used by services that call the provider SDK directly (e.g., thread
+        summarization) so they share the same connection pool as adapters.
+
+        Args:
+            provider: Provider name string ("anthropic", "google", "deepseek")
+
+        Returns:
+            anthropic.AsyncAnthropic, genai.Client or openai.AsyncOpenAI
+
+        Raises:
+            ValueError: If provider has no shared client or no API key is configured
+        """
+        provider_enum = LLMProvider(provider)
+        if provider_enum not in cls._pooled_providers:
+            raise ValueError(f"No shared client for provider: {provider}")
+        api_key = cls._get_api_key(provider_enum)
+        return cls._get_or_create_client(provider_enum, api_key)
+
+    @classmethod
+    def _get_or_create_client(cls, provider: LLMProvider, api_key: str) -> Any:
+        """Return the cached client for (provider, api_key), creating it on first use."""
+        key = (provider, api_key)
+        client = cls._clients.get(key)
+        if client is None:
+            client = cls._create_client(provider, api_key)
+            cls._clients[key] = client
+        return client
+
+    @classmethod
+    def _create_client(cls, provider: LLMProvider, api_key: str) -> Any:
+        """
+        Create a long-lived SDK client with a tuned connection pool.
+
+        Args:
+            provider: LLMProvider enum value (direct API providers only)
+            api_key: API key for the provider
+
+        Returns:
+            Provider SDK client
+        """
+        limits = httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+        )
+
+        if provider == LLMProvider.ANTHROPIC:
+            return anthropic.AsyncAnthropic(
+                api_key=api_key,
+                http_client=anthropic.DefaultAsyncHttpxClient(limits=limits),
+            )
+
+        if provider == LLMProvider.DEEPSEEK:
+            return openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=DEEPSEEK_BASE_URL,
+                http_client=openai.DefaultAsyncHttpxClient(limits=limits),
+            )
+
+        if provider == LLMProvider.GOOGLE:
+            # genai manages its own HTTP transport; reusing the client keeps it warm
+            return genai.Client(api_key=api_key)
+
+        raise ValueError(f"No shared client for provider: {provider.value}")
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close all shared SDK clients (called from the FastAPI lifespan)."""
+        clients = list(cls._clients.values())
+        cls._clients.clear()
+
+        for client in clients:
+            try:
+                if isinstance(client, genai.Client):
+                    await client.aio.aclose()
+                else:
+                    await client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close LLM client: {e}")
+
     @classmethod
     def _get_api_key(cls, provider: LLMProvider) -> str:
         """
@@ -32,6 +32,7 @@ class GeminiAdapter(LLMAdapter):
         self,
         api_key: str,
         model: Optional[str] = None,
+        client: Optional[genai.Client] = None,
     ):
         """
         Initialize the Gemini adapter.
@@ -39,10 +40,11 @@ class GeminiAdapter(LLMAdapter):
         Args:
             api_key: Google API key for authentication
             model: Gemini model to use (defaults to gemini-3-flash-preview)
+            client: Shared client (from LLMFactory); a new one is created if omitted
         """
         self._api_key = api_key
         self.model = model or DEFAULT_MODEL
-        self.client = genai.Client(api_key=api_key)
+        self.client = client or genai.Client(api_key=api_key)
 
     @property
     def provider(self) -> LLMProvider:
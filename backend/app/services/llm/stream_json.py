@@ -0,0 +1,143 @@
+"""
+Parsing stage for Claude CLI stream-json output.
+
+The CLI writes one JSON event per line. Assistant and result events can
+carry a full BRD, while system events (init, hooks) are large tool/server
+listings the adapter discards. This stage:
+
+- reads stdout in large chunks and splits lines itself, instead of one
+  StreamReader.readline() per event (no line-length limit either),
+- sniffs the event type from the first bytes of a line, so events of
+  ignored types are dropped without decoding their payload,
+- parses with orjson instead of json.loads on the decoded line.
+"""
+import logging
+import re
+from typing import Any, AsyncIterator, Dict, FrozenSet, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Bytes requested per read() from the CLI's stdout
+READ_CHUNK_SIZE = 256 * 1024
+
+# The CLI emits "type" as the first key of every event
+_EVENT_TYPE_RE = re.compile(rb'\s*\{\s*"type"\s*:\s*"([^"\\]*)"')
+
+
+def loads(data: bytes) -> Any:
+    """
+    Parse one JSON document from UTF-8 bytes.
+
+    Raises:
+        ValueError: Invalid JSON or invalid UTF-8 (orjson.JSONDecodeError
+            subclasses it)
+    """
+    return orjson.loads(data)
+
+
+def sniff_event_type(line: bytes) -> Optional[str]:
+    """
+    Read an event's type from its leading bytes without parsing the line.
+
+    Returns:
+        The type string, or None if "type" is not the first key
+    """
+    match = _EVENT_TYPE_RE.match(line)
+    if match is None:
+        return None
+    return match.group(1).decode("utf-8", "replace")
+
+
+async def iter_lines(stream: Any, chunk_size: int = READ_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Yield newline-delimited lines (without the newline) from a byte stream.
+
+    Args:
+        stream: asyncio.StreamReader, or any async iterable of lines
+            (iterated as-is when it has no read() method)
+        chunk_size: Bytes requested per read()
+    """
+    read = getattr(stream, "read", None)
+    if read is None:
+        async for line in stream:
+            yield line
+        return
+
+    partial = []  # Pieces of a line spanning several chunks
+    while True:
+        chunk = await read(chunk_size)
+        if not chunk:
+            break
+        lines = chunk.split(b"\n")
+        if len(lines) == 1:
+            partial.append(chunk)
+            continue
+
+        partial.append(lines[0])
+        yield b"".join(partial)
+        for line in lines[1:-1]:
+            yield line
+        partial = [lines[-1]] if lines[-1] else []
+
+    if partial:
+        yield b"".join(partial)
+
+
+class StreamJsonParser:
+    """
+    Turns stream-json lines into event dicts, skipping ignored event types.
+
+    Attributes:
+        parsed: Events decoded
+        skipped: Events dropped by type without decoding
+        errors: Lines that failed to parse
+        bytes_read: Total bytes of non-empty lines seen
+    """
+
+    def __init__(self, skip_types: FrozenSet[str] = frozenset()):
+        self.skip_types = skip_types
+        self.parsed = 0
+        self.skipped = 0
+        self.errors = 0
+        self.bytes_read = 0
+
+    def parse(self, line: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Parse one line.
+
+        Returns:
+            Event dict, or None for blank, skipped or malformed lines
+        """
+        if not line or line.isspace():
+            return None
+        self.bytes_read += len(line)
+
+        if self.skip_types and sniff_event_type(line) in self.skip_types:
+            self.skipped += 1
+            return None
+
+        try:
+            event = loads(line)
+        except ValueError as e:
+            self.errors += 1
+            logger.warning(f"Failed to parse JSON: {line[:100]!r} - {e}")
+            return None
+
+        if not isinstance(event, dict):
+            self.errors += 1
+            logger.warning(f"Ignoring non-object JSON line: {line[:100]!r}")
+            return None
+
+        self.parsed += 1
+        return event
+
+    def stats(self) -> Dict[str, Any]:
+        """Return parse counters."""
+        return {
+            "parsed": self.parsed,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "bytes_read": self.bytes_read,
+        }
@@ -148,6 +148,9 @@ class LoggingService:
         )
         self.queue_listener.start()
 
+        # Lowest level any handler writes; lower records are dropped anyway
+        self.min_level = min(file_handler.level, console_handler.level)
+
         # Configure Python stdlib logging
         root_logger = logging.getLogger()
         root_logger.setLevel(logging.DEBUG)  # Capture all levels
@@ -173,6 +176,14 @@ class LoggingService:
 
         self.logger = structlog.get_logger("ba_assistant")
 
+    def is_enabled_for(self, level: str) -> bool:
+        """
+        Check whether a record at this level would be written by any handler.
+
+        Lets hot paths skip building log fields that would be dropped.
+        """
+        return getattr(logging, level.upper()) >= self.min_level
+
     def log(
         self,
         level: str,
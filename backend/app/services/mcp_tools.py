@@ -17,6 +17,7 @@ from typing import Dict, Any, Optional
 from claude_agent_sdk import tool, create_sdk_mcp_server
 
 from app.services.document_search import search_documents
+from app.services.session_registry import get_session_registry, open_context_db
 from app.models import Artifact, ArtifactType
 
 logger = logging.getLogger(__name__)
@@ -28,8 +29,9 @@ _thread_id_context: ContextVar[str] = ContextVar("thread_id_context")
 _documents_used_context: ContextVar[list] = ContextVar("documents_used_context")
 
 # Session registry for HTTP-based context propagation
-# Maps session_id -> db session for HTTP MCP transport
-_session_registry: Dict[str, Any] = {}
+# Maps session_id -> {"db": AsyncSession} (in-process backend) or {} (shared
+# backend: the tool opens its own session) for HTTP MCP transport
+SESSION_NAMESPACE = "mcp_tools"
 
 # HTTP MCP server singleton (lazily initialized)
 _http_mcp_server_url: Optional[str] = None
@@ -44,7 +46,8 @@ def register_db_session(session_id: str, db: Any) -> None:
         session_id: Unique session identifier
         db: SQLAlchemy AsyncSession
     """
-    _session_registry[session_id] = db
+    registry = get_session_registry(SESSION_NAMESPACE)
+    registry.register(session_id, {} if registry.shared else {"db": db})
     logger.debug(f"Registered db session: {session_id}")
 
 
@@ -55,20 +58,20 @@ def unregister_db_session(session_id: str) -> None:
     Args:
         session_id: Unique session identifier
     """
-    if session_id in _session_registry:
-        del _session_registry[session_id]
-        logger.debug(f"Unregistered db session: {session_id}")
+    get_session_registry(SESSION_NAMESPACE).unregister(session_id)
+    logger.debug(f"Unregistered db session: {session_id}")
 
 
 def _get_context_from_headers_or_contextvar(
     args: Dict[str, Any],
     header_prefix: str = "X-"
-) -> tuple[Any, str, Optional[int]]:
+) -> tuple[Optional[Dict[str, Any]], str, Optional[int]]:
     """
     Extract context from HTTP headers (if present) or fall back to ContextVar.
 
     Returns:
-        tuple: (db, project_id, max_results)
+        tuple: (context, project_id, max_results); open the context's DB
+            session with open_context_db(context)
     """
     # Try to extract from args (HTTP headers passed by SDK)
     # The SDK MCP HTTP transport may pass headers in the args dict
@@ -80,17 +83,17 @@ def _get_context_from_headers_or_contextvar(
 
     if session_id and project_id:
         # HTTP transport mode
-        db = _session_registry.get(session_id)
-        if db:
+        context = get_session_registry(SESSION_NAMESPACE).lookup(session_id)
+        if context is not None:
             logger.debug(f"Using HTTP context: session={session_id}, project={project_id}")
-            return db, project_id, max_results
+            return context, project_id, max_results
 
     # Fall back to ContextVar
     try:
         db = _db_context.get()
         project_id = _project_id_context.get()
         logger.debug("Using ContextVar context")
-        return db, project_id, max_results
+        return ({"db": db} if db else None), project_id, max_results
     except LookupError:
         return None, None, max_results
 
@@ -119,9 +122,9 @@ async def search_documents_tool(args: Dict[str, Any]) -> Dict[str, Any]:
     query_text = args.get("query", "")
 
     # Get context from HTTP headers or ContextVar
-    db, project_id, max_results = _get_context_from_headers_or_contextvar(args)
+    context, project_id, max_results = _get_context_from_headers_or_contextvar(args)
 
-    if not db or not project_id:
+    if context is None or not project_id:
         return {
             "content": [{
                 "type": "text",
@@ -129,7 +132,8 @@ async def search_documents_tool(args: Dict[str, Any]) -> Dict[str, Any]:
             }]
         }
 
-    results = await search_documents(db, project_id, query_text)
+    async with open_context_db(context) as db:
+        results = await search_documents(db, project_id, query_text)
 
     if not results:
         return {
@@ -226,9 +230,9 @@ async def save_artifact_tool(args: Dict[str, Any]) -> Dict[str, Any]:
 
     if session_id and thread_id_arg:
         # HTTP transport mode
-        db = _session_registry.get(session_id)
+        context = get_session_registry(SESSION_NAMESPACE).lookup(session_id)
         thread_id = thread_id_arg
-        if not db:
+        if context is None:
             return {
                 "content": [{
                     "type": "text",
@@ -238,7 +242,7 @@ async def save_artifact_tool(args: Dict[str, Any]) -> Dict[str, Any]:
     else:
         # ContextVar mode
         try:
-            db = _db_context.get()
+            context = {"db": _db_context.get()}
             thread_id = _thread_id_context.get()
         except LookupError:
             return {
@@ -260,9 +264,10 @@ async def save_artifact_tool(args: Dict[str, Any]) -> Dict[str, Any]:
         title=args["title"],
         content_markdown=args["content_markdown"]
     )
-    db.add(artifact)
-    await db.commit()
-    await db.refresh(artifact)
+    async with open_context_db(context) as db:
+        db.add(artifact)
+        await db.commit()
+        await db.refresh(artifact)
 
     # Store event data as JSON string in the tool result
     # This will be parsed by the streaming handler
@@ -0,0 +1,151 @@
+"""
+Effective owner of threads, documents and artifacts.
+
+A thread is owned directly (project-less: Thread.user_id) or through its
+project (Project.user_id); documents and artifacts inherit from their
+project or thread. The resolved owner is denormalized into an
+owner_user_id column on Thread, Document and Artifact so authorization is
+a single indexed predicate instead of loading the thread and its project
+(or OR-joining projects in list queries).
+
+The column is maintained by Session flush listeners (registered on import
+by app.database), so every write path sets it: on insert, and when a
+thread moves into a project its documents and artifacts follow.
+"""
+from typing import Any, Dict, Optional, Set
+
+from fastapi import HTTPException, status
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import Artifact, Document, Project, Thread
+
+# Session.info key for IDs of threads whose owner changed in the current flush
+_MOVED_THREADS_KEY = "ownership_moved_threads"
+
+
+def _project_owner(
+    session: Session,
+    project: Optional[Project],
+    project_id: Optional[str],
+    pending: Dict[str, Any],
+) -> Optional[str]:
+    """Owner of a project given either the object or its ID."""
+    if project is None and project_id is not None:
+        # Pending (same flush) first, then identity map / database
+        project = pending.get(project_id) or session.get(Project, project_id)
+    return project.user_id if project is not None else None
+
+
+def _thread_owner(session: Session, thread: Thread, pending: Dict[str, Any]) -> Optional[str]:
+    """Resolve a thread's owner from user_id or its project."""
+    if thread.user_id is not None:
+        return thread.user_id
+    return _project_owner(session, thread.__dict__.get("project"), thread.project_id, pending)
+
+
+def _owner_via_thread(session: Session, obj: Any, pending: Dict[str, Any]) -> Optional[str]:
+    """Owner of a document/artifact inherited from its thread."""
+    thread = obj.__dict__.get("thread")
+    if thread is None and obj.thread_id is not None:
+        thread = pending.get(obj.thread_id) or session.get(Thread, obj.thread_id)
+    return thread.owner_user_id if thread is not None else None
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_owners(session, flush_context, instances):
+    """Set owner_user_id on new rows and on threads whose ownership changed."""
+    with session.no_autoflush:
+        # Pending projects/threads with explicit IDs are not in the identity map yet
+        pending = {
+            obj.id: obj for obj in session.new
+            if isinstance(obj, (Project, Thread)) and obj.id is not None
+        }
+
+        # Threads first: documents/artifacts created with them inherit their owner
+        for obj in session.new:
+            if isinstance(obj, Thread):
+                obj.owner_user_id = _thread_owner(session, obj, pending)
+
+        for obj in session.new:
+            if isinstance(obj, Document):
+                owner = _project_owner(session, obj.__dict__.get("project"), obj.project_id, pending)
+                obj.owner_user_id = owner or _owner_via_thread(session, obj, pending)
+            elif isinstance(obj, Artifact):
+                obj.owner_user_id = _owner_via_thread(session, obj, pending)
+
+        moved: Set[str] = set()
+        for obj in session.dirty:
+            if not isinstance(obj, Thread):
+                continue
+            attrs = inspect(obj).attrs
+            if any(attrs[name].history.has_changes() for name in ("project_id", "project", "user_id")):
+                owner = _thread_owner(session, obj, pending)
+                if owner != obj.owner_user_id:
+                    obj.owner_user_id = owner
+                    moved.add(obj.id)
+        if moved:
+            session.info.setdefault(_MOVED_THREADS_KEY, set()).update(moved)
+
+
+@event.listens_for(Session, "after_flush")
+def _propagate_moved_owners(session, flush_context):
+    """Re-own documents and artifacts of threads that moved to a new owner."""
+    moved = session.info.pop(_MOVED_THREADS_KEY, None)
+    if not moved:
+        return
+
+    threads = Thread.__table__
+    connection = session.connection()
+    for table in (Document.__table__, Artifact.__table__):
+        connection.execute(
+            update(table)
+            .where(table.c.thread_id.in_(moved))
+            .values(owner_user_id=(
+                select(threads.c.owner_user_id)
+                .where(threads.c.id == table.c.thread_id)
+                .scalar_subquery()
+            ))
+        )
+
+    # Keep objects loaded in this session consistent with the rows
+    owners = {
+        obj.id: obj.owner_user_id
+        for obj in session.identity_map.values()
+        if isinstance(obj, Thread) and obj.id in moved
+    }
+    for obj in session.identity_map.values():
+        if isinstance(obj, (Document, Artifact)) and obj.thread_id in owners:
+            set_committed_value(obj, "owner_user_id", owners[obj.thread_id])
+
+
+async def get_owned_thread(
+    db: AsyncSession,
+    thread_id: str,
+    user_id: str,
+    *options: Any,
+) -> Thread:
+    """
+    Load a thread owned by user_id, or raise 404.
+
+    Args:
+        db: Database session
+        thread_id: Thread UUID
+        user_id: Authenticated user's ID
+        options: Loader options for the thread query (e.g., selectinload)
+
+    Raises:
+        HTTPException: 404 if the thread does not exist or belongs to another user
+    """
+    stmt = select(Thread).where(Thread.id == thread_id, Thread.owner_user_id == user_id)
+    if options:
+        stmt = stmt.options(*options)
+    thread = (await db.execute(stmt)).scalar_one_or_none()
+    if thread is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Thread not found"
+        )
+    return thread
@@ -0,0 +1,185 @@
+"""
+In-memory aggregation of database query timings.
+
+The SQLAlchemy cursor listeners in app.database record every statement
+here instead of writing one log line per query. Per (table, operation)
+the collector keeps a count, total/max duration and a latency histogram,
+and periodically flushes them as one structured log line per key.
+
+Statement parsing (operation and table name) is cached per statement
+string: SQLAlchemy reuses compiled SQL strings, so each distinct statement
+is only regex-matched once.
+"""
+import bisect
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+# Upper bounds (ms) of the latency histogram buckets; a final bucket takes the rest
+LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+_BUCKET_LABELS = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + [f"gt_{LATENCY_BUCKETS_MS[-1]}ms"]
+
+# Distinct statement strings whose parse result is cached
+STATEMENT_CACHE_SIZE = 1024
+
+_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+# Matches: FROM/INTO/UPDATE <table_name>
+_TABLE_RE = re.compile(r'(?:FROM|INTO|UPDATE)\s+([a-zA-Z_][a-zA-Z0-9_]*)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def parse_statement(statement: str) -> Optional[Tuple[str, str]]:
+    """
+    Extract (operation, table) from a SQL statement.
+
+    Returns:
+        (operation, table) e.g. ("SELECT", "threads"), with "UNKNOWN" /
+        "unknown" when not recognized; None for PRAGMA statements (SQLite
+        metadata, not tracked)
+    """
+    head = statement.lstrip()[:6].upper()
+    if head == "PRAGMA":
+        return None
+
+    operation = head if head in _OPERATIONS else "UNKNOWN"
+    match = _TABLE_RE.search(statement)
+    table = match.group(1).lower() if match else "unknown"
+    return operation, table
+
+
+class _QueryStats:
+    """Counters for one (table, operation) key."""
+
+    __slots__ = ("count", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "histogram": dict(zip(_BUCKET_LABELS, self.buckets)),
+        }
+
+
+class QueryMetrics:
+    """
+    Aggregates query timings per (table, operation) between flushes.
+
+    Attributes:
+        enabled: False turns record() into a no-op
+        flush_interval: Seconds between flushes; checked on each record()
+            (no timer task), so an idle process simply keeps its counters
+    """
+
+    def __init__(self, enabled: bool = True, flush_interval: float = 60.0):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self._stats: Dict[Tuple[str, str], _QueryStats] = {}
+        self._lock = threading.Lock()  # Sync engines may execute from worker threads
+        self._last_flush = time.monotonic()
+        self.flushes = 0
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        """
+        Add one executed statement.
+
+        Args:
+            statement: SQL string as passed to the cursor
+            duration_ms: Execution time in milliseconds
+        """
+        if not self.enabled:
+            return
+        key = parse_statement(statement)
+        if key is None:
+            return
+        table_operation = (key[1], key[0])
+
+        with self._lock:
+            stats = self._stats.get(table_operation)
+            if stats is None:
+                stats = self._stats[table_operation] = _QueryStats()
+            stats.add(duration_ms)
+
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return current counters keyed by "table.OPERATION"."""
+        with self._lock:
+            return {
+                f"{table}.{operation}": stats.as_dict()
+                for (table, operation), stats in self._stats.items()
+            }
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """
+        Log one line per (table, operation) and reset the counters.
+
+        Returns:
+            The flushed entries (empty if nothing was recorded)
+        """
+        with self._lock:
+            stats, self._stats = self._stats, {}
+            self._last_flush = time.monotonic()
+        if not stats:
+            return []
+
+        self.flushes += 1
+        entries = []
+        from app.services.logging_service import get_logging_service
+        logging_service = get_logging_service()
+        for (table, operation), table_stats in sorted(stats.items()):
+            entry = {"table": table, "operation": operation, **table_stats.as_dict()}
+            entries.append(entry)
+            logging_service.log(
+                'INFO',
+                f'DB {operation} {table} stats',
+                'db',
+                db_event='query_stats',
+                **entry
+            )
+        return entries
+
+    def stats(self) -> Dict[str, Any]:
+        """Return settings and current counters (e.g., for /health)."""
+        return {
+            "enabled": self.enabled,
+            "flush_interval": self.flush_interval,
+            "flushes": self.flushes,
+            "statement_cache": parse_statement.cache_info()._asdict(),
+            "queries": self.snapshot(),
+        }
+
+
+# Module-level singleton (like get_logging_service)
+_query_metrics: Optional[QueryMetrics] = None
+
+
+def get_query_metrics() -> QueryMetrics:
+    """Get the process-wide QueryMetrics collector."""
+    global _query_metrics
+    if _query_metrics is None:
+        _query_metrics = QueryMetrics(
+            enabled=settings.db_query_metrics_enabled,
+            flush_interval=settings.db_query_metrics_flush_seconds,
+        )
+    return _query_metrics
@@ -0,0 +1,272 @@
+"""
+Token -> request context registries for MCP tool callbacks.
+
+Before a CLI/SDK subprocess runs, the request registers its context (thread
+ID, plus its live DB session when the callback is served in-process) under
+a token; the MCP tool resolves the token when the subprocess calls back.
+
+Backends (settings.mcp_session_backend):
+- "memory": per-process dict. Callbacks must reach the worker that
+  registered the token, so only a single worker is supported.
+- "sqlite": a SQLite file shared by every worker on the host. Contexts are
+  stored as JSON (no live objects), so the tool opens its own DB session.
+
+Entries expire after a TTL, so tokens leaked by crashed requests are
+evicted instead of accumulating.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRegistry(ABC):
+    """
+    Token -> context mapping with TTL eviction.
+
+    Attributes:
+        shared: True if entries are visible to other worker processes
+            (contexts must then be JSON-serializable)
+        ttl: Default seconds before an entry expires
+    """
+
+    shared = False
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+    def register(self, token: str, context: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """
+        Store context under token until unregistered or expired.
+
+        Args:
+            token: Unique token handed to the subprocess
+            context: Request context (JSON-serializable for shared backends)
+            ttl: Seconds until expiry (default self.ttl)
+        """
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._put(token, context, expires_at)
+
+    @abstractmethod
+    def _put(self, token: str, context: Dict[str, Any], expires_at: float) -> None:
+        ...
+
+    @abstractmethod
+    def lookup(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the context for token, or None if unknown or expired."""
+
+    @abstractmethod
+    def unregister(self, token: str) -> None:
+        """Remove token (no-op if already removed)."""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Evict expired entries. Returns the number removed."""
+
+    def close(self) -> None:
+        """Release backend resources."""
+
+
+class InMemorySessionRegistry(SessionRegistry):
+    """Per-process registry; may hold live objects such as AsyncSessions."""
+
+    def __init__(self, ttl: float):
+        super().__init__(ttl)
+        self._entries: Dict[str, tuple] = {}  # token -> (expires_at, context)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _put(self, token: str, context: Dict[str, Any], expires_at: float) -> None:
+        self._entries[token] = (expires_at, context)
+        # Opportunistic eviction keeps leaked tokens bounded without a timer
+        self.purge_expired()
+
+    def lookup(self, token: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        expires_at, context = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            return None
+        return context
+
+    def unregister(self, token: str) -> None:
+        self._entries.pop(token, None)
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        expired = [token for token, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for token in expired:
+            del self._entries[token]
+        if expired:
+            logger.info(f"Evicted {len(expired)} expired MCP session tokens")
+        return len(expired)
+
+
+class SQLiteSessionRegistry(SessionRegistry):
+    """
+    Registry in a SQLite file shared by all workers on one host.
+
+    Uses WAL mode so readers never block the registering worker. Each
+    operation is a single indexed statement on a local file (well under a
+    millisecond), so calls run inline rather than in a thread.
+    """
+
+    shared = True
+    PURGE_INTERVAL = 60.0  # Min seconds between opportunistic purges
+
+    def __init__(self, path: str, ttl: float, namespace: str = "default"):
+        """
+        Open (creating if needed) the registry database.
+
+        Args:
+            path: SQLite file path, identical for every worker
+            ttl: Default seconds before an entry expires
+            namespace: Keeps independent registries apart in one file
+        """
+        super().__init__(ttl)
+        self.path = path
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mcp_sessions ("
+            " namespace TEXT NOT NULL,"
+            " token TEXT NOT NULL,"
+            " context TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, token))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_mcp_sessions_expires_at ON mcp_sessions (expires_at)"
+        )
+
+    def _put(self, token: str, context: Dict[str, Any], expires_at: float) -> None:
+        data = json.dumps(context)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO mcp_sessions (namespace, token, context, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (self.namespace, token, data, expires_at),
+            )
+        if time.time() - self._last_purge >= self.PURGE_INTERVAL:
+            self.purge_expired()
+
+    def lookup(self, token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT context FROM mcp_sessions "
+                "WHERE namespace = ? AND token = ? AND expires_at > ?",
+                (self.namespace, token, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def unregister(self, token: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM mcp_sessions WHERE namespace = ? AND token = ?",
+                (self.namespace, token),
+            )
+
+    def purge_expired(self) -> int:
+        self._last_purge = time.time()
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM mcp_sessions WHERE expires_at <= ?", (self._last_purge,)
+            ).rowcount
+        if removed:
+            logger.info(f"Evicted {removed} expired MCP session tokens")
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@asynccontextmanager
+async def open_context_db(context: Dict[str, Any]) -> AsyncIterator[Any]:
+    """
+    Yield the registering request's DB session, or a fresh one.
+
+    In-process contexts carry the live session under "db"; contexts from a
+    shared backend do not, so a new session is opened for the callback.
+    """
+    db = context.get("db")
+    if db is not None:
+        yield db
+        return
+
+    from app.database import get_session_factory
+    async with get_session_factory()() as db:
+        yield db
+
+
+SESSION_DB_FILENAME = "mcp_sessions.db"
+
+
+def session_db_path() -> str:
+    """
+    Absolute path of the shared registry file, the same for every worker.
+
+    Uses settings.mcp_session_db_path when set (relative paths resolve
+    against the backend directory); otherwise the file sits next to the
+    SQLite database, or in the backend directory for other databases.
+    """
+    backend_dir = Path(__file__).resolve().parent.parent.parent
+    if settings.mcp_session_db_path:
+        return str(backend_dir / settings.mcp_session_db_path)
+
+    url = make_url(settings.database_url)
+    if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        return str(Path(url.database).resolve().parent / SESSION_DB_FILENAME)
+    return str(backend_dir / SESSION_DB_FILENAME)
+
+
+# Module-level registries, one per namespace (like get_logging_service)
+_registries: Dict[str, SessionRegistry] = {}
+
+
+def get_session_registry(namespace: str) -> SessionRegistry:
+    """
+    Get the registry for a namespace, using the configured backend.
+
+    Args:
+        namespace: Registry name (e.g., "mcp_server", "mcp_tools")
+    """
+    registry = _registries.get(namespace)
+    if registry is None:
+        ttl = settings.mcp_session_ttl_seconds
+        if settings.mcp_session_backend == "sqlite":
+            registry = SQLiteSessionRegistry(session_db_path(), ttl, namespace=namespace)
+        elif settings.mcp_session_backend == "memory":
+            registry = InMemorySessionRegistry(ttl)
+        else:
+            raise ValueError(
+                f"Unknown MCP session backend: {settings.mcp_session_backend}. "
+                "Supported: memory, sqlite"
+            )
+        _registries[namespace] = registry
+    return registry
+
+
+def close_session_registries() -> None:
+    """Close every registry (app shutdown)."""
+    for registry in _registries.values():
+        registry.close()
+    _registries.clear()
@@ -0,0 +1,196 @@
+"""
+Replay buffers for resumable chat streams.
+
+Each chat response is produced by a background task that writes its SSE
+events into a bounded, per-stream StreamBuffer. The HTTP response only reads
+from the buffer, so a client disconnect no longer aborts generation: the
+answer is still completed and persisted, and a reconnect carrying the
+standard ``Last-Event-ID`` header replays the events it missed instead of
+triggering a new LLM call.
+
+Event IDs have the form ``"<stream_id>:<seq>"``. Buffers are held in the
+worker process that produced the stream, so a resume must be routed back to
+it (sticky routing); the chat route fails closed when the buffer is unknown.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from typing import Any, AsyncGenerator, Deque, Dict, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def parse_event_id(event_id: Optional[str]) -> Optional[Tuple[str, int]]:
+    """
+    Split a ``Last-Event-ID`` value into (stream_id, seq).
+
+    Args:
+        event_id: Header value (may be None or malformed)
+
+    Returns:
+        (stream_id, seq) tuple, or None if the value is not a stream event ID
+    """
+    if not event_id:
+        return None
+    stream_id, sep, seq = event_id.strip().rpartition(":")
+    if not sep or not stream_id or not seq.isdigit():
+        return None
+    return stream_id, int(seq)
+
+
+class StreamBuffer:
+    """
+    Bounded replay buffer for one chat stream.
+
+    Holds the most recent ``max_events`` events (oldest evicted first).
+    Readers subscribe from a sequence number and wait for new events until
+    the stream is closed.
+    """
+
+    def __init__(self, thread_id: str, user_id: str, max_events: int):
+        self.stream_id = uuid.uuid4().hex
+        self.thread_id = thread_id
+        self.user_id = user_id
+        self.done = False
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None  # Producer task (kept referenced)
+        self._events: Deque[Tuple[int, Dict[str, Any]]] = deque(maxlen=max_events)
+        self._next_seq = 1
+        self._changed = asyncio.Event()
+
+    def event_id(self, seq: int) -> str:
+        """Format the SSE event ID for a sequence number."""
+        return f"{self.stream_id}:{seq}"
+
+    def append(self, event: Dict[str, Any]) -> int:
+        """
+        Add an event, tagging it with its SSE ``id``.
+
+        Args:
+            event: SSE event dict (event/data)
+
+        Returns:
+            Sequence number assigned to the event
+        """
+        seq = self._next_seq
+        self._next_seq += 1
+        self._events.append((seq, {**event, "id": self.event_id(seq)}))
+        self._notify()
+        return seq
+
+    def close(self) -> None:
+        """Mark the stream finished (readers drain remaining events and stop)."""
+        if not self.done:
+            self.done = True
+            self.finished_at = time.monotonic()
+            self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def subscribe(self, after_seq: int = 0) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Yield events with sequence numbers greater than after_seq.
+
+        Replays buffered events first, then follows the live stream until it
+        is closed. If the requested position was already evicted, yields an
+        error event instead of silently skipping text.
+
+        Args:
+            after_seq: Last sequence number the client received (0 = start)
+
+        Yields:
+            SSE event dicts with ``id`` set
+        """
+        last_seq = after_seq
+        while True:
+            changed = self._changed
+            if self._events and self._events[0][0] > last_seq + 1:
+                yield {
+                    "event": "error",
+                    "data": '{"message": "Stream history is no longer available. Please reload the conversation."}'
+                }
+                return
+
+            for seq, event in list(self._events):
+                if seq > last_seq:
+                    last_seq = seq
+                    yield event
+
+            if self.done:
+                return
+            await changed.wait()
+
+
+class StreamBufferRegistry:
+    """
+    In-process registry of active and recently finished stream buffers.
+
+    Finished buffers are kept for ``ttl_seconds`` so late reconnects can
+    still replay the tail, then dropped lazily on the next create().
+    """
+
+    def __init__(self, max_events: int, ttl_seconds: float):
+        self.max_events = max_events
+        self.ttl_seconds = ttl_seconds
+        self._buffers: Dict[str, StreamBuffer] = {}
+
+    def create(self, thread_id: str, user_id: str) -> StreamBuffer:
+        """Create and register a buffer for a new stream."""
+        self.prune()
+        buffer = StreamBuffer(thread_id, user_id, self.max_events)
+        self._buffers[buffer.stream_id] = buffer
+        return buffer
+
+    def get(self, stream_id: str) -> Optional[StreamBuffer]:
+        """Return the buffer for a stream ID, or None if unknown/expired."""
+        return self._buffers.get(stream_id)
+
+    def prune(self) -> None:
+        """Drop finished buffers older than the TTL."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [
+            stream_id for stream_id, buffer in self._buffers.items()
+            if buffer.done and buffer.finished_at is not None and buffer.finished_at < cutoff
+        ]
+        for stream_id in expired:
+            del self._buffers[stream_id]
+
+    def clear(self) -> None:
+        """Drop all buffers."""
+        self._buffers.clear()
+
+    async def aclose(self) -> None:
+        """Cancel producer tasks that are still running and drop all buffers."""
+        tasks = [
+            buffer.task for buffer in self._buffers.values()
+            if buffer.task is not None and not buffer.task.done()
+        ]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+
+# Module-level singleton (like get_logging_service)
+_stream_buffers: Optional[StreamBufferRegistry] = None
+
+
+def get_stream_buffers() -> StreamBufferRegistry:
+    """Get the singleton StreamBufferRegistry instance."""
+    global _stream_buffers
+    if _stream_buffers is None:
+        _stream_buffers = StreamBufferRegistry(
+            max_events=settings.stream_buffer_max_events,
+            ttl_seconds=settings.stream_buffer_ttl_seconds,
+        )
+    return _stream_buffers
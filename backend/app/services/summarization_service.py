@@ -1,19 +1,24 @@
 """
-Thread summarization service for AI-generated titles.
+Thread summarization service for AI-generated titles and context compaction.
 
 Generates concise thread titles based on conversation content.
 Updates automatically as conversation progresses.
-import logging
-logger = logging.getLogger(__name__)
+
+Also folds older turns of long threads into a persisted rolling summary
+(Thread.context_summary) so conversation context stays bounded in tokens.
 """
+import logging
 import anthropic
 from typing import List, Dict, Any, Optional
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Thread, Message
 from app.config import settings
 from app.services.token_tracking import track_token_usage
+from app.services.token_counting import CHARS_PER_TOKEN
+from app.services.llm import LLMFactory
 
+logger = logging.getLogger(__name__)
 # Model for summarization (can use faster/cheaper model)
 SUMMARY_MODEL = "claude-sonnet-4-5-20250929"
 
@@ -23,8 +28,14 @@ SUMMARY_INTERVAL = 5
 # Max title length
 MAX_TITLE_LENGTH = 100
 
+# Per-message character cap when folding turns into the context summary
+COMPACTION_MESSAGE_CHARS = 4000
+
 
-def format_messages_for_summary(messages: List[Dict[str, Any]]) -> str:
+def format_messages_for_summary(
+    messages: List[Dict[str, Any]],
+    max_chars: int = 500
+) -> str:
     """Format messages for summary prompt."""
     formatted = []
     for msg in messages:
@@ -32,8 +43,8 @@ def format_messages_for_summary(messages: List[Dict[str, Any]]) -> str:
         content = msg.get("content", "")
         if isinstance(content, str):
             # Truncate long messages
-            if len(content) > 500:
-                content = content[:500] + "..."
+            if len(content) > max_chars:
+                content = content[:max_chars] + "..."
             formatted.append(f"{role.upper()}: {content}")
     return "\n\n".join(formatted)
 
@@ -139,9 +150,10 @@ async def maybe_update_summary(
     msg_dicts = [{"role": m.role, "content": m.content} for m in messages]
 
     # Generate summary
-    client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
-
     try:
+        # Shared client (keep-alive connections reused across requests)
+        client = LLMFactory.get_client("anthropic")
+
         new_title, usage = await generate_thread_summary(
             client,
             msg_dicts,
@@ -168,3 +180,153 @@ async def maybe_update_summary(
         # Log error but don't fail the main request
         logger.error("Summarization failed", exc_info=True)
         return None
+
+
+async def generate_context_summary(
+    client: anthropic.AsyncAnthropic,
+    messages: List[Dict[str, Any]],
+    previous_summary: Optional[str] = None
+) -> tuple[str, dict]:
+    """
+    Fold conversation turns into an updated rolling context summary.
+
+    Args:
+        client: Anthropic client
+        messages: Turns to fold (oldest first)
+        previous_summary: Existing rolling summary (if any)
+
+    Returns:
+        Tuple of (new_summary, usage_dict)
+    """
+    formatted = format_messages_for_summary(messages, max_chars=COMPACTION_MESSAGE_CHARS)
+
+    prompt = f"""You maintain the running summary of a conversation between a user and a Business Analyst AI assistant. The summary replaces older messages in the assistant's context, so anything left out is forgotten.
+
+Update the existing summary with the new messages below. Preserve every discovery fact:
+- Business goals, stakeholders and user roles
+- Requirements, business rules, constraints and acceptance criteria
+- Decisions made and options rejected (with reasons)
+- Open questions and agreed next steps
+
+Be concise and factual. Use short bullet points grouped by topic.
+
+Existing summary:
+{previous_summary or "(none)"}
+
+New messages:
+{formatted}
+
+Return ONLY the updated summary."""
+
+    response = await client.messages.create(
+        model=SUMMARY_MODEL,
+        max_tokens=settings.context_summary_max_tokens,
+        messages=[{"role": "user", "content": prompt}]
+    )
+
+    summary = response.content[0].text.strip()
+
+    usage = {
+        "input_tokens": response.usage.input_tokens,
+        "output_tokens": response.usage.output_tokens
+    }
+
+    return summary, usage
+
+
+async def maybe_compact_context(
+    db: AsyncSession,
+    thread_id: str,
+    user_id: str
+) -> bool:
+    """
+    Fold older turns into the thread's rolling summary if context is too large.
+
+    The decision is made from the database, not this process's context
+    cache (the turn may have been built on another worker): one aggregate
+    over the messages after the thread's summary boundary, so the check
+    stays cheap until the unsummarized turns exceed
+    context_compaction_trigger_tokens. Older turns are then folded until
+    about context_compaction_keep_tokens of recent turns remain verbatim.
+
+    Summaries are generated with the Anthropic API whatever the thread's
+    provider; without an Anthropic key compaction is skipped (truncation
+    still bounds the context).
+
+    Args:
+        db: Database session
+        thread_id: Thread ID
+        user_id: User ID (for token tracking)
+
+    Returns:
+        True if the summary was updated, False otherwise
+    """
+    from app.services.conversation_service import (
+        _load_thread_context,
+        _load_thread_state,
+        get_context_cache,
+    )
+
+    if not settings.anthropic_api_key:
+        return False
+
+    # Get thread
+    stmt = select(Thread).where(Thread.id == thread_id)
+    result = await db.execute(stmt)
+    thread = result.scalar_one_or_none()
+
+    if not thread:
+        return False
+
+    # Tokens not yet folded (stored counts, falling back to the estimate)
+    tokens_stmt = select(func.coalesce(func.sum(func.coalesce(
+        Message.token_count, func.length(Message.content) // CHARS_PER_TOKEN
+    )), 0)).where(Message.thread_id == thread_id)
+    if thread.context_summary_until is not None:
+        tokens_stmt = tokens_stmt.where(Message.created_at > thread.context_summary_until)
+    unsummarized_tokens = (await db.execute(tokens_stmt)).scalar()
+    if unsummarized_tokens <= settings.context_compaction_trigger_tokens:
+        return False
+
+    # Fulfilled artifact pairs are excluded from context, so recheck exactly
+    entry = await _load_thread_context(
+        db, thread_id, await _load_thread_state(db, thread_id)
+    )
+    if entry.total_tokens <= settings.context_compaction_trigger_tokens:
+        return False
+
+    to_fold = entry.compaction_split(settings.context_compaction_keep_tokens)
+    if not to_fold:
+        return False
+
+    try:
+        client = LLMFactory.get_client("anthropic")
+
+        summary, usage = await generate_context_summary(
+            client,
+            [{"role": m.role, "content": m.content} for m in to_fold],
+            entry.summary
+        )
+
+        # Persist summary and fold boundary, then rebuild context on next turn
+        thread.context_summary = summary
+        thread.context_summary_until = to_fold[-1].created_at
+        await db.commit()
+        get_context_cache().invalidate(thread_id)
+
+        # Track token usage for compaction
+        await track_token_usage(
+            db,
+            user_id,
+            SUMMARY_MODEL,
+            usage["input_tokens"],
+            usage["output_tokens"],
+            f"/threads/{thread_id}/compact"
+        )
+
+        return True
+
+    except Exception:
+        # Log error but don't fail the main request (truncation still applies)
+        logger.error("Context compaction failed", exc_info=True)
+        return False
@@ -0,0 +1,193 @@
+"""
+Pluggable offline token counting for context budgeting.
+
+Provides per-provider token counters used to compute a message's token count
+once (at save time) so context assembly can sum stored integers instead of
+re-estimating text on every turn.
+
+The character heuristic (1 token ~= 4 characters) is always available and is
+the fallback for providers without a registered offline tokenizer.
+OpenAI-compatible providers (DeepSeek) use tiktoken's BPE tokenizer.
+
+Anthropic publishes no offline tokenizer for current Claude models (its
+token counting endpoint is a network call per message, too slow for the
+save path, and cl100k undercounts Claude's vocabulary), so Claude providers
+keep the heuristic, calibrated to Anthropic's documented ratio of about 3.5
+English characters per token.
+
+tiktoken downloads its BPE files on first use, so they are cached under
+settings.tiktoken_cache_dir: fetched at build time with
+``python -m app.services.token_counting`` and loaded at startup by
+init_token_counters() in a worker thread, never on the event loop.
+"""
+import asyncio
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough estimate: 1 token ~= 4 characters
+CHARS_PER_TOKEN = 4
+
+# Anthropic's documented average for Claude models
+ANTHROPIC_CHARS_PER_TOKEN = 3.5
+
+
+class TokenCounter(ABC):
+    """Abstract offline token counter."""
+
+    #: Short identifier for logging/diagnostics
+    name: str = "abstract"
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """
+        Count tokens in text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+
+
+class HeuristicTokenCounter(TokenCounter):
+    """Character-based estimate (fallback for every provider)."""
+
+    name = "heuristic"
+
+    def __init__(self, chars_per_token: float = CHARS_PER_TOKEN):
+        self.chars_per_token = chars_per_token
+        if chars_per_token != CHARS_PER_TOKEN:
+            self.name = f"heuristic:{chars_per_token:g}"
+
+    def count(self, text: str) -> int:
+        """Estimate tokens as len(text) // chars_per_token."""
+        return int(len(text) // self.chars_per_token)
+
+
+class TiktokenTokenCounter(TokenCounter):
+    """
+    BPE tokenizer backed by the ``tiktoken`` package.
+
+    Construction loads the encoding from settings.tiktoken_cache_dir
+    (downloading it if the cache is empty), so it blocks; build it via
+    init_token_counters() rather than on the event loop.
+
+    Raises ImportError on construction if tiktoken is not installed.
+    """
+
+    name = "tiktoken"
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        import tiktoken
+
+        # tiktoken reads its cache location from the environment on each load
+        os.environ.setdefault("TIKTOKEN_CACHE_DIR", str(settings.tiktoken_cache_dir_path))
+
+        self._encoding = tiktoken.get_encoding(encoding_name)
+        self.name = f"tiktoken:{encoding_name}"
+
+    def count(self, text: str) -> int:
+        """Count BPE tokens (special-token text is counted as plain text)."""
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+# Built-in offline counters per provider (constructed lazily, may be unavailable)
+_BUILTIN_COUNTERS: Dict[str, Callable[[], TokenCounter]] = {
+    "deepseek": lambda: TiktokenTokenCounter("cl100k_base"),
+    "anthropic": lambda: HeuristicTokenCounter(ANTHROPIC_CHARS_PER_TOKEN),
+    "claude-code-sdk": lambda: HeuristicTokenCounter(ANTHROPIC_CHARS_PER_TOKEN),
+    "claude-code-cli": lambda: HeuristicTokenCounter(ANTHROPIC_CHARS_PER_TOKEN),
+}
+
+_heuristic = HeuristicTokenCounter()
+_counters: Dict[str, TokenCounter] = {}
+
+
+def register_token_counter(provider: str, counter: TokenCounter) -> None:
+    """
+    Register (or replace) the token counter for a provider.
+
+    Args:
+        provider: Provider name (e.g., "anthropic", "google", "deepseek")
+        counter: TokenCounter instance to use for that provider
+    """
+    _counters[provider] = counter
+
+
+def get_token_counter(provider: Optional[str] = None) -> TokenCounter:
+    """
+    Return the token counter for a provider, falling back to the heuristic.
+
+    Built-in counters are constructed on first use (normally already done by
+    init_token_counters() at startup); if construction fails (e.g., tiktoken
+    missing) the heuristic is memoized instead.
+
+    Args:
+        provider: Provider name, or None for the default heuristic
+
+    Returns:
+        TokenCounter for the provider
+    """
+    if not provider:
+        return _heuristic
+
+    counter = _counters.get(provider)
+    if counter is not None:
+        return counter
+
+    factory = _BUILTIN_COUNTERS.get(provider)
+    counter = _heuristic
+    if factory is not None:
+        try:
+            counter = factory()
+        except Exception as e:
+            logger.info(f"Offline tokenizer unavailable for {provider}, using heuristic: {e}")
+
+    _counters[provider] = counter
+    return counter
+
+
+def count_tokens(text: str, provider: Optional[str] = None) -> int:
+    """
+    Count tokens in text with the provider's counter.
+
+    Args:
+        text: Text to count
+        provider: Provider name (None uses the heuristic)
+
+    Returns:
+        Number of tokens
+    """
+    return get_token_counter(provider).count(text or "")
+
+
+async def init_token_counters() -> None:
+    """
+    Construct the built-in counters in a worker thread (application startup).
+
+    Keeps encoding loads (file reads, or a download if the build-time cache
+    is missing) off the event loop; save_message then only counts.
+    """
+    for provider in _BUILTIN_COUNTERS:
+        counter = await asyncio.to_thread(get_token_counter, provider)
+        logger.info(f"Token counter for {provider}: {counter.name}")
+
+
+def reset_token_counters() -> None:
+    """Forget registered and memoized counters (used by tests)."""
+    _counters.clear()
+
+
+if __name__ == "__main__":
+    # Build step: populate settings.tiktoken_cache_dir so workers start offline
+    for _provider, _factory in _BUILTIN_COUNTERS.items():
+        _counter = _factory()
+        if isinstance(_counter, TiktokenTokenCounter):
+            print(f"{_provider}: {_counter.name} cached in {settings.tiktoken_cache_dir_path}")
@@ -13,15 +13,20 @@ from app.models import TokenUsage
 
 # Claude pricing (Claude 4.5 Sonnet)
 # $3/1M input, $15/1M output
+# Prompt cache: writes 1.25x input ($3.75/1M), reads 0.1x input ($0.30/1M)
 PRICING = {
     "claude-sonnet-4-5-20250929": {
         "input": Decimal("3.00"),   # $3 per 1M input tokens
         "output": Decimal("15.00"),  # $15 per 1M output tokens
+        "cache_write": Decimal("3.75"),  # $3.75 per 1M cache write tokens
+        "cache_read": Decimal("0.30"),  # $0.30 per 1M cache read tokens
     },
     # Fallback pricing
     "default": {
         "input": Decimal("3.00"),
         "output": Decimal("15.00"),
+        "cache_write": Decimal("3.75"),
+        "cache_read": Decimal("0.30"),
     }
 }
 
@@ -32,15 +37,19 @@ DEFAULT_MONTHLY_BUDGET = Decimal("50.00")  # $50/month
 def calculate_cost(
     model: str,
     input_tokens: int,
-    output_tokens: int
+    output_tokens: int,
+    cache_creation_tokens: int = 0,
+    cache_read_tokens: int = 0
 ) -> Decimal:
     """
     Calculate cost for token usage.
 
     Args:
         model: Model name
-        input_tokens: Number of input tokens
+        input_tokens: Number of uncached input tokens
         output_tokens: Number of output tokens
+        cache_creation_tokens: Number of input tokens written to the prompt cache
+        cache_read_tokens: Number of input tokens read from the prompt cache
 
     Returns:
         Total cost in USD
@@ -49,8 +58,12 @@ def calculate_cost(
 
     input_cost = (Decimal(input_tokens) / Decimal(1_000_000)) * pricing["input"]
     output_cost = (Decimal(output_tokens) / Decimal(1_000_000)) * pricing["output"]
+    cache_cost = (
+        (Decimal(cache_creation_tokens) / Decimal(1_000_000)) * pricing["cache_write"]
+        + (Decimal(cache_read_tokens) / Decimal(1_000_000)) * pricing["cache_read"]
+    )
 
-    return input_cost + output_cost
+    return input_cost + output_cost + cache_cost
 
 
 async def track_token_usage(
@@ -60,7 +73,9 @@ async def track_token_usage(
     input_tokens: int,
     output_tokens: int,
     endpoint: str,
-    thread_type: str = "ba_assistant"  # New parameter for analytics
+    thread_type: str = "ba_assistant",  # New parameter for analytics
+    cache_creation_tokens: int = 0,
+    cache_read_tokens: int = 0
 ) -> TokenUsage:
     """
     Record token usage for a request.
@@ -69,15 +84,19 @@ async def track_token_usage(
         db: Database session
         user_id: User ID
         model: Model name used
-        input_tokens: Number of input tokens
+        input_tokens: Number of uncached input tokens
         output_tokens: Number of output tokens
         endpoint: API endpoint that used tokens
         thread_type: Type of thread for analytics separation
+        cache_creation_tokens: Input tokens written to the prompt cache
+        cache_read_tokens: Input tokens read from the prompt cache
 
     Returns:
         Created TokenUsage record
     """
-    total_cost = calculate_cost(model, input_tokens, output_tokens)
+    total_cost = calculate_cost(
+        model, input_tokens, output_tokens, cache_creation_tokens, cache_read_tokens
+    )
 
     # Encode thread_type in endpoint for future analytics separation
     # e.g., "/threads/xxx/chat" -> "/threads/xxx/chat [assistant]"
@@ -88,6 +107,8 @@ async def track_token_usage(
         user_id=user_id,
         request_tokens=input_tokens,
         response_tokens=output_tokens,
+        cache_creation_tokens=cache_creation_tokens,
+        cache_read_tokens=cache_read_tokens,
         total_cost=total_cost,
         endpoint=endpoint,
         model=model
@@ -0,0 +1,189 @@
+"""
+In-process work queue for post-stream chat work.
+
+After a chat response finishes streaming, updating the thread summary and
+rolling context summary (which may make further LLM calls) run here instead
+of inline, so the SSE response closes without waiting on them. The assistant
+message and its token usage are saved inline: the queue is in-process, so
+anything that must survive a worker restart does not belong here.
+
+A work item is an ordered list of named steps. Each step runs in its own
+database session on one of a fixed pool of worker tasks. A failed step is
+retried with exponential backoff; retries resume at the failed step, so
+completed steps are never repeated. Pending work is drained on graceful
+shutdown.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (name, coroutine function taking the step's session)
+WorkStep = Tuple[str, Callable[[AsyncSession], Awaitable[Any]]]
+
+
+@dataclass
+class WorkItem:
+    """A unit of queued work: ordered steps plus retry state."""
+    name: str
+    session_factory: Callable[[], AsyncSession]
+    steps: List[WorkStep]
+    next_step: int = 0
+    attempts: int = 0
+
+
+class WorkQueue:
+    """
+    Fixed pool of worker tasks consuming WorkItems from an asyncio queue.
+
+    Workers start lazily on the first submit() and are rebound when the
+    event loop changes (e.g. per-test loops).
+
+    Attributes:
+        completed: Items whose steps all succeeded
+        failed: Items abandoned after max_attempts on a step
+        retries: Step retries performed
+    """
+
+    def __init__(self, workers: int, max_attempts: int, retry_delay: float):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+
+    def __len__(self) -> int:
+        """Number of items waiting or in progress."""
+        return self._pending
+
+    def submit(
+        self,
+        name: str,
+        session_factory: Callable[[], AsyncSession],
+        steps: List[WorkStep]
+    ) -> WorkItem:
+        """
+        Queue steps to run in order in the background.
+
+        Args:
+            name: Description for logs (e.g., "chat:<thread_id>")
+            session_factory: Opens a session per step
+            steps: Ordered (name, coroutine function) pairs
+
+        Returns:
+            The queued WorkItem
+        """
+        item = WorkItem(name=name, session_factory=session_factory, steps=steps)
+        self._ensure_workers()
+        self._queue.put_nowait(item)
+        self._pending += 1
+        return item
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # New event loop: drop queue and workers bound to the old one
+            self._queue = asyncio.Queue()
+            self._tasks = []
+            self._loop = loop
+            self._pending = 0
+
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(loop.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._run(item)
+            except Exception as e:
+                logger.error(f"Work item {item.name} crashed: {e}")
+                self.failed += 1
+            finally:
+                self._pending -= 1
+                self._queue.task_done()
+
+    async def _run(self, item: WorkItem) -> None:
+        """Run an item's remaining steps, retrying the failed step with backoff."""
+        while item.next_step < len(item.steps):
+            step_name, step = item.steps[item.next_step]
+            try:
+                async with item.session_factory() as db:
+                    await step(db)
+            except Exception as e:
+                item.attempts += 1
+                if item.attempts >= self.max_attempts:
+                    logger.error(
+                        f"Work item {item.name} step {step_name} failed after "
+                        f"{item.attempts} attempts: {e}"
+                    )
+                    self.failed += 1
+                    return
+
+                delay = self.retry_delay * 2 ** (item.attempts - 1)
+                logger.warning(
+                    f"Work item {item.name} step {step_name} failed "
+                    f"(attempt {item.attempts}), retrying in {delay:.1f}s: {e}"
+                )
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+
+            item.next_step += 1
+            item.attempts = 0
+
+        self.completed += 1
+
+    async def join(self) -> None:
+        """Wait until all submitted items have finished."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def aclose(self, timeout: Optional[float] = None) -> None:
+        """
+        Drain pending work (up to timeout seconds), then stop the workers.
+
+        Args:
+            timeout: Max seconds to wait for pending items (None waits forever)
+        """
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {len(self)} unfinished post-stream work items on shutdown")
+
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._loop = None
+        self._pending = 0
+
+
+# Module-level singleton (like get_logging_service)
+_work_queue: Optional[WorkQueue] = None
+
+
+def get_work_queue() -> WorkQueue:
+    """Get the singleton WorkQueue instance."""
+    global _work_queue
+    if _work_queue is None:
+        _work_queue = WorkQueue(
+            workers=settings.post_stream_workers,
+            max_attempts=settings.post_stream_max_attempts,
+            retry_delay=settings.post_stream_retry_delay_seconds,
+        )
+    return _work_queue
@@ -4,7 +4,7 @@ JWT token utilities for authentication.
 Provides JWT creation, verification, and FastAPI dependency injection for protected routes.
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
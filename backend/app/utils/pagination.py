@@ -0,0 +1,154 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Lists are ordered newest first by (sort column, id). A cursor encodes the
+(sort value, id) of the last row of a page; the next page is the rows
+strictly after it in that order. With an index on (..., sort column, id)
+the database seeks straight to the cursor, so every page costs the same
+regardless of depth (OFFSET has to step over every skipped row).
+"""
+
+import base64
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, or_
+
+from app.config import settings
+
+# Response header carrying the next page's cursor for endpoints returning bare arrays
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, row_id: str) -> str:
+    """
+    Encode the position of a row as an opaque URL-safe cursor.
+
+    Args:
+        sort_value: Row's sort column value (e.g., last_activity_at)
+        row_id: Row's primary key (tie-breaker for equal sort values)
+    """
+    payload = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def paginate_keyset(
+    stmt: Select,
+    sort_column: Any,
+    id_column: Any,
+    cursor: Optional[str],
+    limit: Optional[int],
+) -> Select:
+    """
+    Order a query newest first and restrict it to the page after cursor.
+
+    Fetches one extra row so split_page can tell whether more rows follow
+    without a COUNT query.
+
+    Args:
+        stmt: Filtered select
+        sort_column: Column to sort by (descending)
+        id_column: Unique tie-breaker column (descending)
+        cursor: Cursor of the previous page's last row (None for first page)
+        limit: Page size (None for all remaining rows)
+    """
+    stmt = stmt.order_by(sort_column.desc(), id_column.desc())
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        # The leading range condition lets the index seek to the cursor
+        stmt = stmt.where(
+            sort_column <= sort_value,
+            or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < row_id)),
+        )
+    if limit is None:
+        return stmt
+    return stmt.limit(limit + 1)
+
+
+def split_page(
+    rows: Sequence[Any], limit: Optional[int], sort_attr: str
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim the extra row fetched by paginate_keyset and build the next cursor.
+
+    Args:
+        rows: Result rows (at most limit + 1)
+        limit: Page size (None: rows are the complete remainder)
+        sort_attr: Attribute name of the sort column on each row
+
+    Returns:
+        (page rows, next cursor or None on the last page)
+    """
+    if limit is None or len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    last = page[-1]
+    return page, encode_cursor(getattr(last, sort_attr), last.id)
+
+
+class CountCache:
+    """
+    Short-lived cache of list totals.
+
+    Totals are recomputed on a list's first page and reused for the
+    following pages, so walking deep into a list does not re-run COUNT(*)
+    for every page; totals may lag writes by up to ttl seconds.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, int]] = {}
+
+    def get(self, key: Hashable) -> Optional[int]:
+        """Return a cached total, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, total = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return total
+
+    def set(self, key: Hashable, total: int) -> None:
+        """Cache a total for ttl seconds."""
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()  # Bounded memory; totals are cheap to recompute
+        self._entries[key] = (time.monotonic() + self.ttl, total)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Module-level singleton (like get_logging_service)
+_count_cache: Optional[CountCache] = None
+
+
+def get_count_cache() -> CountCache:
+    """Get the process-wide list total cache."""
+    global _count_cache
+    if _count_cache is None:
+        _count_cache = CountCache(ttl=settings.pagination_total_cache_ttl_seconds)
+    return _count_cache
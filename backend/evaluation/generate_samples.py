@@ -101,7 +101,7 @@ async def generate_brd_sample(
         response_text = ""
         async for event in ai_service.stream_chat(messages, project_id, thread_id, db):
             if event["event"] == "text_delta":
-                response_text += json.loads(event["data"])["text"]
+                response_text += event["data"]["text"]
             elif event["event"] == "message_complete":
                 data = json.loads(event["data"])
                 usage = data.get("usage", {})
@@ -15,7 +15,9 @@ from app.config import settings
 from app.database import close_db, init_db
 from app.middleware import LoggingMiddleware
 from app.mcp_server import mcp_app
-from app.routes import artifacts, auth, conversations, documents, logs, projects, skills, threads
+from app.routes import (
+    artifacts, auth, conversations, documents, logs, metrics, projects, skills, threads
+)
 from app.services.logging_service import get_logging_service
 
 logger = logging.getLogger(__name__)
@@ -27,13 +29,20 @@ async def lifespan(app: FastAPI):
     Application lifespan manager.
 
     Handles startup and shutdown events:
-    - Startup: Initialize database connection, pre-warm Claude CLI process pool
-    - Shutdown: Shutdown process pool, close database connection, cleanup logging
+    - Startup: Initialize database connection, load offline tokenizers,
+      pre-warm Claude CLI process pool
+    - Shutdown: Cancel background chat streams, drain post-stream work queue,
+      shutdown process pool, close LLM clients, close database connection,
+      cleanup logging
     """
     # Startup: Initialize database
     await init_db()
     print("Database initialized")
 
+    # Startup: Load offline tokenizers off the event loop (cached at build time)
+    from app.services.token_counting import init_token_counters
+    await init_token_counters()
+
     # Startup: Initialize Claude CLI process pool (conditional on CLI availability)
     cli_path = shutil.which("claude")
     if cli_path:
@@ -45,11 +54,30 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    # Shutdown: Cancel chat generations still running in the background
+    from app.services.stream_buffer import get_stream_buffers
+    await get_stream_buffers().aclose()
+    print("Chat stream buffers closed")
+
+    # Shutdown: Finish queued post-stream work (needs the database)
+    from app.services.work_queue import get_work_queue
+    await get_work_queue().aclose(timeout=settings.post_stream_shutdown_timeout_seconds)
+    print("Post-stream work queue drained")
+
     # Shutdown: Stop Claude CLI process pool before closing database
     from app.services.llm.claude_cli_adapter import shutdown_process_pool
     await shutdown_process_pool()
     print("Claude CLI process pool shutdown")
 
+    # Shutdown: Close MCP session registries
+    from app.services.session_registry import close_session_registries
+    close_session_registries()
+
+    # Shutdown: Close shared LLM SDK clients (keep-alive connection pools)
+    from app.services.llm import LLMFactory
+    await LLMFactory.aclose()
+    print("LLM clients closed")
+
     # Shutdown: Cleanup database
     await close_db()
     print("Database connection closed")
@@ -97,6 +125,7 @@ app.include_router(conversations.router, prefix="/api", tags=["Conversations"])
 app.include_router(artifacts.router, prefix="/api", tags=["Artifacts"])
 app.include_router(skills.router, prefix="/api", tags=["Skills"])
 app.include_router(logs.router)
+app.include_router(metrics.router)
 
 # Mount FastMCP server at /mcp — Claude CLI subprocesses connect here via --mcp-config.
 # MUST be at module level (not inside lifespan) so routes are registered before process pool
@@ -125,6 +154,7 @@ async def health_check():
     Health check endpoint for deployment verification.
 
     Used by PaaS platforms (Railway/Render) to verify service is running.
+    Runtime metrics are served to admins from /api/metrics.
     """
     return {
         "status": "healthy",
@@ -4,8 +4,12 @@ import pytest
 import pytest_asyncio
 from uuid import uuid4
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from app.database import get_db
+from app.database import get_db, get_session_factory
+from app.services.stream_buffer import get_stream_buffers
+from app.services.work_queue import get_work_queue
 from app.models import User, OAuthProvider
 from app.utils.jwt import create_access_token
 from main import app
@@ -36,6 +40,10 @@ async def authenticated_client(db_session):
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    # Background chat generation opens its own sessions on the test engine
+    app.dependency_overrides[get_session_factory] = lambda: sessionmaker(
+        db_session.bind, class_=AsyncSession, expire_on_commit=False
+    )
 
     async with AsyncClient(
         transport=ASGITransport(app=app),
@@ -46,6 +54,8 @@ async def authenticated_client(db_session):
         ac.test_user = user
         yield ac
 
+    await get_stream_buffers().aclose()
+    await get_work_queue().aclose()
     app.dependency_overrides.clear()
 
 
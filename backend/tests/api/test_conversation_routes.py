@@ -10,12 +10,13 @@ Coverage:
 
 import json
 from datetime import datetime
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 import pytest
+from sqlalchemy import select
 
-from app.models import Message, OAuthProvider, Project, Thread, User
+from app.models import Message, OAuthProvider, Project, Thread, TokenUsage, User
 from app.utils.jwt import create_access_token
 
 
@@ -79,6 +80,177 @@ class TestStreamChat:
                         assert response.status_code == 200
                         assert "text/event-stream" in response.headers.get("content-type", "")
 
+    @pytest.mark.asyncio
+    async def test_last_event_id_resumes_without_new_generation(self, client, db_session):
+        """Reconnect with Last-Event-ID replays buffered events (budget not rechecked)."""
+        user = User(
+            id=str(uuid4()),
+            email="test@example.com",
+            oauth_provider=OAuthProvider.GOOGLE,
+            oauth_id="google_123",
+        )
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(
+            id=str(uuid4()),
+            user_id=user.id,
+            title="Test Thread",
+            model_provider="anthropic",
+            last_activity_at=datetime.utcnow(),
+        )
+        db_session.add(thread)
+        await db_session.commit()
+
+        token = create_access_token(user.id, user.email)
+        calls = []
+
+        async def mock_stream(*args, **kwargs):
+            calls.append(args)
+            yield {"event": "text_delta", "data": {"text": "Hello"}}
+            yield {"event": "text_delta", "data": {"text": " world"}}
+            yield {"event": "message_complete", "data": json.dumps({
+                "content": "Hello world",
+                "usage": {"input_tokens": 10, "output_tokens": 5}
+            })}
+
+        def parse_sse(text):
+            return [
+                dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+                for block in text.replace("\r\n", "\n").split("\n\n") if block.strip()
+            ]
+
+        with patch('app.routes.conversations.AIService') as MockAI:
+            MockAI.return_value.stream_chat = mock_stream
+            with patch('app.routes.conversations.check_user_budget', return_value=True) as budget, \
+                 patch('app.routes.conversations.maybe_update_summary', new_callable=AsyncMock), \
+                 patch('app.routes.conversations.maybe_compact_context', new_callable=AsyncMock):
+                first = await client.post(
+                    f"/api/threads/{thread.id}/chat",
+                    headers={"Authorization": f"Bearer {token}"},
+                    json={"content": "Hi", "delta_flush_ms": 0}
+                )
+                events = [e for e in parse_sse(first.text) if "id" in e]
+                assert [e["event"] for e in events] == [
+                    "text_delta", "text_delta", "message_complete"
+                ]
+
+                # The finished turn may push the user over budget; resuming it is free
+                budget.return_value = False
+                resumed = await client.post(
+                    f"/api/threads/{thread.id}/chat",
+                    headers={
+                        "Authorization": f"Bearer {token}",
+                        "Last-Event-ID": events[0]["id"],
+                    },
+                    json={"content": "Hi", "delta_flush_ms": 0}
+                )
+
+        replayed = [e for e in parse_sse(resumed.text) if "id" in e]
+        assert [e["id"] for e in replayed] == [e["id"] for e in events[1:]]
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_assistant_message_saved_inline_side_work_queued(self, client, db_session):
+        """The answer and its usage are committed with the stream; only summaries are queued."""
+        user = User(
+            id=str(uuid4()),
+            email="test@example.com",
+            oauth_provider=OAuthProvider.GOOGLE,
+            oauth_id="google_123",
+        )
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(
+            id=str(uuid4()),
+            user_id=user.id,
+            title="Test Thread",
+            model_provider="anthropic",
+            last_activity_at=datetime.utcnow(),
+        )
+        db_session.add(thread)
+        await db_session.commit()
+
+        token = create_access_token(user.id, user.email)
+
+        async def mock_stream(*args, **kwargs):
+            yield {"event": "text_delta", "data": {"text": "Saved answer"}}
+            yield {"event": "message_complete", "data": json.dumps({
+                "content": "Saved answer",
+                "usage": {"input_tokens": 10, "output_tokens": 5}
+            })}
+
+        queue = MagicMock()
+        with patch('app.routes.conversations.AIService') as MockAI, \
+             patch('app.routes.conversations.check_user_budget', return_value=True), \
+             patch('app.routes.conversations.get_work_queue', return_value=queue):
+            MockAI.return_value.stream_chat = mock_stream
+            response = await client.post(
+                f"/api/threads/{thread.id}/chat",
+                headers={"Authorization": f"Bearer {token}"},
+                json={"content": "Hi"}
+            )
+
+        assert "event: message_complete" in response.text
+        saved = await db_session.execute(
+            select(Message.role, Message.content)
+            .where(Message.thread_id == thread.id)
+            .order_by(Message.created_at)
+        )
+        assert [tuple(row) for row in saved] == [("user", "Hi"), ("assistant", "Saved answer")]
+        queued = [call.args[2][0][0] for call in queue.submit.call_args_list]
+        assert queued == ["update_summary", "compact_context"]
+        usage = await db_session.execute(
+            select(TokenUsage.request_tokens, TokenUsage.response_tokens)
+            .where(TokenUsage.user_id == user.id)
+        )
+        assert [tuple(row) for row in usage] == [(10, 5)]
+
+    @pytest.mark.asyncio
+    async def test_unknown_last_event_id_fails_closed(self, client, db_session):
+        """Reconnect whose buffer is not in this worker neither saves nor generates."""
+        user = User(
+            id=str(uuid4()),
+            email="test@example.com",
+            oauth_provider=OAuthProvider.GOOGLE,
+            oauth_id="google_123",
+        )
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(
+            id=str(uuid4()),
+            user_id=user.id,
+            title="Test Thread",
+            model_provider="anthropic",
+            last_activity_at=datetime.utcnow(),
+        )
+        db_session.add(thread)
+        await db_session.commit()
+
+        token = create_access_token(user.id, user.email)
+
+        with patch('app.routes.conversations.AIService') as MockAI, \
+             patch('app.routes.conversations.check_user_budget', return_value=True):
+            response = await client.post(
+                f"/api/threads/{thread.id}/chat",
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Last-Event-ID": "0123456789abcdef:3",
+                },
+                json={"content": "Hi"}
+            )
+
+        assert response.status_code == 200
+        assert "event: error" in response.text
+        assert "stream_unavailable" in response.text
+        MockAI.assert_not_called()
+        saved = await db_session.execute(
+            select(Message).where(Message.thread_id == thread.id)
+        )
+        assert saved.scalars().all() == []
+
     @pytest.mark.asyncio
     async def test_403_without_auth(self, client, db_session):
         """Returns 403 without authentication token."""
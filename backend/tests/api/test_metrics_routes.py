@@ -0,0 +1,64 @@
+"""Contract tests for the runtime metrics endpoint.
+
+Coverage:
+- GET /api/metrics (admin only)
+- GET /health (liveness only, no metrics)
+"""
+
+from uuid import uuid4
+
+import pytest
+
+from app.models import OAuthProvider, User
+from app.utils.jwt import create_access_token
+
+
+async def _user(db_session, is_admin):
+    user = User(
+        id=str(uuid4()),
+        email=f"{uuid4().hex[:8]}@example.com",
+        oauth_provider=OAuthProvider.GOOGLE,
+        oauth_id=f"google_{uuid4().hex[:8]}",
+        is_admin=is_admin,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    return {"Authorization": f"Bearer {create_access_token(user.id, user.email)}"}
+
+
+class TestMetrics:
+    """Contract tests for GET /api/metrics."""
+
+    @pytest.mark.asyncio
+    async def test_200_for_admin(self, client, db_session):
+        """Admins get pool, admission and query metrics."""
+        headers = await _user(db_session, is_admin=True)
+
+        response = await client.get("/api/metrics", headers=headers)
+
+        assert response.status_code == 200
+        assert {"process_pools", "cli_admission", "db_queries"} <= set(response.json())
+
+    @pytest.mark.asyncio
+    async def test_403_for_non_admin(self, client, db_session):
+        """Regular users cannot read runtime metrics."""
+        headers = await _user(db_session, is_admin=False)
+
+        response = await client.get("/api/metrics", headers=headers)
+
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_rejects_unauthenticated(self, client, db_session):
+        """Requests without a token are rejected."""
+        response = await client.get("/api/metrics")
+
+        assert response.status_code in (401, 403)
+
+    @pytest.mark.asyncio
+    async def test_health_exposes_no_metrics(self, client, db_session):
+        """The unauthenticated liveness check carries no runtime metrics."""
+        response = await client.get("/health")
+
+        assert response.status_code == 200
+        assert set(response.json()) == {"status", "database", "version"}
@@ -18,7 +18,7 @@ from uuid import uuid4
 
 import pytest
 
-from app.models import Message, OAuthProvider, Project, Thread, User
+from app.models import Artifact, ArtifactType, Message, OAuthProvider, Project, Thread, User
 from app.utils.jwt import create_access_token
 
 
@@ -210,6 +210,46 @@ class TestListAllThreads:
         assert "has_more" in data
         assert len(data["threads"]) >= 1
 
+    @pytest.mark.asyncio
+    async def test_counters_from_thread_columns(self, client, db_session):
+        """message_count, artifact_count and preview come from the thread row."""
+        user = User(
+            id=str(uuid4()),
+            email="test@example.com",
+            oauth_provider=OAuthProvider.GOOGLE,
+            oauth_id="google_123",
+        )
+        db_session.add(user)
+        thread = Thread(
+            id=str(uuid4()),
+            user_id=user.id,
+            title="Test Thread",
+            last_activity_at=datetime.utcnow(),
+        )
+        db_session.add(thread)
+        await db_session.commit()
+        db_session.add_all([
+            Message(id=str(uuid4()), thread_id=thread.id, role="user", content="Hello"),
+            Artifact(
+                thread_id=thread.id,
+                artifact_type=ArtifactType.BRD,
+                title="BRD",
+                content_markdown="# BRD",
+            ),
+        ])
+        await db_session.commit()
+
+        token = create_access_token(user.id, user.email)
+        response = await client.get(
+            "/api/threads",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 200
+        item = response.json()["threads"][0]
+        assert (item["message_count"], item["artifact_count"]) == (1, 1)
+        assert item["last_message_preview"] == "Hello"
+
     @pytest.mark.asyncio
     async def test_403_without_auth(self, client, db_session):
         """Returns 403 without authentication token."""
@@ -255,6 +295,51 @@ class TestListAllThreads:
         assert data["page_size"] == 2
         assert len(data["threads"]) == 2
 
+    @pytest.mark.asyncio
+    async def test_cursor_pagination(self, client, db_session):
+        """next_cursor walks every thread once; cursor pages reuse the total."""
+        user = User(
+            id=str(uuid4()),
+            email="test@example.com",
+            oauth_provider=OAuthProvider.GOOGLE,
+            oauth_id="google_123",
+        )
+        db_session.add(user)
+        activity = datetime.utcnow()
+        db_session.add_all([
+            Thread(
+                id=str(uuid4()),
+                user_id=user.id,
+                title=f"Thread {i}",
+                last_activity_at=activity + timedelta(seconds=i // 2),  # Ties on purpose
+            )
+            for i in range(5)
+        ])
+        await db_session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(user.id, user.email)}"}
+
+        first = (await client.get("/api/threads?page_size=2", headers=headers)).json()
+        assert first["total"] == 5 and first["has_more"] is True
+
+        ids = [t["id"] for t in first["threads"]]
+        cursor = first["next_cursor"]
+        while cursor:
+            data = (await client.get(
+                f"/api/threads?page_size=2&cursor={cursor}", headers=headers
+            )).json()
+            assert data["total"] == 5
+            ids.extend(t["id"] for t in data["threads"])
+            cursor = data["next_cursor"]
+
+        assert len(ids) == len(set(ids)) == 5
+        assert data["has_more"] is False
+
+        response = await client.get("/api/threads?cursor=garbage", headers=headers)
+        assert response.status_code == 400
+
+        no_total = (await client.get("/api/threads?include_total=false", headers=headers)).json()
+        assert no_total["total"] is None
+
     @pytest.mark.asyncio
     async def test_response_schema(self, client, db_session):
         """Response has required fields for paginated response."""
@@ -515,6 +600,41 @@ class TestListProjectThreads:
         assert "message_count" in data[0]
         assert data[0]["message_count"] == 3
 
+    @pytest.mark.asyncio
+    async def test_limit_sets_next_cursor_header(self, client, db_session):
+        """With limit, one page is returned and X-Next-Cursor points to the next."""
+        user = User(
+            id=str(uuid4()),
+            email="test@example.com",
+            oauth_provider=OAuthProvider.GOOGLE,
+            oauth_id="google_123",
+        )
+        db_session.add(user)
+        await db_session.commit()
+
+        project = Project(id=str(uuid4()), user_id=user.id, name="Test Project")
+        db_session.add(project)
+        await db_session.commit()
+
+        db_session.add_all([
+            Thread(id=str(uuid4()), project_id=project.id, title=f"Thread {i}")
+            for i in range(3)
+        ])
+        await db_session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(user.id, user.email)}"}
+        url = f"/api/projects/{project.id}/threads"
+
+        first = await client.get(f"{url}?limit=2", headers=headers)
+        second = await client.get(
+            f"{url}?limit=2&cursor={first.headers['X-Next-Cursor']}", headers=headers
+        )
+        everything = await client.get(url, headers=headers)
+
+        assert len(first.json()) == 2
+        assert len(second.json()) == 1
+        assert "X-Next-Cursor" not in second.headers
+        assert [t["id"] for t in first.json() + second.json()] == [t["id"] for t in everything.json()]
+
 
 class TestGetThread:
     """Contract tests for GET /api/threads/{id}."""
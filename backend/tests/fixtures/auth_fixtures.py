@@ -3,8 +3,12 @@
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from app.database import get_db
+from app.database import get_db, get_session_factory
+from app.services.stream_buffer import get_stream_buffers
+from app.services.work_queue import get_work_queue
 from main import app
 
 
@@ -16,12 +20,18 @@ async def client(db_session):
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    # Background chat generation opens its own sessions on the test engine
+    app.dependency_overrides[get_session_factory] = lambda: sessionmaker(
+        db_session.bind, class_=AsyncSession, expire_on_commit=False
+    )
 
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url="http://test"
     ) as ac:
         yield ac
 
+    await get_stream_buffers().aclose()
+    await get_work_queue().aclose()
     app.dependency_overrides.clear()
 
 
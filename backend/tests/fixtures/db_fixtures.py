@@ -66,3 +66,33 @@ async def db_session(db_engine):
 
     async with async_session_maker() as session:
         yield session
+
+
+@pytest.fixture(autouse=True)
+def reset_context_cache():
+    """Clear the conversation context cache (each test gets a fresh database)."""
+    from app.services.conversation_service import get_context_cache
+
+    get_context_cache().clear()
+    yield
+    get_context_cache().clear()
+
+
+@pytest.fixture
+def quiet_root_logger():
+    """
+    Raise the root logger to WARNING for DB benchmarks.
+
+    Once LoggingService is set up the root logger is at DEBUG and aiosqlite
+    logs every operation with its parameters; keep that out of timings.
+    """
+    import logging
+
+    from app.services.logging_service import get_logging_service
+
+    get_logging_service()  # Set up first: it lowers the root logger to DEBUG
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(logging.WARNING)
+    yield
+    root.setLevel(level)
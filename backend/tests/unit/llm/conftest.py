@@ -43,6 +43,10 @@ def mock_anthropic_stream():
         mock_final.usage = MagicMock()
         mock_final.usage.input_tokens = (usage or {}).get("input_tokens", 10)
         mock_final.usage.output_tokens = (usage or {}).get("output_tokens", 5)
+        # Prompt cache counters only when the test provides them
+        for key in ("cache_creation_input_tokens", "cache_read_input_tokens"):
+            if key in (usage or {}):
+                setattr(mock_final.usage, key, usage[key])
         mock_stream.get_final_message = AsyncMock(return_value=mock_final)
 
         return mock_stream
@@ -0,0 +1,145 @@
+"""Unit tests for CLI admission control (global limit + per-user fair queue)."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.config import settings
+from app.services.llm import admission as admission_module
+from app.services.llm.admission import FairAdmissionQueue, get_cli_admission
+from app.services.llm.claude_cli_adapter import ClaudeCLIAdapter
+
+
+class TestFairAdmissionQueue:
+    """Tests for FairAdmissionQueue grant order, positions and metrics."""
+
+    @pytest.mark.asyncio
+    async def test_grants_immediately_under_limit(self):
+        admission = FairAdmissionQueue(limit=2)
+
+        first = admission.enqueue("alice")
+        second = admission.enqueue("alice")
+        third = admission.enqueue("alice")
+
+        assert first.granted and second.granted
+        assert not third.granted
+        assert admission.active == 2
+        assert admission.depth == 1
+
+    @pytest.mark.asyncio
+    async def test_round_robin_across_users_fifo_within_user(self):
+        admission = FairAdmissionQueue(limit=1)
+        running = admission.enqueue("alice")
+
+        a1 = admission.enqueue("alice")
+        a2 = admission.enqueue("alice")
+        a3 = admission.enqueue("alice")
+        b1 = admission.enqueue("bob")
+        b2 = admission.enqueue("bob")
+
+        assert [admission.position(t) for t in (a1, a2, a3, b1, b2)] == [1, 3, 5, 2, 4]
+
+        order = []
+        current = running
+        for _ in range(5):
+            admission.leave(current)
+            current = next(t for t in (a1, a2, a3, b1, b2) if t.granted and not t.released)
+            order.append(current)
+
+        assert order == [a1, b1, a2, b2, a3]
+
+    @pytest.mark.asyncio
+    async def test_leave_withdraws_waiting_ticket(self):
+        admission = FairAdmissionQueue(limit=1)
+        running = admission.enqueue("alice")
+        waiting = admission.enqueue("bob")
+
+        admission.leave(waiting)
+        admission.leave(waiting)  # Idempotent
+
+        assert admission.depth == 0
+        assert admission.active == 1
+        admission.leave(running)
+        assert admission.active == 0
+
+    @pytest.mark.asyncio
+    async def test_changed_event_wakes_waiters_and_records_wait_time(self):
+        admission = FairAdmissionQueue(limit=1)
+        running = admission.enqueue("alice")
+        waiting = admission.enqueue("bob")
+
+        async def wait_for_grant():
+            while True:
+                changed = admission.changed
+                if waiting.granted:
+                    return
+                await changed.wait()
+
+        waiter = asyncio.create_task(wait_for_grant())
+        await asyncio.sleep(0.01)
+        admission.leave(running)
+        await asyncio.wait_for(waiter, timeout=1)
+
+        stats = admission.stats()
+        assert stats["queued_admissions"] == 1
+        assert stats["max_queued"] == 1
+        assert stats["avg_wait_ms"] >= 10
+
+
+class TestGetCliAdmission:
+    """The host-wide CLI limit is split across worker processes."""
+
+    @pytest.mark.parametrize("workers, expected", [(1, 4), (2, 2), (4, 1), (8, 1)])
+    def test_limit_is_per_worker_share(self, monkeypatch, workers, expected):
+        monkeypatch.setattr(settings, "claude_cli_max_concurrency", 4)
+        monkeypatch.setattr(settings, "web_concurrency", workers)
+        monkeypatch.setattr(admission_module, "_cli_admission", None)
+
+        assert get_cli_admission().limit == expected
+
+
+class TestCLIAdapterAdmission:
+    """Tests for admission control in ClaudeCLIAdapter.stream_chat."""
+
+    @pytest.mark.asyncio
+    @patch('app.services.llm.claude_cli_adapter.get_process_pool')
+    @patch('app.services.llm.claude_cli_adapter.shutil.which', return_value='/usr/bin/claude')
+    async def test_yields_queued_position_until_admitted(self, mock_which, mock_get_pool):
+        admission = FairAdmissionQueue(limit=1)
+        holder = admission.enqueue("other-user")
+
+        async def stdout():
+            yield b'{"type": "result", "subtype": "success", "usage": {"input_tokens": 1, "output_tokens": 1}}\n'
+
+        process = MagicMock()
+        process.returncode = 0
+        process.wait = AsyncMock(return_value=0)
+        process.stdin = MagicMock()
+        process.stdin.drain = AsyncMock()
+        process.stdin.wait_closed = AsyncMock()
+        process.stdout = stdout()
+        pool = MagicMock()
+        pool.acquire = AsyncMock(return_value=process)
+        mock_get_pool.return_value = pool
+
+        adapter = ClaudeCLIAdapter(api_key="test-key")
+        adapter.set_context(MagicMock(), "proj-1", "thread-1")
+        adapter.set_user("user-1")
+
+        with patch('app.services.llm.claude_cli_adapter.get_cli_admission', return_value=admission):
+            stream = adapter.stream_chat(
+                messages=[{"role": "user", "content": "Hi"}],
+                system_prompt=""
+            )
+            first = await stream.__anext__()
+            assert first.chunk_type == "queued"
+            assert first.metadata == {"position": 1, "queue_depth": 1}
+            pool.acquire.assert_not_called()
+
+            admission.leave(holder)
+            chunks = [chunk async for chunk in stream]
+
+        assert chunks[-1].chunk_type == "complete"
+        pool.acquire.assert_called_once()
+        assert admission.active == 0
@@ -148,7 +148,7 @@ class TestAnthropicAdapterStreamChat:
             mock_client = MockClient.return_value
             mock_client.messages.stream.return_value = mock_stream
 
-            adapter = AnthropicAdapter(api_key="test-key")
+            adapter = AnthropicAdapter(api_key="test-key", prompt_caching=False)
 
             messages = [
                 {"role": "user", "content": "Hello"},
@@ -177,7 +177,7 @@ class TestAnthropicAdapterStreamChat:
             mock_client = MockClient.return_value
             mock_client.messages.stream.return_value = mock_stream
 
-            adapter = AnthropicAdapter(api_key="test-key")
+            adapter = AnthropicAdapter(api_key="test-key", prompt_caching=False)
 
             chunks = []
             async for chunk in adapter.stream_chat(
@@ -198,7 +198,7 @@ class TestAnthropicAdapterStreamChat:
             mock_client = MockClient.return_value
             mock_client.messages.stream.return_value = mock_stream
 
-            adapter = AnthropicAdapter(api_key="test-key")
+            adapter = AnthropicAdapter(api_key="test-key", prompt_caching=False)
 
             tools = [{
                 "name": "save_artifact",
@@ -323,3 +323,125 @@ class TestAnthropicAdapterStreamChat:
 
             call_kwargs = mock_client.messages.stream.call_args[1]
             assert call_kwargs["model"] == "claude-opus-4-20250514"
+
+
+class TestAnthropicAdapterPromptCaching:
+    """Tests for prompt caching breakpoints and cache usage reporting."""
+
+    @pytest.mark.asyncio
+    async def test_marks_system_prompt_cacheable(self, mock_anthropic_stream):
+        """System prompt is sent as a cacheable text block."""
+        mock_stream = mock_anthropic_stream(["Response"])
+
+        with patch('anthropic.AsyncAnthropic') as MockClient:
+            mock_client = MockClient.return_value
+            mock_client.messages.stream.return_value = mock_stream
+
+            adapter = AnthropicAdapter(api_key="test-key")
+
+            async for _ in adapter.stream_chat(
+                messages=[{"role": "user", "content": "Hi"}],
+                system_prompt="You are a business analyst assistant."
+            ):
+                pass
+
+            call_kwargs = mock_client.messages.stream.call_args[1]
+            assert call_kwargs["system"] == [{
+                "type": "text",
+                "text": "You are a business analyst assistant.",
+                "cache_control": {"type": "ephemeral"},
+            }]
+
+    @pytest.mark.asyncio
+    async def test_marks_last_tool_and_message_without_mutating(self, mock_anthropic_stream):
+        """Last tool and last message get breakpoints; caller data is untouched."""
+        mock_stream = mock_anthropic_stream(["Response"])
+
+        with patch('anthropic.AsyncAnthropic') as MockClient:
+            mock_client = MockClient.return_value
+            mock_client.messages.stream.return_value = mock_stream
+
+            adapter = AnthropicAdapter(api_key="test-key")
+
+            tools = [{"name": "search"}, {"name": "save_artifact"}]
+            messages = [
+                {"role": "user", "content": "Hello"},
+                {"role": "assistant", "content": "Hi there"},
+                {"role": "user", "content": [
+                    {"type": "tool_result", "tool_use_id": "t1", "content": "ok"}
+                ]},
+            ]
+
+            async for _ in adapter.stream_chat(
+                messages=messages,
+                system_prompt="Be helpful.",
+                tools=tools
+            ):
+                pass
+
+            call_kwargs = mock_client.messages.stream.call_args[1]
+            assert call_kwargs["tools"][0] == {"name": "search"}
+            assert call_kwargs["tools"][1]["cache_control"] == {"type": "ephemeral"}
+            assert call_kwargs["messages"][:2] == messages[:2]
+            assert call_kwargs["messages"][2]["content"][0]["cache_control"] == {"type": "ephemeral"}
+
+            assert "cache_control" not in tools[1]
+            assert "cache_control" not in messages[2]["content"][0]
+
+    @pytest.mark.asyncio
+    async def test_string_message_becomes_cacheable_block(self, mock_anthropic_stream):
+        """A plain-string last message is converted to a cacheable text block."""
+        mock_stream = mock_anthropic_stream(["Response"])
+
+        with patch('anthropic.AsyncAnthropic') as MockClient:
+            mock_client = MockClient.return_value
+            mock_client.messages.stream.return_value = mock_stream
+
+            adapter = AnthropicAdapter(api_key="test-key")
+
+            async for _ in adapter.stream_chat(
+                messages=[{"role": "user", "content": "Hi"}],
+                system_prompt=""
+            ):
+                pass
+
+            call_kwargs = mock_client.messages.stream.call_args[1]
+            assert call_kwargs["system"] == ""
+            assert call_kwargs["messages"] == [{
+                "role": "user",
+                "content": [{"type": "text", "text": "Hi", "cache_control": {"type": "ephemeral"}}],
+            }]
+
+    @pytest.mark.asyncio
+    async def test_reports_cache_usage(self, mock_anthropic_stream):
+        """Cache write/read token counts are included in complete usage."""
+        mock_stream = mock_anthropic_stream(
+            text_chunks=["Hi"],
+            usage={
+                "input_tokens": 20,
+                "output_tokens": 50,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 3000,
+            }
+        )
+
+        with patch('anthropic.AsyncAnthropic') as MockClient:
+            mock_client = MockClient.return_value
+            mock_client.messages.stream.return_value = mock_stream
+
+            adapter = AnthropicAdapter(api_key="test-key")
+
+            chunks = []
+            async for chunk in adapter.stream_chat(
+                messages=[{"role": "user", "content": "Hi"}],
+                system_prompt="You are helpful."
+            ):
+                chunks.append(chunk)
+
+            complete = [c for c in chunks if c.chunk_type == "complete"][0]
+            assert complete.usage == {
+                "input_tokens": 20,
+                "output_tokens": 50,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 3000,
+            }
@@ -6,6 +6,8 @@ Mocks asyncio.create_subprocess_exec and shutil.which for isolated testing.
 """
 
 import asyncio
+import json
+import time
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 import unittest.mock
@@ -599,6 +601,7 @@ class TestClaudeCLIAdapterStreamChat:
         assert '--verbose' in call_args[0]
         assert '--model' in call_args[0]
         assert 'claude-sonnet-4-5-20250929' in call_args[0]
+        assert '--include-partial-messages' not in call_args[0]
 
         # Verify stdin pipe is configured (prompt delivered via stdin)
         call_kwargs = mock_subprocess.call_args[1]
@@ -685,6 +688,112 @@ class TestClaudeCLIAdapterStreamChat:
         mock_docs_ctx.set.assert_called_once_with([])
 
 
+def make_partial_transcript(deltas, delay=0.0):
+    """Timed stdout for one text block streamed as partial-message deltas.
+
+    Emits message_start, one text_delta per item (delay seconds apart), the
+    complete assistant event for the same message, then the result.
+    """
+    def stream_event(event):
+        return json.dumps({"type": "stream_event", "event": event}).encode() + b"\n"
+
+    async def stdout():
+        yield b'{"type": "system", "subtype": "init", "session_id": "test-123"}\n'
+        yield stream_event({"type": "message_start", "message": {"id": "msg_1"}})
+        for text in deltas:
+            await asyncio.sleep(delay)
+            yield stream_event({
+                "type": "content_block_delta", "index": 0,
+                "delta": {"type": "text_delta", "text": text}
+            })
+        yield json.dumps({"type": "assistant", "message": {
+            "id": "msg_1", "content": [{"type": "text", "text": "".join(deltas)}]
+        }}).encode() + b"\n"
+        yield b'{"type": "result", "subtype": "success", "usage": {"input_tokens": 10, "output_tokens": 5}}\n'
+
+    return stdout()
+
+
+@patch('app.services.llm.claude_cli_adapter.asyncio.create_subprocess_exec')
+@patch('app.services.llm.claude_cli_adapter.shutil.which', return_value='/usr/bin/claude')
+class TestClaudeCLIAdapterPartialMessages:
+    """Tests for incremental text streaming from partial-message events."""
+
+    async def _stream(self, mock_subprocess, stdout, partial):
+        mock_process = make_mock_process([], returncode=0)
+        mock_process.stdout = stdout
+        mock_subprocess.return_value = mock_process
+
+        adapter = ClaudeCLIAdapter(api_key="test-key")
+        adapter.set_context(MagicMock(), "proj-1", "thread-1")
+        adapter.set_partial_messages(partial)
+
+        start = time.perf_counter()
+        first_text_at = None
+        chunks = []
+        async for chunk in adapter.stream_chat(
+            messages=[{"role": "user", "content": "Hi"}],
+            system_prompt=""
+        ):
+            if chunk.chunk_type == "text" and first_text_at is None:
+                first_text_at = time.perf_counter() - start
+            chunks.append(chunk)
+        return chunks, first_text_at
+
+    @pytest.mark.asyncio
+    async def test_partial_mode_yields_deltas_without_duplicate_text(self, mock_which, mock_subprocess):
+        chunks, _ = await self._stream(
+            mock_subprocess, make_partial_transcript(["Hel", "lo ", "world"]), partial=True
+        )
+
+        assert [c.content for c in chunks if c.chunk_type == "text"] == ["Hel", "lo ", "world"]
+        assert chunks[-1].chunk_type == "complete"
+        assert '--include-partial-messages' in mock_subprocess.call_args[0]
+
+    @pytest.mark.asyncio
+    async def test_default_mode_ignores_stream_events(self, mock_which, mock_subprocess):
+        chunks, _ = await self._stream(
+            mock_subprocess, make_partial_transcript(["Hel", "lo ", "world"]), partial=False
+        )
+
+        assert [c.content for c in chunks if c.chunk_type == "text"] == ["Hello world"]
+
+    @pytest.mark.asyncio
+    async def test_partial_mode_keeps_tool_use_from_assistant_event(self, mock_which, mock_subprocess):
+        async def stdout():
+            yield b'{"type": "stream_event", "event": {"type": "message_start", "message": {"id": "msg_1"}}}\n'
+            yield (b'{"type": "stream_event", "event": {"type": "content_block_delta", "index": 0, '
+                   b'"delta": {"type": "text_delta", "text": "Searching"}}}\n')
+            yield (b'{"type": "assistant", "message": {"id": "msg_1", "content": ['
+                   b'{"type": "text", "text": "Searching"}, '
+                   b'{"type": "tool_use", "id": "t1", "name": "search_documents", "input": {}}]}}\n')
+            # Message whose text arrived without deltas still yields its text
+            yield b'{"type": "assistant", "message": {"id": "msg_2", "content": [{"type": "text", "text": "Done"}]}}\n'
+
+        chunks, _ = await self._stream(mock_subprocess, stdout(), partial=True)
+
+        assert [(c.chunk_type, c.content) for c in chunks[:3]] == [
+            ("text", "Searching"), ("tool_use", ""), ("text", "Done")
+        ]
+
+    @pytest.mark.asyncio
+    async def test_partial_mode_cuts_time_to_first_text(self, mock_which, mock_subprocess):
+        """Benchmark: first text arrives after one delta, not the whole block."""
+        deltas = [f"word{i} " for i in range(20)]
+
+        _, full_ttfb = await self._stream(
+            mock_subprocess, make_partial_transcript(deltas, delay=0.005), partial=False
+        )
+        _, partial_ttfb = await self._stream(
+            mock_subprocess, make_partial_transcript(deltas, delay=0.005), partial=True
+        )
+
+        # Whole block: ~20 x 5ms; partial: ~1 delta
+        assert partial_ttfb < full_ttfb / 4, (
+            f"partial {partial_ttfb * 1000:.1f}ms vs full {full_ttfb * 1000:.1f}ms"
+        )
+
+
 class TestClaudeCLIAdapterSubprocessCleanup:
     """Tests for subprocess cleanup in finally block."""
 
@@ -9,16 +9,21 @@ Expected final state: 57 passing, 1 pre-existing fail.
 """
 
 import asyncio
+import time
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock, call
 import unittest.mock
 
 from app.services.llm.claude_cli_adapter import (
+    CLI_FLAGS,
+    PARTIAL_CLI_FLAGS,
     ClaudeProcessPool,
+    ClaudeProcessPoolRegistry,
     ClaudeCLIAdapter,
     DEFAULT_MODEL,
     DANGEROUSLY_SKIP_PERMISSIONS,
     get_process_pool,
+    get_process_pools,
     init_process_pool,
     shutdown_process_pool,
 )
@@ -49,6 +54,7 @@ def make_mock_process(returncode=None):
     proc.stdin.drain = AsyncMock()
     proc.stdin.close = MagicMock()
     proc.stdin.wait_closed = AsyncMock()
+    proc.stdin.is_closing = MagicMock(return_value=False)
     proc.stdout = MagicMock()
     proc.stderr = AsyncMock()
     proc.stderr.read = AsyncMock(return_value=b"")
@@ -315,3 +321,287 @@ class TestClaudeProcessPool:
             "Docstring must contain cold start latency numbers (120ms or 400ms)"
         assert "5ms" in docstring, \
             "Docstring must contain warm acquire latency number (<5ms)"
+
+
+# ============================================================================
+# Adaptive Sizing Tests
+# ============================================================================
+
+class TestClaudeProcessPoolAdaptiveSizing:
+    """Tests for metrics-driven pool resizing and counters."""
+
+    @pytest.mark.asyncio
+    @patch('app.services.llm.claude_cli_adapter.asyncio.create_subprocess_exec')
+    async def test_counters_track_hits_misses_and_spawns(self, mock_exec):
+        """Warm acquires count as hits, cold fallbacks as misses with spawn latency."""
+        mock_exec.return_value = make_mock_process(returncode=None)
+        pool = ClaudeProcessPool(cli_path='/usr/bin/claude', model=DEFAULT_MODEL)
+        await pool._queue.put(make_mock_process(returncode=None))
+
+        await pool.acquire()  # hit
+        await pool.acquire()  # miss -> cold spawn
+
+        stats = pool.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["cold_spawns"] == 1
+        assert stats["avg_cold_spawn_ms"] is not None
+
+    def test_grows_by_misses_within_max(self):
+        """Cold spawns during a window grow the target, capped at max_size."""
+        pool = ClaudeProcessPool(
+            cli_path='/usr/bin/claude', model=DEFAULT_MODEL, min_size=1, max_size=4
+        )
+        pool._window_acquires = 5
+        pool._window_misses = 3
+
+        pool._resize(pool._window_start + pool.RESIZE_INTERVAL)
+
+        assert pool.target_size == 4
+        assert pool._window_misses == 0  # New window started
+
+    def test_shrinks_when_processes_sat_idle(self):
+        """A window where warm processes were never needed shrinks by one."""
+        pool = ClaudeProcessPool(
+            cli_path='/usr/bin/claude', model=DEFAULT_MODEL, min_size=1, max_size=4
+        )
+        pool.target_size = 3
+        pool._window_low_water = 2
+
+        pool._resize(pool._window_start + pool.RESIZE_INTERVAL)
+        assert pool.target_size == 2
+
+        pool._window_low_water = 2
+        pool._resize(pool._window_start + pool.RESIZE_INTERVAL)
+        pool._window_low_water = 2
+        pool._resize(pool._window_start + pool.RESIZE_INTERVAL)
+        assert pool.target_size == 1  # Never below min_size
+
+    def test_acquire_rate_sets_floor(self):
+        """High acquire rate keeps enough processes to cover spawn latency."""
+        pool = ClaudeProcessPool(
+            cli_path='/usr/bin/claude', model=DEFAULT_MODEL, min_size=1, max_size=8
+        )
+        pool.target_size = 1
+        pool.warm_spawns = 1
+        pool.warm_spawn_seconds = 0.4  # 400ms per warm spawn
+        pool._window_acquires = 100  # 10 acquires/s over the window
+        pool._window_low_water = 1
+
+        pool._resize(pool._window_start + 10.0)
+
+        assert pool.target_size == 5  # ceil(10/s * (0.4 + 0.1)s)
+
+    @pytest.mark.asyncio
+    async def test_trim_terminates_surplus_idle_processes(self):
+        """Processes above the target are terminated."""
+        pool = ClaudeProcessPool(cli_path='/usr/bin/claude', model=DEFAULT_MODEL)
+        procs = [make_mock_process(returncode=None) for _ in range(3)]
+        for proc in procs:
+            await pool._queue.put(proc)
+        pool.target_size = 1
+
+        await pool._trim_to_target()
+
+        assert pool._queue.qsize() == 1
+        assert sum(p.terminate.call_count for p in procs) == 2
+
+
+# ============================================================================
+# Warm Process Health / Recycling Tests
+# ============================================================================
+
+class TestClaudeProcessPoolHealth:
+    """Tests for health-checked handout, idle-age recycling and event-driven refill."""
+
+    @pytest.mark.asyncio
+    @patch('app.services.llm.claude_cli_adapter.asyncio.create_subprocess_exec')
+    async def test_acquire_skips_expired_process(self, mock_exec):
+        """A warm process older than max_idle_age is terminated, the next one is used."""
+        old_proc = make_mock_process(returncode=None)
+        fresh_proc = make_mock_process(returncode=None)
+        mock_exec.side_effect = [old_proc, fresh_proc]
+
+        pool = ClaudeProcessPool(cli_path='/usr/bin/claude', model=DEFAULT_MODEL, max_idle_age=60)
+        for _ in range(2):
+            await pool._queue.put(await pool._spawn_warm_process())
+        spawned_at, fingerprint = pool._warm_info[id(old_proc)]
+        pool._warm_info[id(old_proc)] = (spawned_at - 61, fingerprint)
+
+        result = await pool.acquire()
+        await asyncio.gather(*pool._reaping)
+
+        assert result is fresh_proc
+        old_proc.terminate.assert_called_once()
+        assert pool.stats()["recycled"] == 1
+        assert pool.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_skips_stale_auth_and_closed_stdin(self):
+        """Processes spawned under other credentials or with closed stdin are not handed out."""
+        stale_proc = make_mock_process(returncode=None)
+        broken_proc = make_mock_process(returncode=None)
+        broken_proc.stdin.is_closing.return_value = True
+        good_proc = make_mock_process(returncode=None)
+
+        pool = ClaudeProcessPool(cli_path='/usr/bin/claude', model=DEFAULT_MODEL)
+        for proc in (stale_proc, broken_proc, good_proc):
+            await pool._queue.put(proc)
+        pool._warm_info[id(stale_proc)] = (time.monotonic(), ("old-credentials",))
+
+        result = await pool.acquire()
+        await asyncio.gather(*pool._reaping)
+
+        assert result is good_proc
+        stale_proc.terminate.assert_called_once()
+        broken_proc.terminate.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch('app.services.llm.claude_cli_adapter.asyncio.create_subprocess_exec')
+    async def test_refill_is_triggered_by_acquire(self, mock_exec):
+        """The refill loop sleeps until acquire() wakes it, then tops the pool up."""
+        mock_exec.side_effect = lambda *args, **kwargs: make_mock_process(returncode=None)
+
+        pool = ClaudeProcessPool(cli_path='/usr/bin/claude', model=DEFAULT_MODEL)
+        pool.RESIZE_INTERVAL = 3600  # Keep sizing out of the way
+        await pool.start()
+        assert pool._queue.qsize() == pool.target_size
+        spawned = mock_exec.call_count
+
+        await asyncio.sleep(0.05)
+        assert mock_exec.call_count == spawned  # No polling spawns while full
+
+        await pool.acquire()
+        for _ in range(50):
+            if pool._queue.qsize() == pool.target_size:
+                break
+            await asyncio.sleep(0.01)
+
+        assert pool._queue.qsize() == pool.target_size
+        assert mock_exec.call_count == spawned + 1
+        await pool.stop()
+
+    @pytest.mark.asyncio
+    async def test_maintenance_wakes_for_oldest_idle_process(self):
+        """The refill loop deadline is the earliest idle-age expiry."""
+        pool = ClaudeProcessPool(cli_path='/usr/bin/claude', model=DEFAULT_MODEL, max_idle_age=30)
+        proc = make_mock_process(returncode=None)
+        pool._warm_info[id(proc)] = (time.monotonic() - 25, ())
+
+        assert pool._next_maintenance_delay() <= 5.0
+
+
+# ============================================================================
+# Per-Model Pool Registry Tests
+# ============================================================================
+
+OTHER_MODEL = "claude-opus-4-1-20250805"
+
+
+class TestClaudeProcessPoolRegistry:
+    """Tests for pools keyed by (cli_path, model, flags) under a global cap."""
+
+    @pytest.mark.asyncio
+    @patch('app.services.llm.claude_cli_adapter.asyncio.create_subprocess_exec')
+    async def test_non_default_model_gets_its_own_warm_pool(self, mock_exec):
+        """First request for another model creates a pool that pre-warms that model."""
+        mock_exec.side_effect = lambda *args, **kwargs: make_mock_process(returncode=None)
+        registry = ClaudeProcessPoolRegistry(
+            cli_path='/usr/bin/claude', default_model=DEFAULT_MODEL, global_max=6, model_max_size=2
+        )
+        default_pool = await registry.start()
+
+        pool = registry.get(OTHER_MODEL)
+        assert registry.get(OTHER_MODEL) is pool
+        assert registry.get() is default_pool
+        assert registry.get(OTHER_MODEL, flags=CLI_FLAGS + ("--debug",)) is not pool
+
+        await asyncio.gather(*registry._starting)
+        assert pool._queue.qsize() == 1  # Demand-created pools pre-warm one
+        assert (pool.min_size, pool.max_size) == (0, 2)
+        warm_args = [call.args for call in mock_exec.call_args_list]
+        assert any(OTHER_MODEL in args and '--debug' not in args for args in warm_args)
+
+        stats = registry.stats()
+        assert [p["model"] for p in stats["pools"]] == [DEFAULT_MODEL, OTHER_MODEL, OTHER_MODEL]
+        assert stats["pools"][2]["custom_flags"] is True
+        await registry.stop()
+
+    def test_partial_mode_uses_its_own_pool(self):
+        """Only partial-mode pools start processes with --include-partial-messages."""
+        registry = ClaudeProcessPoolRegistry(
+            cli_path='/usr/bin/claude', default_model=DEFAULT_MODEL, global_max=6
+        )
+        default_pool = registry._create(registry._key(None, None, CLI_FLAGS))
+        partial_pool = registry._create(registry._key(None, None, PARTIAL_CLI_FLAGS))
+
+        assert partial_pool is not default_pool
+        assert '--include-partial-messages' not in default_pool._flags
+        assert '--include-partial-messages' in partial_pool._flags
+        stats = registry.stats()["pools"]
+        assert "partial_messages" not in stats[0]
+        assert stats[1]["partial_messages"] is True
+        assert "custom_flags" not in stats[1]
+
+    def test_global_cap_limits_growth(self):
+        """A pool grows only into capacity other pools' targets leave free."""
+        registry = ClaudeProcessPoolRegistry(
+            cli_path='/usr/bin/claude', default_model=DEFAULT_MODEL, global_max=5,
+            min_size=1, max_size=8, model_max_size=2
+        )
+        default_pool = registry._create(registry._key(None, None, CLI_FLAGS))
+        other_pool = registry._create(registry._key(OTHER_MODEL, None, CLI_FLAGS))
+        other_pool.target_size = 2
+        default_pool._window_misses = 10
+
+        default_pool._resize(default_pool._window_start + default_pool.RESIZE_INTERVAL)
+
+        assert default_pool.target_size == 3
+        assert registry.stats()["total_target"] == 5
+
+    @pytest.mark.asyncio
+    @patch('app.services.llm.claude_cli_adapter.asyncio.create_subprocess_exec')
+    async def test_init_and_shutdown_manage_registry(self, mock_exec):
+        """init_process_pool starts the default pool; get_process_pool keys by model."""
+        mock_exec.side_effect = lambda *args, **kwargs: make_mock_process(returncode=None)
+
+        default_pool = await init_process_pool(cli_path='/usr/bin/claude', model=DEFAULT_MODEL)
+        try:
+            assert get_process_pool() is default_pool
+            assert get_process_pool(DEFAULT_MODEL, '/usr/bin/claude') is default_pool
+            assert get_process_pool(OTHER_MODEL) is not default_pool
+        finally:
+            await shutdown_process_pool()
+
+        assert get_process_pools() is None
+        assert get_process_pool() is None
+
+    @pytest.mark.asyncio
+    @patch('app.services.llm.claude_cli_adapter._documents_used_context')
+    @patch('app.services.llm.claude_cli_adapter._thread_id_context')
+    @patch('app.services.llm.claude_cli_adapter._project_id_context')
+    @patch('app.services.llm.claude_cli_adapter._db_context')
+    @patch('app.services.llm.claude_cli_adapter.get_process_pool')
+    @patch('app.services.llm.claude_cli_adapter.shutil.which', return_value='/usr/bin/claude')
+    async def test_stream_chat_acquires_from_model_pool(
+        self, mock_which, mock_get_pool,
+        mock_db_ctx, mock_proj_ctx, mock_thread_ctx, mock_docs_ctx
+    ):
+        """stream_chat asks for the pool of the adapter's own model."""
+        proc = make_mock_process(returncode=0)
+        proc.stdout = make_async_stdout([
+            '{"type": "result", "subtype": "success", "usage": {"input_tokens": 1, "output_tokens": 1}}'
+        ])
+        pool = MagicMock()
+        pool.acquire = AsyncMock(return_value=proc)
+        mock_get_pool.return_value = pool
+
+        adapter = ClaudeCLIAdapter(api_key="test-key", model=OTHER_MODEL)
+        adapter.set_context(MagicMock(), "proj-1", "thread-1")
+        chunks = [c async for c in adapter.stream_chat(
+            messages=[{"role": "user", "content": "Hi"}], system_prompt=""
+        )]
+
+        mock_get_pool.assert_called_once_with(OTHER_MODEL, '/usr/bin/claude', CLI_FLAGS)
+        assert chunks[-1].chunk_type == "complete"
@@ -0,0 +1,80 @@
+"""Unit tests for LLMFactory shared client pooling."""
+
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from app.services.llm import LLMFactory, AnthropicAdapter, DeepSeekAdapter
+
+
+@pytest.fixture(autouse=True)
+def clean_client_pool():
+    """Isolate the factory's shared client registry between tests."""
+    LLMFactory._clients.clear()
+    yield
+    LLMFactory._clients.clear()
+
+
+class TestLLMFactorySharedClients:
+    """Tests for long-lived per-provider SDK clients."""
+
+    @patch('app.services.llm.factory.settings')
+    def test_adapters_share_one_client(self, mock_settings):
+        """Consecutive create() calls reuse the same SDK client."""
+        mock_settings.anthropic_api_key = "test-key"
+        mock_settings.llm_max_connections = 10
+        mock_settings.llm_max_keepalive_connections = 5
+        mock_settings.llm_keepalive_expiry = 30.0
+
+        first = LLMFactory.create("anthropic")
+        second = LLMFactory.create("anthropic")
+
+        assert isinstance(first, AnthropicAdapter)
+        assert first.client is second.client
+        assert LLMFactory.get_client("anthropic") is first.client
+
+    @patch('app.services.llm.factory.settings')
+    def test_clients_are_per_provider(self, mock_settings):
+        """Each provider gets its own client."""
+        mock_settings.anthropic_api_key = "anthropic-key"
+        mock_settings.deepseek_api_key = "deepseek-key"
+        mock_settings.deepseek_model = "deepseek-chat"
+        mock_settings.llm_max_connections = 10
+        mock_settings.llm_max_keepalive_connections = 5
+        mock_settings.llm_keepalive_expiry = 30.0
+
+        anthropic_adapter = LLMFactory.create("anthropic")
+        deepseek_adapter = LLMFactory.create("deepseek")
+
+        assert isinstance(deepseek_adapter, DeepSeekAdapter)
+        assert anthropic_adapter.client is not deepseek_adapter.client
+
+    def test_get_client_rejects_agent_providers(self):
+        """CLI/SDK providers have no shared HTTP client."""
+        with pytest.raises(ValueError, match="No shared client"):
+            LLMFactory.get_client("claude-code-cli")
+
+    @pytest.mark.asyncio
+    async def test_aclose_closes_and_forgets_clients(self):
+        """aclose() closes every shared client and empties the registry."""
+        client = MagicMock()
+        client.close = AsyncMock()
+        LLMFactory._clients[("anthropic", "test-key")] = client
+
+        await LLMFactory.aclose()
+
+        client.close.assert_awaited_once()
+        assert LLMFactory._clients == {}
+
+    @pytest.mark.asyncio
+    async def test_aclose_survives_close_errors(self):
+        """A failing close() does not prevent closing other clients."""
+        broken = MagicMock()
+        broken.close = AsyncMock(side_effect=RuntimeError("boom"))
+        healthy = MagicMock()
+        healthy.close = AsyncMock()
+        LLMFactory._clients[("anthropic", "a")] = broken
+        LLMFactory._clients[("deepseek", "b")] = healthy
+
+        await LLMFactory.aclose()
+
+        healthy.close.assert_awaited_once()
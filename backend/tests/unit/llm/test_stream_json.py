@@ -0,0 +1,226 @@
+"""Unit tests and replay benchmark for the Claude CLI stream-json parsing stage."""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.llm import stream_json
+from app.services.llm.claude_cli_adapter import ClaudeCLIAdapter, IGNORED_EVENT_TYPES
+from app.services.llm.stream_json import StreamJsonParser, iter_lines, sniff_event_type
+
+
+def _reader(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader(limit=1024 * 1024)
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+async def _collect(stream, chunk_size=stream_json.READ_CHUNK_SIZE):
+    return [line async for line in iter_lines(stream, chunk_size)]
+
+
+def _transcript(turns: int = 4, brd_chars: int = 60_000) -> bytes:
+    """
+    stream-json output shaped like a captured CLI BRD session.
+
+    Per turn: init and hook system events, a search tool call, the BRD
+    streamed as several assistant events, and a result echoing the BRD.
+    """
+    section = (
+        "## Functional Requirements\n"
+        "- FR-{n}: The system shall let \"approvers\" sign off on a request\n"
+        "  | Field | Type | Notes |\n  |---|---|---|\n  | status | enum | draft/approved |\n"
+    )
+    brd = "".join(section.format(n=i) for i in range(brd_chars // len(section) + 1))[:brd_chars]
+    parts = [brd[i:i + brd_chars // 5] for i in range(0, brd_chars, brd_chars // 5)]
+
+    events = []
+    for turn in range(turns):
+        events.append({
+            "type": "system", "subtype": "init", "session_id": f"s-{turn}",
+            "cwd": "/app", "model": "claude-sonnet-4-5-20250929",
+            "tools": [f"mcp__ba__tool_{i}" for i in range(80)],
+            "mcp_servers": [{"name": "ba", "status": "connected"}],
+            "slash_commands": [f"/cmd-{i}" for i in range(40)],
+        })
+        for hook in range(3):
+            events.append({
+                "type": "system", "subtype": "hook_response", "hook_name": f"SessionStart:{hook}",
+                "stdout": "context loaded\n" * 200, "stderr": "", "exit_code": 0,
+            })
+        events.append({"type": "assistant", "message": {"content": [{
+            "type": "tool_use", "id": f"toolu_{turn}", "name": "mcp__ba__search_documents",
+            "input": {"query": "approval workflow"},
+        }]}})
+        for part in parts:
+            events.append({"type": "assistant", "message": {"content": [{"type": "text", "text": part}]}})
+        events.append({
+            "type": "result", "subtype": "success", "result": brd,
+            "usage": {"input_tokens": 1200, "output_tokens": 9000},
+        })
+    return b"".join(json.dumps(event, separators=(",", ":")).encode() + b"\n" for event in events)
+
+
+class TestIterLines:
+    """Tests for the chunked line splitter."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 1024])
+    async def test_splits_across_chunk_boundaries(self, chunk_size):
+        data = b'{"a":1}\n\n{"b":"' + b"x" * 100 + b'"}\n{"c":3}'
+
+        lines = await _collect(_reader(data), chunk_size)
+
+        assert lines == [b'{"a":1}', b"", b'{"b":"' + b"x" * 100 + b'"}', b'{"c":3}']
+
+    @pytest.mark.asyncio
+    async def test_lines_longer_than_reader_limit(self):
+        line = b'{"type":"assistant","text":"' + b"y" * (3 * 1024 * 1024) + b'"}'
+
+        lines = await _collect(_reader(line + b"\n"))
+
+        assert lines == [line]
+
+    @pytest.mark.asyncio
+    async def test_iterates_plain_async_iterables(self):
+        async def stdout():
+            yield b'{"a":1}\n'
+            yield b'{"b":2}\n'
+
+        assert await _collect(stdout()) == [b'{"a":1}\n', b'{"b":2}\n']
+
+
+class TestStreamJsonParser:
+    """Tests for type sniffing, skipping and JSON backends."""
+
+    def test_sniff_event_type(self):
+        assert sniff_event_type(b'{"type":"system","subtype":"init"}') == "system"
+        assert sniff_event_type(b'  { "type" : "result", "usage": {}}') == "result"
+        assert sniff_event_type(b'{"subtype":"init","type":"system"}') is None
+        assert sniff_event_type(b"not json") is None
+
+    def test_skips_ignored_types_without_decoding(self):
+        parser = StreamJsonParser(skip_types=frozenset({"system"}))
+
+        with patch.object(stream_json, "loads", wraps=stream_json.loads) as loads:
+            assert parser.parse(b'{"type":"system","subtype":"init","tools":[]}') is None
+            loads.assert_not_called()
+            assert parser.parse(b'{"type":"result","usage":{}}\r\n') == {"type": "result", "usage": {}}
+
+        assert parser.parse(b"   ") is None
+        assert parser.parse(b"MALFORMED{{") is None
+        assert parser.parse(b"[1, 2]") is None
+        assert (parser.parsed, parser.skipped, parser.errors) == (1, 1, 2)
+
+    def test_invalid_utf8_is_a_parse_error(self):
+        parser = StreamJsonParser()
+
+        assert parser.parse('{"type":"assistant","text":"é"}'.encode()) == {
+            "type": "assistant", "text": "é"
+        }
+        assert parser.parse(b'{"type":"assistant","text":"\xff"}') is None
+        assert parser.errors == 1
+
+    def test_system_is_ignored_by_translate_event(self):
+        adapter = ClaudeCLIAdapter(api_key="test-key")
+
+        for event_type in IGNORED_EVENT_TYPES:
+            assert adapter._translate_event({"type": event_type}) is None
+
+
+class TestCLIAdapterChunkedStdout:
+    """stream_chat reading a real StreamReader through the chunked path."""
+
+    @pytest.mark.asyncio
+    @patch('app.services.llm.claude_cli_adapter.get_process_pool')
+    @patch('app.services.llm.claude_cli_adapter.shutil.which', return_value='/usr/bin/claude')
+    async def test_stream_chat_replays_transcript(self, mock_which, mock_get_pool):
+        process = MagicMock()
+        process.returncode = 0
+        process.wait = AsyncMock(return_value=0)
+        process.stdin = MagicMock()
+        process.stdin.drain = AsyncMock()
+        process.stdin.wait_closed = AsyncMock()
+        process.stdout = _reader(_transcript(turns=1, brd_chars=5000))
+        pool = MagicMock()
+        pool.acquire = AsyncMock(return_value=process)
+        mock_get_pool.return_value = pool
+
+        adapter = ClaudeCLIAdapter(api_key="test-key")
+        adapter.set_context(MagicMock(), "proj-1", "thread-1")
+
+        chunks = [
+            chunk async for chunk in adapter.stream_chat(
+                messages=[{"role": "user", "content": "Write the BRD"}],
+                system_prompt=""
+            )
+        ]
+
+        assert [c.chunk_type for c in chunks] == ["tool_use"] + ["text"] * 5 + ["complete"]
+        assert "".join(c.content for c in chunks if c.chunk_type == "text").startswith(
+            "## Functional Requirements"
+        )
+        assert chunks[-1].usage == {"input_tokens": 1200, "output_tokens": 9000}
+
+
+async def _legacy_parse(data: bytes) -> list:
+    """Pre-optimization path: readline + decode + strip + json.loads per line."""
+    events = []
+    async for line in _reader(data):
+        decoded = line.decode("utf-8").strip()
+        if decoded:
+            events.append(json.loads(decoded))
+    return events
+
+
+async def _fast_parse(data: bytes) -> list:
+    parser = StreamJsonParser(skip_types=IGNORED_EVENT_TYPES)
+    events = []
+    async for line in iter_lines(_reader(data)):
+        event = parser.parse(line)
+        if event is not None:
+            events.append(event)
+    return events
+
+
+def _best_time(data: bytes, parse, repeats: int = 5) -> float:
+    """Best-of-N wall time in seconds to parse a replayed transcript."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        asyncio.run(parse(data))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class TestStreamJsonReplayBenchmark:
+    """
+    Micro-benchmark: replay a multi-turn BRD transcript through both paths.
+
+    The fast path must return the same non-system events and be faster
+    than the legacy per-line json.loads.
+    """
+
+    def test_fast_path_matches_legacy_events(self):
+        data = _transcript()
+
+        legacy = asyncio.run(_legacy_parse(data))
+        fast = asyncio.run(_fast_parse(data))
+
+        assert fast == [event for event in legacy if event["type"] not in IGNORED_EVENT_TYPES]
+
+    def test_fast_path_faster_than_legacy(self):
+        data = _transcript(turns=20)
+
+        legacy_time = _best_time(data, _legacy_parse)
+        fast_time = _best_time(data, _fast_parse)
+
+        assert fast_time < legacy_time, (
+            f"fast {fast_time * 1000:.1f}ms vs "
+            f"legacy {legacy_time * 1000:.1f}ms "
+            f"for {len(data) / 1024:.0f}KB"
+        )
@@ -1,13 +1,27 @@
 """Unit tests for ai_service AIService."""
 
+import asyncio
 import pytest
 import json
+import time
+from contextlib import asynccontextmanager
 from app.services.ai_service import AIService, stream_with_heartbeat
 from app.models import Thread, Project, Document, Artifact, ArtifactType
 from app.services.llm.base import StreamChunk
 from tests.fixtures.llm_fixtures import MockLLMAdapter
 
 
+def _bare_service(adapter=None, session_factory=None):
+    """Build an AIService around an adapter without resolving a provider."""
+    service = AIService.__new__(AIService)
+    service.adapter = adapter
+    service.tools = []
+    service.thread_type = "ba_assistant"
+    service.session_factory = session_factory
+    service.user_id = None
+    return service
+
+
 class TestAIServiceExecuteTool:
     """Tests for AIService.execute_tool method."""
 
@@ -159,9 +173,7 @@ class TestAIServiceStreamChat:
 
         # Create service with mock adapter
         adapter = mock_llm_adapter(responses=["Hello", " world", "!"])
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         events = []
         async for event in service.stream_chat(
@@ -177,7 +189,7 @@ class TestAIServiceStreamChat:
         assert len(text_events) == 3
 
         # Parse data from events
-        texts = [json.loads(e["data"])["text"] for e in text_events]
+        texts = [e["data"]["text"] for e in text_events]
         assert texts == ["Hello", " world", "!"]
 
     @pytest.mark.asyncio
@@ -191,9 +203,7 @@ class TestAIServiceStreamChat:
         await db_session.commit()
 
         adapter = mock_llm_adapter(responses=["Response"])
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         events = []
         async for event in service.stream_chat(
@@ -221,9 +231,7 @@ class TestAIServiceStreamChat:
         await db_session.commit()
 
         adapter = mock_llm_adapter(responses=["OK"])
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         messages = [{"role": "user", "content": "Test message"}]
         async for _ in service.stream_chat(messages, None, thread.id, db_session):
@@ -244,9 +252,7 @@ class TestAIServiceStreamChat:
         await db_session.commit()
 
         adapter = mock_llm_adapter(raise_error="API rate limit exceeded")
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         events = []
         async for event in service.stream_chat(
@@ -298,9 +304,7 @@ class TestAIServiceStreamChat:
                     yield StreamChunk(chunk_type="complete", usage={"input_tokens": 15, "output_tokens": 10})
 
         adapter = ToolThenTextAdapter()
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         events = []
         async for event in service.stream_chat(
@@ -375,9 +379,7 @@ class TestAIServiceStreamChatEdgeCases:
                 yield  # Make this a generator
 
         adapter = ExceptionAdapter()
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         events = []
         async for event in service.stream_chat(
@@ -428,9 +430,7 @@ class TestAIServiceStreamChatEdgeCases:
                     yield StreamChunk(chunk_type="complete", usage={"input_tokens": 15, "output_tokens": 10})
 
         adapter = SearchToolAdapter()
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         events = []
         async for event in service.stream_chat(
@@ -458,9 +458,7 @@ class TestAIServiceStreamChatEdgeCases:
         await db_session.commit()
 
         adapter = mock_llm_adapter(responses=["Hello", ", ", "world", "!"])
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         events = []
         async for event in service.stream_chat(
@@ -517,9 +515,7 @@ class TestAIServiceStreamChatEdgeCases:
                     yield StreamChunk(chunk_type="complete", usage={"input_tokens": 15, "output_tokens": 10})
 
         adapter = TextThenToolAdapter()
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         events = []
         async for event in service.stream_chat(
@@ -535,7 +531,7 @@ class TestAIServiceStreamChatEdgeCases:
         assert len(text_deltas) >= 1
 
         # First text should be the introductory text
-        first_text = json.loads(text_deltas[0]["data"])["text"]
+        first_text = text_deltas[0]["data"]["text"]
         assert "create an artifact" in first_text
 
         # Verify artifact was created and loop exited (BUG-016 fix)
@@ -591,9 +587,7 @@ class TestBUG016ArtifactLoopFix:
                 yield StreamChunk(chunk_type="complete", usage={"input_tokens": 10, "output_tokens": 5})
 
         adapter = InfiniteArtifactAdapter()
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         events = []
         async for event in service.stream_chat(
@@ -641,9 +635,7 @@ class TestBUG016ArtifactLoopFix:
                 yield StreamChunk(chunk_type="complete", usage={"input_tokens": 10, "output_tokens": 5})
 
         adapter = AlwaysArtifactAdapter()
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         # Consume all events
         async for _ in service.stream_chat(
@@ -700,9 +692,7 @@ class TestBUG016ArtifactLoopFix:
                     yield StreamChunk(chunk_type="complete", usage={"input_tokens": 20, "output_tokens": 15})
 
         adapter = SearchThenTextAdapter()
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         events = []
         async for event in service.stream_chat(
@@ -750,9 +740,7 @@ class TestBUG016ArtifactLoopFix:
                 yield StreamChunk(chunk_type="complete", usage={"input_tokens": 10, "output_tokens": 20})
 
         adapter = TextThenArtifactAdapter()
-        service = AIService.__new__(AIService)
-        service.adapter = adapter
-        service.tools = []
+        service = _bare_service(adapter)
 
         events = []
         async for event in service.stream_chat(
@@ -766,7 +754,7 @@ class TestBUG016ArtifactLoopFix:
         # Should have text_delta event with the intro text
         text_events = [e for e in events if e.get("event") == "text_delta"]
         assert len(text_events) >= 1
-        first_text = json.loads(text_events[0]["data"])["text"]
+        first_text = text_events[0]["data"]["text"]
         assert "Creating your BRD" in first_text
 
         # Should have artifact_created
@@ -779,6 +767,128 @@ class TestBUG016ArtifactLoopFix:
         assert "Creating your BRD" in data["content"]
 
 
+class TestParallelToolExecution:
+    """Tests for concurrent execution of independent tool calls in one turn."""
+
+    @pytest.mark.asyncio
+    async def test_searches_run_concurrently_with_results_in_tool_order(self):
+        """Three searches take about as long as one; results keep tool_use order."""
+        sessions = []
+
+        @asynccontextmanager
+        async def session_factory():
+            session = object()
+            sessions.append(session)
+            yield session
+
+        delays = {"slow": 0.15, "medium": 0.1, "fast": 0.05}
+
+        async def execute_tool(tool_name, tool_input, project_id, thread_id, db):
+            await asyncio.sleep(delays[tool_input["query"]])
+            return (f"results for {tool_input['query']}", None)
+
+        class MultiSearchAdapter(MockLLMAdapter):
+            async def stream_chat(self, messages, system_prompt, tools=None, max_tokens=4096):
+                self.call_history.append({"messages": list(messages)})
+                if len(self.call_history) == 1:
+                    for query in delays:
+                        yield StreamChunk(chunk_type="tool_use", tool_call={
+                            "id": f"tool_{query}",
+                            "name": "search_documents",
+                            "input": {"query": query}
+                        })
+                else:
+                    yield StreamChunk(chunk_type="text", content="Done.")
+                yield StreamChunk(chunk_type="complete", usage={"input_tokens": 10, "output_tokens": 5})
+
+        adapter = MultiSearchAdapter()
+        service = _bare_service(adapter, session_factory)
+        service.execute_tool = execute_tool
+
+        start = time.perf_counter()
+        events = [
+            event async for event in service.stream_chat(
+                messages=[{"role": "user", "content": "Research"}],
+                project_id="project-1",
+                thread_id="thread-1",
+                db=None
+            )
+        ]
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < sum(delays.values())
+        assert len(sessions) == 3
+        assert [e["event"] for e in events].count("tool_executing") == 3
+        assert events[-1]["event"] == "message_complete"
+
+        tool_results = adapter.call_history[1]["messages"][-1]["content"]
+        assert [r["tool_use_id"] for r in tool_results] == [
+            "tool_slow", "tool_medium", "tool_fast"
+        ]
+        assert tool_results[0]["content"] == "results for slow"
+
+    @pytest.mark.asyncio
+    async def test_runs_serially_without_session_factory(self, db_session):
+        """Without a session factory, tools share the request session in order."""
+        calls = []
+
+        async def execute_tool(tool_name, tool_input, project_id, thread_id, db):
+            calls.append((tool_input["query"], db))
+            return ("ok", None)
+
+        service = _bare_service()
+        service.execute_tool = execute_tool
+
+        results = await service._execute_tool_calls(
+            [
+                {"id": "a", "name": "search_documents", "input": {"query": "a"}},
+                {"id": "b", "name": "search_documents", "input": {"query": "b"}},
+            ],
+            "project-1",
+            "thread-1",
+            db_session
+        )
+
+        assert results == [("ok", None), ("ok", None)]
+        assert calls == [("a", db_session), ("b", db_session)]
+
+
+    @pytest.mark.asyncio
+    async def test_searches_after_save_artifact_do_not_run(self, db_session):
+        """A save that ends the turn skips later searches instead of racing them."""
+        calls = []
+
+        @asynccontextmanager
+        async def session_factory():
+            yield object()
+
+        async def execute_tool(tool_name, tool_input, project_id, thread_id, db):
+            calls.append(tool_input.get("query", tool_name))
+            if tool_name == "save_artifact":
+                return ("saved", {"id": "artifact-1"})
+            return ("ok", None)
+
+        service = _bare_service(session_factory=session_factory)
+        service.execute_tool = execute_tool
+
+        results = await service._execute_tool_calls(
+            [
+                {"id": "a", "name": "search_documents", "input": {"query": "a"}},
+                {"id": "b", "name": "search_documents", "input": {"query": "b"}},
+                {"id": "s", "name": "save_artifact", "input": {}},
+                {"id": "c", "name": "search_documents", "input": {"query": "c"}},
+                {"id": "d", "name": "search_documents", "input": {"query": "d"}},
+            ],
+            "project-1",
+            "thread-1",
+            db_session
+        )
+
+        assert sorted(calls[:2]) == ["a", "b"]
+        assert calls[2:] == ["save_artifact"]
+        assert results[2] == ("saved", {"id": "artifact-1"})
+
+
 class TestAIServiceInit:
     """Tests for AIService initialization."""
 
@@ -1,5 +1,6 @@
 """Unit tests for conversation_service pure functions."""
 
+import time
 import pytest
 from datetime import datetime, timedelta
 from types import SimpleNamespace
@@ -244,6 +245,154 @@ class TestIdentifyFulfilledPairs:
         assert result == {"msg1"}
 
 
+    def test_unsorted_artifacts_still_matched(self):
+        """Artifact order does not matter (timestamps are sorted internally)."""
+        base_time = datetime(2026, 2, 5, 12, 0, 0)
+        messages = [
+            SimpleNamespace(id="msg1", role="user", created_at=base_time),
+            SimpleNamespace(id="msg2", role="assistant", created_at=base_time + timedelta(seconds=1)),
+        ]
+        artifacts = [
+            SimpleNamespace(created_at=base_time + timedelta(seconds=60)),
+            SimpleNamespace(created_at=base_time + timedelta(seconds=2)),
+        ]
+
+        result = _identify_fulfilled_pairs(messages, artifacts)
+
+        assert result == {"msg1", "msg2"}
+
+    def test_artifact_at_window_boundary_matched(self):
+        """Artifact exactly ARTIFACT_CORRELATION_WINDOW after message still matches."""
+        base_time = datetime(2026, 2, 5, 12, 0, 0)
+        messages = [
+            SimpleNamespace(id="msg1", role="assistant", created_at=base_time),
+        ]
+        artifacts = [SimpleNamespace(created_at=base_time + ARTIFACT_CORRELATION_WINDOW)]
+
+        assert _identify_fulfilled_pairs(messages, artifacts) == {"msg1"}
+
+
+class TestTruncationWithPrecomputedTokens:
+    """Tests for truncate_conversation with cached per-message token counts."""
+
+    def test_precomputed_tokens_match_estimation(self):
+        messages = [
+            {"role": "user", "content": "a" * 4000},
+            {"role": "assistant", "content": "b" * 4000},
+            {"role": "user", "content": "recent"},
+        ]
+        tokens = [estimate_messages_tokens([m]) for m in messages]
+
+        assert truncate_conversation(messages, 100, tokens) == truncate_conversation(messages, 100)
+
+    def test_precomputed_tokens_drive_the_cut(self):
+        """The supplied counts are used as-is (no re-estimation of content)."""
+        messages = [
+            {"role": "user", "content": "x"},
+            {"role": "assistant", "content": "y"},
+        ]
+        # Pretend the first message is huge
+        result = truncate_conversation(messages, 100, [1000, 1])
+
+        assert "1 earlier messages" in result[0]["content"]
+        assert result[1] == messages[1]
+
+
+def _legacy_identify_fulfilled_pairs(messages, artifacts):
+    """Pre-optimization O(messages x artifacts) implementation (reference only)."""
+    fulfilled_ids = set()
+    for i, msg in enumerate(messages):
+        if msg.role != "assistant":
+            continue
+        for artifact in artifacts:
+            time_diff = (artifact.created_at - msg.created_at).total_seconds()
+            if 0 <= time_diff <= ARTIFACT_CORRELATION_WINDOW.total_seconds():
+                fulfilled_ids.add(msg.id)
+                if i > 0 and messages[i - 1].role == "user":
+                    fulfilled_ids.add(messages[i - 1].id)
+                break
+    return fulfilled_ids
+
+
+def _make_thread(num_messages: int, num_artifacts: int):
+    """Build a synthetic thread: alternating turns, artifacts spread evenly."""
+    base_time = datetime(2026, 2, 5, 12, 0, 0)
+    messages = [
+        SimpleNamespace(
+            id=f"msg{i}",
+            role="user" if i % 2 == 0 else "assistant",
+            content="m" * 400,
+            created_at=base_time + timedelta(seconds=10 * i),
+        )
+        for i in range(num_messages)
+    ]
+    step = max(num_messages // num_artifacts, 1)
+    artifacts = [
+        SimpleNamespace(created_at=messages[i].created_at + timedelta(seconds=2))
+        for i in range(1, num_messages, step)
+    ][:num_artifacts]
+    return messages, artifacts
+
+
+def _best_time(fn, repeats: int = 3) -> float:
+    """Best-of-N wall time for fn() in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class TestContextPipelineScaling:
+    """
+    Micro-benchmark: 10k-message / 1k-artifact threads.
+
+    Growing the thread 4x should grow cost roughly 4x (linear / n log n).
+    The pre-optimization pair detection grew ~16x (messages x artifacts).
+    """
+
+    def test_fulfilled_pairs_match_legacy_results(self):
+        messages, artifacts = _make_thread(2000, 200)
+
+        assert _identify_fulfilled_pairs(messages, artifacts) == \
+            _legacy_identify_fulfilled_pairs(messages, artifacts)
+
+    def test_fulfilled_pairs_scale_subquadratically(self):
+        small = _make_thread(2500, 250)
+        large = _make_thread(10000, 1000)
+
+        small_time = _best_time(lambda: _identify_fulfilled_pairs(*small))
+        large_time = _best_time(lambda: _identify_fulfilled_pairs(*large))
+
+        # 4x input: linear ~4x, legacy quadratic ~16x
+        assert large_time < small_time * 10, (
+            f"10k/1k took {large_time * 1000:.1f}ms vs 2.5k/250 {small_time * 1000:.1f}ms"
+        )
+
+    def test_fulfilled_pairs_faster_than_legacy(self):
+        messages, artifacts = _make_thread(10000, 1000)
+
+        new_time = _best_time(lambda: _identify_fulfilled_pairs(messages, artifacts), repeats=1)
+        legacy_time = _best_time(
+            lambda: _legacy_identify_fulfilled_pairs(messages, artifacts), repeats=1
+        )
+
+        assert new_time < legacy_time
+
+    def test_truncation_scales_linearly(self):
+        small = [{"role": "user", "content": "m" * 400} for _ in range(2500)]
+        large = [{"role": "user", "content": "m" * 400} for _ in range(10000)]
+
+        # Budget keeps ~half the small thread so both paths truncate
+        small_time = _best_time(lambda: truncate_conversation(small, 150000))
+        large_time = _best_time(lambda: truncate_conversation(large, 150000))
+
+        assert large_time < small_time * 10, (
+            f"10k took {large_time * 1000:.1f}ms vs 2.5k {small_time * 1000:.1f}ms"
+        )
+
+
 class TestMaxContextTokensRegression:
     """TOKEN-02: Regression test ensuring 150K truncation limit is preserved."""
 
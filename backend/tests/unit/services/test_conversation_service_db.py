@@ -1,11 +1,17 @@
 """Unit tests for conversation_service database functions."""
 
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from app.database import THREAD_COUNTERS_BACKFILL_SQL
 from app.services.conversation_service import (
+    MESSAGE_PREVIEW_CHARS,
     save_message,
     build_conversation_context,
     get_message_count,
+    get_context_cache,
+    ConversationContextCache,
+    _ThreadContext,
 )
 from app.models import Thread, Message, User, Project, Artifact, ArtifactType
 
@@ -66,6 +72,20 @@ class TestSaveMessage:
 
         assert message.role == "assistant"
 
+    @pytest.mark.asyncio
+    async def test_stores_token_count(self, db_session, user):
+        """Token count is computed once and stored on the message row."""
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(id="test-thread-tokens", user_id=user.id, title="Test")
+        db_session.add(thread)
+        await db_session.commit()
+
+        message = await save_message(db_session, thread.id, "user", "a" * 400)
+
+        assert message.token_count == 100
+
 
 class TestBuildConversationContext:
     """Tests for build_conversation_context function."""
@@ -206,6 +226,257 @@ class TestBuildConversationContext:
         assert context[1]["content"] == "Good question. Let me explain..."
 
 
+class TestConversationContextCache:
+    """Tests for the per-thread incremental context cache."""
+
+    @pytest.mark.asyncio
+    async def test_build_populates_cache(self, db_session, user):
+        """First build caches the thread context with a running token total."""
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(id="cache-thread-1", user_id=user.id, title="Cache")
+        db_session.add(thread)
+        await db_session.commit()
+
+        await save_message(db_session, thread.id, "user", "a" * 400)
+        await build_conversation_context(db_session, thread.id)
+
+        entry = get_context_cache().get(thread.id)
+        assert entry is not None
+        assert entry.total_tokens == 100
+
+    @pytest.mark.asyncio
+    async def test_save_message_appends_new_turn(self, db_session, user):
+        """Messages saved after a build are appended to the cached context."""
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(id="cache-thread-2", user_id=user.id, title="Cache")
+        db_session.add(thread)
+        await db_session.commit()
+
+        await save_message(db_session, thread.id, "user", "First")
+        first = await build_conversation_context(db_session, thread.id)
+        await save_message(db_session, thread.id, "assistant", "Second")
+        await save_message(db_session, thread.id, "user", "Third")
+        second = await build_conversation_context(db_session, thread.id)
+
+        assert [m["content"] for m in first] == ["First"]
+        assert [m["content"] for m in second] == ["First", "Second", "Third"]
+        assert get_context_cache().get(thread.id).total_tokens == sum(
+            len(m["content"]) // 4 for m in second
+        )
+
+    @pytest.mark.asyncio
+    async def test_picks_up_messages_inserted_outside_save_message(self, db_session, user):
+        """Cache hit still loads messages newer than the cached watermark."""
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(id="cache-thread-3", user_id=user.id, title="Cache")
+        db_session.add(thread)
+        await db_session.commit()
+
+        base_time = datetime.now(timezone.utc)
+        db_session.add(Message(thread_id=thread.id, role="user", content="Old", created_at=base_time))
+        await db_session.commit()
+        await build_conversation_context(db_session, thread.id)
+
+        db_session.add(Message(
+            thread_id=thread.id, role="assistant", content="New",
+            created_at=base_time + timedelta(seconds=1)
+        ))
+        await db_session.commit()
+        context = await build_conversation_context(db_session, thread.id)
+
+        assert [m["content"] for m in context] == ["Old", "New"]
+
+    @pytest.mark.asyncio
+    async def test_uses_stored_token_counts(self, db_session, user):
+        """Stored token counts are summed instead of re-estimating content."""
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(id="cache-thread-tokens", user_id=user.id, title="Cache")
+        db_session.add(thread)
+        await db_session.commit()
+
+        db_session.add(Message(thread_id=thread.id, role="user", content="Hi", token_count=7))
+        await db_session.commit()
+        await save_message(db_session, thread.id, "assistant", "a" * 40)
+
+        context = await build_conversation_context(db_session, thread.id)
+
+        assert context.token_count == 17
+        assert get_context_cache().get(thread.id).total_tokens == 17
+
+    @pytest.mark.asyncio
+    async def test_returned_list_is_a_copy(self, db_session, user):
+        """Callers appending to the context do not corrupt the cache."""
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(id="cache-thread-4", user_id=user.id, title="Cache")
+        db_session.add(thread)
+        await db_session.commit()
+
+        await save_message(db_session, thread.id, "user", "Hello")
+        context = await build_conversation_context(db_session, thread.id)
+        context.append({"role": "user", "content": "ephemeral"})
+
+        context = await build_conversation_context(db_session, thread.id)
+        assert [m["content"] for m in context] == ["Hello"]
+
+    @pytest.mark.asyncio
+    async def test_artifact_creation_invalidates_cache(self, db_session, user):
+        """Creating an artifact drops the cache so the pair gets filtered."""
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(id="cache-thread-5", user_id=user.id, title="Cache")
+        db_session.add(thread)
+        await db_session.commit()
+
+        base_time = datetime.now(timezone.utc)
+        db_session.add_all([
+            Message(thread_id=thread.id, role="user", content="Generate a BRD", created_at=base_time),
+            Message(thread_id=thread.id, role="assistant", content="Done", created_at=base_time + timedelta(seconds=1)),
+        ])
+        await db_session.commit()
+        assert len(await build_conversation_context(db_session, thread.id)) == 2
+
+        db_session.add(Artifact(
+            thread_id=thread.id,
+            artifact_type=ArtifactType.BRD,
+            title="BRD",
+            content_markdown="# BRD",
+            created_at=base_time + timedelta(seconds=2),
+        ))
+        await db_session.commit()
+
+        assert get_context_cache().get(thread.id) is None
+        assert await build_conversation_context(db_session, thread.id) == []
+
+    @pytest.mark.asyncio
+    async def test_message_deletion_invalidates_cache(self, db_session, user):
+        """Deleting a message drops the cached context for its thread."""
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(id="cache-thread-6", user_id=user.id, title="Cache")
+        db_session.add(thread)
+        await db_session.commit()
+
+        await save_message(db_session, thread.id, "user", "Keep")
+        doomed = await save_message(db_session, thread.id, "assistant", "Delete me")
+        await build_conversation_context(db_session, thread.id)
+
+        await db_session.delete(doomed)
+        await db_session.commit()
+
+        assert get_context_cache().get(thread.id) is None
+        context = await build_conversation_context(db_session, thread.id)
+        assert [m["content"] for m in context] == ["Keep"]
+
+    @pytest.mark.asyncio
+    async def test_write_in_other_worker_is_detected(self, db_session, user):
+        """
+        A delete, artifact or summary committed by another worker (whose
+        after_commit invalidation never reaches this process) is caught by
+        the thread-row check on the next cache hit.
+        """
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(id="cache-thread-workers", user_id=user.id, title="Cache")
+        db_session.add(thread)
+        await db_session.commit()
+
+        base_time = datetime.now(timezone.utc)
+        first = Message(thread_id=thread.id, role="user", content="One", created_at=base_time)
+        doomed = Message(
+            thread_id=thread.id, role="assistant", content="Two",
+            created_at=base_time + timedelta(seconds=1)
+        )
+        db_session.add_all([first, doomed])
+        await db_session.commit()
+        await build_conversation_context(db_session, thread.id)
+
+        async def commit_elsewhere(*changes):
+            stale = get_context_cache().get(thread.id)
+            for change in changes:
+                await change
+            await db_session.commit()
+            get_context_cache().put(thread.id, stale)  # Other worker's cache only
+
+        await commit_elsewhere(db_session.delete(doomed))
+        assert [m["content"] for m in await build_conversation_context(db_session, thread.id)] == ["One"]
+
+        db_session.add(Message(
+            thread_id=thread.id, role="assistant", content="Made a BRD",
+            created_at=base_time + timedelta(seconds=2)
+        ))
+        await db_session.commit()
+        assert len(await build_conversation_context(db_session, thread.id)) == 2
+
+        db_session.add(Artifact(
+            thread_id=thread.id,
+            artifact_type=ArtifactType.BRD,
+            title="BRD",
+            content_markdown="# BRD",
+            created_at=base_time + timedelta(seconds=3),
+        ))
+        await commit_elsewhere()
+        assert await build_conversation_context(db_session, thread.id) == []
+
+        thread.context_summary = "Summary of earlier turns"
+        thread.context_summary_until = base_time + timedelta(seconds=2)
+        await commit_elsewhere()
+        context = await build_conversation_context(db_session, thread.id)
+        assert "Summary of earlier turns" in context[0]["content"]
+
+    @pytest.mark.asyncio
+    async def test_validation_does_not_rely_on_thread_counters(self, db_session, user):
+        """A delete that bypasses the ORM (no counter update) is still detected."""
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(id="cache-thread-raw", user_id=user.id, title="Cache")
+        db_session.add(thread)
+        await db_session.commit()
+
+        base_time = datetime.now(timezone.utc)
+        db_session.add_all([
+            Message(thread_id=thread.id, role="user", content="One", created_at=base_time),
+            Message(
+                id="raw-doomed", thread_id=thread.id, role="assistant", content="Two",
+                created_at=base_time + timedelta(seconds=1)
+            ),
+        ])
+        await db_session.commit()
+        await build_conversation_context(db_session, thread.id)
+
+        await db_session.execute(text("DELETE FROM messages WHERE id = 'raw-doomed'"))
+        await db_session.commit()
+
+        context = await build_conversation_context(db_session, thread.id)
+        assert [m["content"] for m in context] == ["One"]
+
+    def test_lru_evicts_least_recently_used(self):
+        """Oldest untouched thread is evicted when the cache is full."""
+        cache = ConversationContextCache(max_threads=2)
+        cache.put("a", _ThreadContext())
+        cache.put("b", _ThreadContext())
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", _ThreadContext())
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert len(cache) == 2
+
+
 class TestGetMessageCount:
     """Tests for get_message_count function."""
 
@@ -262,3 +533,95 @@ class TestGetMessageCount:
 
         assert await get_message_count(db_session, thread1.id) == 3
         assert await get_message_count(db_session, thread2.id) == 7
+
+
+class TestThreadCounters:
+    """Tests for the denormalized Thread counters maintained on flush."""
+
+    @pytest.mark.asyncio
+    async def test_save_message_updates_count_and_preview(self, db_session, user):
+        """save_message bumps message_count and stores the preview."""
+        db_session.add(user)
+        thread = Thread(id="test-thread-10", user_id=user.id, title="Counters")
+        db_session.add(thread)
+        await db_session.commit()
+
+        await save_message(db_session, thread.id, "user", "First question")
+        await save_message(db_session, thread.id, "assistant", "A" * 500)
+
+        # In-session object is adjusted without a refresh
+        assert thread.message_count == 2
+        assert thread.last_message_preview == "A" * MESSAGE_PREVIEW_CHARS
+        await db_session.refresh(thread)
+        assert thread.message_count == 2
+
+    @pytest.mark.asyncio
+    async def test_delete_recomputes_preview(self, db_session, user):
+        """Deleting the newest message decrements and falls back to the previous one."""
+        db_session.add(user)
+        thread = Thread(id="test-thread-11", user_id=user.id, title="Delete")
+        db_session.add(thread)
+        await db_session.commit()
+        now = datetime.now(timezone.utc)
+        older = Message(thread_id=thread.id, role="user", content="older", created_at=now)
+        newer = Message(
+            thread_id=thread.id, role="assistant", content="newer",
+            created_at=now + timedelta(seconds=1)
+        )
+        db_session.add_all([older, newer])
+        await db_session.commit()
+        assert thread.last_message_preview == "newer"
+
+        await db_session.delete(newer)
+        await db_session.commit()
+        await db_session.refresh(thread)
+
+        assert thread.message_count == 1
+        assert thread.last_message_preview == "older"
+
+    @pytest.mark.asyncio
+    async def test_artifact_count_without_touching_updated_at(self, db_session, user):
+        """Artifact inserts/deletes maintain artifact_count; updated_at is unchanged."""
+        db_session.add(user)
+        thread = Thread(id="test-thread-12", user_id=user.id, title="Artifacts")
+        db_session.add(thread)
+        await db_session.commit()
+        await db_session.refresh(thread)
+        updated_at = thread.updated_at
+
+        artifacts = [
+            Artifact(thread_id=thread.id, artifact_type=ArtifactType.BRD, title=f"BRD {i}",
+                     content_markdown="# BRD")
+            for i in range(2)
+        ]
+        db_session.add_all(artifacts)
+        await db_session.commit()
+        await db_session.delete(artifacts[0])
+        await db_session.commit()
+        await db_session.refresh(thread)
+
+        assert (thread.artifact_count, thread.message_count) == (1, 0)
+        assert thread.updated_at == updated_at
+
+    @pytest.mark.asyncio
+    async def test_backfill_matches_rows(self, db_session, user):
+        """The migration backfill recomputes counters from existing rows."""
+        db_session.add(user)
+        thread = Thread(id="test-thread-13", user_id=user.id, title="Backfill")
+        db_session.add(thread)
+        await db_session.commit()
+        for i in range(3):
+            db_session.add(Message(
+                thread_id=thread.id, role="user", content=f"Msg {i}",
+                created_at=datetime.now(timezone.utc) + timedelta(seconds=i)
+            ))
+        await db_session.commit()
+        await db_session.execute(text(
+            "UPDATE threads SET message_count = 0, last_message_preview = NULL"
+        ))
+
+        await db_session.execute(text(THREAD_COUNTERS_BACKFILL_SQL))
+        await db_session.refresh(thread)
+
+        assert thread.message_count == 3
+        assert thread.last_message_preview == "Msg 2"
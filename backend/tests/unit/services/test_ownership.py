@@ -0,0 +1,149 @@
+"""Unit tests for denormalized owner_user_id maintenance and access checks."""
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.database import OWNER_BACKFILL_SQL
+from app.models import Artifact, ArtifactType, Document, Project, Thread, User
+from app.services.ownership import get_owned_thread
+
+
+async def _add_user(db_session, email: str) -> User:
+    user = User(email=email, oauth_provider="google", oauth_id=f"google_{email}")
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+def _artifact(thread_id: str) -> Artifact:
+    return Artifact(
+        thread_id=thread_id,
+        artifact_type=ArtifactType.USER_STORIES,
+        title="Stories",
+        content_markdown="# Stories",
+    )
+
+
+class TestOwnerOnCreate:
+    """owner_user_id is resolved when rows are inserted."""
+
+    @pytest.mark.asyncio
+    async def test_project_less_thread_and_children(self, db_session, user):
+        db_session.add(user)
+        await db_session.commit()
+
+        thread = Thread(user_id=user.id, title="Direct")
+        db_session.add(thread)
+        await db_session.commit()
+        doc = Document(thread_id=thread.id, filename="a.md", content_encrypted=b"x")
+        artifact = _artifact(thread.id)
+        db_session.add_all([doc, artifact])
+        await db_session.commit()
+
+        assert thread.owner_user_id == user.id
+        assert doc.owner_user_id == user.id
+        assert artifact.owner_user_id == user.id
+
+    @pytest.mark.asyncio
+    async def test_project_rows_in_one_flush(self, db_session, user):
+        """Project, thread and artifact added together (relationships, no IDs yet)."""
+        db_session.add(user)
+        await db_session.commit()
+
+        project = Project(user_id=user.id, name="P")
+        thread = Thread(project=project, title="In project")
+        artifact = Artifact(
+            thread=thread,
+            artifact_type=ArtifactType.BRD,
+            title="BRD",
+            content_markdown="# BRD",
+        )
+        doc = Document(project=project, filename="b.md", content_encrypted=b"x")
+        db_session.add_all([project, thread, artifact, doc])
+        await db_session.commit()
+
+        assert (thread.owner_user_id, artifact.owner_user_id, doc.owner_user_id) == (user.id,) * 3
+
+
+class TestOwnerOnMove:
+    """Moving a thread into a project re-owns its documents and artifacts."""
+
+    @pytest.mark.asyncio
+    async def test_move_propagates_to_children(self, db_session, user):
+        db_session.add(user)
+        other = await _add_user(db_session, "other@example.com")
+        project = Project(user_id=other.id, name="Other's project")
+        thread = Thread(user_id=user.id, title="Moving")
+        db_session.add_all([project, thread])
+        await db_session.commit()
+        doc = Document(thread_id=thread.id, filename="a.md", content_encrypted=b"x")
+        artifact = _artifact(thread.id)
+        db_session.add_all([doc, artifact])
+        await db_session.commit()
+
+        thread.project_id = project.id
+        thread.user_id = None
+        await db_session.commit()
+
+        assert thread.owner_user_id == other.id
+        assert (doc.owner_user_id, artifact.owner_user_id) == (other.id, other.id)
+        rows = (await db_session.execute(text(
+            "SELECT owner_user_id FROM documents UNION ALL SELECT owner_user_id FROM artifacts"
+        ))).scalars().all()
+        assert rows == [other.id, other.id]
+
+
+class TestGetOwnedThread:
+    """Tests for the single-query access check."""
+
+    @pytest.mark.asyncio
+    async def test_owner_and_project_owner_allowed_others_404(self, db_session, user):
+        db_session.add(user)
+        other = await _add_user(db_session, "other@example.com")
+        project = Project(user_id=user.id, name="P")
+        db_session.add(project)
+        await db_session.commit()
+        direct = Thread(user_id=user.id, title="Direct")
+        in_project = Thread(project_id=project.id, title="In project")
+        db_session.add_all([direct, in_project])
+        await db_session.commit()
+
+        assert (await get_owned_thread(db_session, direct.id, user.id)).id == direct.id
+        assert (await get_owned_thread(db_session, in_project.id, user.id)).id == in_project.id
+        for thread_id in (direct.id, in_project.id, "missing"):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_owned_thread(db_session, thread_id, other.id)
+            assert exc_info.value.status_code == 404
+
+
+class TestOwnerBackfill:
+    """Tests for OWNER_BACKFILL_SQL (run by _run_migrations on upgrade)."""
+
+    @pytest.mark.asyncio
+    async def test_backfill_resolves_owners(self, db_session, user):
+        db_session.add(user)
+        await db_session.commit()
+        project = Project(user_id=user.id, name="P")
+        db_session.add(project)
+        await db_session.commit()
+        thread = Thread(project_id=project.id, title="T")
+        db_session.add(thread)
+        await db_session.commit()
+        db_session.add_all([
+            _artifact(thread.id),
+            Document(project_id=project.id, filename="p.md", content_encrypted=b"x"),
+            Document(thread_id=thread.id, filename="t.md", content_encrypted=b"x"),
+        ])
+        await db_session.commit()
+        for table in ("threads", "documents", "artifacts"):
+            await db_session.execute(text(f"UPDATE {table} SET owner_user_id = NULL"))
+
+        for backfill_sql in OWNER_BACKFILL_SQL:
+            await db_session.execute(text(backfill_sql))
+
+        owners = (await db_session.execute(text(
+            "SELECT owner_user_id FROM threads UNION ALL SELECT owner_user_id FROM documents "
+            "UNION ALL SELECT owner_user_id FROM artifacts"
+        ))).scalars().all()
+        assert owners == [user.id] * 4
@@ -0,0 +1,183 @@
+"""Unit tests and listener benchmark for aggregated database query metrics."""
+
+import logging
+import re
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app import database
+from app.services import query_metrics
+from app.services.logging_service import get_logging_service
+from app.services.query_metrics import QueryMetrics, get_query_metrics, parse_statement
+
+INSERT_DOCUMENT = (
+    "INSERT INTO documents (id, project_id, filename, content_encrypted, content_text) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+
+@pytest.fixture
+def quiet_logging():
+    """Logging service at INFO, so per-query DEBUG lines would be dropped."""
+    with patch.object(get_logging_service(), "min_level", logging.INFO):
+        yield
+
+
+class TestParseStatement:
+    """Tests for cached statement parsing."""
+
+    def test_operation_and_table(self):
+        assert parse_statement("SELECT threads.id FROM threads WHERE threads.id = ?") == ("SELECT", "threads")
+        assert parse_statement("  insert into messages (id) VALUES (?)") == ("INSERT", "messages")
+        assert parse_statement("UPDATE projects SET name=?") == ("UPDATE", "projects")
+        assert parse_statement("BEGIN") == ("UNKNOWN", "unknown")
+        assert parse_statement("PRAGMA table_info(users)") is None
+
+    def test_parse_is_cached_per_statement(self):
+        parse_statement.cache_clear()
+
+        for _ in range(3):
+            parse_statement(INSERT_DOCUMENT)
+
+        info = parse_statement.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
+
+
+class TestQueryMetrics:
+    """Tests for aggregation, histograms and flushing."""
+
+    def test_aggregates_per_table_and_operation(self):
+        metrics = QueryMetrics(flush_interval=3600)
+
+        metrics.record("SELECT * FROM threads", 0.5)
+        metrics.record("SELECT * FROM threads", 20.0)
+        metrics.record(INSERT_DOCUMENT, 2000.0)
+        metrics.record("PRAGMA foreign_keys=ON", 0.1)
+
+        snapshot = metrics.snapshot()
+        assert set(snapshot) == {"threads.SELECT", "documents.INSERT"}
+        threads = snapshot["threads.SELECT"]
+        assert (threads["count"], threads["total_ms"], threads["max_ms"]) == (2, 20.5, 20.0)
+        assert threads["histogram"]["le_1ms"] == 1
+        assert threads["histogram"]["le_50ms"] == 1
+        assert snapshot["documents.INSERT"]["histogram"]["gt_1000ms"] == 1
+
+    def test_disabled_records_nothing(self):
+        metrics = QueryMetrics(enabled=False)
+
+        metrics.record("SELECT * FROM threads", 1.0)
+
+        assert metrics.snapshot() == {}
+
+    @patch('app.services.logging_service.get_logging_service')
+    def test_flush_logs_one_line_per_key_and_resets(self, mock_get_logging):
+        metrics = QueryMetrics(flush_interval=3600)
+        for _ in range(50):
+            metrics.record("SELECT * FROM threads", 1.0)
+        metrics.record(INSERT_DOCUMENT, 3.0)
+
+        entries = metrics.flush()
+
+        assert [(e["table"], e["operation"], e["count"]) for e in entries] == [
+            ("documents", "INSERT", 1), ("threads", "SELECT", 50)
+        ]
+        assert mock_get_logging.return_value.log.call_count == 2
+        assert metrics.snapshot() == {}
+        assert metrics.flush() == []
+
+    @patch('app.services.logging_service.get_logging_service')
+    def test_flushes_when_interval_elapsed(self, mock_get_logging):
+        metrics = QueryMetrics(flush_interval=0.05)
+        metrics.record("SELECT * FROM threads", 1.0)
+        assert metrics.flushes == 0
+
+        time.sleep(0.06)
+        metrics.record("SELECT * FROM threads", 1.0)
+
+        assert metrics.flushes == 1
+        assert metrics.snapshot() == {}
+
+
+class TestCursorListener:
+    """Tests for database.after_cursor_execute."""
+
+    def test_skips_per_query_log_below_level(self, quiet_logging):
+        metrics = QueryMetrics(flush_interval=3600)
+        with patch.object(database, "get_query_metrics", return_value=metrics), \
+                patch.object(get_logging_service(), "log") as mock_log:
+            database.after_cursor_execute(None, None, INSERT_DOCUMENT, (), None, False)
+
+        mock_log.assert_not_called()
+        assert metrics.snapshot()["documents.INSERT"]["count"] == 1
+
+    def test_logs_per_query_at_debug(self):
+        metrics = QueryMetrics(flush_interval=3600)
+        with patch.object(get_logging_service(), "min_level", logging.DEBUG), \
+                patch.object(database, "get_query_metrics", return_value=metrics), \
+                patch.object(get_logging_service(), "log") as mock_log:
+            database.after_cursor_execute(None, None, INSERT_DOCUMENT, (), None, False)
+            database.after_cursor_execute(None, None, "PRAGMA foreign_keys=ON", (), None, False)
+
+        mock_log.assert_called_once()
+        assert mock_log.call_args.kwargs["table"] == "documents"
+
+    def test_singleton_follows_settings(self):
+        with patch.object(query_metrics, "_query_metrics", None), \
+                patch.object(query_metrics.settings, "db_query_metrics_enabled", False):
+            assert get_query_metrics().enabled is False
+
+
+def _legacy_after_cursor_execute(statement, duration_ms):
+    """Pre-optimization listener body: parse and log every query unconditionally."""
+    if statement.strip().upper().startswith('PRAGMA'):
+        return
+    statement_upper = statement.strip().upper()
+    operation = 'UNKNOWN'
+    if statement_upper.startswith('SELECT'):
+        operation = 'SELECT'
+    elif statement_upper.startswith('INSERT'):
+        operation = 'INSERT'
+    table_match = re.search(r'(?:FROM|INTO|UPDATE)\s+([a-zA-Z_][a-zA-Z0-9_]*)', statement_upper)
+    table = table_match.group(1).lower() if table_match else 'unknown'
+    get_logging_service().log(
+        'DEBUG', f'DB {operation} {table}', 'db',
+        correlation_id=None, operation=operation, table=table,
+        duration_ms=round(duration_ms, 2), db_event='query'
+    )
+
+
+class TestListenerBenchmark:
+    """
+    Micro-benchmark: per-statement listener cost at log_level=INFO.
+
+    A bulk document import issues many identical INSERTs; the aggregated
+    path must cost less than parsing and logging each one.
+    """
+
+    def test_aggregated_listener_faster_than_per_query_logging(self, quiet_logging):
+        statements = [INSERT_DOCUMENT, "SELECT * FROM threads WHERE id = ?"] * 1000
+        metrics = QueryMetrics(flush_interval=3600)
+        root = logging.getLogger()
+        root_level = root.level
+        root.setLevel(logging.DEBUG)  # As configured by LoggingService
+        try:
+            with patch.object(root, "handlers", [MagicMock(level=logging.INFO)]):
+                start = time.perf_counter()
+                for statement in statements:
+                    _legacy_after_cursor_execute(statement, 1.0)
+                legacy_time = time.perf_counter() - start
+
+                with patch.object(database, "get_query_metrics", return_value=metrics):
+                    start = time.perf_counter()
+                    for statement in statements:
+                        database.after_cursor_execute(None, None, statement, (), None, False)
+                    new_time = time.perf_counter() - start
+        finally:
+            root.setLevel(root_level)
+
+        assert metrics.snapshot()["documents.INSERT"]["count"] == 1000
+        assert new_time < legacy_time, (
+            f"aggregated {new_time * 1000:.1f}ms vs per-query {legacy_time * 1000:.1f}ms"
+        )
@@ -0,0 +1,143 @@
+"""Unit tests for MCP session registry backends."""
+
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services import session_registry
+from app.services.session_registry import (
+    InMemorySessionRegistry,
+    SQLiteSessionRegistry,
+    get_session_registry,
+    open_context_db,
+    session_db_path,
+)
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "mcp_sessions.db")
+
+
+@pytest.fixture(autouse=True)
+def _reset_registries():
+    session_registry.close_session_registries()
+    yield
+    session_registry.close_session_registries()
+
+
+class TestInMemorySessionRegistry:
+    """Tests for the per-process backend."""
+
+    def test_register_lookup_unregister(self):
+        registry = InMemorySessionRegistry(ttl=60)
+        db = object()
+
+        registry.register("tok", {"db": db, "thread_id": "t1"})
+        assert registry.lookup("tok") == {"db": db, "thread_id": "t1"}
+
+        registry.unregister("tok")
+        registry.unregister("tok")  # No-op
+        assert registry.lookup("tok") is None
+
+    def test_expired_tokens_are_evicted(self):
+        registry = InMemorySessionRegistry(ttl=60)
+        registry.register("leaked", {"thread_id": "t1"}, ttl=-1)
+
+        assert registry.lookup("leaked") is None
+        registry.register("other", {"thread_id": "t2"}, ttl=-1)
+        registry.register("live", {"thread_id": "t3"})
+        assert len(registry) == 1
+
+
+class TestSQLiteSessionRegistry:
+    """Tests for the registry shared across workers via a SQLite file."""
+
+    def test_visible_to_other_workers(self, sqlite_path):
+        worker_a = SQLiteSessionRegistry(sqlite_path, ttl=60, namespace="mcp_server")
+        worker_b = SQLiteSessionRegistry(sqlite_path, ttl=60, namespace="mcp_server")
+        other_namespace = SQLiteSessionRegistry(sqlite_path, ttl=60, namespace="mcp_tools")
+
+        worker_a.register("tok", {"thread_id": "t1"})
+
+        assert worker_b.lookup("tok") == {"thread_id": "t1"}
+        assert other_namespace.lookup("tok") is None
+
+        worker_b.unregister("tok")
+        assert worker_a.lookup("tok") is None
+        for registry in (worker_a, worker_b, other_namespace):
+            registry.close()
+
+    def test_ttl_hides_and_purges_leaked_tokens(self, sqlite_path):
+        registry = SQLiteSessionRegistry(sqlite_path, ttl=60)
+        registry.register("live", {"thread_id": "t2"})  # Purges (none expired yet)
+        registry.register("leaked", {"thread_id": "t1"}, ttl=-1)
+
+        assert registry.lookup("leaked") is None
+        assert registry.purge_expired() == 1
+        assert registry.lookup("live") == {"thread_id": "t2"}
+        registry.close()
+
+    def test_rejects_live_objects(self, sqlite_path):
+        registry = SQLiteSessionRegistry(sqlite_path, ttl=60)
+
+        with pytest.raises(TypeError):
+            registry.register("tok", {"db": object()})
+        registry.close()
+
+
+class TestRegistryWiring:
+    """Tests for backend selection and MCP server registration."""
+
+    def test_backend_from_settings(self, sqlite_path):
+        with patch.object(session_registry.settings, "mcp_session_backend", "sqlite"), \
+                patch.object(session_registry.settings, "mcp_session_db_path", sqlite_path):
+            registry = get_session_registry("mcp_server")
+
+        assert isinstance(registry, SQLiteSessionRegistry)
+        assert get_session_registry("mcp_server") is registry
+
+    def test_db_path_defaults_next_to_sqlite_database(self, tmp_path):
+        with patch.object(session_registry.settings, "mcp_session_db_path", ""), \
+                patch.object(session_registry.settings, "database_url",
+                             f"sqlite+aiosqlite:///{tmp_path}/app.db"):
+            assert session_db_path() == str(tmp_path / "mcp_sessions.db")
+
+    def test_relative_db_path_ignores_cwd(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        with patch.object(session_registry.settings, "mcp_session_db_path", "run/sessions.db"):
+            path = session_db_path()
+
+        assert path.endswith("backend/run/sessions.db")
+        assert not path.startswith(str(tmp_path))
+
+    def test_unknown_backend_raises(self):
+        with patch.object(session_registry.settings, "mcp_session_backend", "redis"):
+            with pytest.raises(ValueError, match="Unknown MCP session backend"):
+                get_session_registry("mcp_server")
+
+    def test_shared_backend_omits_live_session(self, sqlite_path):
+        from app.mcp_server import register_mcp_session, unregister_mcp_session
+
+        with patch.object(session_registry.settings, "mcp_session_backend", "sqlite"), \
+                patch.object(session_registry.settings, "mcp_session_db_path", sqlite_path):
+            register_mcp_session("tok", MagicMock(), "thread-1")
+            assert get_session_registry("mcp_server").lookup("tok") == {"thread_id": "thread-1"}
+            unregister_mcp_session("tok")
+            assert get_session_registry("mcp_server").lookup("tok") is None
+
+    @pytest.mark.asyncio
+    async def test_open_context_db_prefers_live_session(self):
+        live = object()
+        fresh = object()
+
+        @asynccontextmanager
+        async def session_factory():
+            yield fresh
+
+        async with open_context_db({"db": live}) as db:
+            assert db is live
+        with patch("app.database.get_session_factory", return_value=session_factory):
+            async with open_context_db({"thread_id": "t1"}) as db:
+                assert db is fresh
@@ -269,3 +269,262 @@ class TestStreamWithHeartbeat:
 
         # Should have received all events
         assert any(e.get("event") == "message_complete" for e in events)
+
+    @pytest.mark.asyncio
+    async def test_heartbeats_during_silence(self):
+        """Heartbeats are emitted after initial_delay, then every heartbeat_interval."""
+        import asyncio
+        from app.services.ai_service import stream_with_heartbeat
+
+        async def slow_source():
+            await asyncio.sleep(0.35)
+            yield {"event": "message_complete", "data": "{}"}
+
+        events = []
+        async for event in stream_with_heartbeat(
+            slow_source(), initial_delay=0.05, heartbeat_interval=0.1
+        ):
+            events.append(event)
+
+        # ~0.05, 0.15, 0.25 (and possibly 0.35) before the data arrives
+        assert 3 <= sum(1 for e in events if "comment" in e) <= 4
+        assert events[-1]["event"] == "message_complete"
+
+    @pytest.mark.asyncio
+    async def test_times_out_after_max_silence(self):
+        """Silence longer than max_silence yields a timeout error, even with heartbeats."""
+        import asyncio
+        from app.services.ai_service import stream_with_heartbeat
+
+        async def stuck_source():
+            await asyncio.sleep(10)
+            yield {"event": "message_complete", "data": "{}"}
+
+        events = []
+        async for event in stream_with_heartbeat(
+            stuck_source(), initial_delay=0.02, heartbeat_interval=0.02, max_silence=0.1
+        ):
+            events.append(event)
+
+        assert any("comment" in e for e in events)
+        assert events[-1]["event"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_streams_share_one_scheduler(self):
+        """Concurrent streams are driven by a single scheduler that stops when idle."""
+        import asyncio
+        from app.services.ai_service import stream_with_heartbeat, get_heartbeat_scheduler
+
+        release = asyncio.Event()
+
+        async def waiting_source():
+            await release.wait()
+            yield {"event": "message_complete", "data": "{}"}
+
+        async def consume():
+            return [e async for e in stream_with_heartbeat(waiting_source(), initial_delay=0.02)]
+
+        tasks = [asyncio.create_task(consume()) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        scheduler = get_heartbeat_scheduler()
+        assert len(scheduler) == 5
+
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert all(any("comment" in e for e in events) for events in results)
+        assert len(scheduler) == 0
+        await asyncio.sleep(0)
+        assert scheduler._task is None or scheduler._task.done()
+
+
+async def _legacy_stream_with_heartbeat(data_gen, initial_delay=5.0, heartbeat_interval=15.0):
+    """Pre-optimization reference: one 1-second polling heartbeat task per stream."""
+    import asyncio
+    import time
+
+    queue = asyncio.Queue()
+    last_data_time = time.monotonic()
+    done = False
+
+    async def data_producer():
+        nonlocal done
+        try:
+            async for item in data_gen:
+                await queue.put(("data", item))
+        finally:
+            done = True
+            await queue.put(("done", None))
+
+    async def heartbeat_producer():
+        nonlocal last_data_time
+        while not done:
+            await asyncio.sleep(1)
+            if time.monotonic() - last_data_time >= initial_delay:
+                await queue.put(("heartbeat", None))
+                last_data_time = time.monotonic()
+
+    data_task = asyncio.create_task(data_producer())
+    heartbeat_task = asyncio.create_task(heartbeat_producer())
+    try:
+        while True:
+            msg_type, payload = await queue.get()
+            if msg_type == "data":
+                last_data_time = time.monotonic()
+                yield payload
+            elif msg_type == "heartbeat":
+                yield {"comment": "heartbeat"}
+            else:
+                return
+    finally:
+        for task in (data_task, heartbeat_task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+async def _idle_streams_cpu(wrapper, streams=1000, idle_seconds=2.2):
+    """Open `streams` idle SSE streams and measure process CPU time while idle."""
+    import asyncio
+    import time
+
+    release = asyncio.Event()
+
+    async def idle_source():
+        await release.wait()
+        yield {"event": "message_complete", "data": "{}"}
+
+    async def consume():
+        async for _ in wrapper(idle_source(), initial_delay=60, heartbeat_interval=60):
+            pass
+
+    tasks = [asyncio.create_task(consume()) for _ in range(streams)]
+    await asyncio.sleep(0.2)  # Let every stream reach its idle wait
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(idle_seconds)
+    cpu_used = time.process_time() - cpu_start
+
+    release.set()
+    await asyncio.gather(*tasks)
+    return cpu_used
+
+
+class TestHeartbeatIdleStreamsBenchmark:
+    """
+    Benchmark: CPU used by 1,000 idle concurrent SSE streams.
+
+    The legacy design woke a polling task per stream every second
+    (~1,000 wakeups/s); the shared scheduler sleeps until the next due
+    heartbeat, so idle streams cost no wakeups at all.
+    """
+
+    @pytest.mark.asyncio
+    async def test_idle_streams_cause_no_scheduler_wakeups(self):
+        from app.services.ai_service import stream_with_heartbeat, get_heartbeat_scheduler
+
+        scheduler = get_heartbeat_scheduler()
+        wakeups_before = scheduler.wakeups
+        await _idle_streams_cpu(stream_with_heartbeat, idle_seconds=0.5)
+
+        # Only the final "all streams closed" wakeup, never per-stream polling
+        assert scheduler.wakeups - wakeups_before <= 1
+
+    @pytest.mark.asyncio
+    async def test_idle_cpu_lower_than_polling(self):
+        from app.services.ai_service import stream_with_heartbeat
+
+        new_cpu = await _idle_streams_cpu(stream_with_heartbeat)
+        legacy_cpu = await _idle_streams_cpu(_legacy_stream_with_heartbeat)
+
+        assert new_cpu < legacy_cpu, (
+            f"1000 idle streams, 2.2s: scheduler {new_cpu * 1000:.1f}ms CPU, "
+            f"polling {legacy_cpu * 1000:.1f}ms CPU"
+        )
+
+
+class TestCoalesceTextDeltas:
+    """Tests for ai_service.coalesce_text_deltas."""
+
+    @pytest.mark.asyncio
+    async def test_merges_burst_into_one_frame(self):
+        """Fragments arriving within the window become a single text_delta."""
+        from app.services.ai_service import coalesce_text_deltas
+
+        async def source():
+            for word in ["Hel", "lo", " wor", "ld"]:
+                yield {"event": "text_delta", "data": {"text": word}}
+            yield {"event": "message_complete", "data": "{}"}
+
+        events = [e async for e in coalesce_text_deltas(source(), flush_interval_ms=1000)]
+
+        assert events == [
+            {"event": "text_delta", "data": {"text": "Hello world"}},
+            {"event": "message_complete", "data": "{}"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_byte_limit(self):
+        """Buffer is flushed as soon as it reaches max_bytes."""
+        from app.services.ai_service import coalesce_text_deltas
+
+        async def source():
+            for _ in range(5):
+                yield {"event": "text_delta", "data": {"text": "abcd"}}
+
+        events = [
+            e async for e in coalesce_text_deltas(source(), flush_interval_ms=1000, max_bytes=8)
+        ]
+
+        assert [e["data"]["text"] for e in events] == ["abcdabcd", "abcdabcd", "abcd"]
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_time_window(self):
+        """Buffered text is flushed after the window even while the source is silent."""
+        import asyncio
+        import time
+        from app.services.ai_service import coalesce_text_deltas
+
+        async def source():
+            yield {"event": "text_delta", "data": {"text": "first"}}
+            await asyncio.sleep(0.3)
+            yield {"event": "text_delta", "data": {"text": "second"}}
+
+        start = time.monotonic()
+        arrivals = []
+        async for event in coalesce_text_deltas(source(), flush_interval_ms=20):
+            arrivals.append((event["data"]["text"], time.monotonic() - start))
+
+        assert [text for text, _ in arrivals] == ["first", "second"]
+        assert arrivals[0][1] < 0.2  # Not held until the next fragment
+
+    @pytest.mark.asyncio
+    async def test_zero_window_passes_through(self):
+        """flush_interval_ms=0 yields every fragment unchanged."""
+        from app.services.ai_service import coalesce_text_deltas
+
+        async def source():
+            yield {"event": "text_delta", "data": {"text": "a"}}
+            yield {"event": "text_delta", "data": {"text": "b"}}
+
+        events = [e async for e in coalesce_text_deltas(source(), flush_interval_ms=0)]
+
+        assert [e["data"]["text"] for e in events] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_flushes_buffer_before_source_error(self):
+        """Buffered text is delivered before a source exception propagates."""
+        from app.services.ai_service import coalesce_text_deltas
+
+        async def source():
+            yield {"event": "text_delta", "data": {"text": "partial"}}
+            raise RuntimeError("provider failed")
+
+        events = []
+        with pytest.raises(RuntimeError, match="provider failed"):
+            async for event in coalesce_text_deltas(source(), flush_interval_ms=1000):
+                events.append(event)
+
+        assert events == [{"event": "text_delta", "data": {"text": "partial"}}]
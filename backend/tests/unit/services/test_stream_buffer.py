@@ -0,0 +1,114 @@
+"""Unit tests for resumable chat stream buffers."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.services.stream_buffer import (
+    StreamBuffer,
+    StreamBufferRegistry,
+    parse_event_id,
+)
+
+
+async def _collect(gen):
+    return [event async for event in gen]
+
+
+class TestParseEventId:
+    """Tests for Last-Event-ID parsing."""
+
+    def test_parses_stream_id_and_seq(self):
+        assert parse_event_id("abc123:42") == ("abc123", 42)
+
+    @pytest.mark.parametrize("value", [None, "", "abc", "abc:", ":5", "abc:x"])
+    def test_rejects_malformed(self, value):
+        assert parse_event_id(value) is None
+
+
+class TestStreamBuffer:
+    """Tests for StreamBuffer replay and live follow."""
+
+    def test_append_tags_events_with_id(self):
+        buffer = StreamBuffer("t1", "u1", max_events=10)
+
+        seq = buffer.append({"event": "text_delta", "data": "{}"})
+
+        assert seq == 1
+        event = list(buffer._events)[0][1]
+        assert event["id"] == f"{buffer.stream_id}:1"
+        assert parse_event_id(event["id"]) == (buffer.stream_id, 1)
+
+    @pytest.mark.asyncio
+    async def test_subscribe_replays_after_seq(self):
+        buffer = StreamBuffer("t1", "u1", max_events=10)
+        for i in range(3):
+            buffer.append({"event": "text_delta", "data": str(i)})
+        buffer.close()
+
+        events = await _collect(buffer.subscribe(after_seq=1))
+
+        assert [e["data"] for e in events] == ["1", "2"]
+
+    @pytest.mark.asyncio
+    async def test_subscribe_follows_live_events_until_closed(self):
+        buffer = StreamBuffer("t1", "u1", max_events=10)
+        reader = asyncio.create_task(_collect(buffer.subscribe()))
+
+        await asyncio.sleep(0)
+        buffer.append({"event": "text_delta", "data": "a"})
+        await asyncio.sleep(0)
+        buffer.append({"event": "message_complete", "data": "b"})
+        buffer.close()
+
+        events = await asyncio.wait_for(reader, timeout=1)
+        assert [e["data"] for e in events] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_subscribe_reports_evicted_history(self):
+        buffer = StreamBuffer("t1", "u1", max_events=2)
+        for i in range(5):
+            buffer.append({"event": "text_delta", "data": str(i)})
+        buffer.close()
+
+        events = await _collect(buffer.subscribe(after_seq=1))
+
+        assert len(events) == 1
+        assert events[0]["event"] == "error"
+        assert "no longer available" in json.loads(events[0]["data"])["message"]
+
+
+class TestStreamBufferRegistry:
+    """Tests for buffer registration and TTL pruning."""
+
+    def test_create_and_get(self):
+        registry = StreamBufferRegistry(max_events=10, ttl_seconds=60)
+
+        buffer = registry.create("t1", "u1")
+
+        assert registry.get(buffer.stream_id) is buffer
+        assert registry.get("unknown") is None
+
+    def test_prune_drops_expired_finished_buffers(self):
+        registry = StreamBufferRegistry(max_events=10, ttl_seconds=0)
+        finished = registry.create("t1", "u1")
+        running = registry.create("t2", "u1")
+        finished.close()
+        finished.finished_at -= 1
+
+        registry.prune()
+
+        assert registry.get(finished.stream_id) is None
+        assert registry.get(running.stream_id) is running
+
+    @pytest.mark.asyncio
+    async def test_aclose_cancels_running_producers(self):
+        registry = StreamBufferRegistry(max_events=10, ttl_seconds=60)
+        buffer = registry.create("t1", "u1")
+        buffer.task = asyncio.create_task(asyncio.sleep(60))
+
+        await registry.aclose()
+
+        assert buffer.task.cancelled()
+        assert len(registry) == 0
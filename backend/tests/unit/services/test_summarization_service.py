@@ -0,0 +1,153 @@
+"""Unit tests for summarization_service context compaction."""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.config import settings
+from app.models import Message, Thread
+from app.services.conversation_service import (
+    build_conversation_context,
+    get_context_cache,
+)
+from app.services.summarization_service import maybe_compact_context
+
+
+def _mock_client(summary_text):
+    """Anthropic client stub returning a fixed summary."""
+    client = MagicMock()
+    client.messages.create = AsyncMock(return_value=SimpleNamespace(
+        content=[SimpleNamespace(text=summary_text)],
+        usage=SimpleNamespace(input_tokens=50, output_tokens=10),
+    ))
+    return client
+
+
+async def _thread_with_turns(db_session, user, thread_id, count, chars=400):
+    """Create a thread with `count` alternating turns of `chars` characters."""
+    db_session.add(user)
+    await db_session.commit()
+    thread = Thread(id=thread_id, user_id=user.id, title="Long")
+    db_session.add(thread)
+    base_time = datetime.now(timezone.utc) - timedelta(hours=1)
+    for i in range(count):
+        db_session.add(Message(
+            thread_id=thread_id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"{i}:" + "x" * (chars - len(f"{i}:")),
+            token_count=chars // 4,
+            created_at=base_time + timedelta(seconds=i),
+        ))
+    await db_session.commit()
+    return thread
+
+
+class TestMaybeCompactContext:
+    """Tests for rolling summary compaction."""
+
+    @pytest.mark.asyncio
+    async def test_noop_below_trigger(self, db_session, user, monkeypatch):
+        """Small threads are left alone without calling the LLM."""
+        monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+        monkeypatch.setattr(settings, "context_compaction_trigger_tokens", 10_000)
+        thread = await _thread_with_turns(db_session, user, "compact-1", 4)
+        await build_conversation_context(db_session, thread.id)
+
+        with patch("app.services.summarization_service.LLMFactory.get_client") as factory:
+            assert await maybe_compact_context(db_session, thread.id, user.id) is False
+            factory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_folds_older_turns_into_summary(self, db_session, user, monkeypatch):
+        """Older turns are replaced by the summary prefix; recent turns stay verbatim."""
+        monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+        monkeypatch.setattr(settings, "context_compaction_trigger_tokens", 500)
+        monkeypatch.setattr(settings, "context_compaction_keep_tokens", 300)
+        thread = await _thread_with_turns(db_session, user, "compact-2", 10)
+        await build_conversation_context(db_session, thread.id)
+
+        client = _mock_client("- Goal: faster invoicing")
+        with patch("app.services.summarization_service.LLMFactory.get_client", return_value=client), \
+                patch("app.services.summarization_service.track_token_usage", new_callable=AsyncMock):
+            assert await maybe_compact_context(db_session, thread.id, user.id) is True
+
+        await db_session.refresh(thread)
+        assert thread.context_summary == "- Goal: faster invoicing"
+
+        context = await build_conversation_context(db_session, thread.id)
+        assert "- Goal: faster invoicing" in context[0]["content"]
+        # 3 x 100-token turns fit in the 300-token keep budget
+        assert [m["content"][:2] for m in context[1:]] == ["7:", "8:", "9:"]
+        assert context.token_count < 500
+
+    @pytest.mark.asyncio
+    async def test_previous_summary_is_extended(self, db_session, user, monkeypatch):
+        """A second compaction feeds the existing summary back to the LLM."""
+        monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+        monkeypatch.setattr(settings, "context_compaction_trigger_tokens", 500)
+        monkeypatch.setattr(settings, "context_compaction_keep_tokens", 300)
+        thread = await _thread_with_turns(db_session, user, "compact-3", 10)
+        thread.context_summary = "- Stakeholder: finance team"
+        thread.context_summary_until = datetime.now(timezone.utc) - timedelta(hours=2)
+        await db_session.commit()
+        await build_conversation_context(db_session, thread.id)
+
+        client = _mock_client("- Stakeholder: finance team\n- Goal: faster invoicing")
+        with patch("app.services.summarization_service.LLMFactory.get_client", return_value=client), \
+                patch("app.services.summarization_service.track_token_usage", new_callable=AsyncMock):
+            await maybe_compact_context(db_session, thread.id, user.id)
+
+        prompt = client.messages.create.call_args.kwargs["messages"][0]["content"]
+        assert "- Stakeholder: finance team" in prompt
+
+    @pytest.mark.asyncio
+    async def test_llm_failure_keeps_context(self, db_session, user, monkeypatch):
+        """Compaction errors are logged and the thread is left unchanged."""
+        monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+        monkeypatch.setattr(settings, "context_compaction_trigger_tokens", 500)
+        monkeypatch.setattr(settings, "context_compaction_keep_tokens", 300)
+        thread = await _thread_with_turns(db_session, user, "compact-4", 10)
+        await build_conversation_context(db_session, thread.id)
+
+        client = MagicMock()
+        client.messages.create = AsyncMock(side_effect=RuntimeError("API down"))
+        with patch("app.services.summarization_service.LLMFactory.get_client", return_value=client):
+            assert await maybe_compact_context(db_session, thread.id, user.id) is False
+
+        assert get_context_cache().get(thread.id) is not None
+        context = await build_conversation_context(db_session, thread.id)
+        assert len(context) == 10
+
+    @pytest.mark.asyncio
+    async def test_decides_from_database_without_cached_context(
+        self, db_session, user, monkeypatch
+    ):
+        """A thread whose context was built on another worker is still compacted."""
+        monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+        monkeypatch.setattr(settings, "context_compaction_trigger_tokens", 500)
+        monkeypatch.setattr(settings, "context_compaction_keep_tokens", 300)
+        thread = await _thread_with_turns(db_session, user, "compact-5", 10)
+        get_context_cache().invalidate(thread.id)
+
+        client = _mock_client("- Goal: faster invoicing")
+        with patch("app.services.summarization_service.LLMFactory.get_client", return_value=client), \
+                patch("app.services.summarization_service.track_token_usage", new_callable=AsyncMock):
+            assert await maybe_compact_context(db_session, thread.id, user.id) is True
+
+        await db_session.refresh(thread)
+        assert thread.context_summary == "- Goal: faster invoicing"
+
+    @pytest.mark.asyncio
+    async def test_skips_without_anthropic_key(self, db_session, user, monkeypatch):
+        """Without an Anthropic key compaction is skipped instead of erroring."""
+        monkeypatch.setattr(settings, "anthropic_api_key", "")
+        monkeypatch.setattr(settings, "context_compaction_trigger_tokens", 500)
+        thread = await _thread_with_turns(db_session, user, "compact-6", 10)
+
+        with patch("app.services.summarization_service.LLMFactory.get_client") as factory:
+            assert await maybe_compact_context(db_session, thread.id, user.id) is False
+            factory.assert_not_called()
+
+        await db_session.refresh(thread)
+        assert thread.context_summary is None
@@ -0,0 +1,113 @@
+"""Unit tests for token_counting pure functions."""
+
+import threading
+
+import pytest
+from app.services.token_counting import (
+    ANTHROPIC_CHARS_PER_TOKEN,
+    CHARS_PER_TOKEN,
+    HeuristicTokenCounter,
+    TokenCounter,
+    count_tokens,
+    get_token_counter,
+    init_token_counters,
+    register_token_counter,
+    reset_token_counters,
+    _BUILTIN_COUNTERS,
+)
+
+
+class _WordCounter(TokenCounter):
+    """Test counter: one token per whitespace-separated word."""
+
+    name = "words"
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    """Isolate the module-level counter registry between tests."""
+    reset_token_counters()
+    yield
+    reset_token_counters()
+
+
+class TestHeuristicTokenCounter:
+    """Tests for the character-based fallback."""
+
+    def test_chars_per_token(self):
+        assert HeuristicTokenCounter().count("a" * 40) == 40 // CHARS_PER_TOKEN
+
+    def test_custom_ratio(self):
+        counter = HeuristicTokenCounter(ANTHROPIC_CHARS_PER_TOKEN)
+        assert counter.count("a" * 36) == 10
+        assert counter.name == "heuristic:3.5"
+
+    def test_empty_string(self):
+        assert HeuristicTokenCounter().count("") == 0
+
+
+class TestGetTokenCounter:
+    """Tests for provider counter lookup."""
+
+    def test_no_provider_uses_heuristic(self):
+        assert get_token_counter(None).name == "heuristic"
+
+    def test_unknown_provider_uses_heuristic(self):
+        assert get_token_counter("google").name == "heuristic"
+
+    def test_claude_providers_use_calibrated_heuristic(self):
+        for provider in ("anthropic", "claude-code-sdk", "claude-code-cli"):
+            assert get_token_counter(provider).name == "heuristic:3.5"
+        assert count_tokens("a" * 350, "anthropic") == 100
+
+    def test_registered_counter_is_used(self):
+        register_token_counter("anthropic", _WordCounter())
+        assert count_tokens("one two three", "anthropic") == 3
+
+    def test_failed_builtin_falls_back_to_heuristic(self, monkeypatch):
+        calls = []
+
+        def broken_factory():
+            calls.append(1)
+            raise ImportError("tokenizer not installed")
+
+        monkeypatch.setitem(_BUILTIN_COUNTERS, "deepseek", broken_factory)
+
+        assert get_token_counter("deepseek").name == "heuristic"
+        # Fallback is memoized - the factory is not retried on every call
+        get_token_counter("deepseek")
+        assert len(calls) == 1
+
+
+class TestInitTokenCounters:
+    """Tests for startup construction of built-in counters."""
+
+    @pytest.mark.asyncio
+    async def test_builds_counters_off_the_event_loop(self, monkeypatch):
+        threads = []
+
+        def factory():
+            threads.append(threading.current_thread())
+            return _WordCounter()
+
+        monkeypatch.setitem(_BUILTIN_COUNTERS, "deepseek", factory)
+
+        await init_token_counters()
+
+        assert threads and threads[0] is not threading.main_thread()
+        # Later lookups on the request path reuse the startup instance
+        assert get_token_counter("deepseek").name == "words"
+        assert len(threads) == 1
+
+
+class TestCountTokens:
+    """Tests for count_tokens."""
+
+    def test_none_text_counts_zero(self):
+        assert count_tokens(None) == 0
+
+    def test_default_matches_heuristic(self):
+        assert count_tokens("a" * 400) == 100
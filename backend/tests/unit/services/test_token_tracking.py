@@ -36,6 +36,11 @@ class TestCalculateCost:
         # Default input price is $3/1M
         assert cost == Decimal("3.00")
 
+    def test_cache_tokens_priced_separately(self):
+        # 1M cache writes at $3.75 + 1M cache reads at $0.30
+        cost = calculate_cost("claude-sonnet-4-5-20250929", 0, 0, 1_000_000, 1_000_000)
+        assert cost == Decimal("4.05")
+
     def test_zero_tokens_returns_zero(self):
         cost = calculate_cost("claude-sonnet-4-5-20250929", 0, 0)
         assert cost == Decimal("0")
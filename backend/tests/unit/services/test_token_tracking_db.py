@@ -53,6 +53,27 @@ class TestTrackTokenUsage:
 
         assert usage.total_cost == Decimal("18.00")
 
+    @pytest.mark.asyncio
+    async def test_records_cache_tokens(self, db_session, user):
+        """Prompt cache token counts are stored and included in cost."""
+        db_session.add(user)
+        await db_session.commit()
+
+        usage = await track_token_usage(
+            db_session,
+            user.id,
+            "claude-sonnet-4-5-20250929",
+            0,
+            0,
+            "/api/chat",
+            cache_creation_tokens=1_000_000,  # $3.75
+            cache_read_tokens=1_000_000  # $0.30
+        )
+
+        assert usage.cache_creation_tokens == 1_000_000
+        assert usage.cache_read_tokens == 1_000_000
+        assert usage.total_cost == Decimal("4.05")
+
     @pytest.mark.asyncio
     async def test_persists_to_database(self, db_session, user):
         """Usage record is persisted and can be queried."""
@@ -0,0 +1,82 @@
+"""Unit tests for the post-stream work queue."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services.work_queue import WorkQueue
+
+
+@asynccontextmanager
+async def _fake_session():
+    yield object()
+
+
+@pytest.fixture
+async def queue():
+    q = WorkQueue(workers=2, max_attempts=3, retry_delay=0)
+    yield q
+    await q.aclose()
+
+
+class TestWorkQueue:
+    """Tests for step ordering, retry and idle waiting."""
+
+    @pytest.mark.asyncio
+    async def test_runs_steps_in_order_with_fresh_sessions(self, queue):
+        calls = []
+        sessions = []
+
+        def step(name):
+            async def run(db):
+                sessions.append(db)
+                calls.append(name)
+            return (name, run)
+
+        queue.submit("job", _fake_session, [step("a"), step("b")])
+        await queue.join()
+
+        assert calls == ["a", "b"]
+        assert sessions[0] is not sessions[1]
+        assert queue.completed == 1
+        assert len(queue) == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_resumes_at_failed_step(self, queue):
+        calls = []
+        failures = {"b": 1}
+
+        def step(name):
+            async def run(db):
+                calls.append(name)
+                if failures.get(name):
+                    failures[name] -= 1
+                    raise RuntimeError("transient")
+            return (name, run)
+
+        queue.submit("job", _fake_session, [step("a"), step("b"), step("c")])
+        await queue.join()
+
+        assert calls == ["a", "b", "b", "c"]
+        assert queue.retries == 1
+        assert queue.completed == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self, queue):
+        calls = []
+
+        async def always_fails(db):
+            calls.append("fail")
+            raise RuntimeError("permanent")
+
+        async def never_reached(db):
+            calls.append("next")
+
+        queue.submit("job", _fake_session, [("fail", always_fails), ("next", never_reached)])
+        await queue.join()
+
+        assert calls == ["fail"] * 3
+        assert queue.failed == 1
+        assert queue.completed == 0
+
@@ -89,7 +89,7 @@ class TestAIServiceAgentRouting:
         # Verify text_delta event
         text_events = [e for e in events if e.get("event") == "text_delta"]
         assert len(text_events) == 1
-        assert json.loads(text_events[0]["data"])["text"] == "hello"
+        assert text_events[0]["data"]["text"] == "hello"
 
     @pytest.mark.asyncio
     @patch('app.services.ai_service.get_logging_service')
@@ -0,0 +1,204 @@
+"""Tests and concurrency benchmark for the SQLite performance profile."""
+
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app import database
+from app.database import (
+    apply_sqlite_profile,
+    engine_options,
+    is_sqlite_file_url,
+    sqlite_profile_pragmas,
+)
+from app.models import Base, Document, Message, OAuthProvider, Project, Thread, User
+
+
+async def _make_engine(path, tuned: bool, busy_timeout_ms: int = 5000):
+    """File database with the profile applied (tuned) or engine defaults."""
+    url = f"sqlite+aiosqlite:///{path}"
+    if tuned:
+        engine = create_async_engine(url, **engine_options(url))
+        with patch.object(database.settings, "sqlite_busy_timeout_ms", busy_timeout_ms):
+            apply_sqlite_profile(engine)
+    else:
+        # Same lock wait as the tuned engine, default rollback journal
+        engine = create_async_engine(url, connect_args={"timeout": busy_timeout_ms / 1000})
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+async def _seed(session_factory, thread_count: int):
+    async with session_factory() as session:
+        user = User(email="bench@example.com", oauth_provider=OAuthProvider.GOOGLE, oauth_id="bench")
+        session.add(user)
+        await session.flush()
+        project = Project(user_id=user.id, name="Bench")
+        session.add(project)
+        await session.flush()
+        threads = [
+            Thread(project_id=project.id, user_id=user.id, title=f"Thread {i}")
+            for i in range(thread_count)
+        ]
+        session.add_all(threads)
+        await session.commit()
+        return project.id, [thread.id for thread in threads]
+
+
+class TestSQLiteProfile:
+    """Tests for profile PRAGMAs and pool options."""
+
+    def test_pragmas_follow_settings(self):
+        with patch.object(database.settings, "sqlite_journal_mode", "wal"), \
+                patch.object(database.settings, "sqlite_cache_size_kib", 2048):
+            pragmas = sqlite_profile_pragmas()
+
+        assert pragmas[0].startswith("PRAGMA busy_timeout=")
+        assert "PRAGMA journal_mode=WAL" in pragmas
+        assert "PRAGMA cache_size=-2048" in pragmas
+
+    def test_rejects_invalid_mode(self):
+        with patch.object(database.settings, "sqlite_synchronous", "NORMAL; DROP TABLE users"):
+            with pytest.raises(ValueError, match="Invalid sqlite_synchronous"):
+                sqlite_profile_pragmas()
+
+    def test_pool_options_only_for_file_databases(self):
+        assert is_sqlite_file_url("sqlite+aiosqlite:///./ba_assistant.db")
+        assert not is_sqlite_file_url("sqlite+aiosqlite:///:memory:")
+        assert engine_options("sqlite+aiosqlite:///:memory:") == {}
+        assert engine_options("sqlite+aiosqlite:///./ba_assistant.db")["pool_size"] == \
+            database.settings.db_pool_size
+
+    @pytest.mark.asyncio
+    async def test_profile_applied_on_connect(self, tmp_path):
+        engine = await _make_engine(tmp_path / "profile.db", tuned=True, busy_timeout_ms=1234)
+        async with engine.connect() as conn:
+            journal_mode = (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar()
+            busy_timeout = (await conn.exec_driver_sql("PRAGMA busy_timeout")).scalar()
+            synchronous = (await conn.exec_driver_sql("PRAGMA synchronous")).scalar()
+        await engine.dispose()
+
+        assert journal_mode == "wal"
+        assert busy_timeout == 1234
+        assert synchronous == 1  # NORMAL
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("tuned", [False, True])
+    async def test_writer_commits_during_open_read_transaction(self, tmp_path, tuned):
+        """WAL lets a writer commit while a reader holds a transaction open."""
+        engine = await _make_engine(tmp_path / "locks.db", tuned=tuned, busy_timeout_ms=200)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        _, thread_ids = await _seed(session_factory, 1)
+
+        async with engine.connect() as reader:
+            await reader.exec_driver_sql("BEGIN")
+            await reader.exec_driver_sql("SELECT count(*) FROM messages")
+
+            async with session_factory() as writer:
+                writer.add(Message(thread_id=thread_ids[0], role="user", content="hi"))
+                if tuned:
+                    await writer.commit()
+                else:
+                    with pytest.raises(OperationalError, match="database is locked"):
+                        await writer.commit()
+            await reader.rollback()
+        await engine.dispose()
+
+
+async def _mixed_traffic(engine, chats: int = 6, uploads: int = 2, turns: int = 5):
+    """
+    Simultaneous chat turns, document uploads and long-lived readers.
+
+    Returns:
+        (elapsed seconds, "database is locked" errors)
+    """
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    project_id, thread_ids = await _seed(session_factory, chats)
+    errors = 0
+    done = asyncio.Event()
+
+    async def chat(thread_id):
+        nonlocal errors
+        for turn in range(turns):
+            try:
+                async with session_factory() as session:
+                    await session.execute(select(Message).where(Message.thread_id == thread_id))
+                    session.add(Message(thread_id=thread_id, role="user", content="question " * 200))
+                    await session.commit()
+                async with session_factory() as session:
+                    session.add(Message(thread_id=thread_id, role="assistant", content="answer " * 2000))
+                    await session.execute(
+                        update(Thread).where(Thread.id == thread_id).values(title=f"Turn {turn}")
+                    )
+                    await session.commit()
+            except OperationalError:
+                errors += 1
+
+    async def upload(index):
+        nonlocal errors
+        for turn in range(turns):
+            try:
+                async with session_factory() as session:
+                    session.add(Document(
+                        project_id=project_id,
+                        filename=f"upload-{index}-{turn}.pdf",
+                        content_encrypted=os.urandom(400_000),
+                        content_text="extracted text " * 10_000,
+                    ))
+                    await session.commit()
+            except OperationalError:
+                errors += 1
+
+    async def reader():
+        # e.g. thread history being serialized while other requests write
+        while not done.is_set():
+            async with engine.connect() as conn:
+                await conn.exec_driver_sql("BEGIN")
+                await conn.exec_driver_sql("SELECT count(*) FROM messages")
+                await asyncio.sleep(0.05)
+                await conn.rollback()
+            await asyncio.sleep(0.005)
+
+    readers = [asyncio.create_task(reader()) for _ in range(2)]
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(chat(thread_id) for thread_id in thread_ids),
+        *(upload(index) for index in range(uploads)),
+    )
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*readers)
+    return elapsed, errors
+
+
+class TestSQLiteConcurrencyBenchmark:
+    """
+    Benchmark: concurrent chat + upload traffic, engine defaults vs profile.
+
+    With the default rollback journal, every open read transaction blocks
+    commits until the busy timeout ("database is locked"); under WAL they
+    proceed, so the tuned engine must finish faster without lock errors.
+    """
+
+    @pytest.mark.asyncio
+    async def test_profile_removes_lock_errors_and_is_faster(self, tmp_path, quiet_root_logger):
+        baseline_engine = await _make_engine(tmp_path / "baseline.db", tuned=False)
+        baseline_time, baseline_errors = await _mixed_traffic(baseline_engine)
+        await baseline_engine.dispose()
+
+        tuned_engine = await _make_engine(tmp_path / "tuned.db", tuned=True)
+        tuned_time, tuned_errors = await _mixed_traffic(tuned_engine)
+        await tuned_engine.dispose()
+
+        assert tuned_errors == 0
+        assert tuned_time < baseline_time, (
+            f"tuned {tuned_time:.2f}s vs defaults {baseline_time:.2f}s "
+            f"({baseline_errors} lock errors)"
+        )
@@ -0,0 +1,150 @@
+"""Tests and deep-page benchmark for keyset pagination helpers."""
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models import Base, OAuthProvider, Thread, User
+from app.utils import pagination
+from app.utils.pagination import CountCache, decode_cursor, encode_cursor, paginate_keyset, split_page
+
+
+async def _seed_threads(tmp_path, count: int, same_timestamp_every: int = 1):
+    """File database with count threads; groups of threads share last_activity_at."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pages.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    start = datetime(2026, 1, 1)
+    async with session_factory() as session:
+        user = User(email="pages@example.com", oauth_provider=OAuthProvider.GOOGLE, oauth_id="pages")
+        session.add(user)
+        await session.commit()
+    async with engine.begin() as conn:
+        await conn.execute(insert(Thread.__table__), [
+            {
+                "user_id": user.id,
+                "title": f"Thread {i}",
+                "last_activity_at": start + timedelta(seconds=i // same_timestamp_every),
+            }
+            for i in range(count)
+        ])
+    return engine, session_factory, user.id
+
+
+class TestCursor:
+    """Tests for cursor encoding."""
+
+    def test_round_trip(self):
+        value = datetime(2026, 10, 17, 12, 30, 1, 250000)
+
+        assert decode_cursor(encode_cursor(value, "thread-1")) == (value, "thread-1")
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", encode_cursor(datetime(2026, 1, 1), "x")[:-4]])
+    def test_malformed_cursor_is_400(self, cursor):
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor(cursor)
+
+        assert exc_info.value.status_code == 400
+
+    def test_split_page(self):
+        rows = [Thread(id=str(i), last_activity_at=datetime(2026, 1, 1)) for i in range(3)]
+
+        assert split_page(rows, 5, "last_activity_at") == (rows, None)
+        assert split_page(rows, None, "last_activity_at") == (rows, None)
+        page, cursor = split_page(rows, 2, "last_activity_at")
+        assert page == rows[:2]
+        assert decode_cursor(cursor) == (datetime(2026, 1, 1), "1")
+
+
+class TestCountCache:
+    """Tests for cached list totals."""
+
+    def test_expires_after_ttl(self):
+        cache = CountCache(ttl=60)
+        cache.set(("threads", "u1", None), 42)
+        assert cache.get(("threads", "u1", None)) == 42
+
+        with patch.object(pagination.time, "monotonic", return_value=time.monotonic() + 61):
+            assert cache.get(("threads", "u1", None)) is None
+
+    def test_bounded(self):
+        cache = CountCache(ttl=60, max_entries=2)
+        for i in range(3):
+            cache.set(i, i)
+
+        assert cache.get(0) is None
+        assert cache.get(2) == 2
+
+
+class TestKeysetWalk:
+    """Walking a list by cursor visits every row exactly once."""
+
+    @pytest.mark.asyncio
+    async def test_walk_with_tied_sort_values(self, tmp_path):
+        engine, session_factory, user_id = await _seed_threads(tmp_path, 23, same_timestamp_every=4)
+
+        seen = []
+        cursor = None
+        async with session_factory() as session:
+            while True:
+                stmt = paginate_keyset(
+                    select(Thread).where(Thread.user_id == user_id),
+                    Thread.last_activity_at, Thread.id, cursor, 5
+                )
+                page, cursor = split_page((await session.execute(stmt)).scalars().all(), 5, "last_activity_at")
+                seen.extend(page)
+                if cursor is None:
+                    break
+            expected = (await session.execute(
+                select(Thread).order_by(Thread.last_activity_at.desc(), Thread.id.desc())
+            )).scalars().all()
+        await engine.dispose()
+
+        assert [t.id for t in seen] == [t.id for t in expected]
+
+
+class TestDeepPageBenchmark:
+    """
+    Benchmark: fetch a page deep into a large thread list.
+
+    OFFSET steps over every earlier row; the keyset query seeks the
+    (last_activity_at, id) index to the cursor, so it must be faster.
+    """
+
+    @pytest.mark.asyncio
+    async def test_keyset_faster_than_offset_on_deep_page(self, tmp_path, quiet_root_logger):
+        total, page_size, depth = 20000, 50, 19000
+        engine, session_factory, user_id = await _seed_threads(tmp_path, total)
+        base = select(Thread)
+
+        async with session_factory() as session:
+            # Cursor of the row just before the deep page
+            boundary = (await session.execute(
+                base.order_by(Thread.last_activity_at.desc(), Thread.id.desc()).offset(depth - 1).limit(1)
+            )).scalar_one()
+            cursor = encode_cursor(boundary.last_activity_at, boundary.id)
+            offset_stmt = paginate_keyset(base, Thread.last_activity_at, Thread.id, None, page_size).offset(depth)
+            keyset_stmt = paginate_keyset(base, Thread.last_activity_at, Thread.id, cursor, page_size)
+
+            async def best_time(stmt):
+                best = float("inf")
+                for _ in range(5):
+                    start = time.perf_counter()
+                    rows = (await session.execute(stmt)).scalars().all()
+                    best = min(best, time.perf_counter() - start)
+                return best, [row.id for row in rows]
+
+            offset_time, offset_ids = await best_time(offset_stmt)
+            keyset_time, keyset_ids = await best_time(keyset_stmt)
+        await engine.dispose()
+
+        assert keyset_ids == offset_ids
+        assert keyset_time < offset_time, (
+            f"keyset {keyset_time * 1000:.1f}ms vs offset {offset_time * 1000:.1f}ms at row {depth}"
+        )
@@ -0,0 +1,208 @@
+"""Tests and startup benchmark for recorded SQLite schema migrations."""
+
+import asyncio
+import sqlite3
+import time
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import database
+from app.database import MIGRATION_STEPS, SCHEMA_MIGRATIONS_TABLE, MigrationStep
+from app.models import Base
+
+
+async def _make_engine(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+def _record_statements(engine):
+    """Collect SQL statements executed on engine (list filled in place)."""
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    return statements
+
+
+class TestRunMigrations:
+    """Tests for _run_migrations and the schema_migrations table."""
+
+    @pytest.mark.asyncio
+    async def test_first_start_applies_and_records_every_step(self, tmp_path):
+        engine = await _make_engine(tmp_path / "fresh.db")
+        with patch.object(database, "engine", engine):
+            applied = await database._run_migrations()
+            async with engine.connect() as conn:
+                recorded = (await conn.execute(
+                    text(f"SELECT version FROM {SCHEMA_MIGRATIONS_TABLE}")
+                )).scalars().all()
+                fts = (await conn.execute(
+                    text("SELECT sql FROM sqlite_master WHERE name = 'document_fts'")
+                )).scalar()
+        await engine.dispose()
+
+        assert applied == [step.version for step in MIGRATION_STEPS]
+        assert sorted(recorded) == sorted(applied)
+        assert "unicode61" in fts
+
+    @pytest.mark.asyncio
+    async def test_warm_start_only_reads_version_table(self, tmp_path):
+        engine = await _make_engine(tmp_path / "warm.db")
+        with patch.object(database, "engine", engine):
+            await database._run_migrations()
+            statements = _record_statements(engine)
+
+            assert await database._run_migrations() == []
+        await engine.dispose()
+
+        assert statements
+        assert all(SCHEMA_MIGRATIONS_TABLE in statement for statement in statements)
+
+    @pytest.mark.asyncio
+    async def test_failed_step_is_retried_on_next_start(self, tmp_path):
+        calls = []
+
+        async def flaky(conn):
+            calls.append(1)
+            # Not IF NOT EXISTS: the re-run fails unless the first attempt rolled back
+            await conn.execute(text("CREATE TABLE flaky_probe (id INTEGER)"))
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+
+        steps = MIGRATION_STEPS + [MigrationStep("sqlite:test_flaky", "Flaky", flaky)]
+        engine = await _make_engine(tmp_path / "flaky.db")
+        with patch.object(database, "engine", engine), \
+                patch.object(database, "MIGRATION_STEPS", steps):
+            with pytest.raises(RuntimeError):
+                await database._run_migrations()
+
+            # Earlier steps stay recorded; the failed one rolled back and re-runs
+            assert await database._run_migrations() == ["sqlite:test_flaky"]
+            assert await database._run_migrations() == []
+        assert len(calls) == 2
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_starts_apply_each_step_once(self, tmp_path):
+        """Two workers migrating one file database at the same time."""
+        engine = await _make_engine(tmp_path / "race.db")
+        with patch.object(database, "engine", engine):
+            first, second = await asyncio.gather(
+                database._run_migrations(), database._run_migrations()
+            )
+            async with engine.connect() as conn:
+                recorded = (await conn.execute(
+                    text(f"SELECT version FROM {SCHEMA_MIGRATIONS_TABLE}")
+                )).scalars().all()
+        await engine.dispose()
+
+        assert sorted(first + second) == sorted(step.version for step in MIGRATION_STEPS)
+        assert sorted(recorded) == sorted(first + second)
+
+    @pytest.mark.asyncio
+    async def test_legacy_database_is_upgraded(self, tmp_path):
+        """Pre-counter threads table: columns added and backfilled once."""
+        path = tmp_path / "legacy.db"
+        engine = await _make_engine(path)
+        async with engine.begin() as conn:
+            await conn.execute(text("INSERT INTO users (id, email, oauth_provider, oauth_id, is_admin, "
+                                    "created_at, updated_at) VALUES ('u1', 'a@b.c', 'GOOGLE', 'g1', 0, "
+                                    "CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"))
+            await conn.execute(text("INSERT INTO threads (id, user_id, thread_type, created_at, updated_at, "
+                                    "last_activity_at, message_count, artifact_count) VALUES ('t1', 'u1', "
+                                    "'ba_assistant', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 0, 0)"))
+            await conn.execute(text("INSERT INTO messages (id, thread_id, role, content, created_at) "
+                                    "VALUES ('m1', 't1', 'user', 'hello', CURRENT_TIMESTAMP)"))
+            await conn.execute(text("DROP INDEX ix_threads_owner_activity_id"))
+            for column in ("owner_user_id", "last_message_preview", "artifact_count", "message_count"):
+                await conn.execute(text(f"ALTER TABLE threads DROP COLUMN {column}"))
+
+        with patch.object(database, "engine", engine):
+            await database._run_migrations()
+            async with engine.connect() as conn:
+                row = (await conn.execute(text(
+                    "SELECT message_count, last_message_preview, owner_user_id FROM threads"
+                ))).one()
+        await engine.dispose()
+
+        assert tuple(row) == (1, "hello", "u1")
+
+
+def _seed_messages(path, thread_count: int, messages_per_thread: int):
+    """Bulk-load a large conversation history with the stdlib driver."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(
+        "INSERT INTO users (id, email, oauth_provider, oauth_id, is_admin, created_at, updated_at) "
+        "VALUES ('u1', 'bench@example.com', 'GOOGLE', 'bench', 0, '2026-01-01', '2026-01-01')"
+    )
+    conn.executemany(
+        "INSERT INTO threads (id, user_id, owner_user_id, thread_type, created_at, updated_at, "
+        "last_activity_at, message_count, artifact_count) "
+        "VALUES (?, 'u1', 'u1', 'ba_assistant', '2026-01-01', '2026-01-01', '2026-01-01', ?, 0)",
+        ((f"t{i}", messages_per_thread) for i in range(thread_count)),
+    )
+    conn.executemany(
+        "INSERT INTO messages (id, thread_id, role, content, created_at) "
+        "VALUES (?, ?, 'user', 'message body', '2026-01-01')",
+        (
+            (f"m{i}", f"t{i % thread_count}")
+            for i in range(thread_count * messages_per_thread)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+class TestStartupBenchmark:
+    """
+    Benchmark: startup migration cost on a 1M-message database.
+
+    Before schema_migrations, every start re-ran all checks, including the
+    last_activity_at backfill UPDATE over threads; a recorded warm start
+    only reads the version table, so it must be faster.
+    """
+
+    @pytest.mark.asyncio
+    async def test_warm_start_faster_than_rerunning_all_checks(self, tmp_path, quiet_root_logger):
+        path = tmp_path / "large.db"
+        engine = await _make_engine(path)
+        await engine.dispose()
+        _seed_messages(path, thread_count=20_000, messages_per_thread=50)
+
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        with patch.object(database, "engine", engine):
+            await database._run_migrations()  # Cold start records every step
+
+            async def legacy_start():
+                async with engine.begin() as conn:
+                    for step in MIGRATION_STEPS:
+                        await step.apply(conn)
+
+            async def best_time(start_fn):
+                best = float("inf")
+                for _ in range(3):
+                    started = time.perf_counter()
+                    await start_fn()
+                    best = min(best, time.perf_counter() - started)
+                return best
+
+            legacy_time = await best_time(legacy_start)
+            warm_time = await best_time(database._run_migrations)
+            async with engine.connect() as conn:
+                message_total = (await conn.execute(text("SELECT COUNT(*) FROM messages"))).scalar()
+        await engine.dispose()
+
+        assert message_total == 1_000_000
+        assert warm_time < legacy_time, (
+            f"warm {warm_time * 1000:.1f}ms vs all checks {legacy_time * 1000:.1f}ms"
+        )